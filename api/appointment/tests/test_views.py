@@ -1,13 +1,13 @@
 # api/appointment/test_views.py
 
-from unittest.mock import patch
-
 import pytest
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIClient
 
 from api.appointment.models import Appointment
+from api.email_outbox.kinds import APPOINTMENT_CREATED, APPOINTMENT_DELETED
+from api.email_outbox.models import EmailOutbox
 from api.leads.models import Lead, LeadStatus
 from api.statut_dossier.models import StatutDossier
 from api.users.models import User
@@ -42,24 +42,26 @@ def lead():
 
 
 def test_create_appointment_success(client, admin_user, lead):
-    with patch("api.utils.email.appointment.tasks.send_appointment_created_task.delay"):
-        client.force_authenticate(user=admin_user)
-        date = timezone.now() + timezone.timedelta(days=1)
-        response = client.post(
-            "/api/appointments/",
-            {
-                "lead_id": lead.id,
-                "date": date.isoformat(),
-                "note": "Premier rendez-vous",
-            },
-            format="json",
-        )
-
-        assert response.status_code == status.HTTP_201_CREATED
-        assert Appointment.objects.count() == 1
-        appointment = Appointment.objects.first()
-        assert appointment.lead == lead
-        assert appointment.created_by == admin_user
+    client.force_authenticate(user=admin_user)
+    date = timezone.now() + timezone.timedelta(days=1)
+    response = client.post(
+        "/api/appointments/",
+        {
+            "lead_id": lead.id,
+            "date": date.isoformat(),
+            "note": "Premier rendez-vous",
+        },
+        format="json",
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert Appointment.objects.count() == 1
+    appointment = Appointment.objects.first()
+    assert appointment.lead == lead
+    assert appointment.created_by == admin_user
+    assert EmailOutbox.objects.filter(
+        kind=APPOINTMENT_CREATED, object_id=appointment.id
+    ).exists()
 
 
 def test_create_appointment_in_past_fails(client, admin_user, lead):
@@ -95,14 +97,49 @@ def test_list_appointments(client, admin_user, lead):
 
 
 def test_delete_appointment(client, admin_user, lead):
-    with patch("api.appointment.views.send_appointment_deleted_task.delay"):
-        client.force_authenticate(user=admin_user)
-        appointment = Appointment.objects.create(
-            lead=lead,
-            date=timezone.now() + timezone.timedelta(days=1),
-            note="À supprimer",
-            created_by=admin_user,
-        )
-        response = client.delete(f"/api/appointments/{appointment.id}/")
-        assert response.status_code == status.HTTP_204_NO_CONTENT
-        assert Appointment.objects.count() == 0
+    client.force_authenticate(user=admin_user)
+    appointment = Appointment.objects.create(
+        lead=lead,
+        date=timezone.now() + timezone.timedelta(days=1),
+        note="À supprimer",
+        created_by=admin_user,
+    )
+    response = client.delete(f"/api/appointments/{appointment.id}/")
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert Appointment.objects.count() == 0
+
+    outbox = EmailOutbox.objects.get(kind=APPOINTMENT_DELETED)
+    assert outbox.lead_id == lead.id
+    assert outbox.payload["date"] == appointment.date.isoformat()
+
+
+def test_list_appointments_query_count_is_constant(client, admin_user, lead):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    client.force_authenticate(user=admin_user)
+    future_date = timezone.now() + timezone.timedelta(days=2)
+
+    def _add_appointments(count):
+        for i in range(count):
+            other = Lead.objects.create(
+                first_name=f"Lead{i}",
+                last_name="Rdv",
+                email=f"lead{Lead.objects.count()}@example.com",
+                status=lead.status,
+            )
+            other.assigned_to.add(admin_user)
+            Appointment.objects.create(
+                lead=other, date=future_date, note="RDV", created_by=admin_user
+            )
+
+    def _count():
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get("/api/appointments/")
+        assert response.status_code == status.HTTP_200_OK
+        return len(ctx.captured_queries)
+
+    _add_appointments(2)
+    few = _count()
+    _add_appointments(5)
+    assert _count() == few
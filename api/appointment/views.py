@@ -2,7 +2,8 @@
 
 from datetime import datetime
 
-from django.db.models import Count
+from django.db import transaction
+from django.db.models import Count, Prefetch
 from django.db.models.functions import TruncDate
 from django.utils.dateparse import parse_date
 from rest_framework import permissions, status, viewsets
@@ -11,19 +12,24 @@ from rest_framework.response import Response
 
 from api.appointment.models import Appointment
 from api.appointment.serializers import AppointmentSerializer
+from api.email_outbox.kinds import (
+    APPOINTMENT_CREATED,
+    APPOINTMENT_DELETED,
+    APPOINTMENT_UPDATED,
+)
+from api.email_outbox.services import enqueue_email
 from api.jurist_appointment.models import JuristAppointment
 from api.jurist_appointment.serializers import JuristAppointmentSerializer
 from api.leads.models import Lead
+from api.leads.serializers import LeadSerializer
 from api.users.models import UserRoles  # <-- adapte si besoin
-from api.utils.email.appointment.tasks import (
-    send_appointment_created_task,
-    send_appointment_deleted_task,
-    send_appointment_updated_task,
-)
 
 
 class AppointmentViewSet(viewsets.ModelViewSet):
-    queryset = Appointment.objects.select_related("lead", "created_by")
+    # Le lead imbriqué est chargé avec le même queryset optimisé que LeadViewSet
+    queryset = Appointment.objects.select_related("created_by").prefetch_related(
+        Prefetch("lead", queryset=LeadSerializer.setup_eager_loading(Lead.objects.all()))
+    )
     serializer_class = AppointmentSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -35,35 +41,38 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         if user.role == UserRoles.ADMIN:
             return qs  # admin : tout voir
         elif user.role == UserRoles.CONSEILLER:
-            return qs.filter(lead__assigned_to=user)
+            return qs.filter(lead__assigned_to__id=user.id)
         elif user.role == UserRoles.JURISTE:
-            lead_ids = JuristAppointment.objects.filter(jurist=user).values_list(
+            lead_ids = JuristAppointment.objects.filter(jurist_id=user.id).values_list(
                 "lead_id", flat=True
             )
             return qs.filter(lead_id__in=lead_ids)
         else:
             return qs.none()
 
+    @transaction.atomic
     def perform_create(self, serializer):
         instance = serializer.save()
-        send_appointment_created_task.delay(instance.id)
+        enqueue_email(APPOINTMENT_CREATED, lead=instance.lead_id, object_id=instance.id)
         return instance
 
+    @transaction.atomic
     def perform_update(self, serializer):
         instance = serializer.save()
-        send_appointment_updated_task.delay(instance.id)
+        enqueue_email(APPOINTMENT_UPDATED, lead=instance.lead_id, object_id=instance.id)
         return instance
 
+    @transaction.atomic
     def perform_destroy(self, instance):
         lead = instance.lead
 
-        # ⛔️ Ne pas envoyer un datetime.isoformat(), mais plutôt un dict sérialisé
+        # Le RDV est supprimé : sa date est figée dans le payload de l'e-mail
         appointment_data = {
             "date": instance.date.isoformat(),
         }
         instance.delete()
 
-        send_appointment_deleted_task.delay(lead.id, appointment_data)
+        enqueue_email(APPOINTMENT_DELETED, lead=lead, payload=appointment_data)
 
     @action(detail=False, methods=["get"], url_path="all-by-date")
     def all_by_date(self, request):
@@ -114,7 +123,7 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         elif user.role == UserRoles.JURISTE:
             # ✅ Juristes : uniquement LEURS RDV
             jurist_qs = JuristAppointment.objects.select_related("jurist", "lead").filter(
-                jurist=user,
+                jurist_id=user.id,
                 date__date=day
             )
             if lead_id:
@@ -157,7 +166,7 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         elif user.role == UserRoles.JURISTE:
             # ✅ Juristes : uniquement leurs RDV
             jurist_qs = JuristAppointment.objects.filter(
-                jurist=user,
+                jurist_id=user.id,
                 date__isnull=False
             )
         else:
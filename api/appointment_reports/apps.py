@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class AppointmentReportsConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "api.appointment_reports"
+
+    def ready(self):
+        from api.appointment_reports.services import connect_entry_signals
+
+        connect_entry_signals()
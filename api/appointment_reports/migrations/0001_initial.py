@@ -0,0 +1,104 @@
+# Generated by Django 5.1.7 on 2026-10-19 17:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("leads", "0011_lead_last_reminder_sent"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AppointmentReport",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("scope", models.CharField(max_length=64)),
+                ("fingerprint", models.CharField(max_length=64)),
+                ("s3_key", models.CharField(max_length=255)),
+                ("appointment_count", models.PositiveIntegerField(default=0)),
+                ("generated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Rapport quotidien des rendez-vous",
+                "verbose_name_plural": "Rapports quotidiens des rendez-vous",
+                "ordering": ["-day", "scope"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("day", "scope"),
+                        name="appointment_report_day_scope_uniq",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="DailyAppointmentEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "day",
+                    models.DateField(
+                        db_index=True, help_text="Jour (heure locale) du rendez-vous"
+                    ),
+                ),
+                ("appointment_date", models.DateTimeField()),
+                ("first_name", models.CharField(max_length=150)),
+                ("last_name", models.CharField(max_length=150)),
+                ("phone", models.CharField(blank=True, max_length=32)),
+                ("email", models.CharField(blank=True, max_length=254)),
+                ("status_code", models.CharField(max_length=50)),
+                ("status_label", models.CharField(max_length=100)),
+                (
+                    "jurists",
+                    models.JSONField(
+                        blank=True,
+                        default=list,
+                        help_text="Juristes assignés : [{id, name, email}]",
+                    ),
+                ),
+                (
+                    "conseillers",
+                    models.JSONField(
+                        blank=True,
+                        default=list,
+                        help_text="Conseillers assignés : [{id, name, email}]",
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "lead",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_appointment_entry",
+                        to="leads.lead",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Rendez-vous du rapport quotidien",
+                "verbose_name_plural": "Rendez-vous du rapport quotidien",
+                "ordering": ["appointment_date", "id"],
+            },
+        ),
+    ]
@@ -0,0 +1,63 @@
+from django.db import migrations
+from django.utils import timezone
+
+
+def _people(users):
+    return sorted(
+        (
+            {
+                "id": str(user.id),
+                "name": f"{user.first_name} {user.last_name}".strip(),
+                "email": user.email or "",
+            }
+            for user in users
+        ),
+        key=lambda p: (p["name"], p["id"]),
+    )
+
+
+def backfill_entries(apps, schema_editor):
+    """
+    Remplit le jeu des rapports avec les RDV planifiés ou confirmés déjà en base.
+    """
+    Lead = apps.get_model("leads", "Lead")
+    DailyAppointmentEntry = apps.get_model("appointment_reports", "DailyAppointmentEntry")
+
+    leads = (
+        Lead.objects.filter(
+            appointment_date__isnull=False,
+            status__code__in=["RDV_PLANIFIE", "RDV_CONFIRME"],
+        )
+        .select_related("status")
+        .prefetch_related("assigned_to", "jurist_assigned")
+    )
+    DailyAppointmentEntry.objects.bulk_create(
+        (
+            DailyAppointmentEntry(
+                lead_id=lead.id,
+                day=timezone.localtime(lead.appointment_date).date(),
+                appointment_date=lead.appointment_date,
+                first_name=lead.first_name,
+                last_name=lead.last_name,
+                phone=lead.phone or "",
+                email=lead.email or "",
+                status_code=lead.status.code,
+                status_label=lead.status.label,
+                jurists=_people(lead.jurist_assigned.all()),
+                conseillers=_people(lead.assigned_to.all()),
+            )
+            for lead in leads.iterator(chunk_size=500)
+        ),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("appointment_reports", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_entries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,66 @@
+from django.db import models
+
+
+class DailyAppointmentEntry(models.Model):
+    """
+    Ligne du rapport quotidien des rendez-vous : copie figée d'un lead ayant un RDV
+    planifié ou confirmé, tenue à jour au fil des écritures sur le lead et ses assignations.
+    Le rapport d'une journée se construit à partir de ces lignes, sans relire les leads.
+    """
+
+    lead = models.OneToOneField(
+        "leads.Lead",
+        on_delete=models.CASCADE,
+        related_name="daily_appointment_entry",
+    )
+    day = models.DateField(db_index=True, help_text="Jour (heure locale) du rendez-vous")
+    appointment_date = models.DateTimeField()
+    first_name = models.CharField(max_length=150)
+    last_name = models.CharField(max_length=150)
+    phone = models.CharField(max_length=32, blank=True)
+    email = models.CharField(max_length=254, blank=True)
+    status_code = models.CharField(max_length=50)
+    status_label = models.CharField(max_length=100)
+    jurists = models.JSONField(
+        default=list, blank=True, help_text="Juristes assignés : [{id, name, email}]"
+    )
+    conseillers = models.JSONField(
+        default=list, blank=True, help_text="Conseillers assignés : [{id, name, email}]"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Rendez-vous du rapport quotidien"
+        verbose_name_plural = "Rendez-vous du rapport quotidien"
+        ordering = ["appointment_date", "id"]
+
+    def __str__(self):
+        return f"{self.day} – {self.first_name} {self.last_name}"
+
+
+class AppointmentReport(models.Model):
+    """
+    Rapport PDF déjà généré pour un jour et un périmètre (`all` ou `user:<uuid>`),
+    stocké dans le bucket des rapports. `fingerprint` résume le contenu : tant qu'il ne
+    change pas, le PDF stocké est resservi (renvois, téléchargements) sans être reconstruit.
+    """
+
+    day = models.DateField()
+    scope = models.CharField(max_length=64)
+    fingerprint = models.CharField(max_length=64)
+    s3_key = models.CharField(max_length=255)
+    appointment_count = models.PositiveIntegerField(default=0)
+    generated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Rapport quotidien des rendez-vous"
+        verbose_name_plural = "Rapports quotidiens des rendez-vous"
+        ordering = ["-day", "scope"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "scope"], name="appointment_report_day_scope_uniq"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.day} ({self.scope})"
@@ -0,0 +1,343 @@
+"""
+Rapport quotidien des rendez-vous : jeu du jour tenu à jour, rendu et cache.
+
+- `DailyAppointmentEntry` contient une ligne par lead ayant un RDV planifié ou confirmé.
+  Les signaux (`connect_entry_signals`) la resynchronisent à chaque écriture du lead ou de
+  ses assignations ; les mises à jour en masse appellent `sync_entries` ; `rebuild_day`
+  rapproche une journée complète (tâche préparatoire, avant l'envoi).
+- Un rapport = un jour + un périmètre : `all` (tous les RDV, sections par juriste et par
+  conseiller) ou `user:<uuid>` (RDV d'un juriste ou d'un conseiller).
+- `get_daily_report` ne reconstruit le PDF que si l'empreinte du contenu a changé ; sinon
+  le PDF stocké dans le bucket `reports` est resservi (cache disque par ETag côté worker).
+"""
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_save
+from django.utils import timezone
+
+from api.appointment_reports.models import AppointmentReport, DailyAppointmentEntry
+from api.leads.constants import RDV_CONFIRME, RDV_PLANIFIE
+from api.utils.cloud.scw.bucket_utils import delete_object, put_object
+from api.utils.cloud.scw.downloads import download_files_from_s3
+from api.utils.email.leads.pdf_report.appointment_report import (
+    generate_daily_appointment_report,
+)
+
+logger = logging.getLogger(__name__)
+
+REPORT_STATUSES = (RDV_PLANIFIE, RDV_CONFIRME)
+REPORT_BUCKET = "reports"
+SCOPE_ALL = "all"
+USER_SCOPE_PREFIX = "user:"
+# À incrémenter si la mise en page du PDF change (invalide les rapports stockés)
+LAYOUT_VERSION = "1"
+
+ENTRY_FIELDS = [
+    "day",
+    "appointment_date",
+    "first_name",
+    "last_name",
+    "phone",
+    "email",
+    "status_code",
+    "status_label",
+    "jurists",
+    "conseillers",
+]
+
+
+# ==========================
+#  JEU DU JOUR
+# ==========================
+
+
+def _person(user) -> dict:
+    return {
+        "id": str(user.id),
+        "name": f"{user.first_name} {user.last_name}".strip(),
+        "email": user.email or "",
+    }
+
+
+def _people(users) -> list:
+    return sorted((_person(user) for user in users), key=lambda p: (p["name"], p["id"]))
+
+
+def _entry_for(lead) -> DailyAppointmentEntry:
+    return DailyAppointmentEntry(
+        lead_id=lead.id,
+        day=timezone.localtime(lead.appointment_date).date(),
+        appointment_date=lead.appointment_date,
+        first_name=lead.first_name,
+        last_name=lead.last_name,
+        phone=lead.phone or "",
+        email=lead.email or "",
+        status_code=lead.status.code,
+        status_label=lead.status.label,
+        jurists=_people(lead.jurist_assigned.all()),
+        conseillers=_people(lead.assigned_to.all()),
+    )
+
+
+def sync_entries(lead_ids) -> int:
+    """
+    Aligne les lignes du rapport sur l'état courant des leads donnés : création / mise à
+    jour des RDV planifiés ou confirmés, suppression des autres. Retourne le nombre de
+    lignes conservées.
+    """
+    from api.leads.models import Lead
+
+    lead_ids = set(lead_ids)
+    if not lead_ids:
+        return 0
+
+    leads = (
+        Lead.objects.filter(
+            id__in=lead_ids,
+            appointment_date__isnull=False,
+            status__code__in=REPORT_STATUSES,
+        )
+        .select_related("status")
+        .prefetch_related("assigned_to", "jurist_assigned")
+    )
+    entries = [_entry_for(lead) for lead in leads]
+    kept = {entry.lead_id for entry in entries}
+
+    with transaction.atomic():
+        if lead_ids - kept:
+            DailyAppointmentEntry.objects.filter(lead_id__in=lead_ids - kept).delete()
+        if entries:
+            DailyAppointmentEntry.objects.bulk_create(
+                entries,
+                update_conflicts=True,
+                unique_fields=["lead"],
+                update_fields=ENTRY_FIELDS + ["updated_at"],
+            )
+    return len(entries)
+
+
+def _day_bounds(day):
+    start = timezone.make_aware(datetime.combine(day, datetime.min.time()))
+    end = timezone.make_aware(datetime.combine(day, datetime.max.time()))
+    return start, end
+
+
+def rebuild_day(day) -> int:
+    """
+    Rapproche le jeu d'une journée avec les leads (rattrape les écritures sans signaux).
+    """
+    from api.leads.models import Lead
+
+    lead_ids = set(
+        Lead.objects.filter(
+            appointment_date__range=_day_bounds(day),
+            status__code__in=REPORT_STATUSES,
+        ).values_list("id", flat=True)
+    )
+    lead_ids |= set(
+        DailyAppointmentEntry.objects.filter(day=day).values_list("lead_id", flat=True)
+    )
+    return sync_entries(lead_ids)
+
+
+def _sync_safely(lead_ids):
+    # Le rapport ne doit jamais faire échouer l'écriture du lead : la tâche
+    # préparatoire rattrape les écarts.
+    try:
+        sync_entries(lead_ids)
+    except Exception as e:
+        logger.warning("⚠️ Rapport RDV : synchronisation impossible (%s) : %s", lead_ids, e)
+
+
+def _on_lead_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if instance.appointment_date is None:
+        DailyAppointmentEntry.objects.filter(lead_id=instance.pk).delete()
+        return
+    _sync_safely([instance.pk])
+
+
+def _on_assignment_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        _sync_safely([instance.pk])
+    elif pk_set:
+        # Côté utilisateur : `pk_set` contient les leads concernés
+        _sync_safely(pk_set)
+
+
+def connect_entry_signals():
+    from api.leads.models import Lead
+
+    post_save.connect(
+        _on_lead_saved, sender=Lead, weak=False, dispatch_uid="daily-report-lead-save"
+    )
+    for field in ("assigned_to", "jurist_assigned"):
+        m2m_changed.connect(
+            _on_assignment_changed,
+            sender=getattr(Lead, field).through,
+            weak=False,
+            dispatch_uid=f"daily-report-lead-{field}",
+        )
+
+
+# ==========================
+#  RAPPORTS
+# ==========================
+
+
+@dataclass
+class DailyReport:
+    day: object
+    scope: str
+    content: bytes
+    appointment_count: int
+    from_cache: bool = False
+    owner_email: str = ""
+
+    @property
+    def filename(self) -> str:
+        if self.scope == SCOPE_ALL:
+            return f"rapport_rdv_{self.day.isoformat()}.pdf"
+        user_id = self.scope[len(USER_SCOPE_PREFIX):]
+        return f"rapport_rdv_{self.day.isoformat()}_{user_id[:8]}.pdf"
+
+
+def user_scope(user_id) -> str:
+    return f"{USER_SCOPE_PREFIX}{user_id}"
+
+
+def _scope_owner(entries, scope):
+    """Personne (juriste / conseiller) d'un périmètre `user:<uuid>`, d'après les lignes."""
+    user_id = scope[len(USER_SCOPE_PREFIX):]
+    for entry in entries:
+        for person in entry.jurists + entry.conseillers:
+            if person["id"] == user_id:
+                return person
+    return None
+
+
+def scope_entries(entries, scope) -> list:
+    if scope == SCOPE_ALL:
+        return list(entries)
+    user_id = scope[len(USER_SCOPE_PREFIX):]
+    return [
+        entry
+        for entry in entries
+        if any(p["id"] == user_id for p in entry.jurists + entry.conseillers)
+    ]
+
+
+def user_scopes(entries) -> list:
+    """Périmètres `user:<uuid>` de toutes les personnes assignées aux RDV donnés."""
+    ids = {p["id"] for entry in entries for p in entry.jurists + entry.conseillers}
+    return [user_scope(user_id) for user_id in sorted(ids)]
+
+
+def _fingerprint(entries, scope) -> str:
+    digest = hashlib.sha1(f"{LAYOUT_VERSION}|{scope}".encode())
+    for entry in entries:
+        digest.update(
+            json.dumps(
+                [entry.lead_id, entry.appointment_date.isoformat()]
+                + [getattr(entry, field) for field in ENTRY_FIELDS[2:]],
+                ensure_ascii=False,
+                sort_keys=True,
+            ).encode()
+        )
+    return digest.hexdigest()
+
+
+def _render(day, scope, entries) -> bytes:
+    if scope == SCOPE_ALL:
+        return generate_daily_appointment_report(entries, day).getvalue()
+    owner = _scope_owner(entries, scope)
+    return generate_daily_appointment_report(
+        entries, day, owner=owner["name"] if owner else "", sections=False
+    ).getvalue()
+
+
+def _store(day, scope, fingerprint, entries, content, previous):
+    key = f"rdv/{day.isoformat()}/{scope.replace(':', '-')}/{fingerprint}.pdf"
+    try:
+        put_object(REPORT_BUCKET, key, content, "application/pdf")
+    except Exception as e:
+        logger.warning("⚠️ Rapport RDV %s (%s) non stocké : %s", day, scope, e)
+        return
+
+    AppointmentReport.objects.update_or_create(
+        day=day,
+        scope=scope,
+        defaults={
+            "fingerprint": fingerprint,
+            "s3_key": key,
+            "appointment_count": len(entries),
+        },
+    )
+    if previous and previous.s3_key != key:
+        try:
+            delete_object(REPORT_BUCKET, previous.s3_key)
+        except Exception as e:
+            logger.warning("⚠️ Ancien rapport RDV non supprimé (%s) : %s", previous.s3_key, e)
+
+
+def _report_for(day, scope, entries) -> DailyReport:
+    owner = _scope_owner(entries, scope) if scope != SCOPE_ALL else None
+    report = DailyReport(
+        day=day,
+        scope=scope,
+        content=b"",
+        appointment_count=len(entries),
+        owner_email=owner["email"] if owner else "",
+    )
+    fingerprint = _fingerprint(entries, scope)
+    stored = AppointmentReport.objects.filter(day=day, scope=scope).first()
+
+    if stored and stored.fingerprint == fingerprint:
+        (download,) = download_files_from_s3(REPORT_BUCKET, [stored.s3_key])
+        if download.ok:
+            report.content = download.content
+            report.from_cache = True
+            return report
+        logger.warning("⚠️ Rapport RDV stocké illisible (%s), reconstruction", stored.s3_key)
+
+    report.content = _render(day, scope, entries)
+    _store(day, scope, fingerprint, entries, report.content, stored)
+    return report
+
+
+def get_daily_report(day=None, scope=SCOPE_ALL) -> DailyReport:
+    """
+    Rapport d'un jour pour un périmètre, resservi depuis le stockage s'il est à jour.
+    """
+    day = day or timezone.localdate()
+    entries = scope_entries(DailyAppointmentEntry.objects.filter(day=day), scope)
+    return _report_for(day, scope, entries)
+
+
+def prepare_daily_reports(day=None, per_user=False) -> list:
+    """
+    Rapproche le jeu du jour puis génère (ou reprend) le rapport complet et, si demandé,
+    celui de chaque juriste / conseiller concerné. Liste vide s'il n'y a aucun RDV.
+    """
+    day = day or timezone.localdate()
+    rebuild_day(day)
+    entries = list(DailyAppointmentEntry.objects.filter(day=day))
+    if not entries:
+        return []
+
+    reports = [_report_for(day, SCOPE_ALL, entries)]
+    if per_user:
+        reports += [
+            _report_for(day, scope, scope_entries(entries, scope))
+            for scope in user_scopes(entries)
+        ]
+    return reports
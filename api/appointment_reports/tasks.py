@@ -0,0 +1,24 @@
+import logging
+from datetime import date
+
+from celery import shared_task
+from django.conf import settings
+
+from api.appointment_reports.services import prepare_daily_reports
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def prepare_daily_appointments_report(day=None):
+    """
+    Prépare à l'avance les rapports du jour (ou de `day`, AAAA-MM-JJ) : rapprochement du
+    jeu de RDV, rendu et stockage des PDF. L'envoi de 06:00 n'a plus qu'à les reprendre.
+    """
+    reports = prepare_daily_reports(
+        date.fromisoformat(day) if day else None,
+        per_user=getattr(settings, "DAILY_RDV_REPORT_PER_USER", False),
+    )
+    rendered = sum(1 for report in reports if not report.from_cache)
+    logger.info(f"🗂️ {len(reports)} rapports RDV prêts ({rendered} générés)")
+    return len(reports)
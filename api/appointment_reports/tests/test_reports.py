@@ -0,0 +1,184 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from django.core import mail
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.appointment_reports.models import AppointmentReport, DailyAppointmentEntry
+from api.appointment_reports.services import (
+    SCOPE_ALL,
+    get_daily_report,
+    rebuild_day,
+    user_scope,
+)
+from api.lead_status.models import LeadStatus
+from api.leads.constants import ABSENT, RDV_CONFIRME, RDV_PLANIFIE
+from api.leads.models import Lead
+from api.users.models import User
+from api.users.roles import UserRoles
+from api.utils.cloud.scw.downloads import S3Download
+from api.utils.email.leads.daily_report import send_daily_appointment_report
+from api.utils.email.leads.pdf_report.appointment_report import (
+    generate_daily_appointment_report,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+class FakeBucket:
+    def __init__(self):
+        self.objects = {}
+
+    def put(self, bucket_key, key, content, content_type=None):
+        self.objects[key] = content
+
+    def delete(self, bucket_key, key):
+        self.objects.pop(key, None)
+
+    def download(self, bucket_key, keys):
+        return [
+            S3Download(key=key, filename=key, content=self.objects[key], from_cache=True)
+            if key in self.objects
+            else S3Download(key=key, filename=key, error=KeyError(key))
+            for key in keys
+        ]
+
+
+@pytest.fixture
+def bucket():
+    fake = FakeBucket()
+    with patch("api.appointment_reports.services.put_object", fake.put), patch(
+        "api.appointment_reports.services.delete_object", fake.delete
+    ), patch("api.appointment_reports.services.download_files_from_s3", fake.download):
+        yield fake
+
+
+@pytest.fixture
+def statuses():
+    return {
+        code: LeadStatus.objects.create(code=code, label=code.title(), color="#000")
+        for code in (RDV_PLANIFIE, RDV_CONFIRME, ABSENT)
+    }
+
+
+def _user(role, name):
+    return User.objects.create_user(
+        email=f"{name.lower()}@example.com",
+        password="pass",
+        role=role,
+        first_name=name,
+        last_name="Test",
+    )
+
+
+def _today_at(hour):
+    return timezone.make_aware(
+        datetime.combine(timezone.localdate(), datetime.min.time())
+    ) + timedelta(hours=hour)
+
+
+def _lead(status, hour=10, **kwargs):
+    return Lead.objects.create(
+        first_name=kwargs.pop("first_name", "Sarah"),
+        last_name="Martin",
+        phone="+33600000000",
+        status=status,
+        appointment_date=_today_at(hour),
+        **kwargs,
+    )
+
+
+def test_entries_follow_lead_writes(statuses):
+    jurist = _user(UserRoles.JURISTE, "Paul")
+    lead = _lead(statuses[RDV_PLANIFIE])
+    entry = DailyAppointmentEntry.objects.get(lead=lead)
+    assert (entry.day, entry.jurists) == (timezone.localdate(), [])
+
+    lead.jurist_assigned.add(jurist)
+    entry.refresh_from_db()
+    assert [p["name"] for p in entry.jurists] == ["Paul Test"]
+
+    lead.status = statuses[ABSENT]
+    lead.save()
+    assert not DailyAppointmentEntry.objects.filter(lead=lead).exists()
+
+
+def test_rebuild_day_catches_bulk_updates(statuses):
+    kept = _lead(statuses[RDV_CONFIRME])
+    gone = _lead(statuses[RDV_CONFIRME], hour=11)
+    Lead.objects.filter(pk=gone.pk).update(status=statuses[ABSENT])
+
+    assert rebuild_day(timezone.localdate()) == 1
+    assert list(DailyAppointmentEntry.objects.values_list("lead_id", flat=True)) == [kept.id]
+
+
+def test_report_is_rebuilt_only_when_content_changes(statuses, bucket):
+    lead = _lead(statuses[RDV_PLANIFIE])
+
+    with patch(
+        "api.appointment_reports.services.generate_daily_appointment_report",
+        wraps=generate_daily_appointment_report,
+    ) as render:
+        first = get_daily_report()
+        second = get_daily_report()
+        assert render.call_count == 1
+        assert (first.from_cache, second.from_cache) == (False, True)
+        assert second.content == first.content
+        assert first.content.startswith(b"%PDF")
+
+        lead.first_name = "Sophie"
+        lead.save()
+        third = get_daily_report()
+        assert render.call_count == 2 and not third.from_cache
+
+    report = AppointmentReport.objects.get(day=timezone.localdate(), scope=SCOPE_ALL)
+    assert list(bucket.objects) == [report.s3_key]
+
+
+def test_send_report_to_teams_and_assigned_people(statuses, bucket, settings):
+    settings.DAILY_RDV_REPORT_RECIPIENTS = ["accueil@example.com", "direction@example.com"]
+    settings.DAILY_RDV_REPORT_PER_USER = True
+    jurist = _user(UserRoles.JURISTE, "Paul")
+    conseiller = _user(UserRoles.CONSEILLER, "Lea")
+    _lead(statuses[RDV_PLANIFIE]).jurist_assigned.add(jurist)
+    _lead(statuses[RDV_CONFIRME], hour=14).assigned_to.add(conseiller)
+
+    reports = send_daily_appointment_report()
+
+    assert [r.appointment_count for r in reports] == [2, 1, 1]
+    assert sorted(m.to[0] for m in mail.outbox) == [
+        "accueil@example.com",
+        "direction@example.com",
+        "lea@example.com",
+        "paul@example.com",
+    ]
+    assert all(m.attachments[0][2] == "application/pdf" for m in mail.outbox)
+
+
+def test_send_report_without_appointments(statuses, bucket):
+    assert send_daily_appointment_report() == []
+    assert mail.outbox == []
+
+
+def test_download_endpoint_scopes(statuses, bucket):
+    admin = _user(UserRoles.ADMIN, "Admin")
+    jurist = _user(UserRoles.JURISTE, "Paul")
+    _lead(statuses[RDV_PLANIFIE]).jurist_assigned.add(jurist)
+    url = reverse("appointment-report-daily")
+
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/pdf"
+    assert client.get(url)["X-Report-Cache"] == "HIT"
+    assert client.get(url, {"date": "15/01/2030"}).status_code == 400
+
+    client.force_authenticate(user=jurist)
+    assert client.get(url).status_code == 200
+    assert AppointmentReport.objects.filter(scope=user_scope(jurist.id)).exists()
+    assert client.get(url, {"scope": SCOPE_ALL}).status_code == 403
+    assert client.post(url).status_code == 403
@@ -0,0 +1,7 @@
+from django.urls import path
+
+from api.appointment_reports.views import DailyAppointmentReportView
+
+urlpatterns = [
+    path("daily/", DailyAppointmentReportView.as_view(), name="appointment-report-daily"),
+]
@@ -0,0 +1,62 @@
+from datetime import date
+
+from django.http import HttpResponse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from api.appointment_reports.services import SCOPE_ALL, get_daily_report, user_scope
+from api.users.roles import UserRoles
+
+
+def _parse_day(value):
+    if not value:
+        return timezone.localdate()
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValidationError({"date": "Format attendu : AAAA-MM-JJ"})
+
+
+class DailyAppointmentReportView(APIView):
+    """
+    GET /api/appointment-reports/daily/?date=AAAA-MM-JJ&scope=all|user:<uuid>
+        PDF du rapport (resservi depuis le stockage s'il est à jour).
+        Un administrateur choisit le périmètre (`all` par défaut) ; les autres utilisateurs
+        ne reçoivent que leur propre rapport.
+    POST /api/appointment-reports/daily/ {"date": "AAAA-MM-JJ"} (ADMIN)
+        Renvoi du rapport par e-mail.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def _is_admin(self, request):
+        return getattr(request.user, "role", None) == UserRoles.ADMIN
+
+    def get(self, request):
+        day = _parse_day(request.query_params.get("date"))
+        own_scope = user_scope(request.user.id)
+        if self._is_admin(request):
+            scope = request.query_params.get("scope") or SCOPE_ALL
+        else:
+            scope = request.query_params.get("scope") or own_scope
+            if scope != own_scope:
+                raise PermissionDenied("Accès limité à votre propre rapport.")
+
+        report = get_daily_report(day, scope)
+        response = HttpResponse(report.content, content_type="application/pdf")
+        response["Content-Disposition"] = f'attachment; filename="{report.filename}"'
+        response["X-Report-Cache"] = "HIT" if report.from_cache else "MISS"
+        return response
+
+    def post(self, request):
+        from api.leads.tasks import send_daily_appointments_report_task
+
+        if not self._is_admin(request):
+            raise PermissionDenied("Réservé aux administrateurs.")
+        day = _parse_day(request.data.get("date"))
+        send_daily_appointments_report_task.delay(day.isoformat())
+        return Response({"date": day.isoformat()}, status=status.HTTP_202_ACCEPTED)
@@ -1,5 +1,6 @@
 from datetime import datetime
 
+from django.db import transaction
 from django.utils import timezone
 from django.utils.dateparse import parse_date
 from rest_framework import status
@@ -8,7 +9,13 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
 from api.booking.services import list_slots_with_quota, try_book_slot
+from api.lead_assignment.services import auto_assign_new
 from api.leads.constants import RDV_PLANIFIE
+from api.leads.duplicates import (
+    attach_appointment,
+    booking_confirmation,
+    find_existing_lead,
+)
 from api.leads.models import LeadStatus
 from api.leads.serializers import LeadSerializer
 
@@ -39,7 +46,11 @@ def public_book(request):
     body: { first_name, last_name, email?, phone, date:'YYYY-MM-DD', time:'HH:mm' }
 
     1) Réserve le quota du créneau (409 si plein)
-    2) Crée le Lead (status RDV_PLANIFIE, appointment_date = start_at)
+    2) Crée le Lead (status RDV_PLANIFIE, appointment_date = start_at), assigné au
+       conseiller disponible le moins chargé, ou rattache le rendez-vous au lead existant
+       au même téléphone
+
+    Réponse (201) identique dans les deux cas, sans données du lead.
     """
     payload = request.data
     date_s = payload.get("date")
@@ -52,25 +63,35 @@ def public_book(request):
     except Exception:
         return Response({"detail": "Format date/heure invalide."}, status=400)
 
-    # 1) réservation quota
-    try:
-        try_book_slot(start_at)
-    except ValueError as e:
-        return Response({"detail": str(e)}, status=409)
+    existing = find_existing_lead(payload.get("phone"), use_filter=True)
+    lead_status = LeadStatus.objects.get(code=RDV_PLANIFIE)
 
-    # 2) création du lead (tu peux réutiliser ta route public-create si tu y injectes try_book_slot)
-    status_pk = LeadStatus.objects.get(code=RDV_PLANIFIE).pk
-    ser = LeadSerializer(
-        data={
-            "first_name": payload.get("first_name"),
-            "last_name": payload.get("last_name"),
-            "email": payload.get("email"),
-            "phone": payload.get("phone"),
-            "appointment_date": start_at,
-            "status": status_pk,
-        }
-    )
-    ser.is_valid(raise_exception=True)
-    lead = ser.save()
+    # Une erreur de validation annule aussi la réservation du créneau
+    with transaction.atomic():
+        # 1) réservation quota
+        try:
+            try_book_slot(start_at)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=409)
+
+        # 2) création du lead, ou rattachement au lead existant
+        ser = LeadSerializer(
+            existing,
+            data={
+                "first_name": payload.get("first_name"),
+                "last_name": payload.get("last_name"),
+                "email": payload.get("email"),
+                "phone": payload.get("phone"),
+                "appointment_date": start_at,
+            },
+        )
+        ser.is_valid(raise_exception=True)
+        if existing is None:
+            lead = ser.save(status=lead_status)
+            auto_assign_new([lead])
+        else:
+            lead = attach_appointment(
+                existing, start_at, lead_status, email=ser.validated_data.get("email")
+            )
 
-    return Response(LeadSerializer(lead).data, status=status.HTTP_201_CREATED)
+    return Response(booking_confirmation(lead.appointment_date), status=status.HTTP_201_CREATED)
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-19 18:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("campaigns", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="campaignrecipient",
+            name="claimed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
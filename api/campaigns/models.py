@@ -0,0 +1,91 @@
+from django.db import models
+from django.utils import timezone
+
+
+class CampaignStatus(models.TextChoices):
+    PENDING = "PENDING", "En attente"
+    RUNNING = "RUNNING", "En cours"
+    COMPLETED = "COMPLETED", "Terminée"
+    CANCELLED = "CANCELLED", "Annulée"
+
+
+class RecipientStatus(models.TextChoices):
+    PENDING = "PENDING", "En attente"
+    SENDING = "SENDING", "En cours d'envoi"
+    SENT = "SENT", "Envoyé"
+    FAILED = "FAILED", "Échec"
+    SKIPPED = "SKIPPED", "Ignoré"
+
+
+class Campaign(models.Model):
+    """
+    Campagne de notification : un même message envoyé à tous les leads sélectionnés par
+    des filtres de recherche (ex : fermeture exceptionnelle, indisponibilité d'un juriste).
+    Les destinataires sont figés à la création (`CampaignRecipient`).
+    """
+
+    name = models.CharField(max_length=255)
+    subject = models.CharField(max_length=255)
+    message = models.TextField(help_text="Corps du message (texte, un paragraphe par ligne)")
+    filters = models.JSONField(
+        default=dict, blank=True, help_text="Filtres de recherche des leads (voir lead_search)"
+    )
+    idempotency_key = models.CharField(
+        max_length=128,
+        unique=True,
+        null=True,
+        blank=True,
+        help_text="Clé fournie par le client (en-tête Idempotency-Key) : une seule campagne par clé",
+    )
+    status = models.CharField(
+        max_length=10, choices=CampaignStatus.choices, default=CampaignStatus.PENDING
+    )
+    total = models.PositiveIntegerField(default=0)
+    created_by = models.ForeignKey(
+        "users.User", on_delete=models.SET_NULL, null=True, blank=True
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Campagne"
+        verbose_name_plural = "Campagnes"
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.name} ({self.get_status_display()})"
+
+
+class CampaignRecipient(models.Model):
+    """
+    Destinataire d'une campagne. `idempotency_key` (campagne + lead) garantit un seul envoi
+    par lead, y compris si un lot est rejoué.
+    """
+
+    campaign = models.ForeignKey(
+        Campaign, on_delete=models.CASCADE, related_name="recipients"
+    )
+    lead = models.ForeignKey(
+        "leads.Lead", on_delete=models.CASCADE, related_name="campaign_recipients"
+    )
+    email = models.CharField(max_length=254)
+    idempotency_key = models.CharField(max_length=64, unique=True)
+    status = models.CharField(
+        max_length=10, choices=RecipientStatus.choices, default=RecipientStatus.PENDING
+    )
+    # Réservation par un lot (SENDING) : au-delà du délai, le worker est réputé tombé
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = "Destinataire de campagne"
+        verbose_name_plural = "Destinataires de campagne"
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["campaign", "status"], name="campaign_recipient_status_idx")
+        ]
+
+    def __str__(self):
+        return f"{self.campaign_id} → {self.email} ({self.status})"
@@ -0,0 +1,74 @@
+import uuid
+
+from rest_framework import serializers
+
+from api.campaigns.models import Campaign
+from api.leads.lead_search import FILTER_PARAMS, USER_ID_PARAMS
+
+
+class CampaignFiltersField(serializers.DictField):
+    """
+    Filtres de recherche des leads : seules les clés de `FILTER_PARAMS` sont acceptées,
+    les ids d'utilisateur doivent être des UUID.
+    """
+
+    child = serializers.CharField(allow_blank=True)
+
+    def to_internal_value(self, data):
+        filters = super().to_internal_value(data)
+        unknown = sorted(set(filters) - set(FILTER_PARAMS))
+        if unknown:
+            raise serializers.ValidationError(
+                f"Filtres inconnus : {', '.join(unknown)}"
+            )
+        for key in USER_ID_PARAMS:
+            if filters.get(key):
+                try:
+                    uuid.UUID(filters[key])
+                except ValueError:
+                    raise serializers.ValidationError(f"{key} : identifiant invalide.")
+        return {key: value for key, value in filters.items() if value != ""}
+
+
+class CampaignSerializer(serializers.ModelSerializer):
+    filters = CampaignFiltersField(required=False)
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Campaign
+        fields = [
+            "id",
+            "name",
+            "subject",
+            "message",
+            "filters",
+            "status",
+            "total",
+            "progress",
+            "created_by",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+        read_only_fields = [
+            "status",
+            "total",
+            "created_by",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+
+    def get_progress(self, obj):
+        # Compteurs annotés par `with_progress`
+        counts = {
+            key: getattr(obj, f"count_{key}", 0)
+            for key in ("pending", "sending", "sent", "failed", "skipped")
+        }
+        done = counts["sent"] + counts["failed"] + counts["skipped"]
+        counts["percent"] = round(100 * done / obj.total, 1) if obj.total else 100.0
+        return counts
+
+
+class CampaignPreviewSerializer(serializers.Serializer):
+    filters = CampaignFiltersField(required=False)
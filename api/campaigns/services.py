@@ -0,0 +1,286 @@
+"""
+Campagnes de notification en masse.
+
+- Cible : leads sélectionnés par les filtres de la recherche (`filter_leads`) et ayant un
+  e-mail ; une adresse reçoit le message une seule fois (doublons d'e-mail ignorés).
+- Les destinataires sont insérés en bloc à la création, puis découpés en lots
+  (`CAMPAIGN_CHUNK_SIZE`) traités par un groupe Celery.
+- Cadence : les lots sont échelonnés (`countdown`) pour rester sous
+  `CAMPAIGN_RATE_LIMIT_PER_MINUTE`, inférieur au quota SMTP global afin de laisser passer
+  les e-mails transactionnels.
+- Idempotence : clé unique par destinataire (campagne + lead), passage PENDING → SENDING
+  sous verrou ; un lot rejoué ne renvoie rien de ce qui est déjà parti. Chaque
+  destinataire est marqué envoyé dès son envoi.
+- Reprise : un destinataire resté SENDING au-delà de `CAMPAIGN_CLAIM_TIMEOUT` (worker
+  tombé ou arrêté) repasse en attente et est reprogrammé (`release_stale_recipients`,
+  tâche périodique `resume_campaigns`) ; sans cela la campagne ne se terminerait jamais.
+- Avancement : compté sur les statuts des destinataires (`with_progress`).
+"""
+
+import logging
+import math
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from api.campaigns.models import (
+    Campaign,
+    CampaignRecipient,
+    CampaignStatus,
+    RecipientStatus,
+)
+from api.leads.lead_search import filter_leads
+from api.leads.models import Lead
+from api.utils.email.config import _build_context, _build_message
+from api.utils.email.dispatch import dispatch_messages
+from api.utils.email.rendering import render_batch
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE = "email/campaigns/campaign.html"
+DEFAULTS = {
+    "CAMPAIGN_CHUNK_SIZE": 50,
+    "CAMPAIGN_RATE_LIMIT_PER_MINUTE": 20,
+    "CAMPAIGN_INSERT_BATCH_SIZE": 1000,
+    # Supérieur à la limite de temps de la file emails-bulk (900 s)
+    "CAMPAIGN_CLAIM_TIMEOUT": 20 * 60,
+}
+
+
+def _setting(name):
+    return getattr(settings, name, DEFAULTS[name])
+
+
+def recipient_key(campaign_id, lead_id) -> str:
+    return f"campaign:{campaign_id}:lead:{lead_id}"
+
+
+def target_leads(filters):
+    """Leads ciblés par des filtres de recherche, limités à ceux qui ont un e-mail."""
+    leads = Lead.objects.exclude(email__isnull=True).exclude(email="")
+    return filter_leads(leads, filters or {})
+
+
+# ==========================
+#  CRÉATION
+# ==========================
+
+
+def _insert_recipients(campaign) -> int:
+    batch_size = _setting("CAMPAIGN_INSERT_BATCH_SIZE")
+    seen, batch, total = set(), [], 0
+    rows = target_leads(campaign.filters).order_by("id").values_list("id", "email")
+
+    for lead_id, email in rows.iterator(chunk_size=batch_size):
+        address = email.strip().lower()
+        if address in seen:
+            continue
+        seen.add(address)
+        batch.append(
+            CampaignRecipient(
+                campaign=campaign,
+                lead_id=lead_id,
+                email=email.strip(),
+                idempotency_key=recipient_key(campaign.id, lead_id),
+            )
+        )
+        if len(batch) >= batch_size:
+            CampaignRecipient.objects.bulk_create(batch, ignore_conflicts=True)
+            total += len(batch)
+            batch = []
+    if batch:
+        CampaignRecipient.objects.bulk_create(batch, ignore_conflicts=True)
+        total += len(batch)
+    return total
+
+
+def create_campaign(*, name, subject, message, filters, created_by=None, idempotency_key=None):
+    """
+    Crée la campagne et ses destinataires, puis lance l'envoi après validation de la
+    transaction. Une clé d'idempotence déjà connue renvoie la campagne existante.
+    Retourne `(campagne, créée ?)`.
+    """
+    if idempotency_key:
+        existing = Campaign.objects.filter(idempotency_key=idempotency_key).first()
+        if existing:
+            return existing, False
+
+    from api.campaigns.tasks import start_campaign
+
+    try:
+        with transaction.atomic():
+            campaign = Campaign.objects.create(
+                name=name,
+                subject=subject,
+                message=message,
+                filters=filters or {},
+                created_by=created_by,
+                idempotency_key=idempotency_key or None,
+            )
+            campaign.total = _insert_recipients(campaign)
+            campaign.save(update_fields=["total"])
+            transaction.on_commit(lambda: start_campaign.delay(campaign.id))
+    except IntegrityError:
+        # Même clé soumise en parallèle : l'autre requête a gagné
+        if not idempotency_key:
+            raise
+        return Campaign.objects.get(idempotency_key=idempotency_key), False
+
+    logger.info(f"📣 Campagne #{campaign.id} créée ({campaign.total} destinataires)")
+    return campaign, True
+
+
+# ==========================
+#  ENVOI
+# ==========================
+
+
+def chunk_interval() -> int:
+    """Secondes entre deux lots pour respecter `CAMPAIGN_RATE_LIMIT_PER_MINUTE`."""
+    rate = _setting("CAMPAIGN_RATE_LIMIT_PER_MINUTE")
+    if not rate:
+        return 0
+    return math.ceil(_setting("CAMPAIGN_CHUNK_SIZE") * 60 / rate)
+
+
+def split_chunks(ids) -> list:
+    """Découpe des ids de destinataires en lots de `CAMPAIGN_CHUNK_SIZE`."""
+    size = _setting("CAMPAIGN_CHUNK_SIZE")
+    return [ids[i : i + size] for i in range(0, len(ids), size)]
+
+
+def plan_chunks(campaign_id) -> list:
+    """Lots d'ids de destinataires encore à envoyer."""
+    ids = list(
+        CampaignRecipient.objects.filter(
+            campaign_id=campaign_id, status=RecipientStatus.PENDING
+        )
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+    return split_chunks(ids)
+
+
+def _claim(campaign_id, recipient_ids) -> list:
+    with transaction.atomic():
+        recipients = list(
+            CampaignRecipient.objects.select_for_update(skip_locked=True, of=("self",))
+            .filter(
+                campaign_id=campaign_id,
+                id__in=recipient_ids,
+                status=RecipientStatus.PENDING,
+            )
+            .select_related("lead")
+        )
+        CampaignRecipient.objects.filter(id__in=[r.id for r in recipients]).update(
+            status=RecipientStatus.SENDING, claimed_at=timezone.now()
+        )
+    return recipients
+
+
+def release_stale_recipients(campaign_id) -> list:
+    """
+    Remet en attente les destinataires réservés depuis plus de `CAMPAIGN_CLAIM_TIMEOUT`
+    (lot interrompu) et retourne leurs ids, à reprogrammer.
+    """
+    stale = timezone.now() - timezone.timedelta(seconds=_setting("CAMPAIGN_CLAIM_TIMEOUT"))
+    with transaction.atomic():
+        ids = list(
+            CampaignRecipient.objects.select_for_update(skip_locked=True)
+            .filter(
+                campaign_id=campaign_id,
+                status=RecipientStatus.SENDING,
+                claimed_at__lt=stale,
+            )
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+        CampaignRecipient.objects.filter(id__in=ids).update(
+            status=RecipientStatus.PENDING, claimed_at=None
+        )
+    return ids
+
+
+def send_chunk(campaign_id, recipient_ids) -> dict:
+    """
+    Envoie un lot : seuls les destinataires encore en attente sont pris (verrou), chacun
+    est marqué envoyé dès son envoi (pas de renvoi si le lot est interrompu), les échecs
+    en fin de lot.
+    """
+    campaign = Campaign.objects.filter(pk=campaign_id).first()
+    if not campaign or campaign.status != CampaignStatus.RUNNING:
+        return {"sent": 0, "failed": 0}
+
+    recipients = _claim(campaign_id, recipient_ids)
+    bodies = render_batch(
+        TEMPLATE,
+        [
+            _build_context(r.lead, extra={"paragraphs": campaign.message.splitlines()})
+            for r in recipients
+        ],
+    )
+
+    sent_ids, failures = [], {}
+    for recipient, html in zip(recipients, bodies):
+        message = _build_message(recipient.email, campaign.subject, html)
+        message.extra_headers["X-Idempotency-Key"] = recipient.idempotency_key
+        result = dispatch_messages([message])
+        if result.sent:
+            CampaignRecipient.objects.filter(id=recipient.id).update(
+                status=RecipientStatus.SENT, sent_at=timezone.now()
+            )
+            sent_ids.append(recipient.id)
+        else:
+            failures[recipient.id] = str(result.errors[0]) if result.errors else "Échec"
+
+    for recipient_id, error in failures.items():
+        CampaignRecipient.objects.filter(id=recipient_id).update(
+            status=RecipientStatus.FAILED, last_error=error[:1000]
+        )
+
+    finish_if_done(campaign_id)
+    return {"sent": len(sent_ids), "failed": len(failures)}
+
+
+def finish_if_done(campaign_id) -> bool:
+    pending = CampaignRecipient.objects.filter(
+        campaign_id=campaign_id,
+        status__in=[RecipientStatus.PENDING, RecipientStatus.SENDING],
+    ).exists()
+    if pending:
+        return False
+    return bool(
+        Campaign.objects.filter(pk=campaign_id, status=CampaignStatus.RUNNING).update(
+            status=CampaignStatus.COMPLETED, finished_at=timezone.now()
+        )
+    )
+
+
+def cancel_campaign(campaign) -> int:
+    """Arrête la campagne : les destinataires encore en attente sont ignorés."""
+    with transaction.atomic():
+        Campaign.objects.filter(
+            pk=campaign.pk, status__in=[CampaignStatus.PENDING, CampaignStatus.RUNNING]
+        ).update(status=CampaignStatus.CANCELLED, finished_at=timezone.now())
+        return CampaignRecipient.objects.filter(
+            campaign=campaign, status=RecipientStatus.PENDING
+        ).update(status=RecipientStatus.SKIPPED)
+
+
+# ==========================
+#  AVANCEMENT
+# ==========================
+
+
+def with_progress(queryset):
+    """Annote le nombre de destinataires par statut (une seule requête)."""
+    return queryset.annotate(
+        **{
+            f"count_{status.lower()}": Count(
+                "recipients", filter=Q(recipients__status=status)
+            )
+            for status in RecipientStatus.values
+        }
+    )
@@ -0,0 +1,82 @@
+import logging
+
+from celery import group, shared_task
+from django.utils import timezone
+
+from api.campaigns.models import Campaign, CampaignStatus
+from api.campaigns.services import (
+    chunk_interval,
+    finish_if_done,
+    plan_chunks,
+    release_stale_recipients,
+    send_chunk,
+    split_chunks,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _schedule_chunks(campaign_id, chunks) -> int:
+    """Programme les lots (groupe Celery), échelonnés ; retourne l'intervalle en secondes."""
+    interval = chunk_interval()
+    group(
+        send_campaign_chunk.s(campaign_id, ids).set(countdown=index * interval)
+        for index, ids in enumerate(chunks)
+    ).apply_async()
+    return interval
+
+
+@shared_task
+def start_campaign(campaign_id: int):
+    """
+    Passe la campagne en cours et programme ses lots (groupe Celery), échelonnés pour
+    respecter la cadence d'envoi.
+    """
+    started = Campaign.objects.filter(
+        pk=campaign_id, status=CampaignStatus.PENDING
+    ).update(status=CampaignStatus.RUNNING, started_at=timezone.now())
+    if not started:
+        return 0
+
+    chunks = plan_chunks(campaign_id)
+    if not chunks:
+        finish_if_done(campaign_id)
+        return 0
+
+    interval = _schedule_chunks(campaign_id, chunks)
+    logger.info(
+        f"📣 Campagne #{campaign_id} : {len(chunks)} lots programmés (un toutes les {interval}s)"
+    )
+    return len(chunks)
+
+
+@shared_task
+def send_campaign_chunk(campaign_id: int, recipient_ids: list):
+    stats = send_chunk(campaign_id, recipient_ids)
+    logger.info(
+        f"📨 Campagne #{campaign_id} : lot de {len(recipient_ids)} → "
+        f"{stats['sent']} envoyés, {stats['failed']} échecs"
+    )
+    return stats
+
+
+@shared_task
+def resume_campaigns():
+    """
+    Reprise des campagnes en cours : les destinataires d'un lot interrompu (restés
+    SENDING au-delà du délai de réservation) sont remis en attente et reprogrammés,
+    les campagnes dont tout est traité sont terminées.
+    """
+    resumed = 0
+    running = Campaign.objects.filter(status=CampaignStatus.RUNNING).values_list("pk", flat=True)
+    for campaign_id in running:
+        released = release_stale_recipients(campaign_id)
+        if released:
+            _schedule_chunks(campaign_id, split_chunks(released))
+            resumed += len(released)
+            logger.warning(
+                f"♻️ Campagne #{campaign_id} : {len(released)} destinataire(s) repris"
+            )
+        else:
+            finish_if_done(campaign_id)
+    return resumed
@@ -0,0 +1,209 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.core import mail
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.campaigns.models import (
+    Campaign,
+    CampaignRecipient,
+    CampaignStatus,
+    RecipientStatus,
+)
+from api.campaigns.services import chunk_interval, create_campaign, send_chunk
+from api.campaigns.tasks import resume_campaigns, start_campaign
+from api.lead_status.models import LeadStatus
+from api.leads.constants import RDV_CONFIRME
+from api.leads.models import Lead
+from api.users.models import User
+from api.users.roles import UserRoles
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def admin():
+    return User.objects.create_user(
+        email="admin@example.com",
+        password="pass",
+        role=UserRoles.ADMIN,
+        first_name="Admin",
+        last_name="User",
+    )
+
+
+@pytest.fixture
+def jurist():
+    return User.objects.create_user(
+        email="juriste@example.com",
+        password="pass",
+        role=UserRoles.JURISTE,
+        first_name="Paul",
+        last_name="Juriste",
+    )
+
+
+@pytest.fixture
+def leads(jurist):
+    status = LeadStatus.objects.create(code=RDV_CONFIRME, label="RDV confirmé", color="#000")
+    tomorrow = timezone.now() + timedelta(days=1)
+    created = [
+        Lead.objects.create(
+            first_name=f"Lead{i}",
+            last_name="Test",
+            phone=f"+3360000000{i}",
+            email=f"lead{i}@example.com",
+            status=status,
+            appointment_date=tomorrow,
+        )
+        for i in range(5)
+    ]
+    # Même adresse qu'un autre lead, et lead sans e-mail
+    created.append(
+        Lead.objects.create(
+            first_name="Doublon", last_name="Test", phone="+33611111111",
+            email="LEAD0@example.com", status=status, appointment_date=tomorrow,
+        )
+    )
+    created.append(
+        Lead.objects.create(
+            first_name="Sans", last_name="Email", phone="+33622222222",
+            status=status, appointment_date=tomorrow,
+        )
+    )
+    for lead in created[:3]:
+        lead.jurist_assigned.add(jurist)
+    return created
+
+
+def _run(campaign, settings, chunk_size=2):
+    settings.CAMPAIGN_CHUNK_SIZE = chunk_size
+    with patch("api.campaigns.tasks.group") as mocked_group:
+        start_campaign(campaign.id)
+    signatures = list(mocked_group.call_args.args[0])
+    for signature in signatures:
+        send_chunk(*signature.args)
+    return signatures
+
+
+def test_campaign_targets_filtered_leads_once_per_email(leads, jurist, settings):
+    campaign, created = create_campaign(
+        name="Indisponibilité",
+        subject="Report de votre rendez-vous",
+        message="Votre juriste est absent.\nNous vous recontactons.",
+        filters={"jurist_id": str(jurist.id)},
+    )
+    assert created and campaign.total == 3
+
+    signatures = _run(campaign, settings)
+
+    assert [len(s.args[1]) for s in signatures] == [2, 1]
+    assert [s.options["countdown"] for s in signatures] == [0, chunk_interval()]
+    assert sorted(m.to[0] for m in mail.outbox) == [f"lead{i}@example.com" for i in range(3)]
+    assert "Votre juriste est absent." in mail.outbox[0].alternatives[0][0]
+    campaign.refresh_from_db()
+    assert campaign.status == CampaignStatus.COMPLETED
+
+
+def test_replayed_chunk_does_not_resend(leads, settings):
+    campaign, _ = create_campaign(
+        name="Fermeture", subject="Fermeture exceptionnelle", message="Fermé.", filters={}
+    )
+    assert campaign.total == 5  # doublon d'e-mail et lead sans e-mail exclus
+    signatures = _run(campaign, settings, chunk_size=10)
+
+    send_chunk(*signatures[0].args)
+
+    assert len(mail.outbox) == 5
+    assert set(
+        CampaignRecipient.objects.values_list("status", flat=True)
+    ) == {RecipientStatus.SENT}
+
+
+def test_interrupted_chunk_is_resumed_and_campaign_completes(leads, settings):
+    settings.CAMPAIGN_CHUNK_SIZE = 10
+    campaign, _ = create_campaign(
+        name="Fermeture", subject="Fermeture exceptionnelle", message="Fermé.", filters={}
+    )
+    with patch("api.campaigns.tasks.group"):
+        start_campaign(campaign.id)
+    recipients = list(CampaignRecipient.objects.order_by("id"))
+    # Lot interrompu (worker tombé) : deux envoyés, trois restés réservés
+    CampaignRecipient.objects.filter(id__in=[r.id for r in recipients[:2]]).update(
+        status=RecipientStatus.SENT, sent_at=timezone.now()
+    )
+    CampaignRecipient.objects.filter(id__in=[r.id for r in recipients[2:]]).update(
+        status=RecipientStatus.SENDING, claimed_at=timezone.now()
+    )
+
+    # Réservation récente : le lot est peut-être encore en cours
+    with patch("api.campaigns.tasks.group") as mocked_group:
+        assert resume_campaigns() == 0
+    mocked_group.assert_not_called()
+
+    CampaignRecipient.objects.filter(status=RecipientStatus.SENDING).update(
+        claimed_at=timezone.now() - timedelta(hours=1)
+    )
+    with patch("api.campaigns.tasks.group") as mocked_group:
+        assert resume_campaigns() == 3
+    for signature in mocked_group.call_args.args[0]:
+        send_chunk(*signature.args)
+
+    # Seuls les destinataires interrompus sont envoyés
+    assert sorted(m.to[0] for m in mail.outbox) == sorted(r.email for r in recipients[2:])
+    campaign.refresh_from_db()
+    assert campaign.status == CampaignStatus.COMPLETED
+
+
+def test_api_idempotency_key_and_progress(leads, admin, django_capture_on_commit_callbacks):
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    url = reverse("campaigns-list")
+    payload = {
+        "name": "Fermeture",
+        "subject": "Fermeture exceptionnelle",
+        "message": "L'agence sera fermée.",
+        "filters": {"status_code": RDV_CONFIRME},
+    }
+
+    with patch("api.campaigns.tasks.start_campaign.delay") as mocked_start:
+        with django_capture_on_commit_callbacks(execute=True):
+            first = client.post(url, payload, format="json", HTTP_IDEMPOTENCY_KEY="abc")
+        second = client.post(url, payload, format="json", HTTP_IDEMPOTENCY_KEY="abc")
+
+    assert (first.status_code, second.status_code) == (201, 200)
+    assert first.data["id"] == second.data["id"]
+    assert Campaign.objects.count() == 1
+    mocked_start.assert_called_once_with(first.data["id"])
+    assert first.data["progress"]["pending"] == 5
+
+    cancel = client.post(reverse("campaigns-cancel", args=[first.data["id"]]))
+    assert cancel.data["status"] == CampaignStatus.CANCELLED
+    assert cancel.data["progress"]["skipped"] == 5
+
+
+def test_preview_and_filter_validation(leads, admin, jurist):
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    url = reverse("campaigns-preview")
+
+    response = client.post(url, {"filters": {"has_jurist": "sans"}}, format="json")
+    assert response.data["count"] == 3
+
+    response = client.post(url, {"filters": {"inconnu": "x"}}, format="json")
+    assert response.status_code == 400
+
+    # Id d'utilisateur non UUID : refusé, la campagne n'est pas créée
+    response = client.post(
+        reverse("campaigns-list"),
+        {"name": "Relance", "subject": "Sujet", "message": "Bonjour", "filters": {"jurist_id": "abc"}},
+        format="json",
+    )
+    assert response.status_code == 400
+    assert "jurist_id" in str(response.data["filters"])
+
+    client.force_authenticate(user=jurist)
+    assert client.post(url, {}, format="json").status_code == 403
@@ -0,0 +1,8 @@
+from rest_framework.routers import DefaultRouter
+
+from api.campaigns.views import CampaignViewSet
+
+router = DefaultRouter()
+router.register(r"", CampaignViewSet, basename="campaigns")
+
+urlpatterns = router.urls
@@ -0,0 +1,75 @@
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from api.campaigns.models import Campaign
+from api.campaigns.serializers import CampaignPreviewSerializer, CampaignSerializer
+from api.campaigns.services import (
+    cancel_campaign,
+    create_campaign,
+    target_leads,
+    with_progress,
+)
+from api.users.permissions import IsAdminRole
+
+PREVIEW_SAMPLE_SIZE = 10
+
+
+class CampaignViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    Campagnes de notification (ADMIN).
+
+    - POST /campaigns/ {name, subject, message, filters} : crée et lance la campagne.
+      En-tête `Idempotency-Key` : une requête rejouée renvoie la campagne existante.
+    - GET /campaigns/, /campaigns/{id}/ : campagnes et avancement.
+    - POST /campaigns/preview/ {filters} : nombre de leads ciblés et échantillon.
+    - POST /campaigns/{id}/cancel/ : arrête l'envoi.
+    """
+
+    serializer_class = CampaignSerializer
+    permission_classes = [IsAdminRole]
+
+    def get_queryset(self):
+        return with_progress(Campaign.objects.all())
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        campaign, created = create_campaign(
+            **serializer.validated_data,
+            created_by=request.user,
+            idempotency_key=request.headers.get("Idempotency-Key"),
+        )
+        campaign = self.get_queryset().get(pk=campaign.pk)
+        return Response(
+            self.get_serializer(campaign).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+    @action(detail=False, methods=["post"])
+    def preview(self, request):
+        serializer = CampaignPreviewSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        leads = target_leads(serializer.validated_data.get("filters", {}))
+        return Response(
+            {
+                "count": leads.count(),
+                "sample": list(
+                    leads.order_by("id").values("id", "first_name", "last_name", "email")[
+                        :PREVIEW_SAMPLE_SIZE
+                    ]
+                ),
+            }
+        )
+
+    @action(detail=True, methods=["post"])
+    def cancel(self, request, pk=None):
+        campaign = self.get_object()
+        skipped = cancel_campaign(campaign)
+        campaign = self.get_queryset().get(pk=campaign.pk)
+        return Response({**self.get_serializer(campaign).data, "skipped_now": skipped})
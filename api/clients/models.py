@@ -178,3 +178,13 @@ class Client(models.Model):
         Représentation lisible du client, affichée dans l’admin Django.
         """
         return f"Données de {self.lead.first_name} {self.lead.last_name}"
+
+    def save(self, *args, **kwargs):
+        """
+        `updated_at` sert de version (ETag) : on le garde à jour
+        même lors des sauvegardes partielles (`update_fields`).
+        """
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "updated_at"}
+        super().save(*args, **kwargs)
@@ -15,6 +15,7 @@ from rest_framework import serializers
 from api.clients.models import Client
 from api.services.models import Service
 from api.services.serializers import ServiceSerializer
+from api.utils.reference_data import CachedPrimaryKeyRelatedField
 
 
 class ClientSerializer(serializers.ModelSerializer):
@@ -26,7 +27,8 @@ class ClientSerializer(serializers.ModelSerializer):
     """
 
     # Champ write-only : permet d'assigner le type_demande par son id (POST/PATCH)
-    type_demande_id = serializers.PrimaryKeyRelatedField(
+    type_demande_id = CachedPrimaryKeyRelatedField(
+        dataset="services",
         queryset=Service.objects.all(),
         source="type_demande",
         write_only=True,
@@ -90,3 +90,15 @@ def test_list_clients_authenticated_allowed(api_client, user):
     url = reverse("client-list")
     response = api_client.get(url)
     assert response.status_code == 200
+
+
+# 🔸 Test GET liste projetée (?view=compact)
+def test_list_clients_compact_view(api_client, user, lead):
+    Client.objects.create(lead=lead, ville="Paris")
+    api_client.force_authenticate(user=user)
+    response = api_client.get(reverse("client-list"), {"view": "compact"})
+    assert response.status_code == 200
+    row = response.data["results"][0]
+    assert row["lead_id"] == lead.id
+    assert row["last_name"] == "Doe"
+    assert "anef_password" not in row
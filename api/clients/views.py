@@ -1,5 +1,4 @@
 from django.db import transaction
-from django.db.models.signals import post_delete, pre_delete
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
@@ -8,19 +7,51 @@ from rest_framework.response import Response
 from api.clients.models import Client
 from api.clients.permissions import IsClientCreateOpen
 from api.clients.serializers import ClientSerializer
-from api.contracts.models import Contract
-from api.documents.models import Document
+from api.email_outbox.kinds import CLIENT_ACCOUNT_CREATED
+from api.email_outbox.services import enqueue_email
 from api.leads.models import Lead
-from api.leads.serializers import LeadSerializer
-from api.payments.models import PaymentReceipt
-from api.utils.email.clients.tasks import send_client_account_created_task
+from api.leads.purge import purge_leads
+from api.utils.conditional import ConditionalRetrieveMixin
+from api.utils.projection import ProjectionListMixin
 
 
-class ClientViewSet(viewsets.ModelViewSet):
+class ClientViewSet(
+    ProjectionListMixin, ConditionalRetrieveMixin, viewsets.ModelViewSet
+):
     queryset = Client.objects.all()
     serializer_class = ClientSerializer
     permission_classes = [IsClientCreateOpen]
 
+    etag_resource = "client"
+    etag_reference_datasets = ("services",)
+
+    projection_fields = {
+        "id": "id",
+        "lead_id": "lead_id",
+        "first_name": "lead__first_name",
+        "last_name": "lead__last_name",
+        "email": "lead__email",
+        "phone": "lead__phone",
+        "civilite": "civilite",
+        "nationalite": "nationalite",
+        "ville": "ville",
+        "type_demande_id": "type_demande_id",
+        "type_demande_label": "type_demande__label",
+        "created_at": "created_at",
+        "updated_at": "updated_at",
+    }
+    projection_compact = (
+        "id",
+        "lead_id",
+        "first_name",
+        "last_name",
+        "email",
+        "phone",
+        "type_demande_label",
+        "created_at",
+    )
+
+    @transaction.atomic
     def perform_create(self, serializer):
         """
         Crée ou met à jour un client lié à un lead.
@@ -47,7 +78,7 @@ class ClientViewSet(viewsets.ModelViewSet):
 
         # Sinon création
         client = serializer.save(lead=lead)
-        send_client_account_created_task.delay(client.id)
+        enqueue_email(CLIENT_ACCOUNT_CREATED, lead=lead, object_id=client.id)
         return client
 
     def create(self, request, *args, **kwargs):
@@ -78,9 +109,9 @@ class ClientViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=["delete"], url_path="cascade-delete-by-lead")
     def cascade_delete_by_lead(self, request):
         """
-        Supprime un lead et toutes ses données associées en cascade.
-        Les signaux Django sont désactivés pendant la suppression pour éviter
-        les erreurs de sérialisation sur des instances déjà supprimées.
+        Supprime un lead et toutes ses données associées (fiche client, contrats, reçus,
+        documents, rendez-vous…) par le service de purge : suppressions ensemblistes sans
+        signaux, fichiers S3 effacés en tâche de fond, notification `lead_deleted`.
         """
         lead_id = request.query_params.get("lead_id")
         if not lead_id:
@@ -89,55 +120,15 @@ class ClientViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        try:
-            lead = Lead.objects.get(pk=lead_id)
-        except Lead.DoesNotExist:
+        if not Lead.objects.filter(pk=lead_id).exists():
             return Response(
                 {"detail": "Lead introuvable."},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        # 🔹 Sérialiser AVANT toute suppression pour la notification WebSocket si nécessaire
-        lead_data = LeadSerializer(lead).data
-
-        client = getattr(lead, "form_data", None)
-
-        # 🔹 Sauvegarder les receivers actuels pour les restaurer après
-        post_delete_receivers_backup = post_delete.receivers[:]
-        pre_delete_receivers_backup = pre_delete.receivers[:]
-
-        try:
-            with transaction.atomic():
-                # 🔹 DÉSACTIVER TOUS LES SIGNAUX de suppression
-                post_delete.receivers = []
-                pre_delete.receivers = []
-
-                if client:
-                    # Supprimer paiements liés aux contrats
-                    contracts = Contract.objects.filter(client=client)
-                    PaymentReceipt.objects.filter(contract__in=contracts).delete()
-
-                    # Supprimer documents liés au client
-                    Document.objects.filter(client=client).delete()
-
-                    # Supprimer contrats et client
-                    contracts.delete()
-                    client.delete()
-
-                # Supprimer le lead
-                lead.delete()
-
-        finally:
-            # 🔹 RÉACTIVER TOUS LES SIGNAUX (même en cas d'erreur)
-            post_delete.receivers = post_delete_receivers_backup
-            pre_delete.receivers = pre_delete_receivers_backup
-
-        # 🔹 Optionnel : Envoyer manuellement la notification WebSocket
-        # Si vous voulez notifier via WebSocket après suppression :
-        # from api.websocket.signals.leads import _send
-        # _send("deleted", lead_data)
+        purge_leads([lead_id])
 
         return Response(
             {"detail": f"Lead #{lead_id} et client associé supprimés."},
             status=status.HTTP_204_NO_CONTENT
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,22 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contracts", "0006_contract_invoice_url"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="contract",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True,
+                default=django.utils.timezone.now,
+                verbose_name="Modifié le",
+            ),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.7 on 2026-10-19 18:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contracts", "0007_contract_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="contract",
+            index=models.Index(fields=["created_at"], name="contract_created_idx"),
+        ),
+    ]
@@ -30,6 +30,7 @@ class Contract(models.Model):
     contract_url = models.URLField(_("Contrat PDF"), max_length=1024, blank=True, null=True)
     invoice_url = models.URLField(_("Facture PDF"), max_length=1024, blank=True, null=True)
     created_at = models.DateTimeField(_("Créé le"), default=timezone.now)
+    updated_at = models.DateTimeField(_("Modifié le"), auto_now=True)
     is_signed = models.BooleanField(_("Signé ?"), default=False)
     is_refunded = models.BooleanField(default=False)
     is_cancelled = models.BooleanField(default=False)
@@ -44,6 +45,8 @@ class Contract(models.Model):
         ordering = ["-created_at"]
         verbose_name = _("contrat")
         verbose_name_plural = _("contrats")
+        # Rapprochement des relevés : contrats d'une période
+        indexes = [models.Index(fields=["created_at"], name="contract_created_idx")]
 
     @property
     def real_amount(self):
@@ -115,6 +118,10 @@ class Contract(models.Model):
             self.refund_amount = Decimal("0.00")
         self.is_refunded = bool(self.refund_amount and self.refund_amount > 0)
         self.full_clean()
+        # La version (updated_at) suit aussi les sauvegardes partielles
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "updated_at"}
         return super().save(*args, **kwargs)
 
     def apply_refund(self, amount: Decimal):
@@ -147,7 +154,9 @@ class Contract(models.Model):
             if contract_url:
                 self.contract_url = contract_url
                 # ✅ MAJ persistée côté base
-                Contract.objects.filter(pk=self.pk).update(contract_url=contract_url)
+                Contract.objects.filter(pk=self.pk).update(
+                    contract_url=contract_url, updated_at=timezone.now()
+                )
                 print("✅ Contrat PDF généré :", contract_url)
             else:
                 print("⚠️ Aucune URL retournée par store_contract_pdf")
@@ -176,7 +185,9 @@ class Contract(models.Model):
             if invoice_url:
                 self.invoice_url = invoice_url
                 # ✅ MAJ persistée côté base
-                Contract.objects.filter(pk=self.pk).update(invoice_url=invoice_url)
+                Contract.objects.filter(pk=self.pk).update(
+                    invoice_url=invoice_url, updated_at=timezone.now()
+                )
                 print("✅ Facture PDF générée :", invoice_url)
             else:
                 print("⚠️ Aucune URL retournée par store_invoice_pdf")
@@ -1,4 +1,5 @@
 from decimal import Decimal
+from unittest.mock import patch
 
 import pytest
 from django.urls import reverse
@@ -122,3 +123,68 @@ def test_filter_contract_by_client(auth_client, contract):
     assert res.status_code == status.HTTP_200_OK
     assert len(res.data) == 1
     assert res.data[0]["id"] == contract.id
+
+
+def test_list_contracts_compact_view(auth_client, contract, admin_user):
+    PaymentReceipt.objects.create(
+        client=contract.client,
+        contract=contract,
+        amount=Decimal("50.00"),
+        mode="CB",
+        created_by=admin_user,
+    )
+    url = reverse("contract-list")
+    response = auth_client.get(url, {"view": "compact"})
+    assert response.status_code == status.HTTP_200_OK
+    row = response.data["results"][0]
+    assert row["first_name"] == "Marc"
+    assert row["amount_paid"] == Decimal("50.00")
+    assert row["balance_due"] == Decimal("100.00")
+    assert row["is_fully_paid"] is False
+    assert "client_details" not in row
+
+
+def test_list_contracts_fields_projection(auth_client, contract):
+    url = reverse("contract-list")
+    response = auth_client.get(url, {"fields": "id,service_label"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["results"] == [
+        {"id": contract.id, "service_label": "Test Service"}
+    ]
+
+    response = auth_client.get(url, {"fields": "id,anef_password"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.parametrize(
+    "fields, expected",
+    [
+        ("real_amount_due,amount_paid", {"real_amount_due": 150.0, "amount_paid": 50.0}),
+        ("net_paid,amount_due", {"net_paid": 50.0, "amount_due": "150.00"}),
+        ("balance_due", {"balance_due": 100.0}),
+    ],
+)
+def test_list_contracts_mixed_computed_fields(auth_client, contract, admin_user, fields, expected):
+    PaymentReceipt.objects.create(
+        client=contract.client,
+        contract=contract,
+        amount=Decimal("50.00"),
+        mode="CB",
+        created_by=admin_user,
+    )
+    response = auth_client.get(reverse("contract-list"), {"fields": fields})
+    assert response.status_code == status.HTTP_200_OK
+    # Colonnes intermédiaires lues pour le calcul, non renvoyées
+    assert response.data["results"] == [expected]
+
+
+def test_failed_pdf_deletion_does_not_stop_the_others(contract):
+    from api.contracts.views import ContractViewSet
+
+    files = [("receipts", "https://s3/recus/a.pdf"), ("contracts", "https://s3/contracts/b.pdf")]
+    with patch.object(
+        ContractViewSet, "_delete_file_from_url", side_effect=[RuntimeError("S3"), None]
+    ) as delete:
+        ContractViewSet()._delete_files(files)
+
+    assert [c.args for c in delete.call_args_list] == files
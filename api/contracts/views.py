@@ -10,8 +10,11 @@ Cette vue inclut les fonctionnalités suivantes :
 - Envoi du contrat au client par e-mail via une tâche asynchrone
 """
 
-from decimal import Decimal, InvalidOperation
+import logging
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
 
+from django.db.models import DecimalField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 from django.utils.text import slugify
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
@@ -22,10 +25,30 @@ from api.contracts.permissions import IsContractEditor
 from api.contracts.serializer import ContractSerializer
 from api.payments.models import PaymentReceipt
 from api.payments.serializers import PaymentReceiptSerializer
+from api.utils.background import submit_on_commit
+from api.utils.conditional import ConditionalRetrieveMixin
 from api.utils.email.contracts.tasks import send_contract_email_task, send_contract_signed_notification_task
-
-
-class ContractViewSet(viewsets.ModelViewSet):
+from api.utils.projection import ProjectionListMixin
+
+logger = logging.getLogger(__name__)
+
+# Total des reçus par contrat, calculé en SQL pour la liste projetée
+AMOUNT_PAID = Coalesce(
+    Subquery(
+        PaymentReceipt.objects.filter(contract=OuterRef("pk"))
+        .order_by()
+        .values("contract")
+        .annotate(total=Sum("amount"))
+        .values("total")[:1]
+    ),
+    Value(Decimal("0.00")),
+    output_field=DecimalField(max_digits=12, decimal_places=2),
+)
+
+
+class ContractViewSet(
+    ProjectionListMixin, ConditionalRetrieveMixin, viewsets.ModelViewSet
+):
     """
     ViewSet principal pour la gestion CRUD des contrats,
     avec endpoints pour uploads PDF, receipts et filtrage par client.
@@ -36,6 +59,81 @@ class ContractViewSet(viewsets.ModelViewSet):
     serializer_class = ContractSerializer
     permission_classes = [IsContractEditor]
 
+    etag_resource = "contract"
+    etag_version_fields = ("updated_at", "client__updated_at")
+    etag_reference_datasets = ("services",)
+    # PDF contrat / facture servis en URLs signées
+    etag_max_age = 30 * 60
+
+    projection_fields = {
+        "id": "id",
+        "client_id": "client_id",
+        "lead_id": "client__lead_id",
+        "first_name": "client__lead__first_name",
+        "last_name": "client__lead__last_name",
+        "service_id": "service_id",
+        "service_code": "service__code",
+        "service_label": "service__label",
+        "amount_due": "amount_due",
+        "discount_percent": "discount_percent",
+        "amount_paid": AMOUNT_PAID,
+        "refund_amount": "refund_amount",
+        "is_signed": "is_signed",
+        "is_cancelled": "is_cancelled",
+        "is_refunded": "is_refunded",
+        "created_at": "created_at",
+        "created_by_id": "created_by_id",
+    }
+    _balance_inputs = ("amount_due", "discount_percent", "amount_paid", "refund_amount")
+    projection_computed = {
+        "real_amount_due": ("amount_due", "discount_percent"),
+        "net_paid": ("amount_paid", "refund_amount"),
+        "balance_due": _balance_inputs,
+        "is_fully_paid": _balance_inputs,
+    }
+    # Montants rendus par des méthodes de ContractSerializer (en nombre)
+    projection_formatters = {
+        name: float for name in ("amount_paid", "real_amount_due", "net_paid", "balance_due")
+    }
+    projection_compact = (
+        "id",
+        "client_id",
+        "first_name",
+        "last_name",
+        "service_label",
+        "real_amount_due",
+        "amount_paid",
+        "balance_due",
+        "is_fully_paid",
+        "is_signed",
+        "is_cancelled",
+        "created_at",
+    )
+
+    def postprocess_projection(self, rows, fields):
+        """
+        Montants dérivés calculés comme les propriétés du modèle
+        (`real_amount`, `net_paid`, `balance_due`, `is_fully_paid`).
+        """
+        if not set(fields) & set(self.projection_computed):
+            return rows
+        # Colonnes de tous les champs calculés lues (voir `get_projection_queryset`)
+        for row in rows:
+            row["real_amount_due"] = Contract(
+                amount_due=row["amount_due"],
+                discount_percent=row["discount_percent"] or Decimal("0.00"),
+            ).real_amount
+            net = row["amount_paid"] - (row["refund_amount"] or Decimal("0.00"))
+            row["net_paid"] = net if net > 0 else Decimal("0.00")
+            remaining = row["real_amount_due"] - row["net_paid"]
+            row["balance_due"] = (
+                remaining.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+                if remaining > 0
+                else Decimal("0.00")
+            )
+            row["is_fully_paid"] = row["balance_due"] == Decimal("0.00")
+        return rows
+
     def perform_create(self, serializer):
         """
         Méthode appelée à la création d'un contrat.
@@ -140,28 +238,35 @@ class ContractViewSet(viewsets.ModelViewSet):
         """
         Supprime un contrat ainsi que tous ses reçus et fichiers PDF associés (contrat et reçus).
 
-        Les suppressions sont faites côté MinIO et en base.
+        Les suppressions sont faites en base, puis côté MinIO en arrière-plan.
         """
         instance = self.get_object()
 
-        # 1. Suppression des reçus liés (PDF storage + DB)
-        receipts = instance.receipts.all()
-        for receipt in receipts:
-            if receipt.receipt_url:
-                try:
-                    self._delete_file_from_url("receipts", receipt.receipt_url)
-                except Exception as e:
-                    print(f"Erreur suppression du PDF reçu S3: {e}")
-
-        # 2. Suppression du PDF contrat
+        # 1. Fichiers à supprimer : PDF des reçus liés et PDF du contrat
+        files = [
+            ("receipts", url)
+            for url in instance.receipts.exclude(receipt_url__isnull=True)
+            .exclude(receipt_url="")
+            .values_list("receipt_url", flat=True)
+        ]
         if instance.contract_url:
-            try:
-                self._delete_file_from_url("contracts", instance.contract_url)
-            except Exception as e:
-                print(f"Erreur suppression du PDF contrat S3: {e}")
+            files.append(("contracts", instance.contract_url))
 
-        # 3. Supprime l'instance (et reçus via FK CASCADE)
-        return super().destroy(request, *args, **kwargs)
+        # 2. Supprime l'instance (et reçus via FK CASCADE)
+        response = super().destroy(request, *args, **kwargs)
+
+        # 3. Suppression des PDF en arrière-plan, une fois la suppression validée
+        if files:
+            submit_on_commit(self._delete_files, files)
+        return response
+
+    def _delete_files(self, files):
+        # Un échec n'interrompt pas la suppression des autres PDF
+        for bucket_key, file_url in files:
+            try:
+                self._delete_file_from_url(bucket_key, file_url)
+            except Exception:
+                logger.exception("❌ Suppression du PDF %s impossible : %s", bucket_key, file_url)
 
     @action(detail=True, methods=["post"], url_path="send-email")
     def send_email(self, request, pk=None):
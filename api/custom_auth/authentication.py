@@ -1,13 +1,32 @@
 from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from api.custom_auth.revocation import is_token_revoked
+from api.custom_auth.tokens import ClaimsUser, has_user_claims
 
 
 class CookieJWTAuthentication(JWTAuthentication):
+    """
+    Authentification JWT via le header Authorization ou le cookie HttpOnly `access_token`.
+
+    - Lecture (GET/HEAD/OPTIONS) : l'utilisateur est reconstruit à partir des claims
+      du jeton (`ClaimsUser`), sans requête en base.
+    - Écriture : l'utilisateur est chargé depuis la base (instance `User` complète,
+      nécessaire pour les clés étrangères `created_by`, les M2M, etc.).
+    - Dans les deux cas, le jeton est vérifié contre la liste de révocation Redis.
+    """
+
     def authenticate(self, request):
         # 🔹 Si le header Authorization est présent, utiliser la méthode normale
         header = self.get_header(request)
         if header is not None:
-            return super().authenticate(request)
+            raw_token = self.get_raw_token(header)
+            if raw_token is None:
+                return None
+            validated_token = self.get_validated_token(raw_token)
+            return self.get_user_for_request(request, validated_token), validated_token
 
         # 🔸 Sinon, on tente de lire le token depuis le cookie HttpOnly
         raw_token = request.COOKIES.get("access_token")
@@ -16,6 +35,28 @@ class CookieJWTAuthentication(JWTAuthentication):
 
         try:
             validated_token = self.get_validated_token(raw_token)
-            return self.get_user(validated_token), validated_token
         except Exception:
             raise AuthenticationFailed("Token invalide ou expiré (via cookie)")
+        return self.get_user_for_request(request, validated_token), validated_token
+
+    def get_user_for_request(self, request, validated_token):
+        """
+        Choisit entre l'utilisateur issu des claims (lecture) et l'utilisateur en base (écriture).
+        Les jetons émis avant l'ajout des claims de rôle retombent sur la lecture en base.
+        """
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return self.get_user(validated_token)
+
+        if is_token_revoked(validated_token, user_id):
+            raise AuthenticationFailed("Session révoquée, veuillez vous reconnecter.")
+
+        if getattr(request, "method", None) in SAFE_METHODS and has_user_claims(
+            validated_token
+        ):
+            user = ClaimsUser(validated_token)
+            if not user.is_active:
+                raise AuthenticationFailed("User is inactive", code="user_inactive")
+            return user
+
+        return self.get_user(validated_token)
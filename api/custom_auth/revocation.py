@@ -0,0 +1,72 @@
+"""
+Liste de révocation des jetons JWT, stockée dans Redis (cache Django).
+
+Deux granularités :
+- révocation d'un jeton précis (`jti`) : utilisée par la déconnexion ;
+- révocation de tous les jetons d'un utilisateur émis avant un instant donné :
+  utilisée pour les déconnexions forcées (désactivation, changement de rôle ou de mot de passe).
+
+Les entrées expirent d'elles-mêmes une fois la durée de vie du refresh token écoulée.
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+JTI_KEY = "auth:revoked:jti:{jti}"
+USER_KEY = "auth:revoked:user:{user_id}"
+
+
+def _refresh_lifetime_seconds() -> int:
+    return int(settings.SIMPLE_JWT["REFRESH_TOKEN_LIFETIME"].total_seconds())
+
+
+def revoke_token(token):
+    """
+    Révoque un jeton précis jusqu'à son expiration naturelle.
+    """
+    jti = token.get("jti")
+    if not jti:
+        return
+    exp = token.get("exp") or (time.time() + _refresh_lifetime_seconds())
+    ttl = max(int(exp - time.time()), 1)
+    cache.set(JTI_KEY.format(jti=jti), 1, timeout=ttl)
+
+
+def revoke_user_tokens(user_id):
+    """
+    Révoque tous les jetons de l'utilisateur émis jusqu'à maintenant (déconnexion forcée).
+    """
+    cache.set(
+        USER_KEY.format(user_id=user_id),
+        int(time.time()),
+        timeout=_refresh_lifetime_seconds(),
+    )
+    logger.info("🔒 Jetons révoqués pour l'utilisateur %s", user_id)
+
+
+def is_token_revoked(token, user_id) -> bool:
+    """
+    Vérifie en un seul aller-retour Redis si le jeton est révoqué.
+    En cas d'indisponibilité du cache, le jeton est accepté (fail-open) et l'erreur est loggée.
+    """
+    jti_key = JTI_KEY.format(jti=token.get("jti"))
+    user_key = USER_KEY.format(user_id=user_id)
+    try:
+        values = cache.get_many([jti_key, user_key])
+    except Exception as e:
+        logger.warning("⚠️ Liste de révocation indisponible : %s", e)
+        return False
+
+    if values.get(jti_key):
+        return True
+
+    revoked_before = values.get(user_key)
+    issued_at = token.get("iat")
+    if revoked_before is not None and issued_at is not None:
+        return int(issued_at) <= int(revoked_before)
+    return False
@@ -2,7 +2,15 @@ from django.contrib.auth import authenticate, get_user_model
 from django.core.exceptions import ObjectDoesNotExist
 from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+
+from api.custom_auth.revocation import is_token_revoked
+from api.custom_auth.tokens import RoleRefreshToken, add_user_claims
 
 User = get_user_model()
 
@@ -54,8 +62,8 @@ class LoginSerializer(serializers.Serializer):
             errors["password"] = _("Mot de passe incorrect.")
             raise serializers.ValidationError(errors)
 
-        # 4. Génère les tokens JWT
-        refresh = RefreshToken.for_user(user)
+        # 4. Génère les tokens JWT (avec les claims de rôle)
+        refresh = RoleRefreshToken.for_user(user)
         return {
             "user": user,
             "tokens": {
@@ -63,3 +71,41 @@ class LoginSerializer(serializers.Serializer):
                 "access": str(refresh.access_token),
             },
         }
+
+
+class RoleTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Variante de l'obtention de paire JWT native (`/auth/token/`) qui émet
+    des jetons portant les claims de rôle.
+    """
+
+    token_class = RoleRefreshToken
+
+
+class RoleTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Rafraîchit le jeton d'accès en rechargeant l'utilisateur :
+    - refuse les refresh tokens révoqués (déconnexion / déconnexion forcée),
+    - réémet les claims de rôle à partir de l'état courant en base,
+      de sorte qu'un changement de rôle soit pris en compte au prochain refresh.
+    """
+
+    token_class = RoleRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+
+        if is_token_revoked(refresh, user_id):
+            raise AuthenticationFailed(
+                _("Session révoquée, veuillez vous reconnecter."), "token_revoked"
+            )
+
+        user = User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+        if not user or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(
+                self.error_messages["no_active_account"], "no_active_account"
+            )
+
+        add_user_claims(refresh, user)
+        return {"access": str(refresh.access_token)}
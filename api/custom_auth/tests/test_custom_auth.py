@@ -127,3 +127,110 @@ def test_cookie_jwt_authentication_missing_token():
     request = type("Request", (), {"COOKIES": {}, "META": {}})()
     auth = CookieJWTAuthentication()
     assert auth.authenticate(request) is None
+
+
+# ==========================
+#  CLAIMS DE RÔLE & RÉVOCATION
+# ==========================
+
+
+def _cookie_request(token, method="GET"):
+    return type(
+        "Request",
+        (),
+        {"COOKIES": {"access_token": str(token)}, "META": {}, "method": method},
+    )()
+
+
+def test_login_tokens_carry_role_claims(api_client, user_active):
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    url = reverse("login")
+    response = api_client.post(
+        url, {"email": user_active.email, "password": "securepass123"}
+    )
+
+    token = AccessToken(response.cookies["access_token"].value)
+    assert token["role"] == user_active.role
+    assert token["is_active"] is True
+
+
+def test_safe_request_authenticates_from_claims_without_query(
+    user_active, django_assert_num_queries
+):
+    from api.custom_auth.authentication import CookieJWTAuthentication
+    from api.custom_auth.tokens import ClaimsUser, RoleRefreshToken
+
+    token = RoleRefreshToken.for_user(user_active).access_token
+    auth = CookieJWTAuthentication()
+
+    with django_assert_num_queries(0):
+        user, _ = auth.authenticate(_cookie_request(token))
+
+    assert isinstance(user, ClaimsUser)
+    assert user.role == user_active.role
+    assert user == user_active
+
+
+def test_unsafe_request_loads_db_user(user_active):
+    from api.custom_auth.authentication import CookieJWTAuthentication
+    from api.custom_auth.tokens import RoleRefreshToken
+
+    token = RoleRefreshToken.for_user(user_active).access_token
+    user, _ = CookieJWTAuthentication().authenticate(_cookie_request(token, "POST"))
+    assert isinstance(user, User)
+
+
+def test_revoked_user_tokens_are_rejected(user_active):
+    from rest_framework.exceptions import AuthenticationFailed
+
+    from api.custom_auth.authentication import CookieJWTAuthentication
+    from api.custom_auth.revocation import revoke_user_tokens
+    from api.custom_auth.tokens import RoleRefreshToken
+
+    token = RoleRefreshToken.for_user(user_active).access_token
+    revoke_user_tokens(user_active.pk)
+
+    with pytest.raises(AuthenticationFailed):
+        CookieJWTAuthentication().authenticate(_cookie_request(token))
+
+
+def test_logout_revokes_access_token(api_client, user_active):
+    from api.custom_auth.revocation import is_token_revoked
+    from api.custom_auth.tokens import RoleRefreshToken
+
+    access = RoleRefreshToken.for_user(user_active).access_token
+    api_client.cookies["access_token"] = str(access)
+
+    response = api_client.post(reverse("logout"))
+
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert is_token_revoked(access, user_active.pk)
+
+
+def test_refresh_reissues_current_role(api_client, user_active):
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from api.custom_auth.tokens import RoleRefreshToken
+
+    refresh = RoleRefreshToken.for_user(user_active)
+    user_active.role = "ADMIN"
+    user_active.save()
+    api_client.cookies["refresh_token"] = str(refresh)
+
+    response = api_client.post(reverse("token_refresh"))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert AccessToken(response.cookies["access_token"].value)["role"] == "ADMIN"
+
+
+def test_refresh_rejected_after_forced_logout(api_client, user_active):
+    from api.custom_auth.revocation import revoke_user_tokens
+    from api.custom_auth.tokens import RoleRefreshToken
+
+    refresh = RoleRefreshToken.for_user(user_active)
+    revoke_user_tokens(user_active.pk)
+    api_client.cookies["refresh_token"] = str(refresh)
+
+    response = api_client.post(reverse("token_refresh"))
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
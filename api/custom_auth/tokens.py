@@ -0,0 +1,129 @@
+"""
+Jetons JWT enrichis et utilisateur « stateless » construit à partir des claims.
+
+Les jetons émis par `LoginView` / `CustomTokenRefreshView` portent le rôle et l'état
+du compte de l'utilisateur. Sur les endpoints en lecture, `CookieJWTAuthentication`
+reconstruit un `ClaimsUser` à partir de ces claims, sans aucune requête en base.
+"""
+
+import uuid
+from functools import cached_property
+
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.users.roles import UserRoles
+
+# Claims ajoutés au jeton (refresh + access) en plus de l'identifiant utilisateur
+ROLE_CLAIM = "role"
+ACTIVE_CLAIM = "is_active"
+USER_CLAIMS = (
+    ROLE_CLAIM,
+    ACTIVE_CLAIM,
+    "is_staff",
+    "is_superuser",
+    "email",
+    "first_name",
+    "last_name",
+)
+
+
+def add_user_claims(token, user):
+    """
+    Copie le rôle et l'état du compte de `user` dans le jeton.
+    """
+    token[ROLE_CLAIM] = user.role
+    token[ACTIVE_CLAIM] = user.is_active
+    token["is_staff"] = user.is_staff
+    token["is_superuser"] = user.is_superuser
+    token["email"] = user.email
+    token["first_name"] = user.first_name
+    token["last_name"] = user.last_name
+    return token
+
+
+def has_user_claims(token) -> bool:
+    """Vrai si le jeton a été émis avec les claims de rôle (jetons récents)."""
+    return ROLE_CLAIM in token and ACTIVE_CLAIM in token
+
+
+class RoleRefreshToken(RefreshToken):
+    """
+    Refresh token portant les claims utilisateur.
+    Le jeton d'accès dérivé (`.access_token`) hérite automatiquement de ces claims.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        return add_user_claims(token, user)
+
+
+class ClaimsUser(TokenUser):
+    """
+    Utilisateur léger construit uniquement à partir des claims du jeton.
+
+    Expose les attributs lus par les permissions (`role`, `is_active`, `is_staff`…)
+    et se compare à une instance `User` par identifiant. Il n'a pas de représentation
+    en base : les vues qui ont besoin du modèle complet doivent le recharger via `pk`.
+    """
+
+    @cached_property
+    def id(self):
+        raw = super().id
+        try:
+            return uuid.UUID(str(raw))
+        except (TypeError, ValueError):
+            return raw
+
+    @cached_property
+    def pk(self):
+        return self.id
+
+    @cached_property
+    def role(self) -> str:
+        return self.token.get(ROLE_CLAIM, "") or ""
+
+    @cached_property
+    def is_active(self) -> bool:
+        return bool(self.token.get(ACTIVE_CLAIM, False))
+
+    @cached_property
+    def email(self) -> str:
+        return self.token.get("email", "") or ""
+
+    @cached_property
+    def first_name(self) -> str:
+        return self.token.get("first_name", "") or ""
+
+    @cached_property
+    def last_name(self) -> str:
+        return self.token.get("last_name", "") or ""
+
+    @cached_property
+    def username(self) -> str:
+        return self.email
+
+    def get_full_name(self):
+        return f"{self.first_name} {self.last_name}"
+
+    def get_short_name(self):
+        return self.first_name
+
+    def get_role_display(self):
+        try:
+            return UserRoles(self.role).label
+        except ValueError:
+            return self.role
+
+    def __str__(self):
+        return f"{self.email} ({self.get_full_name()})"
+
+    def __eq__(self, other):
+        other_pk = getattr(other, "pk", None)
+        if other_pk is None:
+            return False
+        return str(self.pk) == str(other_pk)
+
+    def __hash__(self):
+        return hash(str(self.pk))
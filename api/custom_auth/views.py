@@ -7,9 +7,12 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.models import update_last_login
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 from rest_framework_simplejwt.views import TokenRefreshView
 
-from api.custom_auth.serializers import LoginSerializer
+from api.custom_auth.revocation import revoke_token
+from api.custom_auth.serializers import LoginSerializer, RoleTokenRefreshSerializer
 import logging
 
 logger = logging.getLogger(__name__)
@@ -81,6 +84,7 @@ class LogoutView(APIView):
     permission_classes = []
 
     def post(self, request, *args, **kwargs):
+        self._revoke_cookie_tokens(request)
         response = Response(status=status.HTTP_204_NO_CONTENT)
 
         domain = ".tds-dossier.fr" if IS_PROD else None
@@ -90,8 +94,29 @@ class LogoutView(APIView):
 
         return response
 
+    def _revoke_cookie_tokens(self, request):
+        """
+        Ajoute les jetons de la session courante à la liste de révocation,
+        pour qu'ils ne soient plus utilisables même s'ils ont été copiés ailleurs.
+        """
+        for cookie, token_class in (
+            ("access_token", AccessToken),
+            ("refresh_token", RefreshToken),
+        ):
+            raw_token = request.COOKIES.get(cookie)
+            if not raw_token:
+                continue
+            try:
+                revoke_token(token_class(raw_token))
+            except TokenError:
+                continue  # jeton déjà expiré ou invalide : rien à révoquer
+            except Exception as e:
+                logger.warning("⚠️ Révocation impossible pour %s : %s", cookie, e)
+
 
 class CustomTokenRefreshView(TokenRefreshView):
+    serializer_class = RoleTokenRefreshSerializer
+
     def post(self, request, *args, **kwargs):
         refresh_token = request.COOKIES.get("refresh_token")
 
@@ -0,0 +1,229 @@
+"""
+Types de notifications passant par l'outbox.
+
+Chaque type déclare :
+- load : chargement par lot des objets nécessaires à tout un groupe de lignes
+  (une requête par type, quel que soit le nombre d'e-mails), renvoie
+  `{id de ligne: arguments de send}` ; une ligne absente du résultat est ignorée
+  (objet supprimé entre-temps, lead sans e-mail…)
+- send : fonction de `api.utils.email.*.notifications` appelée avec ces arguments
+- dedup : gabarit de clé de déduplication (formaté avec `lead_id`, `object_id` et le payload) ;
+  parmi les lignes en attente d'une même clé, seule la plus récente est envoyée
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable
+
+from django.utils.dateparse import parse_datetime
+
+from api.utils.email.appointment.notifications import (
+    send_appointment_created_email,
+    send_appointment_deleted_email,
+    send_appointment_updated_email,
+)
+from api.utils.email.clients.notifications import send_client_account_created_email
+from api.utils.email.jurist_appointment.notifications import (
+    send_jurist_appointment_deleted_email,
+    send_jurist_appointment_email,
+)
+from api.utils.email.leads.notifications import (
+    send_appointment_confirmation_email,
+    send_appointment_planned_email,
+    send_dossier_status_email,
+    send_formulaire_email,
+    send_jurist_assigned_email,
+)
+
+LEAD_APPOINTMENT_PLANNED = "lead.appointment_planned"
+LEAD_APPOINTMENT_CONFIRMED = "lead.appointment_confirmed"
+LEAD_DOSSIER_STATUS = "lead.dossier_status"
+LEAD_FORMULAIRE = "lead.formulaire"
+LEAD_JURIST_ASSIGNED = "lead.jurist_assigned"
+APPOINTMENT_CREATED = "appointment.created"
+APPOINTMENT_UPDATED = "appointment.updated"
+APPOINTMENT_DELETED = "appointment.deleted"
+JURIST_APPOINTMENT_CREATED = "jurist_appointment.created"
+JURIST_APPOINTMENT_DELETED = "jurist_appointment.deleted"
+CLIENT_ACCOUNT_CREATED = "client.account_created"
+
+
+@dataclass(frozen=True)
+class OutboxKind:
+    load: Callable
+    send: Callable
+    dedup: str = ""
+
+    def dedup_key(self, lead_id=None, object_id=None, payload=None) -> str:
+        if not self.dedup:
+            return ""
+        return self.dedup.format(lead_id=lead_id, object_id=object_id, **(payload or {}))
+
+
+# ==========================
+#  CHARGEURS PAR LOT
+# ==========================
+
+
+def _load_leads(*related):
+    def _load(rows):
+        from api.leads.models import Lead
+
+        leads = Lead.objects.select_related(*related).in_bulk(
+            {row.lead_id for row in rows}
+        )
+        return {
+            row.id: (leads[row.lead_id],)
+            for row in rows
+            if row.lead_id in leads and leads[row.lead_id].email
+        }
+
+    return _load
+
+
+def _load_users(ids):
+    from api.users.models import User
+
+    # Identifiants UUID stockés en chaîne dans le payload
+    return {str(pk): user for pk, user in User.objects.in_bulk(ids).items()}
+
+
+def _load_leads_with_jurist(rows):
+    from api.leads.models import Lead
+
+    leads = Lead.objects.in_bulk({row.lead_id for row in rows})
+    jurists = _load_users({row.payload.get("jurist_id") for row in rows})
+    result = {}
+    for row in rows:
+        lead = leads.get(row.lead_id)
+        jurist = jurists.get(row.payload.get("jurist_id"))
+        if lead and lead.email and jurist:
+            result[row.id] = (lead, jurist)
+    return result
+
+
+def _load_appointments(rows):
+    from api.appointment.models import Appointment
+
+    appointments = Appointment.objects.select_related("lead").in_bulk(
+        {row.object_id for row in rows}
+    )
+    result = {}
+    for row in rows:
+        appointment = appointments.get(row.object_id)
+        if appointment and appointment.lead and appointment.lead.email:
+            result[row.id] = (appointment.lead, appointment)
+    return result
+
+
+def _load_deleted_appointments(rows):
+    from api.leads.models import Lead
+
+    leads = Lead.objects.in_bulk({row.lead_id for row in rows})
+    result = {}
+    for row in rows:
+        lead = leads.get(row.lead_id)
+        if lead and lead.email:
+            result[row.id] = (lead, parse_datetime(row.payload["date"]), row.payload)
+    return result
+
+
+def _load_jurist_appointments(rows):
+    from api.jurist_appointment.models import JuristAppointment
+
+    appointments = JuristAppointment.objects.select_related("lead", "jurist").in_bulk(
+        {row.object_id for row in rows}
+    )
+    return {
+        row.id: (appointments[row.object_id],)
+        for row in rows
+        if row.object_id in appointments
+    }
+
+
+def _load_deleted_jurist_appointments(rows):
+    from api.leads.models import Lead
+
+    leads = Lead.objects.in_bulk({row.lead_id for row in rows})
+    jurists = _load_users({row.payload.get("jurist_id") for row in rows})
+    result = {}
+    for row in rows:
+        lead = leads.get(row.lead_id)
+        jurist = jurists.get(row.payload.get("jurist_id"))
+        if lead and jurist:
+            date = datetime.fromisoformat(row.payload["date"])
+            result[row.id] = (lead, jurist, date)
+    return result
+
+
+def _load_clients(rows):
+    from api.clients.models import Client
+
+    clients = Client.objects.select_related("lead").in_bulk(
+        {row.object_id for row in rows}
+    )
+    result = {}
+    for row in rows:
+        client = clients.get(row.object_id)
+        if client and client.lead and client.lead.email:
+            result[row.id] = (client,)
+    return result
+
+
+# ==========================
+#  REGISTRE
+# ==========================
+
+OUTBOX_KINDS = {
+    # Planifié / confirmé partagent la même clé : un aller-retour de statut
+    # avant l'envoi ne produit qu'un e-mail, celui du dernier statut.
+    LEAD_APPOINTMENT_PLANNED: OutboxKind(
+        _load_leads("status"),
+        send_appointment_planned_email,
+        dedup="lead:{lead_id}:appointment",
+    ),
+    LEAD_APPOINTMENT_CONFIRMED: OutboxKind(
+        _load_leads("status"),
+        send_appointment_confirmation_email,
+        dedup="lead:{lead_id}:appointment",
+    ),
+    LEAD_DOSSIER_STATUS: OutboxKind(
+        _load_leads("statut_dossier"),
+        send_dossier_status_email,
+        dedup="lead:{lead_id}:dossier_status",
+    ),
+    LEAD_FORMULAIRE: OutboxKind(
+        _load_leads(), send_formulaire_email, dedup="lead:{lead_id}:formulaire"
+    ),
+    LEAD_JURIST_ASSIGNED: OutboxKind(
+        _load_leads_with_jurist,
+        send_jurist_assigned_email,
+        dedup="lead:{lead_id}:jurist:{jurist_id}",
+    ),
+    APPOINTMENT_CREATED: OutboxKind(
+        _load_appointments,
+        send_appointment_created_email,
+        dedup="appointment:{object_id}:created",
+    ),
+    APPOINTMENT_UPDATED: OutboxKind(
+        _load_appointments,
+        send_appointment_updated_email,
+        dedup="appointment:{object_id}:updated",
+    ),
+    APPOINTMENT_DELETED: OutboxKind(
+        _load_deleted_appointments, send_appointment_deleted_email
+    ),
+    JURIST_APPOINTMENT_CREATED: OutboxKind(
+        _load_jurist_appointments,
+        send_jurist_appointment_email,
+        dedup="jurist_appointment:{object_id}:created",
+    ),
+    JURIST_APPOINTMENT_DELETED: OutboxKind(
+        _load_deleted_jurist_appointments, send_jurist_appointment_deleted_email
+    ),
+    CLIENT_ACCOUNT_CREATED: OutboxKind(
+        _load_clients,
+        send_client_account_created_email,
+        dedup="client:{object_id}:account_created",
+    ),
+}
@@ -0,0 +1,66 @@
+from django.db import models
+from django.utils import timezone
+
+
+class OutboxStatus(models.TextChoices):
+    PENDING = "PENDING", "En attente"
+    SENDING = "SENDING", "En cours d'envoi"
+    SENT = "SENT", "Envoyé"
+    FAILED = "FAILED", "Échec"
+    SKIPPED = "SKIPPED", "Ignoré"
+
+
+class EmailOutbox(models.Model):
+    """
+    E-mail transactionnel à envoyer, écrit dans la même transaction que l'écriture métier
+    qui le déclenche. Si la transaction est annulée, l'e-mail disparaît avec elle ;
+    si elle est validée, l'envoi est garanti par le worker de vidage (`drain_email_outbox`).
+    """
+
+    kind = models.CharField(max_length=64, help_text="Type de notification (gabarit)")
+    lead = models.ForeignKey(
+        "leads.Lead",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="outbox_emails",
+    )
+    object_id = models.PositiveBigIntegerField(
+        null=True,
+        blank=True,
+        help_text="Objet concerné (rendez-vous, client…) selon le type",
+    )
+    payload = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Données figées au moment de l'écriture (ex : date d'un RDV supprimé)",
+    )
+    dedup_key = models.CharField(
+        max_length=128,
+        blank=True,
+        db_index=True,
+        help_text="Seule la dernière notification d'une même clé est envoyée",
+    )
+    status = models.CharField(
+        max_length=10, choices=OutboxStatus.choices, default=OutboxStatus.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(default=timezone.now)
+    available_at = models.DateTimeField(
+        default=timezone.now, help_text="Pas d'envoi avant cette date (relances espacées)"
+    )
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "E-mail en attente d'envoi"
+        verbose_name_plural = "E-mails en attente d'envoi"
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["status", "available_at"], name="outbox_status_avail_idx")
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
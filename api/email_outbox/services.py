@@ -0,0 +1,271 @@
+"""
+Outbox des e-mails transactionnels.
+
+- `enqueue_email` écrit la notification dans la transaction courante : un rollback
+  de l'écriture métier annule aussi l'e-mail, un commit garantit son envoi.
+- `drain_outbox` (tâche périodique `drain_email_outbox`, relancée aussi quelques
+  secondes après chaque commit) réserve un lot de lignes, écarte les doublons,
+  charge les objets de chaque type en une requête et envoie sur la connexion SMTP
+  partagée du worker. Chaque ligne est marquée envoyée dès son envoi : un worker
+  arrêté en cours de lot (limite de temps) ne renvoie pas les e-mails déjà partis.
+- Le lot réservé est borné par le quota SMTP (`EMAIL_RATE_LIMIT_PER_MINUTE`) : un lot
+  s'envoie en une fenêtre d'une minute au plus.
+"""
+
+import logging
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Max, Q
+from django.utils import timezone
+
+from api.email_outbox.kinds import OUTBOX_KINDS
+from api.email_outbox.models import EmailOutbox, OutboxStatus
+from api.utils.metrics import incr
+
+logger = logging.getLogger(__name__)
+
+KICK_KEY = "email_outbox:kick"
+METRICS_KEY = "email_outbox:{metric}"
+
+DEFAULTS = {
+    "EMAIL_OUTBOX_BATCH_SIZE": 200,
+    "EMAIL_OUTBOX_DEBOUNCE": 5,
+    "EMAIL_OUTBOX_MAX_ATTEMPTS": 5,
+    "EMAIL_OUTBOX_CLAIM_TIMEOUT": 10 * 60,
+    "EMAIL_OUTBOX_RETRY_DELAY": 60,
+}
+
+
+def _setting(name):
+    return getattr(settings, name, DEFAULTS[name])
+
+
+def claim_size() -> int:
+    """Taille d'un lot réservé : au plus un quota SMTP d'une minute."""
+    size = _setting("EMAIL_OUTBOX_BATCH_SIZE")
+    rate_limit = getattr(settings, "EMAIL_RATE_LIMIT_PER_MINUTE", None)
+    return min(size, rate_limit) if rate_limit else size
+
+
+# ==========================
+#  ÉCRITURE
+# ==========================
+
+
+def enqueue_email(kind: str, lead=None, object_id=None, payload=None) -> EmailOutbox:
+    """
+    Ajoute une notification à l'outbox, dans la transaction courante.
+    Un vidage est programmé après le commit (regroupé sur `EMAIL_OUTBOX_DEBOUNCE` secondes).
+    """
+    if kind not in OUTBOX_KINDS:
+        raise ValueError(f"Type de notification inconnu : {kind}")
+
+    lead_id = getattr(lead, "pk", lead)
+    payload = payload or {}
+    entry = EmailOutbox.objects.create(
+        kind=kind,
+        lead_id=lead_id,
+        object_id=object_id,
+        payload=payload,
+        dedup_key=OUTBOX_KINDS[kind].dedup_key(lead_id, object_id, payload),
+    )
+    transaction.on_commit(schedule_drain)
+    return entry
+
+
+def enqueue_emails(kind: str, entries) -> list:
+    """
+    Variante en lot de `enqueue_email` pour les écritures en masse : `entries` est une
+    suite de `(lead, object_id, payload)`, insérée en une requête, un seul vidage programmé.
+    """
+    if kind not in OUTBOX_KINDS:
+        raise ValueError(f"Type de notification inconnu : {kind}")
+
+    definition = OUTBOX_KINDS[kind]
+    rows = []
+    for lead, object_id, payload in entries:
+        lead_id = getattr(lead, "pk", lead)
+        payload = payload or {}
+        rows.append(
+            EmailOutbox(
+                kind=kind,
+                lead_id=lead_id,
+                object_id=object_id,
+                payload=payload,
+                dedup_key=definition.dedup_key(lead_id, object_id, payload),
+            )
+        )
+    if not rows:
+        return []
+    rows = EmailOutbox.objects.bulk_create(rows)
+    transaction.on_commit(schedule_drain)
+    return rows
+
+
+def schedule_drain():
+    """
+    Programme un vidage différé, une seule fois par fenêtre de debounce :
+    une rafale d'écritures est envoyée en un seul lot.
+    La tâche périodique reste le filet de sécurité si le broker est indisponible.
+    """
+    from api.email_outbox.tasks import drain_email_outbox
+
+    debounce = _setting("EMAIL_OUTBOX_DEBOUNCE")
+    try:
+        if cache.add(KICK_KEY, 1, timeout=debounce):
+            drain_email_outbox.apply_async(countdown=debounce)
+    except Exception as e:
+        logger.warning("⚠️ Vidage de l'outbox non programmé : %s", e)
+
+
+# ==========================
+#  VIDAGE
+# ==========================
+
+
+def claim_batch(batch_size: int) -> list:
+    """
+    Réserve un lot de lignes en attente (ou bloquées en envoi depuis trop longtemps,
+    worker tombé) ; `skip_locked` permet à plusieurs workers de vider en parallèle.
+    """
+    now = timezone.now()
+    stale = now - timezone.timedelta(seconds=_setting("EMAIL_OUTBOX_CLAIM_TIMEOUT"))
+    with transaction.atomic():
+        ids = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=OutboxStatus.PENDING, available_at__lte=now)
+                | Q(status=OutboxStatus.SENDING, claimed_at__lt=stale)
+            )
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return []
+        EmailOutbox.objects.filter(id__in=ids).update(
+            status=OutboxStatus.SENDING,
+            claimed_at=now,
+            attempts=F("attempts") + 1,
+        )
+    return list(EmailOutbox.objects.filter(id__in=ids).order_by("id"))
+
+
+def split_duplicates(rows):
+    """
+    Sépare les lignes à envoyer des doublons : pour une même clé, seule la ligne
+    la plus récente est envoyée, y compris si elle est encore en attente hors du lot.
+    """
+    keys = {row.dedup_key for row in rows if row.dedup_key}
+    latest = dict(
+        EmailOutbox.objects.filter(
+            dedup_key__in=keys,
+            status__in=[OutboxStatus.PENDING, OutboxStatus.SENDING],
+        )
+        .values("dedup_key")
+        .annotate(last_id=Max("id"))
+        .values_list("dedup_key", "last_id")
+    )
+
+    to_send, duplicates = [], []
+    for row in rows:
+        if row.dedup_key and latest.get(row.dedup_key, row.id) != row.id:
+            duplicates.append(row)
+        else:
+            to_send.append(row)
+    return to_send, duplicates
+
+
+def _send_group(kind, rows, outcome):
+    definition = OUTBOX_KINDS.get(kind)
+    if definition is None:
+        for row in rows:
+            outcome["failed"][row.id] = f"Type de notification inconnu : {kind}"
+        return
+
+    try:
+        arguments = definition.load(rows)
+    except Exception as e:
+        logger.exception("❌ Chargement des e-mails « %s » impossible", kind)
+        for row in rows:
+            outcome["failed"][row.id] = str(e)
+        return
+
+    for row in rows:
+        args = arguments.get(row.id)
+        if args is None:
+            outcome["skipped"].append(row.id)
+            continue
+        try:
+            definition.send(*args)
+        except Exception as e:
+            outcome["failed"][row.id] = str(e)
+        else:
+            # Marquée tout de suite : pas de renvoi si le worker est arrêté plus loin
+            EmailOutbox.objects.filter(id=row.id).update(
+                status=OutboxStatus.SENT, sent_at=timezone.now(), last_error=""
+            )
+            outcome["sent"].append(row.id)
+
+
+def _record(rows, outcome):
+    now = timezone.now()
+    EmailOutbox.objects.filter(id__in=outcome["skipped"]).update(
+        status=OutboxStatus.SKIPPED
+    )
+
+    # Relances espacées exponentiellement, abandon après EMAIL_OUTBOX_MAX_ATTEMPTS
+    max_attempts = _setting("EMAIL_OUTBOX_MAX_ATTEMPTS")
+    retry_delay = _setting("EMAIL_OUTBOX_RETRY_DELAY")
+    attempts = {row.id: row.attempts for row in rows}
+    for row_id, error in outcome["failed"].items():
+        if attempts[row_id] >= max_attempts:
+            changes = {"status": OutboxStatus.FAILED}
+        else:
+            delay = retry_delay * 2 ** (attempts[row_id] - 1)
+            changes = {
+                "status": OutboxStatus.PENDING,
+                "available_at": now + timezone.timedelta(seconds=delay),
+            }
+        EmailOutbox.objects.filter(id=row_id).update(last_error=error, **changes)
+
+    for metric in ("sent", "skipped", "failed"):
+        if outcome[metric]:
+            incr(METRICS_KEY.format(metric=metric), len(outcome[metric]))
+
+
+def drain_outbox(batch_size=None) -> dict:
+    """
+    Envoie un lot de l'outbox. Retourne le nombre de lignes envoyées, ignorées
+    (doublons, objets disparus) et en échec (réessayées au vidage suivant jusqu'à
+    `EMAIL_OUTBOX_MAX_ATTEMPTS`).
+    """
+    rows = claim_batch(batch_size or claim_size())
+    outcome = {"sent": [], "skipped": [], "failed": {}}
+    if not rows:
+        return {"claimed": 0, "sent": 0, "skipped": 0, "failed": 0}
+
+    to_send, duplicates = split_duplicates(rows)
+    outcome["skipped"].extend(row.id for row in duplicates)
+
+    groups = defaultdict(list)
+    for row in to_send:
+        groups[row.kind].append(row)
+    for kind, group in groups.items():
+        _send_group(kind, group, outcome)
+
+    _record(rows, outcome)
+    summary = {
+        "claimed": len(rows),
+        "sent": len(outcome["sent"]),
+        "skipped": len(outcome["skipped"]),
+        "failed": len(outcome["failed"]),
+    }
+    logger.info(
+        "📤 Outbox : %(sent)s envoyés, %(skipped)s ignorés, %(failed)s en échec "
+        "(%(claimed)s lignes)",
+        summary,
+    )
+    return summary
@@ -0,0 +1,41 @@
+import time
+
+from celery import shared_task
+from django.core.cache import cache
+
+from api.email_outbox.services import KICK_KEY, drain_outbox
+from api.utils.task_queues import get_queue_settings, queue_for_task
+
+MAX_BATCHES = 20
+# Durée maximale d'un lot : un quota SMTP d'une minute (voir `claim_size`)
+BATCH_SECONDS = 60
+DEFAULT_DRAIN_BUDGET = 4 * 60
+
+
+def _drain_budget(task_name: str) -> float:
+    """Temps disponible pour réserver de nouveaux lots, sous la limite douce de la file."""
+    soft_limit = get_queue_settings().get(queue_for_task(task_name), {}).get("soft_time_limit")
+    return soft_limit - BATCH_SECONDS if soft_limit else DEFAULT_DRAIN_BUDGET
+
+
+@shared_task
+def drain_email_outbox():
+    """
+    Vide l'outbox par lots successifs (tâche périodique et relance après commit).
+    Un nouveau lot n'est réservé que s'il peut être envoyé avant la limite de temps
+    de la file ; le reste est repris au passage suivant.
+    """
+    # Les écritures suivantes peuvent reprogrammer un vidage
+    cache.delete(KICK_KEY)
+
+    deadline = time.monotonic() + _drain_budget(drain_email_outbox.name)
+    total = {"claimed": 0, "sent": 0, "skipped": 0, "failed": 0}
+    for _ in range(MAX_BATCHES):
+        if time.monotonic() > deadline:
+            break
+        summary = drain_outbox()
+        for key, value in summary.items():
+            total[key] += value
+        if not summary["claimed"]:
+            break
+    return total
@@ -0,0 +1,172 @@
+from dataclasses import replace
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from django.core import mail
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api.appointment.models import Appointment
+from api.email_outbox.kinds import (
+    APPOINTMENT_CREATED,
+    OUTBOX_KINDS,
+    LEAD_APPOINTMENT_CONFIRMED,
+    LEAD_APPOINTMENT_PLANNED,
+    LEAD_DOSSIER_STATUS,
+)
+from api.email_outbox.models import EmailOutbox, OutboxStatus
+from api.email_outbox.services import KICK_KEY, claim_size, drain_outbox, enqueue_email
+from api.lead_status.models import LeadStatus
+from api.leads.models import Lead
+from api.statut_dossier.models import StatutDossier
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def lead_status():
+    return LeadStatus.objects.create(
+        code="RDV_PLANIFIE", label="RDV planifié", color="#000"
+    )
+
+
+@pytest.fixture
+def statut_dossier():
+    return StatutDossier.objects.create(
+        code="EN_COURS", label="En cours", color="#111"
+    )
+
+
+def _create_leads(count, lead_status, **extra):
+    appointment = timezone.make_aware(datetime(2030, 1, 15, 10, 0))
+    return [
+        Lead.objects.create(
+            first_name=f"Lead{i}",
+            last_name="Test",
+            phone=f"+3360000000{i}",
+            email=f"lead{i}@example.com",
+            status=lead_status,
+            appointment_date=appointment,
+            **extra,
+        )
+        for i in range(count)
+    ]
+
+
+def test_rollback_discards_email(lead_status):
+    lead = _create_leads(1, lead_status)[0]
+
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():
+            enqueue_email(LEAD_APPOINTMENT_PLANNED, lead=lead)
+            raise RuntimeError("écriture métier annulée")
+
+    assert not EmailOutbox.objects.exists()
+
+
+def test_commit_schedules_single_drain(lead_status, django_capture_on_commit_callbacks):
+    from django.core.cache import cache
+
+    cache.delete(KICK_KEY)
+    leads = _create_leads(3, lead_status)
+
+    with patch("api.email_outbox.tasks.drain_email_outbox.apply_async") as mocked:
+        with django_capture_on_commit_callbacks(execute=True):
+            for lead in leads:
+                enqueue_email(LEAD_APPOINTMENT_PLANNED, lead=lead)
+
+    mocked.assert_called_once()
+    cache.delete(KICK_KEY)
+
+
+def test_status_flip_flop_sends_latest_only(lead_status):
+    lead = _create_leads(1, lead_status)[0]
+    enqueue_email(LEAD_APPOINTMENT_PLANNED, lead=lead)
+    enqueue_email(LEAD_APPOINTMENT_CONFIRMED, lead=lead)
+    last = enqueue_email(LEAD_APPOINTMENT_PLANNED, lead=lead)
+
+    summary = drain_outbox()
+
+    assert summary == {"claimed": 3, "sent": 1, "skipped": 2, "failed": 0}
+    assert len(mail.outbox) == 1
+    assert mail.outbox[0].subject.startswith("Planification confirmée")
+    assert EmailOutbox.objects.get(pk=last.pk).status == OutboxStatus.SENT
+
+
+def test_drain_loads_each_kind_in_constant_queries(lead_status, statut_dossier):
+    def _drain_queries(count):
+        for lead in _create_leads(count, lead_status, statut_dossier=statut_dossier):
+            enqueue_email(LEAD_DOSSIER_STATUS, lead=lead)
+        with CaptureQueriesContext(connection) as ctx:
+            summary = drain_outbox()
+        assert summary["sent"] == count
+        return len(ctx.captured_queries)
+
+    # Chargement en nombre fixe de requêtes ; une mise à jour par e-mail envoyé
+    assert _drain_queries(2) + 6 == _drain_queries(8)
+    assert len(mail.outbox) == 10
+
+
+def test_sent_rows_are_marked_before_the_batch_ends(lead_status):
+    leads = _create_leads(3, lead_status)
+    for lead in leads:
+        enqueue_email(LEAD_APPOINTMENT_PLANNED, lead=lead)
+    sent = []
+
+    def send_then_stop(lead):
+        # Worker arrêté (limite de temps) pendant l'envoi du troisième e-mail
+        if len(sent) == 2:
+            raise SystemExit
+        sent.append(lead.pk)
+
+    kind = OUTBOX_KINDS[LEAD_APPOINTMENT_PLANNED]
+    with patch.dict(OUTBOX_KINDS, {LEAD_APPOINTMENT_PLANNED: replace(kind, send=send_then_stop)}):
+        with pytest.raises(SystemExit):
+            drain_outbox()
+
+    statuses = dict(EmailOutbox.objects.values_list("lead_id", "status"))
+    assert [statuses[pk] for pk in sent] == [OutboxStatus.SENT] * 2
+    # Ligne interrompue : reprise après le délai de réservation, sans renvoyer les autres
+    assert list(statuses.values()).count(OutboxStatus.SENDING) == 1
+
+
+def test_claim_is_sized_to_smtp_rate_limit(settings):
+    settings.EMAIL_OUTBOX_BATCH_SIZE = 200
+    settings.EMAIL_RATE_LIMIT_PER_MINUTE = 30
+    assert claim_size() == 30
+
+
+def test_failed_send_is_retried_later_then_abandoned(lead_status, settings):
+    settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+    lead = _create_leads(1, lead_status)[0]
+    entry = enqueue_email(LEAD_APPOINTMENT_PLANNED, lead=lead)
+
+    with patch("api.email_outbox.services.OUTBOX_KINDS", {}):
+        assert drain_outbox()["failed"] == 1
+
+    entry.refresh_from_db()
+    assert entry.status == OutboxStatus.PENDING
+    assert entry.available_at > timezone.now()
+    # Pas de nouvelle tentative avant le délai
+    assert drain_outbox()["claimed"] == 0
+
+    EmailOutbox.objects.filter(pk=entry.pk).update(available_at=timezone.now())
+    with patch("api.email_outbox.services.OUTBOX_KINDS", {}):
+        drain_outbox()
+    entry.refresh_from_db()
+    assert entry.status == OutboxStatus.FAILED
+    assert entry.attempts == 2
+
+
+def test_deleted_object_is_skipped(lead_status):
+    lead = _create_leads(1, lead_status)[0]
+    appointment = Appointment.objects.create(
+        lead=lead, date=timezone.now() + timedelta(days=1)
+    )
+    enqueue_email(APPOINTMENT_CREATED, lead=lead, object_id=appointment.id)
+    appointment.delete()
+
+    assert drain_outbox()["skipped"] == 1
+    assert not mail.outbox
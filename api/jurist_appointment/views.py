@@ -1,4 +1,5 @@
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.db.models import Q
 from django.utils import timezone
 from django.utils.dateparse import parse_date
@@ -11,10 +12,8 @@ from api.leads.models import Lead
 from api.jurist_availability_date.models import JuristGlobalAvailability
 from ..user_unavailability.models import UserUnavailability
 from ..users.roles import UserRoles
-from ..utils.email.jurist_appointment.tasks import (
-    send_jurist_appointment_created_task,
-    send_jurist_appointment_deleted_task,
-)
+from ..email_outbox.kinds import JURIST_APPOINTMENT_CREATED, JURIST_APPOINTMENT_DELETED
+from ..email_outbox.services import enqueue_email
 from ..utils.jurist_slots import get_available_slots_for_jurist, is_valid_day
 from .models import JuristAppointment
 from .serializers import (
@@ -50,17 +49,23 @@ class JuristAppointmentViewSet(viewsets.ModelViewSet):
     filter_backends = [filters.SearchFilter]
     search_fields = ["lead__id", "date"]
 
+    @transaction.atomic
     def perform_create(self, serializer):
         instance = serializer.save()
-        send_jurist_appointment_created_task.delay(instance.id)
+        enqueue_email(
+            JURIST_APPOINTMENT_CREATED, lead=instance.lead_id, object_id=instance.id
+        )
 
+    @transaction.atomic
     def perform_destroy(self, instance):
         lead = instance.lead
         jurist = instance.jurist
         appointment_date = instance.date
         instance.delete()
-        send_jurist_appointment_deleted_task.delay(
-            lead.id, jurist.id, appointment_date.isoformat()
+        enqueue_email(
+            JURIST_APPOINTMENT_DELETED,
+            lead=lead,
+            payload={"jurist_id": str(jurist.id), "date": appointment_date.isoformat()},
         )
 
     def get_queryset(self):
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class LeadAssignmentConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "api.lead_assignment"
+
+    def ready(self):
+        from api.lead_assignment.services import connect_load_signals
+
+        connect_load_signals()
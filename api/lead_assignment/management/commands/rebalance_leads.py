@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.lead_assignment.models import AssignmentLoad
+from api.lead_assignment.services import rebalance, refresh_loads
+from api.users.models import User
+from api.users.roles import UserRoles
+
+
+class Command(BaseCommand):
+    help = (
+        "Répartit les leads en attente de rendez-vous sans conseiller entre les conseillers "
+        "disponibles les moins chargés (après retrait de ceux de --from), puis affiche les charges."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--from",
+            dest="from_users",
+            nargs="+",
+            default=[],
+            metavar="EMAIL",
+            help="Conseillers dont les leads en attente sont redistribués",
+        )
+        parser.add_argument(
+            "--refresh-only",
+            action="store_true",
+            help="Recalcule seulement les charges, sans assigner",
+        )
+
+    def handle(self, *args, **options):
+        emails = options["from_users"]
+        from_users = list(
+            User.objects.filter(email__in=emails, role=UserRoles.CONSEILLER).values_list(
+                "pk", flat=True
+            )
+        )
+        if len(from_users) != len(set(emails)):
+            raise CommandError("Un ou plusieurs conseillers de --from sont introuvables")
+
+        if options["refresh_only"]:
+            refresh_loads()
+        else:
+            result = rebalance(from_users)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"⚖️ {result['assigned']}/{result['backlog']} lead(s) assigné(s) "
+                    f"({result['released']} libéré(s))"
+                )
+            )
+
+        loads = AssignmentLoad.objects.filter(
+            user__role=UserRoles.CONSEILLER, user__is_active=True
+        ).select_related("user").order_by("open_leads", "user__last_name")
+        for load in loads:
+            self.stdout.write(
+                f"  • {load.user.first_name} {load.user.last_name} : "
+                f"{load.open_leads} lead(s) en attente, {load.appointments_today} RDV aujourd'hui"
+            )
@@ -0,0 +1,72 @@
+# Generated by Django 5.1.7 on 2026-10-19 18:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AssignmentLoad",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="assignment_load",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "open_leads",
+                    models.IntegerField(
+                        default=0,
+                        help_text="Leads assignés en attente de rendez-vous (planifié ou confirmé)",
+                    ),
+                ),
+                (
+                    "appointments_today",
+                    models.IntegerField(
+                        default=0,
+                        help_text="Rendez-vous des leads assignés à la date `day`",
+                    ),
+                ),
+                (
+                    "day",
+                    models.DateField(
+                        blank=True, help_text="Date des RDV comptés", null=True
+                    ),
+                ),
+                (
+                    "auto_assigned",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text="Leads reçus par l'assignation automatique (cumul)",
+                    ),
+                ),
+                (
+                    "last_assigned_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="Dernière assignation automatique (tour de rôle)",
+                        null=True,
+                    ),
+                ),
+                ("refreshed_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name": "Charge conseiller",
+                "verbose_name_plural": "Charges conseillers",
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.db import models
+
+
+class AssignmentLoad(models.Model):
+    """
+    Charge courante d'un conseiller, lue par l'assignation automatique des leads.
+
+    Les compteurs sont tenus à jour à chaque assignation (automatique ou manuelle) et
+    recalculés depuis la base par une tâche périodique, qui corrige les écarts (leads
+    passés ABSENT / PRESENT, fusions, purges) et remet à zéro les RDV du jour au
+    changement de date.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="assignment_load",
+    )
+    open_leads = models.IntegerField(
+        default=0, help_text="Leads assignés en attente de rendez-vous (planifié ou confirmé)"
+    )
+    appointments_today = models.IntegerField(
+        default=0, help_text="Rendez-vous des leads assignés à la date `day`"
+    )
+    day = models.DateField(null=True, blank=True, help_text="Date des RDV comptés")
+    auto_assigned = models.PositiveIntegerField(
+        default=0, help_text="Leads reçus par l'assignation automatique (cumul)"
+    )
+    last_assigned_at = models.DateTimeField(
+        null=True, blank=True, help_text="Dernière assignation automatique (tour de rôle)"
+    )
+    refreshed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Charge conseiller"
+        verbose_name_plural = "Charges conseillers"
+
+    def __str__(self):
+        return f"{self.user} : {self.open_leads} leads, {self.appointments_today} RDV"
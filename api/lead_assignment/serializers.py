@@ -0,0 +1,40 @@
+from rest_framework import serializers
+
+from api.lead_assignment.models import AssignmentLoad
+from api.users.models import User
+from api.users.roles import UserRoles
+
+
+class AssignmentLoadSerializer(serializers.ModelSerializer):
+    email = serializers.EmailField(source="user.email", read_only=True)
+    first_name = serializers.CharField(source="user.first_name", read_only=True)
+    last_name = serializers.CharField(source="user.last_name", read_only=True)
+    is_active = serializers.BooleanField(source="user.is_active", read_only=True)
+    unavailable_today = serializers.BooleanField(read_only=True)
+
+    class Meta:
+        model = AssignmentLoad
+        fields = [
+            "user",
+            "email",
+            "first_name",
+            "last_name",
+            "is_active",
+            "unavailable_today",
+            "open_leads",
+            "appointments_today",
+            "day",
+            "auto_assigned",
+            "last_assigned_at",
+            "refreshed_at",
+        ]
+        read_only_fields = fields
+
+
+class RebalanceSerializer(serializers.Serializer):
+    from_users = serializers.PrimaryKeyRelatedField(
+        queryset=User.objects.filter(role=UserRoles.CONSEILLER),
+        many=True,
+        required=False,
+        help_text="Conseillers dont les leads en attente de RDV sont redistribués",
+    )
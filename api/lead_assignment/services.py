@@ -0,0 +1,384 @@
+"""
+Assignation automatique des nouveaux leads aux conseillers (formulaires publics, prise de
+rendez-vous en ligne, imports) et rééquilibrage d'un stock de leads non assignés.
+
+- Candidats : conseillers actifs, hors indisponibilité (`UserUnavailability`) le jour du
+  rendez-vous du lead (aujourd'hui à défaut).
+- Choix : charge la plus faible, `open_leads + poids × appointments_today`
+  (`LEAD_AUTO_ASSIGN_APPOINTMENT_WEIGHT`), puis tour de rôle (assignation automatique la
+  plus ancienne) à charge égale.
+- La charge est lue dans des compteurs par conseiller (`AssignmentLoad`) verrouillés le
+  temps de la décision, pas recomptée à chaque lead : un lot de leads est réparti en
+  mémoire et écrit en un nombre fixe de requêtes. Les compteurs suivent les assignations
+  automatiques et manuelles (`adjust_loads`), ainsi que les écritures en masse qui
+  changent le statut ou la date de RDV de leads assignés, ou suppriment leurs liens
+  (transitions, absences, fusion, purge : `tracking_loads`) ; `refresh_loads` les
+  recalcule depuis la base (tâche périodique, et au changement de date pour les RDV du
+  jour).
+
+`LEAD_AUTO_ASSIGNMENT=False` désactive l'assignation automatique (le rééquilibrage
+explicite reste disponible).
+"""
+
+import logging
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Value, When
+from django.db.models.signals import post_save
+from django.utils import timezone
+
+from api.appointment_reports.services import sync_entries
+from api.lead_assignment.models import AssignmentLoad
+from api.leads.constants import RDV_CONFIRME, RDV_PLANIFIE
+from api.leads.models import Lead
+from api.user_unavailability.models import UserUnavailability
+from api.users.models import User
+from api.users.roles import UserRoles
+from api.utils.reference_data import get_reference_entry
+from api.websocket.signals.leads import broadcast_leads_bulk
+
+logger = logging.getLogger(__name__)
+
+# Leads comptés dans la charge : en attente de leur rendez-vous
+OPEN_STATUSES = (RDV_PLANIFIE, RDV_CONFIRME)
+# Champs du lead dont dépend sa part dans la charge de ses conseillers
+LOAD_FIELDS = {"status", "appointment_date", "assigned_to"}
+LOAD_COUNTERS = ("open_leads", "appointments_today")
+REBALANCE_BATCH_SIZE = 500
+# Conseiller jamais assigné automatiquement : premier servi à charge égale
+NEVER_ASSIGNED = datetime.min.replace(tzinfo=dt_timezone.utc)
+
+
+def _local_day(value):
+    return timezone.localdate(value) if value else None
+
+
+def open_status_ids() -> set:
+    """Ids des statuts « en attente de RDV », lus dans le cache des données de référence."""
+    entry = get_reference_entry("lead_statuses")
+    code = entry["fields"].index("code")
+    return {row[0] for row in entry["rows"].values() if row[code] in OPEN_STATUSES}
+
+
+# ==========================
+#  COMPTEURS
+# ==========================
+
+
+def refresh_loads(today=None) -> int:
+    """
+    Recalcule les compteurs de tous les conseillers depuis les assignations (une requête
+    d'agrégation, une écriture). Retourne le nombre de conseillers.
+    """
+    today = today or timezone.localdate()
+    counts = {
+        row["user_id"]: row
+        for row in Lead.assigned_to.through.objects.filter(user__role=UserRoles.CONSEILLER)
+        .values("user_id")
+        .annotate(
+            open_leads=Count("id", filter=Q(lead__status__code__in=OPEN_STATUSES)),
+            appointments_today=Count("id", filter=Q(lead__appointment_date__date=today)),
+        )
+    }
+    now = timezone.now()
+    loads = [
+        AssignmentLoad(
+            user_id=user_id,
+            open_leads=counts.get(user_id, {}).get("open_leads", 0),
+            appointments_today=counts.get(user_id, {}).get("appointments_today", 0),
+            day=today,
+            refreshed_at=now,
+        )
+        for user_id in User.objects.filter(role=UserRoles.CONSEILLER).values_list(
+            "id", flat=True
+        )
+    ]
+    AssignmentLoad.objects.bulk_create(
+        loads,
+        update_conflicts=True,
+        unique_fields=["user"],
+        update_fields=["open_leads", "appointments_today", "day", "refreshed_at"],
+    )
+    logger.info("📊 Charges recalculées pour %s conseiller(s)", len(loads))
+    return len(loads)
+
+
+def _apply_deltas(deltas, today):
+    """Écarts `{user_id: Counter}` ajoutés aux compteurs du jour, en une mise à jour."""
+    deltas = {user_id: delta for user_id, delta in deltas.items() if any(delta.values())}
+    if not deltas:
+        return
+    changes = {
+        field: F(field)
+        + Case(
+            *[When(user_id=user_id, then=Value(delta[field])) for user_id, delta in deltas.items()],
+            default=Value(0),
+        )
+        for field in LOAD_COUNTERS
+    }
+    AssignmentLoad.objects.filter(user_id__in=list(deltas), day=today).update(**changes)
+
+
+def adjust_loads(added=(), removed=()):
+    """
+    Répercute sur les compteurs des liens lead ↔ conseiller ajoutés / retirés hors de
+    l'assignation automatique (`(lead_id, user_id)`). Une requête de lecture, une mise à
+    jour pour tous les conseillers concernés.
+    """
+    pairs = [(pair, 1) for pair in added] + [(pair, -1) for pair in removed]
+    if not pairs:
+        return
+    today = timezone.localdate()
+    open_ids = open_status_ids()
+    leads = {
+        pk: (status_id in open_ids, _local_day(appointment_date) == today)
+        for pk, status_id, appointment_date in Lead.objects.filter(
+            pk__in={lead_id for (lead_id, _), _ in pairs}
+        ).values_list("pk", "status_id", "appointment_date")
+    }
+    deltas = defaultdict(Counter)
+    for (lead_id, user_id), sign in pairs:
+        is_open, is_today = leads.get(lead_id, (False, False))
+        deltas[user_id]["open_leads"] += sign * is_open
+        deltas[user_id]["appointments_today"] += sign * is_today
+    _apply_deltas(deltas, today)
+
+
+def _load_shares(lead_ids, today) -> dict:
+    """Part des leads `lead_ids` dans les compteurs de leurs conseillers (une requête)."""
+    rows = list(
+        Lead.assigned_to.through.objects.filter(lead_id__in=lead_ids).values_list(
+            "user_id", "lead__status_id", "lead__appointment_date"
+        )
+    )
+    shares = defaultdict(Counter)
+    if not rows:
+        return shares
+    open_ids = open_status_ids()
+    for user_id, status_id, appointment_date in rows:
+        shares[user_id]["open_leads"] += status_id in open_ids
+        shares[user_id]["appointments_today"] += _local_day(appointment_date) == today
+    return shares
+
+
+@contextmanager
+def tracking_loads(lead_ids, fields=None):
+    """
+    Répercute sur les compteurs les écritures du bloc sur les leads `lead_ids` (statut,
+    date de RDV, liens retirés ou déplacés, suppression) : leur part est lue avant et
+    après, seul l'écart est écrit. `fields` (champs modifiés) : sans effet si aucun
+    n'entre dans la charge.
+    """
+    lead_ids = list(lead_ids)
+    if not lead_ids or (fields is not None and not LOAD_FIELDS & set(fields)):
+        yield
+        return
+    today = timezone.localdate()
+    before = _load_shares(lead_ids, today)
+    yield
+    after = _load_shares(lead_ids, today)
+    _apply_deltas(
+        {
+            user_id: Counter(
+                {field: after[user_id][field] - before[user_id][field] for field in LOAD_COUNTERS}
+            )
+            for user_id in before.keys() | after.keys()
+        },
+        today,
+    )
+
+
+def _create_load(sender, instance, created, raw=False, **kwargs):
+    # Nouveau conseiller : ligne sans date, complétée au prochain recalcul
+    if created and not raw and instance.role == UserRoles.CONSEILLER:
+        AssignmentLoad.objects.get_or_create(user=instance)
+
+
+def connect_load_signals():
+    post_save.connect(
+        _create_load, sender=User, weak=False, dispatch_uid="lead-assignment-load"
+    )
+
+
+# ==========================
+#  ASSIGNATION
+# ==========================
+
+
+def _lock_loads(today) -> list:
+    """Compteurs des conseillers actifs, verrouillés ; recalculés s'ils datent d'un autre jour."""
+
+    def locked():
+        return list(
+            AssignmentLoad.objects.select_for_update(of=("self",))
+            .filter(user__role=UserRoles.CONSEILLER, user__is_active=True)
+            .order_by("user_id")
+        )
+
+    loads = locked()
+    if not loads or any(load.day != today for load in loads):
+        refresh_loads(today)
+        loads = locked()
+    return loads
+
+
+def _unavailable_days(user_ids, days) -> dict:
+    """Périodes d'indisponibilité `{user_id: [(début, fin)]}` couvrant les jours donnés."""
+    periods = defaultdict(list)
+    rows = UserUnavailability.objects.filter(
+        user_id__in=user_ids, start_date__lte=max(days), end_date__gte=min(days)
+    ).values_list("user_id", "start_date", "end_date")
+    for user_id, start, end in rows:
+        periods[user_id].append((start, end))
+    return periods
+
+
+def _score(load, weight):
+    return (
+        load.open_leads + weight * load.appointments_today,
+        load.last_assigned_at or NEVER_ASSIGNED,
+        str(load.user_id),
+    )
+
+
+def auto_assign(leads, notify: bool = True) -> dict:
+    """
+    Assigne chaque lead (instances ou objets avec `pk`, `status_id`, `appointment_date`,
+    supposés sans conseiller) au conseiller disponible le moins chargé. Retourne
+    `{lead_id: user_id}` ; un lead sans conseiller disponible n'est pas assigné.
+
+    `notify=False` : ni événement websocket ni resynchronisation du rapport des RDV
+    (l'appelant s'en charge, ex : import).
+    """
+    leads = list(leads)
+    if not leads:
+        return {}
+
+    today = timezone.localdate()
+    weight = settings.LEAD_AUTO_ASSIGN_APPOINTMENT_WEIGHT
+    now = timezone.now()
+    assignments = {}
+    # Sans point de sauvegarde : appelé dans la transaction de création des leads
+    with transaction.atomic(savepoint=False):
+        loads = _lock_loads(today)
+        if not loads:
+            logger.warning("⚠️ Assignation automatique : aucun conseiller actif")
+            return {}
+
+        days = {lead.pk: _local_day(lead.appointment_date) or today for lead in leads}
+        unavailable = _unavailable_days([load.user_id for load in loads], set(days.values()))
+        open_ids = open_status_ids()
+        changed = set()
+        for index, lead in enumerate(leads):
+            day = days[lead.pk]
+            candidates = [
+                load
+                for load in loads
+                if not any(start <= day <= end for start, end in unavailable[load.user_id])
+            ]
+            if not candidates:
+                continue
+            load = min(candidates, key=lambda candidate: _score(candidate, weight))
+            load.open_leads += lead.status_id in open_ids
+            load.appointments_today += day == today and lead.appointment_date is not None
+            load.auto_assigned += 1
+            # Instants distincts : le tour de rôle reste ordonné au sein d'un lot
+            load.last_assigned_at = now + timedelta(microseconds=index)
+            assignments[lead.pk] = load.user_id
+            changed.add(load)
+
+        if not assignments:
+            logger.warning("⚠️ Assignation automatique : aucun conseiller disponible")
+            return {}
+
+        through = Lead.assigned_to.through
+        through.objects.bulk_create(
+            [through(lead_id=lead_id, user_id=user_id) for lead_id, user_id in assignments.items()],
+            ignore_conflicts=True,
+        )
+        AssignmentLoad.objects.bulk_update(
+            changed,
+            ["open_leads", "appointments_today", "auto_assigned", "last_assigned_at"],
+        )
+
+        if notify:
+            with_appointment = [
+                lead.pk for lead in leads if lead.pk in assignments and lead.appointment_date
+            ]
+            transaction.on_commit(lambda: sync_entries(with_appointment))
+            transaction.on_commit(
+                lambda: broadcast_leads_bulk(
+                    "assigned", sorted(assignments), extra={"auto": True}
+                )
+            )
+
+    logger.info(
+        "🎯 Assignation automatique : %s/%s lead(s) répartis sur %s conseiller(s)",
+        len(assignments),
+        len(leads),
+        len(set(assignments.values())),
+    )
+    return assignments
+
+
+def auto_assign_new(leads, notify: bool = True) -> dict:
+    """Assignation automatique des leads créés, si elle est activée (`LEAD_AUTO_ASSIGNMENT`)."""
+    if not settings.LEAD_AUTO_ASSIGNMENT:
+        return {}
+    return auto_assign(leads, notify=notify)
+
+
+# ==========================
+#  RÉÉQUILIBRAGE
+# ==========================
+
+
+def backlog():
+    """Leads en attente de rendez-vous sans conseiller, du rendez-vous le plus proche au plus lointain."""
+    return Lead.objects.filter(
+        status__code__in=OPEN_STATUSES, assigned_to__isnull=True
+    ).order_by(F("appointment_date").asc(nulls_last=True), "created_at")
+
+
+def rebalance(from_users=(), batch_size: int = REBALANCE_BATCH_SIZE) -> dict:
+    """
+    Répartit le stock de leads non assignés, après avoir retiré aux conseillers
+    `from_users` (départ, longue absence) leurs leads en attente de rendez-vous.
+    Traitement par lots de `batch_size` leads, une transaction par lot.
+    """
+    from api.leads.assignment import assign_leads
+
+    released = 0
+    if from_users:
+        lead_ids = list(
+            Lead.objects.filter(
+                status__code__in=OPEN_STATUSES, assigned_to__in=from_users
+            ).values_list("pk", flat=True).distinct()
+        )
+        if lead_ids:
+            released = assign_leads(lead_ids, "assigned_to", unassign=list(from_users))["changed"]
+
+    lead_ids = list(backlog().values_list("pk", flat=True))
+    assigned = 0
+    for start in range(0, len(lead_ids), batch_size):
+        batch = Lead.objects.filter(
+            pk__in=lead_ids[start : start + batch_size], assigned_to__isnull=True
+        ).only("pk", "status_id", "appointment_date")
+        with transaction.atomic():
+            assignments = auto_assign(batch)
+            # Leads existants : nouvelle version pour les GET conditionnels
+            Lead.objects.filter(pk__in=list(assignments)).update(updated_at=timezone.now())
+        assigned += len(assignments)
+
+    logger.info(
+        "⚖️ Rééquilibrage : %s lead(s) libéré(s), %s/%s assigné(s)",
+        released,
+        assigned,
+        len(lead_ids),
+    )
+    return {"released": released, "backlog": len(lead_ids), "assigned": assigned}
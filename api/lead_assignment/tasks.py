@@ -0,0 +1,22 @@
+import logging
+
+from celery import shared_task
+
+from api.lead_assignment.services import rebalance, refresh_loads
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def refresh_assignment_loads():
+    """
+    Recalcule les charges des conseillers (écarts dus aux changements de statut, fusions,
+    purges ; RDV du jour après minuit).
+    """
+    return refresh_loads()
+
+
+@shared_task
+def rebalance_leads_task(from_users=None):
+    """Répartit les leads en attente sans conseiller (après retrait de `from_users`)."""
+    return rebalance(from_users or [])
@@ -0,0 +1,271 @@
+from collections import Counter
+from datetime import time, timedelta
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.lead_assignment.models import AssignmentLoad
+from api.lead_assignment.services import auto_assign, rebalance, refresh_loads
+from api.lead_assignment.tasks import rebalance_leads_task
+from api.lead_dedup.merge import merge_leads
+from api.lead_status.models import LeadStatus
+from api.leads.assignment import assign_leads
+from api.leads.constants import ABSENT, RDV_CONFIRME, RDV_PLANIFIE
+from api.leads.models import Lead
+from api.leads.purge import purge_leads
+from api.leads.tasks import mark_absent_leads
+from api.leads.transitions import transition_leads
+from api.opening_hours.models import OpeningHours
+from api.user_unavailability.models import UserUnavailability
+from api.users.models import User
+from api.users.roles import UserRoles
+
+pytestmark = pytest.mark.django_db
+
+
+def _user(name, role=UserRoles.CONSEILLER, **extra):
+    return User.objects.create_user(
+        email=f"{name}@example.com",
+        password="pass",
+        role=role,
+        first_name=name.capitalize(),
+        last_name="Test",
+        **extra,
+    )
+
+
+@pytest.fixture
+def statuses():
+    return {
+        code: LeadStatus.objects.create(code=code, label=code, color="#000")
+        for code in (RDV_PLANIFIE, RDV_CONFIRME, ABSENT)
+    }
+
+
+@pytest.fixture
+def make_lead(statuses):
+    def make(code=RDV_PLANIFIE, appointment=None, conseiller=None):
+        lead = Lead.objects.create(
+            first_name="Jean",
+            last_name="Dupont",
+            phone="0612345678",
+            status=statuses[code],
+            appointment_date=appointment,
+        )
+        if conseiller:
+            lead.assigned_to.add(conseiller)
+        return lead
+
+    return make
+
+
+def test_auto_assign_picks_least_loaded_available_conseiller(
+    make_lead, django_assert_max_num_queries
+):
+    busy, booked, away, free = (_user(n) for n in ("busy", "booked", "away", "free"))
+    _user("inactive", is_active=False)
+    now = timezone.now()
+    tomorrow = now + timedelta(days=1)
+    for _ in range(2):
+        make_lead(conseiller=busy)
+    make_lead(ABSENT, conseiller=busy)  # lead clos : hors charge
+    make_lead(RDV_CONFIRME, appointment=now, conseiller=booked)  # 1 + 2 × 1 RDV du jour
+    UserUnavailability.objects.create(
+        user=away, start_date=tomorrow.date(), end_date=tomorrow.date()
+    )
+    refresh_loads()
+    leads = [make_lead(appointment=tomorrow) for _ in range(4)]
+
+    # Charges lues dans les compteurs : requêtes en nombre fixe quel que soit le lot
+    with django_assert_max_num_queries(6):
+        assignments = auto_assign(leads, notify=False)
+
+    # free (0) → free (1) → busy (2, jamais servi) / free (2) → free
+    assert Counter(assignments.values()) == {free.pk: 3, busy.pk: 1}
+    assert [assignments[lead.pk] for lead in leads] == [free.pk, free.pk, busy.pk, free.pk]
+    assert Lead.objects.filter(assigned_to=free).count() == 3
+    loads = {load.user_id: load for load in AssignmentLoad.objects.all()}
+    assert (loads[free.pk].open_leads, loads[free.pk].auto_assigned) == (3, 3)
+    assert (loads[booked.pk].open_leads, loads[booked.pk].appointments_today) == (1, 1)
+    assert loads[away.pk].auto_assigned == 0
+
+
+def test_counters_follow_manual_assignment_and_day_change(make_lead):
+    conseiller = _user("conseiller")
+    today_lead = make_lead(RDV_CONFIRME, appointment=timezone.now())
+    refresh_loads()
+
+    assign_leads([today_lead.pk, make_lead().pk], "assigned_to", assign=[conseiller.pk])
+    load = AssignmentLoad.objects.get(user=conseiller)
+    assert (load.open_leads, load.appointments_today) == (2, 1)
+
+    assign_leads([today_lead.pk], "assigned_to", unassign=[conseiller.pk])
+    load.refresh_from_db()
+    assert (load.open_leads, load.appointments_today) == (1, 0)
+
+    # Compteurs de la veille : recalculés avant de décider
+    AssignmentLoad.objects.update(day=timezone.localdate() - timedelta(days=1), open_leads=50)
+    lead = make_lead()
+    assert auto_assign([lead], notify=False) == {lead.pk: conseiller.pk}
+    load.refresh_from_db()
+    assert (load.open_leads, load.day) == (2, timezone.localdate())
+
+
+def test_counters_follow_status_changes_merge_and_purge(make_lead, statuses):
+    conseiller, other = _user("conseiller"), _user("other")
+    now = timezone.now()
+    missed = make_lead(RDV_CONFIRME, appointment=now - timedelta(days=1), conseiller=conseiller)
+    planned = [make_lead(appointment=now, conseiller=conseiller) for _ in range(2)]
+    survivor = make_lead(conseiller=other)
+    refresh_loads()
+    client = APIClient()
+    client.force_authenticate(_user("admin", UserRoles.ADMIN))
+
+    def loads():
+        return {
+            load.user_id: (load.open_leads, load.appointments_today)
+            for load in AssignmentLoad.objects.all()
+        }
+
+    def assert_counted(expected):
+        # Compteurs tenus à jour = recalcul complet
+        assert loads()[conseiller.pk] == expected
+        counted = loads()
+        refresh_loads()
+        assert loads() == counted
+
+    with patch("api.leads.tasks.broadcast_leads_bulk"):
+        assert mark_absent_leads() == 1
+    assert_counted((2, 2))
+
+    transition_leads([planned[0].pk], {"status": statuses[ABSENT]})
+    assert_counted((1, 2))
+
+    response = client.patch(
+        reverse("lead-detail", kwargs={"pk": planned[0].pk}),
+        {"status_id": statuses[RDV_CONFIRME].pk},
+        format="json",
+    )
+    assert response.status_code == 200, response.data
+    assert_counted((2, 2))
+
+    # Liens du doublon repris par le lead conservé (sans RDV)
+    merge_leads(survivor.pk, [planned[1].pk])
+    assert_counted((2, 1))
+    assert loads()[other.pk] == (1, 0)
+
+    purge_leads([survivor.pk, missed.pk])
+    assert_counted((1, 1))
+    assert loads()[other.pk] == (0, 0)
+
+
+def test_public_book_assigns_new_lead(statuses, django_capture_on_commit_callbacks):
+    conseiller = _user("conseiller")
+    OpeningHours.objects.create(
+        day_of_week=1,
+        is_active=True,
+        open_time=time(10, 0),
+        close_time=time(12, 0),
+        slot_duration_minutes=30,
+        capacity_per_slot=2,
+    )
+    day = timezone.localdate() + timedelta(days=1)
+    while day.weekday() != 1:
+        day += timedelta(days=1)
+
+    with (
+        patch("api.lead_assignment.services.broadcast_leads_bulk") as broadcast,
+        django_capture_on_commit_callbacks(execute=True),
+    ):
+        response = APIClient().post(
+            "/api/booking/book/",
+            {
+                "first_name": "Léa",
+                "last_name": "Martin",
+                "phone": "0698765432",
+                "email": "lea@example.com",
+                "date": day.isoformat(),
+                "time": "10:00",
+            },
+            format="json",
+        )
+
+    assert response.status_code == 201, response.data
+    lead = Lead.objects.get()
+    assert list(lead.assigned_to.all()) == [conseiller]
+    broadcast.assert_called_once_with("assigned", [lead.pk], extra={"auto": True})
+
+
+def test_auto_assignment_can_be_disabled(statuses, settings):
+    settings.LEAD_AUTO_ASSIGNMENT = False
+    _user("conseiller")
+
+    with patch("api.leads.views.enqueue_email"):
+        response = APIClient().post(
+            reverse("lead-public-create"),
+            {
+                "first_name": "Léa",
+                "last_name": "Martin",
+                "phone": "0698765432",
+                "email": "lea@example.com",
+                "appointment_date": (timezone.now() + timedelta(days=2)).strftime("%d/%m/%Y 10:00"),
+            },
+            format="json",
+        )
+
+    assert response.status_code == 201, response.data
+    assert not Lead.objects.get().assigned_to.exists()
+
+
+def test_rebalance_moves_leads_of_departing_conseiller(make_lead):
+    leaving, staying = _user("leaving"), _user("staying")
+    kept = make_lead(ABSENT, conseiller=leaving)  # lead clos : non redistribué
+    moved = [make_lead(conseiller=leaving) for _ in range(2)]
+    backlog = [make_lead() for _ in range(2)]
+    UserUnavailability.objects.create(
+        user=leaving,
+        start_date=timezone.localdate() - timedelta(days=1),
+        end_date=timezone.localdate() + timedelta(days=30),
+    )
+
+    result = rebalance([leaving.pk], batch_size=3)
+
+    assert result == {"released": 2, "backlog": 4, "assigned": 4}
+    assert set(Lead.objects.filter(assigned_to=staying)) == {*moved, *backlog}
+    assert list(Lead.objects.filter(assigned_to=leaving)) == [kept]
+
+
+def test_loads_api_and_command(make_lead, django_capture_on_commit_callbacks):
+    admin = _user("admin", role=UserRoles.ADMIN)
+    conseiller = _user("conseiller")
+    make_lead()
+    client = APIClient()
+    client.force_authenticate(conseiller)
+    assert client.get(reverse("lead-assignment-loads-list")).status_code == 403
+
+    client.force_authenticate(admin)
+    response = client.post(reverse("lead-assignment-loads-refresh"))
+    assert [(row["email"], row["open_leads"]) for row in response.data] == [
+        ("conseiller@example.com", 0)
+    ]
+
+    with (
+        patch(
+            "api.lead_assignment.tasks.rebalance_leads_task.delay",
+            side_effect=rebalance_leads_task,
+        ),
+        django_capture_on_commit_callbacks(execute=True),
+    ):
+        response = client.post(reverse("lead-assignment-loads-rebalance"), {}, format="json")
+    assert response.status_code == 202
+    assert response.data["backlog"] == 1
+    assert Lead.objects.filter(assigned_to=conseiller).count() == 1
+
+    out = StringIO()
+    call_command("rebalance_leads", "--refresh-only", stdout=out)
+    assert "Conseiller Test : 1 lead(s) en attente" in out.getvalue()
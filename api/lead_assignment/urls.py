@@ -0,0 +1,8 @@
+from rest_framework.routers import DefaultRouter
+
+from api.lead_assignment.views import AssignmentLoadViewSet
+
+router = DefaultRouter()
+router.register(r"loads", AssignmentLoadViewSet, basename="lead-assignment-loads")
+
+urlpatterns = router.urls
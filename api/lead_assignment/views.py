@@ -0,0 +1,60 @@
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from api.lead_assignment.models import AssignmentLoad
+from api.lead_assignment.serializers import AssignmentLoadSerializer, RebalanceSerializer
+from api.lead_assignment.services import backlog, refresh_loads
+from api.lead_assignment.tasks import rebalance_leads_task
+from api.user_unavailability.models import UserUnavailability
+from api.users.permissions import IsAdminRole
+from api.users.roles import UserRoles
+
+
+class AssignmentLoadViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Charges des conseillers utilisées par l'assignation automatique (ADMIN).
+
+    - GET /lead-assignment/loads/ : compteurs par conseiller, du moins au plus chargé.
+    - POST /lead-assignment/loads/refresh/ : recalcule les compteurs depuis la base.
+    - POST /lead-assignment/loads/rebalance/ (from_users) : répartit en tâche de fond les
+      leads en attente sans conseiller, après retrait de ceux des conseillers `from_users`.
+    """
+
+    serializer_class = AssignmentLoadSerializer
+    permission_classes = [IsAdminRole]
+    pagination_class = None
+
+    def get_queryset(self):
+        today = timezone.localdate()
+        return (
+            AssignmentLoad.objects.filter(user__role=UserRoles.CONSEILLER)
+            .select_related("user")
+            .annotate(
+                unavailable_today=Exists(
+                    UserUnavailability.objects.filter(
+                        user=OuterRef("user"), start_date__lte=today, end_date__gte=today
+                    )
+                )
+            )
+            .order_by("open_leads", "appointments_today", "user__last_name")
+        )
+
+    @action(detail=False, methods=["post"])
+    def refresh(self, request):
+        refresh_loads()
+        return self.list(request)
+
+    @action(detail=False, methods=["post"])
+    def rebalance(self, request):
+        serializer = RebalanceSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        from_users = [str(user.pk) for user in serializer.validated_data.get("from_users", [])]
+        transaction.on_commit(lambda: rebalance_leads_task.delay(from_users))
+        return Response(
+            {"backlog": backlog().count(), "from_users": from_users},
+            status=status.HTTP_202_ACCEPTED,
+        )
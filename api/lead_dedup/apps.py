@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class LeadDedupConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "api.lead_dedup"
+
+    def ready(self):
+        from api.lead_dedup.services import connect_candidate_signals
+
+        connect_candidate_signals()
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.lead_dedup.models import CandidateStatus, DuplicateCandidate
+from api.lead_dedup.services import run_detection, running_run
+
+
+class Command(BaseCommand):
+    help = (
+        "Détecte les leads en doublon (blocage téléphone / e-mail / nom phonétique, score "
+        "de similarité) et alimente la file de fusion. Remplace api/find_doublon.py."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Passe complète (index reconstruit) au lieu des seuls leads modifiés",
+        )
+        parser.add_argument(
+            "--show", type=int, default=20, help="Nombre de doublons à afficher"
+        )
+
+    def handle(self, *args, **options):
+        current = running_run()
+        if current is not None:
+            raise CommandError(f"Une passe est déjà en cours (#{current.pk})")
+
+        run = run_detection(full=options["full"])
+        self.stdout.write(
+            f"🔎 Passe #{run.pk} ({'complète' if run.full else 'incrémentale'}) : "
+            f"{run.leads_scanned} leads, {run.pairs_compared} comparaisons, "
+            f"{run.candidates_found} nouveaux doublons"
+        )
+        for block in run.oversized_blocks:
+            self.stdout.write(f"⚠️  Bloc ignoré ({block['size']} leads) : {block['key']}")
+
+        pending = DuplicateCandidate.objects.filter(
+            status=CandidateStatus.PENDING
+        ).select_related("lead_a", "lead_b")
+        for candidate in pending[: options["show"]]:
+            a, b = candidate.lead_a, candidate.lead_b
+            self.stdout.write(
+                f"➡️ {candidate.score:.2f} [{', '.join(candidate.reasons)}] "
+                f"#{a.id} {a.first_name} {a.last_name} ({a.phone or a.email or '-'}) ~ "
+                f"#{b.id} {b.first_name} {b.last_name} ({b.phone or b.email or '-'})"
+            )
@@ -0,0 +1,155 @@
+"""
+Comparaison de leads : clés de blocage et score de similarité.
+
+- Clés de blocage (`blocking_keys`) : téléphone normalisé, e-mail, et clé phonétique du
+  nom (prénom + nom, dans l'ordre alphabétique des codes pour tolérer l'inversion).
+  Seuls les leads partageant une clé sont comparés : pas de comparaison n².
+- Clé phonétique (`phonetic_key`) : approximation française de type Soundex
+  (accents retirés, graphies équivalentes regroupées : PH/F, QU/K, C doux/S, EAU/O…,
+  lettres muettes et doublées supprimées).
+- Similarité des noms : Jaro-Winkler sur le prénom et le nom normalisés (la moins bonne
+  des deux parties, meilleur des deux ordres prénom / nom).
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+
+PHONE_WEIGHT = 0.5
+EMAIL_WEIGHT = 0.4
+NAME_WEIGHT = 0.5
+NAME_ONLY_FACTOR = 0.8
+NAME_MATCH_THRESHOLD = 0.85
+NAME_DISTANT_FACTOR = 0.5
+PHONETIC_LENGTH = 6
+
+_NON_LETTERS = re.compile(r"[^A-Z ]+")
+_SUBSTITUTIONS = (
+    (re.compile(r"PH"), "F"),
+    (re.compile(r"QU|CK|Q"), "K"),
+    (re.compile(r"C(?=[EIY])"), "S"),
+    (re.compile(r"C"), "K"),
+    (re.compile(r"GU(?=[EI])"), "G"),
+    (re.compile(r"G(?=[EIY])"), "J"),
+    (re.compile(r"EAU|AU"), "O"),
+    (re.compile(r"AI|EI|ET\b|ER\b|EZ\b"), "E"),
+    (re.compile(r"OU"), "U"),
+    (re.compile(r"Y"), "I"),
+    (re.compile(r"W"), "V"),
+    (re.compile(r"Z"), "S"),
+    (re.compile(r"TH"), "T"),
+    (re.compile(r"H"), ""),
+)
+_TRAILING_SILENT = re.compile(r"(?<=..)[ESTXD]$")
+_VOWELS_AFTER_FIRST = re.compile(r"(?<=.)[AEIOU]")
+_DOUBLES = re.compile(r"(.)\1+")
+
+
+@lru_cache(maxsize=65536)
+def normalize_name(value: str) -> str:
+    """Nom en majuscules, sans accents ni ponctuation, espaces simples."""
+    s = unicodedata.normalize("NFKD", value or "")
+    s = "".join(c for c in s if unicodedata.category(c) != "Mn").upper()
+    return " ".join(_NON_LETTERS.sub(" ", s).split())
+
+
+@lru_cache(maxsize=65536)
+def phonetic_key(value: str) -> str:
+    """Code phonétique d'un mot ou d'un nom composé (« JEAN PIERRE » → « JNPR »)."""
+    s = normalize_name(value).replace(" ", "")
+    if not s:
+        return ""
+    for pattern, replacement in _SUBSTITUTIONS:
+        s = pattern.sub(replacement, s)
+    s = _DOUBLES.sub(r"\1", s)
+    s = _TRAILING_SILENT.sub("", s)
+    return _VOWELS_AFTER_FIRST.sub("", s)[:PHONETIC_LENGTH]
+
+
+def name_key(first_name: str, last_name: str) -> str:
+    codes = sorted(filter(None, (phonetic_key(first_name), phonetic_key(last_name))))
+    return "-".join(codes) if len(codes) == 2 else ""
+
+
+def blocking_keys(first_name, last_name, phone, email) -> list:
+    keys = []
+    if phone:
+        keys.append(f"phone:{phone}")
+    if email:
+        keys.append(f"email:{email.strip().lower()}")
+    key = name_key(first_name, last_name)
+    if key:
+        keys.append(f"name:{key}")
+    return keys
+
+
+def jaro_winkler(a: str, b: str) -> float:
+    if a == b:
+        return 1.0 if a else 0.0
+    len_a, len_b = len(a), len(b)
+    if not len_a or not len_b:
+        return 0.0
+
+    window = max(max(len_a, len_b) // 2 - 1, 0)
+    matched_b = [False] * len_b
+    matches_a = []
+    for i, char in enumerate(a):
+        for j in range(max(0, i - window), min(len_b, i + window + 1)):
+            if not matched_b[j] and b[j] == char:
+                matched_b[j] = True
+                matches_a.append(char)
+                break
+    if not matches_a:
+        return 0.0
+
+    matches_b = [b[j] for j in range(len_b) if matched_b[j]]
+    transpositions = sum(x != y for x, y in zip(matches_a, matches_b)) / 2
+    m = len(matches_a)
+    jaro = (m / len_a + m / len_b + (m - transpositions) / m) / 3
+
+    prefix = 0
+    for x, y in zip(a[:4], b[:4]):
+        if x != y:
+            break
+        prefix += 1
+    return jaro + prefix * 0.1 * (1 - jaro)
+
+
+def name_similarity(first_a, last_a, first_b, last_b) -> float:
+    """
+    Similarité des noms : la moins bonne des deux parties (prénom, nom), pour que deux
+    homonymes de prénom ne passent pas pour des doublons. Prénom / nom éventuellement
+    inversés.
+    """
+    first_a, last_a = normalize_name(first_a), normalize_name(last_a)
+    first_b, last_b = normalize_name(first_b), normalize_name(last_b)
+    direct = min(jaro_winkler(first_a, first_b), jaro_winkler(last_a, last_b))
+    swapped = min(jaro_winkler(first_a, last_b), jaro_winkler(last_a, first_b))
+    return max(direct, swapped)
+
+
+def score_pair(a, b):
+    """
+    Score (0 à 1) et motifs d'un couple de leads `(first_name, last_name, phone, email)`.
+    Un contact identique pèse davantage qu'une simple ressemblance de noms.
+    """
+    similarity = name_similarity(a[0], a[1], b[0], b[1])
+    reasons = []
+    contact = 0.0
+    if a[2] and a[2] == b[2]:
+        reasons.append("phone")
+        contact = PHONE_WEIGHT
+    if a[3] and b[3] and a[3].strip().lower() == b[3].strip().lower():
+        reasons.append("email")
+        contact = max(contact, EMAIL_WEIGHT)
+    if similarity >= NAME_MATCH_THRESHOLD:
+        reasons.append("name")
+
+    if contact:
+        score = contact + NAME_WEIGHT * similarity
+    elif "name" in reasons:
+        score = NAME_ONLY_FACTOR * similarity
+    else:
+        # Noms seulement voisins, sans contact commun : homonymes probables
+        score = NAME_DISTANT_FACTOR * similarity
+    return round(min(score, 1.0), 3), reasons
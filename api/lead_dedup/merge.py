@@ -0,0 +1,240 @@
+"""
+Fusion de leads en doublon.
+
+`merge_leads(survivor, duplicates)` rattache au lead conservé tout ce qui appartient aux
+doublons, par des UPDATE ensemblistes dans une seule transaction (aucune sauvegarde
+objet par objet) :
+- fiche client : celle du lead conservé, à défaut celle du plus ancien doublon ; les
+  contrats, reçus et documents des autres fiches y sont rattachés, puis ces fiches sont
+  supprimées (copie conservée dans le journal) ;
+- commentaires, rendez-vous (conseiller et juriste), e-mails en attente, destinataires
+  de campagne, historique des statuts, fusions antérieures : lead remplacé ;
+- assignations conseillers / juristes : union, sans doublon ;
+- téléphone et e-mail : repris d'un doublon si absents du lead conservé.
+
+Les doublons sont ensuite supprimés sans signaux `post_delete` (toutes leurs relations
+ont été rattachées ou purgées), le journal `LeadMerge` est écrit et une seule
+notification websocket est envoyée après validation.
+"""
+
+import logging
+
+from django.db import transaction
+from django.forms.models import model_to_dict
+from django.utils import timezone
+
+from api.appointment.models import Appointment
+from api.appointment_reports.models import DailyAppointmentEntry
+from api.appointment_reports.services import sync_entries
+from api.campaigns.models import CampaignRecipient
+from api.clients.models import Client
+from api.comments.models import Comment
+from api.contracts.models import Contract
+from api.documents.models import Document
+from api.email_outbox.models import EmailOutbox
+from api.jurist_appointment.models import JuristAppointment
+from api.lead_assignment.services import tracking_loads
+from api.lead_dedup.models import (
+    CandidateStatus,
+    DuplicateCandidate,
+    LeadBlockingKey,
+    LeadMerge,
+)
+from api.leads.duplicates import remember_leads
+from api.leads.models import Lead, LeadTransition
+from api.payments.models import PaymentReceipt
+from api.utils.phones import normalize_phone
+from api.websocket.signals.leads import broadcast_leads_bulk
+
+logger = logging.getLogger(__name__)
+
+MAX_DUPLICATES = 50
+
+# Relations directes vers le lead, rattachées par `UPDATE ... SET lead_id = survivant`
+LEAD_RELATIONS = {
+    "comments": Comment,
+    "appointments": Appointment,
+    "jurist_appointments": JuristAppointment,
+    "outbox_emails": EmailOutbox,
+    "campaign_recipients": CampaignRecipient,
+    "transitions": LeadTransition,
+}
+# Relations vers la fiche client, rattachées à la fiche conservée
+CLIENT_RELATIONS = {
+    "contracts": Contract,
+    "receipts": PaymentReceipt,
+    "documents": Document,
+}
+ASSIGNMENT_FIELDS = ("assigned_to", "jurist_assigned")
+FILLED_FIELDS = ("phone", "email")
+
+
+class MergeError(ValueError):
+    pass
+
+
+def _raw_delete(queryset):
+    """DELETE ensembliste, sans collecte des objets ni signaux `pre/post_delete`."""
+    return queryset._raw_delete(queryset.db)
+
+
+def _merge_clients(survivor, duplicate_ids, moved) -> list:
+    """Rattache les fiches client ; retourne les fiches supprimées (journal)."""
+    clients = list(
+        Client.objects.filter(lead_id__in=[survivor.pk, *duplicate_ids]).order_by("lead_id")
+    )
+    if not clients:
+        return []
+
+    kept = next((c for c in clients if c.lead_id == survivor.pk), clients[0])
+    others = [c for c in clients if c.pk != kept.pk]
+    if kept.lead_id != survivor.pk:
+        Client.objects.filter(pk=kept.pk).update(lead_id=survivor.pk)
+        moved["form_data"] = 1
+    if not others:
+        return []
+
+    other_ids = [c.pk for c in others]
+    now = timezone.now()
+    moved["contracts"] = Contract.objects.filter(client_id__in=other_ids).update(
+        client_id=kept.pk, updated_at=now
+    )
+    moved["receipts"] = PaymentReceipt.objects.filter(client_id__in=other_ids).update(
+        client_id=kept.pk
+    )
+    moved["documents"] = Document.objects.filter(client_id__in=other_ids).update(
+        client_id=kept.pk
+    )
+    _raw_delete(Client.objects.filter(pk__in=other_ids))
+    return [model_to_dict(c) for c in others]
+
+
+def _merge_assignments(survivor, duplicate_ids, moved):
+    for field in ASSIGNMENT_FIELDS:
+        through = getattr(Lead, field).through
+        existing = set(
+            through.objects.filter(lead_id=survivor.pk).values_list("user_id", flat=True)
+        )
+        added = (
+            set(
+                through.objects.filter(lead_id__in=duplicate_ids).values_list(
+                    "user_id", flat=True
+                )
+            )
+            - existing
+        )
+        through.objects.bulk_create(
+            [through(lead_id=survivor.pk, user_id=user_id) for user_id in added],
+            ignore_conflicts=True,
+        )
+        _raw_delete(through.objects.filter(lead_id__in=duplicate_ids))
+        moved[field] = len(added)
+
+
+def _fill_survivor(survivor, duplicates) -> dict:
+    """Champs de contact absents du lead conservé, repris du plus ancien doublon."""
+    changes = {}
+    for field in FILLED_FIELDS:
+        if getattr(survivor, field):
+            continue
+        value = next((getattr(d, field) for d in duplicates if getattr(d, field)), None)
+        if value:
+            changes[field] = value
+    if "phone" in changes:
+        changes["phone_normalized"] = normalize_phone(changes["phone"]) or ""
+    return changes
+
+
+def merge_leads(survivor_id, duplicate_ids, merged_by=None) -> LeadMerge:
+    """
+    Fusionne `duplicate_ids` dans `survivor_id`. Lève `MergeError` si la demande est
+    invalide (lead inconnu, survivant parmi les doublons, trop de doublons).
+    """
+    duplicate_ids = sorted(set(duplicate_ids))
+    if not duplicate_ids:
+        raise MergeError("Aucun doublon à fusionner.")
+    if survivor_id in duplicate_ids:
+        raise MergeError("Le lead conservé ne peut pas figurer parmi les doublons.")
+    if len(duplicate_ids) > MAX_DUPLICATES:
+        raise MergeError(f"{MAX_DUPLICATES} doublons au plus par fusion.")
+
+    all_ids = [survivor_id, *duplicate_ids]
+    with transaction.atomic():
+        leads = {
+            lead.pk: lead
+            for lead in Lead.objects.select_for_update().filter(pk__in=all_ids).order_by("pk")
+        }
+        missing = set(all_ids) - set(leads)
+        if missing:
+            raise MergeError(f"Leads introuvables : {sorted(missing)}")
+        survivor = leads[survivor_id]
+        duplicates = [leads[pk] for pk in duplicate_ids]
+
+        moved = {}
+        deleted_clients = _merge_clients(survivor, duplicate_ids, moved)
+        for name, model in LEAD_RELATIONS.items():
+            moved[name] = model.objects.filter(lead_id__in=duplicate_ids).update(
+                lead_id=survivor_id
+            )
+        # Liens des doublons repris ou supprimés : charge des conseillers ajustée
+        with tracking_loads(all_ids):
+            _merge_assignments(survivor, duplicate_ids, moved)
+        # Fusions antérieures dont un doublon était le lead conservé
+        LeadMerge.objects.filter(survivor_id__in=duplicate_ids).update(survivor_id=survivor_id)
+
+        changes = _fill_survivor(survivor, duplicates)
+        Lead.objects.filter(pk=survivor_id).update(updated_at=timezone.now(), **changes)
+        if changes:
+            remember_leads([(changes.get("phone_normalized"), changes.get("email"))])
+
+        merge = LeadMerge.objects.create(
+            survivor=survivor,
+            survivor_lead_id=survivor_id,
+            merged_lead_ids=duplicate_ids,
+            snapshot={
+                "leads": [model_to_dict(d, exclude=ASSIGNMENT_FIELDS) for d in duplicates],
+                "clients": deleted_clients,
+            },
+            moved=moved,
+            merged_by=merged_by,
+        )
+
+        # Paires de la file de fusion : fusionnées à l'intérieur du groupe, supprimées
+        # ailleurs (la prochaine détection recompare le lead conservé)
+        in_group = DuplicateCandidate.objects.filter(
+            lead_a_id__in=all_ids, lead_b_id__in=all_ids
+        )
+        in_group.update(
+            status=CandidateStatus.MERGED,
+            merge=merge,
+            reviewed_by=merged_by,
+            reviewed_at=timezone.now(),
+        )
+        DuplicateCandidate.objects.filter(lead_a_id__in=duplicate_ids).exclude(
+            merge=merge
+        ).delete()
+        DuplicateCandidate.objects.filter(lead_b_id__in=duplicate_ids).exclude(
+            merge=merge
+        ).delete()
+        DuplicateCandidate.objects.filter(merge=merge, lead_a_id__in=duplicate_ids).update(
+            lead_a=None
+        )
+        DuplicateCandidate.objects.filter(merge=merge, lead_b_id__in=duplicate_ids).update(
+            lead_b=None
+        )
+
+        _raw_delete(LeadBlockingKey.objects.filter(lead_id__in=duplicate_ids))
+        _raw_delete(DailyAppointmentEntry.objects.filter(lead_id__in=duplicate_ids))
+        _raw_delete(Lead.objects.filter(pk__in=duplicate_ids))
+        sync_entries([survivor_id])
+
+        transaction.on_commit(
+            lambda: broadcast_leads_bulk(
+                "merged",
+                all_ids,
+                extra={"survivor": survivor_id, "merged": duplicate_ids, "merge_id": merge.pk},
+            )
+        )
+
+    logger.info("🔗 Fusion #%s : leads %s → %s (%s)", merge.pk, duplicate_ids, survivor_id, moved)
+    return merge
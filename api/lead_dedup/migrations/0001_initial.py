@@ -0,0 +1,173 @@
+# Generated by Django 5.1.7 on 2026-10-19 17:44
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("leads", "0014_lead_updated_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DedupRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("full", models.BooleanField(default=False)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("RUNNING", "En cours"),
+                            ("COMPLETED", "Terminé"),
+                            ("FAILED", "Échec"),
+                        ],
+                        default="RUNNING",
+                        max_length=10,
+                    ),
+                ),
+                ("leads_scanned", models.PositiveIntegerField(default=0)),
+                ("pairs_compared", models.PositiveIntegerField(default=0)),
+                ("candidates_found", models.PositiveIntegerField(default=0)),
+                (
+                    "oversized_blocks",
+                    models.JSONField(
+                        blank=True,
+                        default=list,
+                        help_text="Clés partagées par trop de leads pour être comparées deux à deux (ex : numéro générique)",
+                    ),
+                ),
+                ("error", models.TextField(blank=True)),
+                ("started_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name": "Passe de dédoublonnage",
+                "verbose_name_plural": "Passes de dédoublonnage",
+                "ordering": ["-started_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="DuplicateCandidate",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("score", models.FloatField()),
+                (
+                    "reasons",
+                    models.JSONField(
+                        blank=True,
+                        default=list,
+                        help_text="Motifs : phone, email, name",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PENDING", "À examiner"),
+                            ("APPROVED", "Fusion validée"),
+                            ("DISMISSED", "Écarté"),
+                            ("MERGED", "Fusionné"),
+                        ],
+                        default="PENDING",
+                        max_length=10,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("reviewed_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "lead_a",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="duplicate_candidates_as_a",
+                        to="leads.lead",
+                    ),
+                ),
+                (
+                    "lead_b",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="duplicate_candidates_as_b",
+                        to="leads.lead",
+                    ),
+                ),
+                (
+                    "reviewed_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Doublon potentiel",
+                "verbose_name_plural": "Doublons potentiels",
+                "ordering": ["-score", "id"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "-score"], name="dedup_candidate_status_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("lead_a", "lead_b"), name="dedup_candidate_unique_pair"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="LeadBlockingKey",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.CharField(max_length=300)),
+                (
+                    "lead",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="blocking_keys",
+                        to="leads.lead",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Clé de blocage",
+                "verbose_name_plural": "Clés de blocage",
+                "indexes": [
+                    models.Index(fields=["key"], name="dedup_blocking_key_idx")
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,110 @@
+# Generated by Django 5.1.7 on 2026-10-19 17:54
+
+import django.core.serializers.json
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lead_dedup", "0001_initial"),
+        ("leads", "0014_lead_updated_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="duplicatecandidate",
+            name="lead_a",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="duplicate_candidates_as_a",
+                to="leads.lead",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="duplicatecandidate",
+            name="lead_b",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="duplicate_candidates_as_b",
+                to="leads.lead",
+            ),
+        ),
+        migrations.CreateModel(
+            name="LeadMerge",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "survivor_lead_id",
+                    models.PositiveIntegerField(
+                        help_text="Id du lead conservé (reste lisible s'il est supprimé ensuite)"
+                    ),
+                ),
+                ("merged_lead_ids", models.JSONField(default=list)),
+                (
+                    "snapshot",
+                    models.JSONField(
+                        default=dict,
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                        help_text="Leads et fiches client supprimés : {leads: [...], clients: [...]}",
+                    ),
+                ),
+                (
+                    "moved",
+                    models.JSONField(
+                        default=dict,
+                        help_text="Lignes rattachées au lead conservé, par relation",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "merged_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "survivor",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="merges",
+                        to="leads.lead",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Fusion de leads",
+                "verbose_name_plural": "Fusions de leads",
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.AddField(
+            model_name="duplicatecandidate",
+            name="merge",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="candidates",
+                to="lead_dedup.leadmerge",
+            ),
+        ),
+    ]
@@ -0,0 +1,161 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+
+class CandidateStatus(models.TextChoices):
+    PENDING = "PENDING", "À examiner"
+    APPROVED = "APPROVED", "Fusion validée"
+    DISMISSED = "DISMISSED", "Écarté"
+    MERGED = "MERGED", "Fusionné"
+
+
+class RunStatus(models.TextChoices):
+    RUNNING = "RUNNING", "En cours"
+    COMPLETED = "COMPLETED", "Terminé"
+    FAILED = "FAILED", "Échec"
+
+
+class LeadBlockingKey(models.Model):
+    """
+    Index de blocage : une ligne par clé (téléphone, e-mail, nom phonétique) et par lead.
+    Deux leads ne sont comparés que s'ils partagent une clé.
+    """
+
+    lead = models.ForeignKey(
+        "leads.Lead", on_delete=models.CASCADE, related_name="blocking_keys"
+    )
+    key = models.CharField(max_length=300)
+
+    class Meta:
+        verbose_name = "Clé de blocage"
+        verbose_name_plural = "Clés de blocage"
+        indexes = [models.Index(fields=["key"], name="dedup_blocking_key_idx")]
+
+    def __str__(self):
+        return f"{self.key} → {self.lead_id}"
+
+
+class DuplicateCandidate(models.Model):
+    """
+    Paire de leads potentiellement en doublon, à examiner (file de fusion).
+    `lead_a` est toujours le plus ancien (id le plus petit) : une seule ligne par paire.
+    Une paire fusionnée est conservée (statut MERGED, lien vers la fusion) : le lead
+    supprimé y devient vide. Les autres paires d'un lead supprimé sont retirées.
+    """
+
+    lead_a = models.ForeignKey(
+        "leads.Lead",
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="duplicate_candidates_as_a",
+    )
+    lead_b = models.ForeignKey(
+        "leads.Lead",
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="duplicate_candidates_as_b",
+    )
+    score = models.FloatField()
+    reasons = models.JSONField(
+        default=list, blank=True, help_text="Motifs : phone, email, name"
+    )
+    status = models.CharField(
+        max_length=10, choices=CandidateStatus.choices, default=CandidateStatus.PENDING
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+    reviewed_by = models.ForeignKey(
+        "users.User", on_delete=models.SET_NULL, null=True, blank=True
+    )
+    reviewed_at = models.DateTimeField(null=True, blank=True)
+    merge = models.ForeignKey(
+        "lead_dedup.LeadMerge",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="candidates",
+    )
+
+    class Meta:
+        verbose_name = "Doublon potentiel"
+        verbose_name_plural = "Doublons potentiels"
+        ordering = ["-score", "id"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["lead_a", "lead_b"], name="dedup_candidate_unique_pair"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["status", "-score"], name="dedup_candidate_status_idx")
+        ]
+
+    def __str__(self):
+        return f"{self.lead_a_id} ~ {self.lead_b_id} ({self.score})"
+
+
+class DedupRun(models.Model):
+    """
+    Passe de détection. Une passe incrémentale ne traite que les leads créés ou modifiés
+    depuis le début de la dernière passe terminée.
+    """
+
+    full = models.BooleanField(default=False)
+    status = models.CharField(
+        max_length=10, choices=RunStatus.choices, default=RunStatus.RUNNING
+    )
+    leads_scanned = models.PositiveIntegerField(default=0)
+    pairs_compared = models.PositiveIntegerField(default=0)
+    candidates_found = models.PositiveIntegerField(default=0)
+    oversized_blocks = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Clés partagées par trop de leads pour être comparées deux à deux (ex : numéro générique)",
+    )
+    error = models.TextField(blank=True)
+    started_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Passe de dédoublonnage"
+        verbose_name_plural = "Passes de dédoublonnage"
+        ordering = ["-started_at"]
+
+    def __str__(self):
+        kind = "complète" if self.full else "incrémentale"
+        return f"Passe {kind} du {self.started_at:%Y-%m-%d %H:%M} ({self.get_status_display()})"
+
+
+class LeadMerge(models.Model):
+    """
+    Journal d'une fusion : leads absorbés par le lead conservé, copie de leurs données
+    (et de leurs fiches client non reprises) au moment de la suppression, et nombre de
+    lignes rattachées par relation.
+    """
+
+    survivor = models.ForeignKey(
+        "leads.Lead", on_delete=models.SET_NULL, null=True, related_name="merges"
+    )
+    survivor_lead_id = models.PositiveIntegerField(
+        help_text="Id du lead conservé (reste lisible s'il est supprimé ensuite)"
+    )
+    merged_lead_ids = models.JSONField(default=list)
+    snapshot = models.JSONField(
+        default=dict,
+        encoder=DjangoJSONEncoder,
+        help_text="Leads et fiches client supprimés : {leads: [...], clients: [...]}",
+    )
+    moved = models.JSONField(
+        default=dict, help_text="Lignes rattachées au lead conservé, par relation"
+    )
+    merged_by = models.ForeignKey(
+        "users.User", on_delete=models.SET_NULL, null=True, blank=True
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Fusion de leads"
+        verbose_name_plural = "Fusions de leads"
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"Fusion {self.merged_lead_ids} → {self.survivor_lead_id}"
@@ -0,0 +1,94 @@
+from rest_framework import serializers
+
+from api.lead_dedup.merge import MAX_DUPLICATES
+from api.lead_dedup.models import DedupRun, DuplicateCandidate, LeadMerge
+from api.leads.models import Lead
+
+
+class DuplicateLeadSerializer(serializers.ModelSerializer):
+    status = serializers.CharField(source="status.code", read_only=True)
+
+    class Meta:
+        model = Lead
+        fields = [
+            "id",
+            "first_name",
+            "last_name",
+            "phone",
+            "email",
+            "status",
+            "created_at",
+        ]
+        read_only_fields = fields
+
+
+class DuplicateCandidateSerializer(serializers.ModelSerializer):
+    lead_a = DuplicateLeadSerializer(read_only=True)
+    lead_b = DuplicateLeadSerializer(read_only=True)
+
+    class Meta:
+        model = DuplicateCandidate
+        fields = [
+            "id",
+            "lead_a",
+            "lead_b",
+            "score",
+            "reasons",
+            "status",
+            "created_at",
+            "reviewed_by",
+            "reviewed_at",
+            "merge",
+        ]
+        read_only_fields = fields
+
+
+class DedupRunSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DedupRun
+        fields = [
+            "id",
+            "full",
+            "status",
+            "leads_scanned",
+            "pairs_compared",
+            "candidates_found",
+            "oversized_blocks",
+            "error",
+            "started_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
+
+
+class DedupRunCreateSerializer(serializers.Serializer):
+    full = serializers.BooleanField(default=False)
+
+
+class LeadMergeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = LeadMerge
+        fields = [
+            "id",
+            "survivor",
+            "survivor_lead_id",
+            "merged_lead_ids",
+            "snapshot",
+            "moved",
+            "merged_by",
+            "created_at",
+        ]
+        read_only_fields = fields
+
+
+class LeadMergeCreateSerializer(serializers.Serializer):
+    survivor = serializers.IntegerField()
+    duplicates = serializers.ListField(
+        child=serializers.IntegerField(), min_length=1, max_length=MAX_DUPLICATES
+    )
+
+
+class CandidateMergeSerializer(serializers.Serializer):
+    survivor = serializers.IntegerField(
+        required=False, help_text="Lead conservé (par défaut le plus ancien de la paire)"
+    )
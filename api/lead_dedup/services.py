@@ -0,0 +1,221 @@
+"""
+Détection des leads en doublon.
+
+Déroulé (`run_detection`) :
+1. Index de blocage (`LeadBlockingKey`) : clés téléphone normalisé, e-mail et nom
+   phonétique de chaque lead (`matching.blocking_keys`). Passe complète : index
+   reconstruit. Passe incrémentale : seules les clés des leads créés ou modifiés depuis
+   la dernière passe terminée sont recalculées.
+2. Lecture en flux de l'index trié par clé (jointure sur les champs utiles du lead) :
+   chaque bloc (leads partageant une clé) est comparé deux à deux. En incrémental, seuls
+   les blocs des clés touchées sont relus, et seules les paires impliquant un lead
+   modifié sont comparées.
+3. Les paires dont le score atteint `DEDUP_MIN_SCORE` alimentent la file de fusion
+   (`DuplicateCandidate`, `bulk_create` par lots). Une paire déjà présente (examinée ou
+   non) n'est pas recréée : une paire écartée ne revient pas.
+
+Un lead supprimé (`Lead.delete()`) retire de la file ses paires non fusionnées ; la fusion
+et la purge, qui suppriment sans signaux, le font elles-mêmes.
+
+Les blocs de plus de `DEDUP_MAX_BLOCK_SIZE` leads (numéro ou e-mail générique, nom très
+courant) ne sont pas comparés : ils sont listés dans le rapport de la passe.
+"""
+
+import logging
+from itertools import groupby, islice
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import pre_delete
+from django.utils import timezone
+
+from api.lead_dedup.matching import blocking_keys, score_pair
+from api.lead_dedup.models import (
+    DedupRun,
+    DuplicateCandidate,
+    LeadBlockingKey,
+    RunStatus,
+)
+from api.leads.models import Lead
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 5000
+KEY_LOOKUP_BATCH = 500
+MAX_REPORTED_BLOCKS = 50
+
+LEAD_FIELDS = ("id", "first_name", "last_name", "phone_normalized", "email")
+BLOCK_FIELDS = (
+    "key",
+    "lead_id",
+    "lead__first_name",
+    "lead__last_name",
+    "lead__phone_normalized",
+    "lead__email",
+)
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _index_leads(rows) -> set:
+    """Enregistre les clés de blocage des leads `rows` ; retourne les clés touchées."""
+    touched = set()
+    for batch in _batches(rows, BATCH_SIZE):
+        keys = []
+        for lead_id, first_name, last_name, phone, email in batch:
+            for key in blocking_keys(first_name, last_name, phone, email):
+                keys.append(LeadBlockingKey(lead_id=lead_id, key=key))
+                touched.add(key)
+        LeadBlockingKey.objects.bulk_create(keys, batch_size=BATCH_SIZE)
+    return touched
+
+
+def _block_rows(keys=None):
+    """Lignes (clé, lead_id, prénom, nom, téléphone, e-mail) triées par clé."""
+    queryset = LeadBlockingKey.objects.order_by("key", "lead_id").values_list(*BLOCK_FIELDS)
+    if keys is None:
+        yield from queryset.iterator(chunk_size=BATCH_SIZE)
+        return
+    for batch in _batches(sorted(keys), KEY_LOOKUP_BATCH):
+        yield from queryset.filter(key__in=batch).iterator(chunk_size=BATCH_SIZE)
+
+
+def find_pairs(rows, changed=None, max_block_size=None, oversized=None):
+    """
+    Compare deux à deux les leads de chaque bloc. Retourne `{(id_a, id_b): (score, motifs)}`
+    (id_a < id_b) pour les paires au-dessus du seuil, et le nombre de comparaisons.
+    `changed` : ids des leads modifiés (passe incrémentale), None pour tout comparer.
+    """
+    max_block_size = max_block_size or settings.DEDUP_MAX_BLOCK_SIZE
+    min_score = settings.DEDUP_MIN_SCORE
+    found = {}
+    compared = 0
+    for key, block in groupby(rows, key=lambda row: row[0]):
+        block = [row[1:] for row in block]
+        if len(block) < 2:
+            continue
+        if len(block) > max_block_size:
+            if oversized is not None:
+                oversized.append({"key": key, "size": len(block)})
+            continue
+        for i, a in enumerate(block):
+            for b in block[i + 1 :]:
+                if changed is not None and a[0] not in changed and b[0] not in changed:
+                    continue
+                pair = (a[0], b[0])
+                if pair in found:
+                    continue
+                compared += 1
+                score, reasons = score_pair(a[1:], b[1:])
+                if score >= min_score:
+                    found[pair] = (score, reasons)
+    return found, compared
+
+
+def _save_candidates(found) -> int:
+    created = 0
+    for batch in _batches(found.items(), BATCH_SIZE):
+        before = DuplicateCandidate.objects.count()
+        DuplicateCandidate.objects.bulk_create(
+            [
+                DuplicateCandidate(lead_a_id=a, lead_b_id=b, score=score, reasons=reasons)
+                for (a, b), (score, reasons) in batch
+            ],
+            ignore_conflicts=True,
+        )
+        created += DuplicateCandidate.objects.count() - before
+    return created
+
+
+def running_run():
+    """Passe en cours (démarrée depuis moins que la limite de temps de la file `imports`)."""
+    limit = settings.CELERY_QUEUE_SETTINGS["imports"]["time_limit"]
+    return (
+        DedupRun.objects.filter(
+            status=RunStatus.RUNNING,
+            started_at__gte=timezone.now() - timezone.timedelta(seconds=limit),
+        )
+        .order_by("-started_at")
+        .first()
+    )
+
+
+def _last_completed_run():
+    return (
+        DedupRun.objects.filter(status=RunStatus.COMPLETED)
+        .order_by("-started_at")
+        .first()
+    )
+
+
+def run_detection(full: bool = False, max_block_size: int = None) -> DedupRun:
+    """
+    Passe de détection. Incrémentale par défaut ; complète si demandé ou si aucune passe
+    n'a encore abouti.
+    """
+    last_run = None if full else _last_completed_run()
+    run = DedupRun.objects.create(full=last_run is None)
+    oversized = []
+    try:
+        with transaction.atomic():
+            if run.full:
+                LeadBlockingKey.objects.all().delete()
+                leads = Lead.objects.order_by().values_list(*LEAD_FIELDS)
+                run.leads_scanned = leads.count()
+                _index_leads(leads.iterator(chunk_size=BATCH_SIZE))
+                rows, changed = _block_rows(), None
+            else:
+                leads = list(
+                    Lead.objects.filter(updated_at__gte=last_run.started_at)
+                    .order_by()
+                    .values_list(*LEAD_FIELDS)
+                )
+                changed = {row[0] for row in leads}
+                run.leads_scanned = len(changed)
+                for batch in _batches(sorted(changed), KEY_LOOKUP_BATCH):
+                    LeadBlockingKey.objects.filter(lead_id__in=batch).delete()
+                rows = _block_rows(_index_leads(leads))
+
+            found, run.pairs_compared = find_pairs(
+                rows, changed, max_block_size=max_block_size, oversized=oversized
+            )
+            run.candidates_found = _save_candidates(found)
+    except Exception as e:
+        logger.exception("❌ Détection des doublons #%s en échec", run.pk)
+        run.status = RunStatus.FAILED
+        run.error = str(e)
+        run.finished_at = timezone.now()
+        run.save()
+        raise
+
+    run.oversized_blocks = sorted(oversized, key=lambda b: -b["size"])[:MAX_REPORTED_BLOCKS]
+    run.status = RunStatus.COMPLETED
+    run.finished_at = timezone.now()
+    run.save()
+    logger.info(
+        "🔎 Détection des doublons #%s (%s) : %s leads, %s comparaisons, %s nouveaux doublons",
+        run.pk,
+        "complète" if run.full else "incrémentale",
+        run.leads_scanned,
+        run.pairs_compared,
+        run.candidates_found,
+    )
+    return run
+
+
+def _drop_candidates(sender, instance, **kwargs):
+    # Paires non fusionnées sans objet ; celles d'une fusion restent au journal
+    DuplicateCandidate.objects.filter(
+        Q(lead_a=instance) | Q(lead_b=instance), merge__isnull=True
+    ).delete()
+
+
+def connect_candidate_signals():
+    pre_delete.connect(
+        _drop_candidates, sender=Lead, weak=False, dispatch_uid="lead-dedup-candidates"
+    )
@@ -0,0 +1,25 @@
+import logging
+
+from celery import shared_task
+
+from api.lead_dedup.services import run_detection, running_run
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def run_duplicate_detection(full: bool = False):
+    """
+    Détection des doublons (nocturne, incrémentale). Ignorée si une passe est déjà en cours.
+    """
+    current = running_run()
+    if current is not None:
+        logger.info("⏭️ Détection des doublons ignorée : passe #%s en cours", current.pk)
+        return None
+
+    run = run_detection(full=full)
+    return {
+        "run_id": run.pk,
+        "leads_scanned": run.leads_scanned,
+        "candidates_found": run.candidates_found,
+    }
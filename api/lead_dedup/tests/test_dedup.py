@@ -0,0 +1,245 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.lead_dedup.matching import blocking_keys, phonetic_key, score_pair
+from api.lead_dedup.models import (
+    CandidateStatus,
+    DedupRun,
+    DuplicateCandidate,
+    LeadBlockingKey,
+    LeadMerge,
+    RunStatus,
+)
+from api.lead_dedup.services import run_detection
+from api.lead_dedup.tasks import run_duplicate_detection
+from api.lead_status.models import LeadStatus
+from api.leads.constants import RDV_PLANIFIE
+from api.leads.models import Lead
+from api.users.models import User
+from api.users.roles import UserRoles
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def status():
+    return LeadStatus.objects.create(code=RDV_PLANIFIE, label="RDV planifié", color="#000")
+
+
+@pytest.fixture
+def admin():
+    return User.objects.create_user(
+        email="admin@example.com",
+        password="pass",
+        role=UserRoles.ADMIN,
+        first_name="Admin",
+        last_name="User",
+    )
+
+
+def _lead(status, first_name, last_name, phone="", email=""):
+    return Lead.objects.create(
+        first_name=first_name, last_name=last_name, phone=phone, email=email, status=status
+    )
+
+
+def _pairs():
+    return {
+        (c.lead_a_id, c.lead_b_id): c
+        for c in DuplicateCandidate.objects.all()
+    }
+
+
+@pytest.mark.parametrize(
+    "a, b",
+    [
+        ("Mohamed", "Mohammed"),
+        ("Dupont", "Dupond"),
+        ("Philippe", "Filipe"),
+        ("Hélène", "Helene"),
+    ],
+)
+def test_phonetic_key_groups_spelling_variants(a, b):
+    assert phonetic_key(a) == phonetic_key(b)
+
+
+def test_matching_scores_and_keys():
+    assert blocking_keys("Jean", "Dupont", "+33612345678", " Jean@Example.com") == [
+        "phone:+33612345678",
+        "email:jean@example.com",
+        "name:DPN-JN",
+    ]
+    # Prénom et nom inversés : même clé de nom
+    assert blocking_keys("Dupont", "Jean", "", "")[0] == "name:DPN-JN"
+
+    score, reasons = score_pair(
+        ("Jean", "Dupont", "+33612345678", ""), ("Jean", "Dupond", "+33612345678", "")
+    )
+    assert score >= 0.9 and reasons == ["phone", "name"]
+    # Même numéro, personnes différentes (ex : membres d'une famille)
+    assert score_pair(
+        ("Jean", "Dupont", "+33612345678", ""), ("Awa", "Diallo", "+33612345678", "")
+    )[0] < 0.9
+    # Noms proches sans contact commun : score modéré
+    assert score_pair(("Jean", "Dupont", "", ""), ("Jean", "Dupond", "", ""))[0] < 0.8
+
+
+def test_full_run_finds_duplicates_across_blocking_keys(status):
+    a = _lead(status, "Jean", "Dupont", "06 12 34 56 78")
+    b = _lead(status, "Jean", "Dupond", "+33612345678")
+    c = _lead(status, "Léa", "Martin", "0698765432", "lea@example.com")
+    d = _lead(status, "Lea", "Martin", "0611111111", "LEA@example.com")
+    e = _lead(status, "Mohamed", "Benali")
+    f = _lead(status, "Mohammed", "Benali")
+    _lead(status, "Paul", "Durand", "0622222222")
+
+    run = run_detection(full=True)
+
+    assert run.status == RunStatus.COMPLETED and run.full
+    assert run.leads_scanned == 7
+    pairs = _pairs()
+    assert set(pairs) == {(a.id, b.id), (c.id, d.id), (e.id, f.id)}
+    assert pairs[(a.id, b.id)].reasons == ["phone", "name"]
+    assert pairs[(c.id, d.id)].reasons == ["email", "name"]
+    assert pairs[(e.id, f.id)].reasons == ["name"]
+    assert run.candidates_found == 3
+    assert LeadBlockingKey.objects.filter(lead=a).count() == 2
+
+
+def test_incremental_run_only_compares_changed_leads(status):
+    a = _lead(status, "Jean", "Dupont", "0612345678")
+    run_detection(full=True)
+    an_hour_ago = timezone.now() - timedelta(hours=1)
+    Lead.objects.update(updated_at=an_hour_ago - timedelta(minutes=1))
+    DedupRun.objects.update(started_at=an_hour_ago)
+    assert not DuplicateCandidate.objects.exists()
+
+    b = _lead(status, "Jean", "Dupont", "0612345678")
+    run = run_detection()
+
+    assert not run.full
+    assert run.leads_scanned == 1
+    assert run.pairs_compared == 1
+    assert set(_pairs()) == {(a.id, b.id)}
+    assert LeadBlockingKey.objects.count() == 4
+
+
+def test_dismissed_pair_is_not_proposed_again(status):
+    a = _lead(status, "Jean", "Dupont", "0612345678")
+    b = _lead(status, "Jean", "Dupont", "0612345678")
+    run_detection(full=True)
+    DuplicateCandidate.objects.update(status=CandidateStatus.DISMISSED)
+
+    run = run_detection(full=True)
+
+    assert run.candidates_found == 0
+    assert _pairs()[(a.id, b.id)].status == CandidateStatus.DISMISSED
+
+
+def test_deleted_lead_leaves_the_review_queue(status, admin):
+    a = _lead(status, "Jean", "Dupont", "0612345678")
+    b = _lead(status, "Jean", "Dupont", "0612345678")
+    c = _lead(status, "Jean", "Dupond")
+    run_detection(full=True)
+    # Paire d'une fusion : gardée au journal
+    DuplicateCandidate.objects.filter(lead_a=a, lead_b=c).update(
+        status=CandidateStatus.MERGED,
+        merge=LeadMerge.objects.create(survivor=a, survivor_lead_id=a.id, merged_lead_ids=[c.id]),
+    )
+    client = APIClient()
+    client.force_authenticate(admin)
+
+    assert client.delete(reverse("lead-detail", args=[b.id])).status_code == 204
+    c.delete()
+
+    assert set(_pairs()) == {(a.id, None)}
+    assert client.get(reverse("lead-dedup-candidates-list")).data["count"] == 0
+
+
+def test_oversized_blocks_are_reported_not_compared(status):
+    for first_name, last_name in [("Jean", "Dupont"), ("Léa", "Martin"), ("Awa", "Diallo"), ("Paul", "Durand")]:
+        _lead(status, first_name, last_name, "0600000000")
+
+    run = run_detection(full=True, max_block_size=3)
+
+    assert run.pairs_compared == 0
+    assert run.oversized_blocks == [{"key": "phone:+33600000000", "size": 4}]
+
+
+def test_failed_run_is_recorded(status):
+    _lead(status, "Jean", "Dupont", "0612345678")
+
+    with patch("api.lead_dedup.services.find_pairs", side_effect=RuntimeError("boom")):
+        with pytest.raises(RuntimeError):
+            run_detection(full=True)
+
+    run = DedupRun.objects.get()
+    assert (run.status, run.error) == (RunStatus.FAILED, "boom")
+    # L'index n'est pas laissé à moitié reconstruit
+    assert not LeadBlockingKey.objects.exists()
+
+
+def test_management_command(status):
+    _lead(status, "Jean", "Dupont", "0612345678")
+    _lead(status, "Jean", "Dupont", "0612345678")
+    out = StringIO()
+
+    call_command("find_duplicate_leads", "--full", stdout=out)
+
+    assert "1 nouveaux doublons" in out.getvalue()
+    assert "[phone, email" not in out.getvalue()
+    assert "[phone, name]" in out.getvalue()
+
+
+def test_api_review_queue(status, admin, django_capture_on_commit_callbacks):
+    a = _lead(status, "Jean", "Dupont", "0612345678")
+    b = _lead(status, "Jean", "Dupont", "0612345678")
+    _lead(status, "Jean", "Dupond")
+    client = APIClient()
+    client.force_authenticate(admin)
+
+    with (
+        patch(
+            "api.lead_dedup.tasks.run_duplicate_detection.delay",
+            side_effect=run_duplicate_detection,
+        ),
+        django_capture_on_commit_callbacks(execute=True),
+    ):
+        response = client.post(reverse("lead-dedup-runs-list"), {"full": True})
+    assert response.status_code == 202
+    assert client.get(reverse("lead-dedup-runs-list")).data["results"][0]["candidates_found"] == 3
+
+    results = client.get(reverse("lead-dedup-candidates-list"), {"min_score": 0.9}).data["results"]
+    assert len(results) == 1
+    assert (results[0]["lead_a"]["id"], results[0]["lead_b"]["id"]) == (a.id, b.id)
+
+    response = client.post(reverse("lead-dedup-candidates-approve", args=[results[0]["id"]]))
+    assert response.status_code == 200
+    assert response.data["status"] == CandidateStatus.APPROVED
+    assert response.data["reviewed_by"] == admin.id
+    assert client.get(reverse("lead-dedup-candidates-list")).data["count"] == 2
+    assert client.get(reverse("lead-dedup-candidates-list"), {"status": "ALL"}).data["count"] == 3
+
+
+def test_api_requires_admin_and_rejects_concurrent_run(admin):
+    conseiller = User.objects.create_user(
+        email="conseiller@example.com",
+        password="pass",
+        role=UserRoles.CONSEILLER,
+        first_name="Claire",
+        last_name="Conseil",
+    )
+    client = APIClient()
+    client.force_authenticate(conseiller)
+    assert client.get(reverse("lead-dedup-candidates-list")).status_code == 403
+
+    DedupRun.objects.create(status=RunStatus.RUNNING)
+    client.force_authenticate(admin)
+    assert client.post(reverse("lead-dedup-runs-list")).status_code == 409
@@ -0,0 +1,230 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.appointment.models import Appointment
+from api.appointment_reports.models import DailyAppointmentEntry
+from api.clients.models import Client
+from api.comments.models import Comment
+from api.contracts.models import Contract
+from api.documents.models import Document
+from api.jurist_appointment.models import JuristAppointment
+from api.lead_dedup.merge import (
+    ASSIGNMENT_FIELDS,
+    CLIENT_RELATIONS,
+    LEAD_RELATIONS,
+    MergeError,
+    merge_leads,
+)
+from api.lead_dedup.models import (
+    CandidateStatus,
+    DuplicateCandidate,
+    LeadBlockingKey,
+    LeadMerge,
+)
+from api.lead_status.models import LeadStatus
+from api.leads.constants import RDV_CONFIRME, RDV_PLANIFIE
+from api.leads.models import Lead
+from api.payments.models import PaymentReceipt
+from api.services.models import Service
+from api.users.models import User
+from api.users.roles import UserRoles
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def status():
+    LeadStatus.objects.create(code=RDV_CONFIRME, label="RDV confirmé", color="#000")
+    return LeadStatus.objects.create(code=RDV_PLANIFIE, label="RDV planifié", color="#000")
+
+
+@pytest.fixture
+def admin():
+    return User.objects.create_user(
+        email="admin@example.com",
+        password="pass",
+        role=UserRoles.ADMIN,
+        first_name="Admin",
+        last_name="User",
+    )
+
+
+@pytest.fixture
+def juriste():
+    return User.objects.create_user(
+        email="juriste@example.com",
+        password="pass",
+        role=UserRoles.JURISTE,
+        first_name="Jules",
+        last_name="Juriste",
+    )
+
+
+def _lead(status, **kwargs):
+    return Lead.objects.create(first_name="Jean", last_name="Dupont", status=status, **kwargs)
+
+
+def _contract(client, admin, amount=200):
+    contract = Contract.objects.create(
+        client=client,
+        created_by=admin,
+        service=Service.objects.get_or_create(code="VISA", defaults={"label": "Visa"})[0],
+        amount_due=amount,
+    )
+    PaymentReceipt.objects.create(contract=contract, client=client, amount=50, mode="ESPECES")
+    return contract
+
+
+def test_merge_covers_every_relation_of_lead_and_client():
+    # Toute nouvelle relation vers Lead / Client doit être prise en charge par la fusion
+    handled = set(LEAD_RELATIONS.values()) | {
+        Client,
+        DailyAppointmentEntry,
+        DuplicateCandidate,
+        LeadBlockingKey,
+        LeadMerge,
+    }
+    assert {r.related_model for r in Lead._meta.related_objects} == handled
+    assert {r.related_model for r in Client._meta.related_objects} == set(
+        CLIENT_RELATIONS.values()
+    )
+    assert {f.name for f in Lead._meta.many_to_many} == set(ASSIGNMENT_FIELDS)
+
+
+def test_merge_reparents_related_rows_in_one_transaction(
+    status, admin, juriste, django_assert_max_num_queries, django_capture_on_commit_callbacks
+):
+    survivor = _lead(status, phone="0612345678")
+    survivor_client = Client.objects.create(lead=survivor)
+    survivor.assigned_to.add(admin)
+
+    duplicate = _lead(status, email="jean@example.com", phone="+33612345678")
+    duplicate_client = Client.objects.create(lead=duplicate)
+    contract = _contract(duplicate_client, admin)
+    Document.objects.create(client=duplicate_client, url="https://example.com/a.pdf")
+    Comment.objects.create(lead=duplicate, author=admin, content="Rappeler")
+    Appointment.objects.create(lead=duplicate, date="2030-01-15T10:00:00Z")
+    JuristAppointment.objects.create(lead=duplicate, jurist=juriste, date="2030-01-16T10:00:00Z")
+    duplicate.assigned_to.add(admin)
+    duplicate.jurist_assigned.add(juriste)
+
+    other = _lead(status)
+    other_client = Client.objects.create(lead=other)
+    _contract(other_client, admin, amount=300)
+
+    with patch("api.websocket.signals.leads.broadcast") as broadcast:
+        with django_capture_on_commit_callbacks(execute=True):
+            # Requêtes en nombre fixe, indépendant du nombre de lignes rattachées
+            with django_assert_max_num_queries(45):
+                merge = merge_leads(survivor.pk, [duplicate.pk, other.pk], merged_by=admin)
+
+    assert set(Lead.objects.values_list("pk", flat=True)) == {survivor.pk}
+    survivor.refresh_from_db()
+    assert survivor.email == "jean@example.com"
+    assert list(Client.objects.values_list("pk", flat=True)) == [survivor_client.pk]
+    assert Contract.objects.filter(client=survivor_client).count() == 2
+    assert PaymentReceipt.objects.filter(client=survivor_client).count() == 2
+    assert Contract.objects.get(pk=contract.pk).receipts.count() == 1
+    assert Document.objects.get().client == survivor_client
+    assert Comment.objects.get().lead == survivor
+    assert Appointment.objects.get().lead == survivor
+    assert JuristAppointment.objects.get().lead == survivor
+    assert list(survivor.assigned_to.all()) == [admin]
+    assert list(survivor.jurist_assigned.all()) == [juriste]
+
+    assert merge.merged_lead_ids == sorted([duplicate.pk, other.pk])
+    assert merge.moved["contracts"] == 2 and merge.moved["comments"] == 1
+    assert {lead["id"] for lead in merge.snapshot["leads"]} == {duplicate.pk, other.pk}
+    assert len(merge.snapshot["clients"]) == 2
+
+    # Une seule notification websocket pour toute la fusion
+    broadcast.assert_called_once()
+    payload = broadcast.call_args.args[1]
+    assert payload["event"] == "leads_bulk_merged"
+    assert payload["extra"]["survivor"] == survivor.pk
+
+
+def test_merge_moves_client_of_duplicate_when_survivor_has_none(status, admin):
+    survivor = _lead(status)
+    duplicate = _lead(status, appointment_date=timezone.now() + timedelta(days=3))
+    client = Client.objects.create(lead=duplicate)
+    _contract(client, admin)
+    assert DailyAppointmentEntry.objects.filter(lead=duplicate).exists()
+
+    merge_leads(survivor.pk, [duplicate.pk])
+
+    client.refresh_from_db()
+    assert client.lead_id == survivor.pk
+    assert client.contracts.count() == 1
+    assert not DailyAppointmentEntry.objects.exists()
+
+
+def test_merge_marks_candidates_and_drops_stale_pairs(status, admin):
+    a, b, c = _lead(status), _lead(status), _lead(status)
+    in_group = DuplicateCandidate.objects.create(lead_a=a, lead_b=b, score=0.9)
+    DuplicateCandidate.objects.create(lead_a=b, lead_b=c, score=0.7)
+
+    merge = merge_leads(a.pk, [b.pk], merged_by=admin)
+
+    in_group.refresh_from_db()
+    assert (in_group.status, in_group.merge, in_group.lead_a, in_group.lead_b) == (
+        CandidateStatus.MERGED,
+        merge,
+        a,
+        None,
+    )
+    assert DuplicateCandidate.objects.count() == 1
+
+
+@pytest.mark.parametrize(
+    "survivor, duplicates",
+    [(1, []), (1, [1]), (1, [999])],
+)
+def test_merge_rejects_invalid_requests(status, survivor, duplicates):
+    lead = _lead(status)
+    duplicates = [lead.pk if d == 1 else d for d in duplicates]
+
+    with pytest.raises(MergeError):
+        merge_leads(lead.pk, duplicates)
+    assert Lead.objects.count() == 1
+
+
+def test_api_merge_candidate_and_list_audit(status, admin):
+    a, b = _lead(status), _lead(status)
+    candidate = DuplicateCandidate.objects.create(lead_a=a, lead_b=b, score=0.9)
+    client = APIClient()
+    client.force_authenticate(admin)
+
+    response = client.post(
+        reverse("lead-dedup-candidates-merge", args=[candidate.pk]), {"survivor": b.pk}
+    )
+
+    assert response.status_code == 201
+    assert (response.data["survivor"], response.data["merged_lead_ids"]) == (b.pk, [a.pk])
+    assert list(Lead.objects.values_list("pk", flat=True)) == [b.pk]
+    assert client.post(reverse("lead-dedup-candidates-merge", args=[candidate.pk])).status_code == 400
+    assert client.get(reverse("lead-dedup-merges-list")).data["count"] == 1
+
+
+def test_api_merge_endpoint(status, admin):
+    a, b, c = _lead(status), _lead(status), _lead(status)
+    client = APIClient()
+    client.force_authenticate(admin)
+
+    response = client.post(
+        reverse("lead-dedup-merges-list"),
+        {"survivor": a.pk, "duplicates": [b.pk, c.pk]},
+        format="json",
+    )
+    assert response.status_code == 201
+    assert Lead.objects.count() == 1
+
+    response = client.post(
+        reverse("lead-dedup-merges-list"), {"survivor": a.pk, "duplicates": [b.pk]}, format="json"
+    )
+    assert response.status_code == 400
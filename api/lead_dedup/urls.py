@@ -0,0 +1,14 @@
+from rest_framework.routers import DefaultRouter
+
+from api.lead_dedup.views import (
+    DedupRunViewSet,
+    DuplicateCandidateViewSet,
+    LeadMergeViewSet,
+)
+
+router = DefaultRouter()
+router.register(r"candidates", DuplicateCandidateViewSet, basename="lead-dedup-candidates")
+router.register(r"runs", DedupRunViewSet, basename="lead-dedup-runs")
+router.register(r"merges", LeadMergeViewSet, basename="lead-dedup-merges")
+
+urlpatterns = router.urls
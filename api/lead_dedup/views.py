@@ -0,0 +1,171 @@
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from api.lead_dedup.merge import MergeError, merge_leads
+from api.lead_dedup.models import (
+    CandidateStatus,
+    DedupRun,
+    DuplicateCandidate,
+    LeadMerge,
+)
+from api.lead_dedup.serializers import (
+    CandidateMergeSerializer,
+    DedupRunCreateSerializer,
+    DedupRunSerializer,
+    DuplicateCandidateSerializer,
+    LeadMergeCreateSerializer,
+    LeadMergeSerializer,
+)
+from api.lead_dedup.services import running_run
+from api.lead_dedup.tasks import run_duplicate_detection
+from api.users.permissions import IsAdminRole
+
+
+class DuplicateCandidateViewSet(
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    File des doublons potentiels (ADMIN), du score le plus élevé au plus faible.
+
+    - GET /lead-dedup/candidates/?status=PENDING&min_score=0.8&lead=12 : paires à examiner
+      (statut PENDING par défaut, `status=ALL` pour tout voir).
+    - POST /lead-dedup/candidates/{id}/approve/ : valide la fusion (exécutée à part).
+    - POST /lead-dedup/candidates/{id}/dismiss/ : écarte la paire, elle ne sera plus proposée.
+    - POST /lead-dedup/candidates/{id}/merge/ (survivor) : fusionne la paire ; le lead
+      conservé est le plus ancien, sauf `survivor` explicite.
+    """
+
+    serializer_class = DuplicateCandidateSerializer
+    permission_classes = [IsAdminRole]
+
+    def get_queryset(self):
+        queryset = DuplicateCandidate.objects.select_related(
+            "lead_a__status", "lead_b__status"
+        )
+        if self.action != "list":
+            return queryset
+
+        params = self.request.query_params
+        status_filter = params.get("status", CandidateStatus.PENDING)
+        if status_filter != "ALL":
+            queryset = queryset.filter(status=status_filter)
+        if params.get("min_score"):
+            try:
+                queryset = queryset.filter(score__gte=float(params["min_score"]))
+            except ValueError:
+                pass
+        if params.get("lead"):
+            queryset = queryset.filter(Q(lead_a_id=params["lead"]) | Q(lead_b_id=params["lead"]))
+        return queryset
+
+    def _review(self, request, new_status):
+        candidate = self.get_object()
+        if candidate.status == CandidateStatus.MERGED:
+            return Response(
+                {"detail": "Ces leads ont déjà été fusionnés."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        candidate.status = new_status
+        candidate.reviewed_by = request.user
+        candidate.reviewed_at = timezone.now()
+        candidate.save(update_fields=["status", "reviewed_by", "reviewed_at"])
+        return Response(self.get_serializer(candidate).data)
+
+    @action(detail=True, methods=["post"])
+    def approve(self, request, pk=None):
+        return self._review(request, CandidateStatus.APPROVED)
+
+    @action(detail=True, methods=["post"])
+    def dismiss(self, request, pk=None):
+        return self._review(request, CandidateStatus.DISMISSED)
+
+    @action(detail=True, methods=["post"])
+    def merge(self, request, pk=None):
+        candidate = self.get_object()
+        if candidate.status in (CandidateStatus.MERGED, CandidateStatus.DISMISSED):
+            return Response(
+                {"detail": "Seule une paire à examiner ou validée peut être fusionnée."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        params = CandidateMergeSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        pair = (candidate.lead_a_id, candidate.lead_b_id)
+        survivor = params.validated_data.get("survivor", pair[0])
+        if survivor not in pair:
+            return Response(
+                {"survivor": "Le lead conservé doit appartenir à la paire."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        duplicate = pair[1] if survivor == pair[0] else pair[0]
+        return _merge_response(request, survivor, [duplicate])
+
+
+def _merge_response(request, survivor, duplicates):
+    try:
+        merge = merge_leads(survivor, duplicates, merged_by=request.user)
+    except MergeError as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(LeadMergeSerializer(merge).data, status=status.HTTP_201_CREATED)
+
+
+class LeadMergeViewSet(
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    Fusions de leads (ADMIN).
+
+    - POST /lead-dedup/merges/ (survivor, duplicates) : fusionne les doublons dans le lead
+      conservé (fiche client, contrats, reçus, documents, commentaires, rendez-vous,
+      assignations) en une transaction.
+    - GET /lead-dedup/merges/ : journal des fusions, avec la copie des leads supprimés.
+    """
+
+    queryset = LeadMerge.objects.all()
+    serializer_class = LeadMergeSerializer
+    permission_classes = [IsAdminRole]
+
+    def create(self, request, *args, **kwargs):
+        params = LeadMergeCreateSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        return _merge_response(
+            request, params.validated_data["survivor"], params.validated_data["duplicates"]
+        )
+
+
+class DedupRunViewSet(
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    Passes de détection des doublons (ADMIN).
+
+    - GET /lead-dedup/runs/ : historique et rapport (blocs trop volumineux ignorés).
+    - POST /lead-dedup/runs/ (full) : lance une passe en tâche de fond, incrémentale par
+      défaut (leads créés ou modifiés depuis la dernière passe).
+    """
+
+    queryset = DedupRun.objects.all()
+    serializer_class = DedupRunSerializer
+    permission_classes = [IsAdminRole]
+
+    def create(self, request, *args, **kwargs):
+        params = DedupRunCreateSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        current = running_run()
+        if current is not None:
+            return Response(
+                {"detail": f"Une passe est déjà en cours (#{current.pk})."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        full = params.validated_data["full"]
+        transaction.on_commit(lambda: run_duplicate_detection.delay(full=full))
+        return Response({"full": full}, status=status.HTTP_202_ACCEPTED)
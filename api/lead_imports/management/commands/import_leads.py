@@ -0,0 +1,80 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.lead_imports.models import ImportStatus, LeadImport
+from api.lead_imports.reader import ImportFileError
+from api.lead_imports.services import REPORT_SAMPLE_SIZE, run_import
+
+
+class Command(BaseCommand):
+    help = (
+        "Importe des leads depuis un fichier CSV / XLSX (lecture en flux, écriture par lots). "
+        "Remplace les scripts data_migrations/leads/import_leads*.py."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Fichier .csv ou .xlsx")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Simulation : affiche les leads à créer, doublons et rejets sans rien écrire",
+        )
+        parser.add_argument("--chunk-size", type=int, default=None, help="Lignes par lot")
+        parser.add_argument(
+            "--resume",
+            type=int,
+            metavar="IMPORT_ID",
+            help="Reprend un import interrompu à partir de son point de reprise",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if not os.path.exists(path):
+            raise CommandError(f"Fichier introuvable : {path}")
+
+        if options["resume"]:
+            lead_import = LeadImport.objects.filter(pk=options["resume"]).first()
+            if lead_import is None:
+                raise CommandError(f"Import #{options['resume']} introuvable")
+            if lead_import.status == ImportStatus.COMPLETED:
+                raise CommandError(f"Import #{lead_import.pk} déjà terminé")
+        else:
+            lead_import = LeadImport.objects.create(
+                file_name=os.path.basename(path), dry_run=options["dry_run"]
+            )
+
+        try:
+            run_import(lead_import, path, chunk_size=options["chunk_size"])
+        except ImportFileError as e:
+            raise CommandError(str(e))
+        except Exception as e:
+            raise CommandError(
+                f"Import #{lead_import.pk} interrompu ligne {lead_import.rows_processed + 1} : {e}. "
+                f"Relancer avec --resume {lead_import.pk}"
+            )
+
+        self._print_report(lead_import)
+
+    def _print_report(self, lead_import):
+        verb = "à créer" if lead_import.dry_run else "créés"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Import #{lead_import.pk} : {lead_import.rows_processed} lignes, "
+                f"{lead_import.created_count} {verb}, {lead_import.duplicate_count} doublons, "
+                f"{lead_import.invalid_count} rejetées"
+            )
+        )
+        samples = lead_import.report.get("samples", {})
+        for sample in samples.get("duplicate", []):
+            self.stdout.write(
+                f"  doublon ligne {sample['row']} ({sample['phone']}) → "
+                f"{'lead #' + str(sample['lead_id']) if sample['lead_id'] else 'ligne ' + str(sample.get('first_row'))}"
+                f"{' ' + str(sample['changes']) if sample['changes'] else ''}"
+            )
+        for sample in samples.get("invalid", []):
+            self.stdout.write(
+                self.style.WARNING(f"  rejet ligne {sample['row']} : {', '.join(sample['errors'])}")
+            )
+        if lead_import.duplicate_count + lead_import.invalid_count > 2 * REPORT_SAMPLE_SIZE:
+            self.stdout.write(f"  (échantillons limités à {REPORT_SAMPLE_SIZE} par catégorie)")
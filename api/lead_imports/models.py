@@ -0,0 +1,52 @@
+from django.db import models
+from django.utils import timezone
+
+
+class ImportStatus(models.TextChoices):
+    PENDING = "PENDING", "En attente"
+    RUNNING = "RUNNING", "En cours"
+    COMPLETED = "COMPLETED", "Terminé"
+    FAILED = "FAILED", "Échec"
+
+
+class LeadImport(models.Model):
+    """
+    Import en masse de leads depuis un fichier CSV / XLSX.
+
+    `rows_processed` sert de point de reprise : chaque lot est écrit dans la même
+    transaction que l'avancement, une reprise repart de la première ligne non traitée.
+    En simulation (`dry_run`), rien n'est écrit hors de cet enregistrement : `report`
+    contient le différentiel (leads à créer, doublons, lignes rejetées).
+    """
+
+    file_name = models.CharField(max_length=255)
+    s3_key = models.CharField(
+        max_length=500, blank=True, help_text="Fichier déposé via l'API (bucket imports)"
+    )
+    dry_run = models.BooleanField(default=False)
+    status = models.CharField(
+        max_length=10, choices=ImportStatus.choices, default=ImportStatus.PENDING
+    )
+    rows_processed = models.PositiveIntegerField(
+        default=0, help_text="Lignes de données traitées (point de reprise)"
+    )
+    created_count = models.PositiveIntegerField(default=0)
+    duplicate_count = models.PositiveIntegerField(default=0)
+    invalid_count = models.PositiveIntegerField(default=0)
+    report = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(
+        "users.User", on_delete=models.SET_NULL, null=True, blank=True
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Import de leads"
+        verbose_name_plural = "Imports de leads"
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        mode = " (simulation)" if self.dry_run else ""
+        return f"{self.file_name}{mode} – {self.get_status_display()}"
@@ -0,0 +1,121 @@
+"""
+Normalisation des valeurs importées (téléphones, e-mails, dates, libellés).
+
+Les fichiers d'import répètent massivement les mêmes valeurs (dates de RDV sur quelques
+créneaux, mêmes statuts / services / conseillers, numéros saisis plusieurs fois) :
+`normalize_chunk` traite chaque lot colonne par colonne, en ne normalisant qu'une fois
+chaque valeur distincte, et les normaliseurs unitaires sont mémoïsés par processus.
+Les téléphones passent par le module partagé `api.utils.phones`.
+"""
+
+from datetime import date, datetime
+from functools import lru_cache
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.utils import timezone
+
+from api.services.utils import code_from_label
+from api.utils.phones import normalize_phones
+
+DATE_FORMATS = (
+    "%d/%m/%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M",
+    "%d/%m/%Y",
+    "%d-%m-%Y %H:%M",
+    "%d-%m-%Y",
+)
+NAME_MAX_LENGTH = 150
+
+
+def _text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        # Cellules numériques XLSX / CSV exportés (ex : 33612345678.0)
+        value = int(value)
+    text = str(value).strip()
+    return "" if text.lower() in ("nan", "none", "null") else text
+
+
+@lru_cache(maxsize=16384)
+def _parse_datetime_text(text: str):
+    try:
+        dt = datetime.fromisoformat(text)
+    except ValueError:
+        for fmt in DATE_FORMATS:
+            try:
+                dt = datetime.strptime(text, fmt)
+                break
+            except ValueError:
+                continue
+        else:
+            return None
+    if timezone.is_naive(dt):
+        dt = timezone.make_aware(dt)
+    return dt
+
+
+def parse_datetime_value(value):
+    """Date / heure importée (texte ou cellule XLSX) ; heure locale si non précisée."""
+    if isinstance(value, datetime):
+        return timezone.make_aware(value) if timezone.is_naive(value) else value
+    if isinstance(value, date):
+        return timezone.make_aware(datetime(value.year, value.month, value.day))
+    text = _text(value)
+    return _parse_datetime_text(text) if text else None
+
+
+def lookup_key(value) -> str:
+    """Clé de correspondance d'un code, libellé, identifiant ou e-mail (sans accents, MAJ)."""
+    text = _text(value)
+    return code_from_label(text) if text else ""
+
+
+def normalize_email(value):
+    email = _text(value).lower()
+    if not email:
+        return None
+    try:
+        validate_email(email)
+    except ValidationError:
+        return None
+    return email
+
+
+def normalize_name(value) -> str:
+    return " ".join(_text(value).split()).title()[:NAME_MAX_LENGTH]
+
+
+def _column(rows, column, normalizer) -> list:
+    # Cellules CSV / XLSX : valeurs hashables, une normalisation par valeur distincte
+    raw = [row.get(column) for row in rows]
+    distinct = {value: None for value in raw}
+    for value in distinct:
+        distinct[value] = normalizer(value)
+    return [distinct[value] for value in raw]
+
+
+def normalize_chunk(rows) -> list:
+    """
+    Normalise un lot de lignes brutes (dicts par colonne canonique), colonne par colonne.
+    Retourne un dict par ligne : valeurs normalisées + valeurs brutes utiles au rapport.
+    """
+    columns = {
+        "first_name": _column(rows, "first_name", normalize_name),
+        "last_name": _column(rows, "last_name", normalize_name),
+        "phone": normalize_phones([row.get("phone") for row in rows]),
+        "email": _column(rows, "email", normalize_email),
+        "appointment_date": _column(rows, "appointment_date", parse_datetime_value),
+        "created_at": _column(rows, "created_at", parse_datetime_value),
+        "status": _column(rows, "status", lookup_key),
+        "service": _column(rows, "service", lookup_key),
+        "conseiller": _column(rows, "conseiller", lookup_key),
+    }
+    normalized = []
+    for i, row in enumerate(rows):
+        values = {name: column[i] for name, column in columns.items()}
+        values["raw_phone"] = _text(row.get("phone"))
+        values["comment"] = _text(row.get("comment"))
+        normalized.append(values)
+    return normalized
@@ -0,0 +1,136 @@
+"""
+Lecture en flux des fichiers d'import (CSV / XLSX).
+
+- Le fichier n'est jamais chargé en entier : les lignes sont produites une à une.
+- La ligne d'en-tête est détectée parmi les premières lignes (les exports commencent
+  souvent par un titre ou des lignes vides).
+- Les en-têtes sont normalisés (minuscules, sans accents, `_`) puis ramenés aux colonnes
+  canoniques via `COLUMN_ALIASES` (ou la table d'alias passée par l'appelant, ex : relevés
+  de contrats) ; les colonnes inconnues sont ignorées.
+- La lecture XLSX utilise openpyxl en mode `read_only` (dépendance optionnelle).
+"""
+
+import csv
+import os
+import re
+import unicodedata
+
+HEADER_SCAN_ROWS = 20
+SNIFF_SIZE = 64 * 1024
+DELIMITERS = (";", ",", "\t", "|")
+
+COLUMN_ALIASES = {
+    "first_name": ("first_name", "prenom", "firstname"),
+    "last_name": ("last_name", "nom", "lastname", "nom_de_famille"),
+    "phone": ("phone", "telephone", "tel", "numero_de_telephone", "portable", "mobile"),
+    "email": ("email", "e_mail", "mail", "adresse_email"),
+    "appointment_date": ("appointment_date", "date_de_rdv", "date_du_rdv", "rdv"),
+    "created_at": ("created_at", "date_du_lead", "lead_date", "date_de_creation"),
+    "status": ("status", "status_id", "statut", "statut_client", "status_code"),
+    "service": ("service", "service_id", "service_code", "type_demande", "prestation"),
+    "conseiller": ("conseiller", "collaborator_id", "collaborateur", "assigned_to"),
+    "comment": ("comment", "commentaire", "commentaires"),
+}
+SUPPORTED_EXTENSIONS = (".csv", ".xlsx")
+
+
+class ImportFileError(ValueError):
+    """Fichier illisible ou sans en-tête exploitable."""
+
+
+def normalize_header(value) -> str:
+    s = unicodedata.normalize("NFKD", str(value or ""))
+    s = "".join(c for c in s if unicodedata.category(c) != "Mn")
+    s = re.sub(r"[^0-9a-z]+", "_", s.strip().lower())
+    return s.strip("_")
+
+
+def _alias_map(aliases) -> dict:
+    return {alias: column for column, names in aliases.items() for alias in names}
+
+
+def map_columns(header, aliases=COLUMN_ALIASES) -> list:
+    """Colonne canonique de chaque cellule d'en-tête (None si ignorée, premier doublon gardé)."""
+    alias_to_column = _alias_map(aliases)
+    seen = set()
+    mapped = []
+    for cell in header:
+        column = alias_to_column.get(normalize_header(cell))
+        if column in seen:
+            column = None
+        seen.add(column)
+        mapped.append(column)
+    return mapped
+
+
+def _is_header(row, aliases) -> bool:
+    columns = {c for c in map_columns(row, aliases) if c}
+    return "phone" in columns and bool(columns & {"first_name", "last_name"})
+
+
+def _is_blank(values) -> bool:
+    return all(v is None or str(v).strip() == "" for v in values)
+
+
+def _iter_csv(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        # Séparateur le plus fréquent de l'échantillon (le Sniffer échoue sur les
+        # exports précédés d'une ligne de titre)
+        sample = f.read(SNIFF_SIZE)
+        f.seek(0)
+        delimiter = max(DELIMITERS, key=sample.count)
+        yield from csv.reader(f, delimiter=delimiter)
+
+
+def _iter_xlsx(path):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFileError("Lecture XLSX indisponible : le paquet openpyxl n'est pas installé")
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def iter_raw_rows(path):
+    ext = os.path.splitext(str(path))[1].lower()
+    if ext == ".csv":
+        return _iter_csv(path)
+    if ext == ".xlsx":
+        return _iter_xlsx(path)
+    raise ImportFileError(
+        f"Format non pris en charge ({ext or 'sans extension'}) : "
+        f"{', '.join(SUPPORTED_EXTENSIONS)} attendus"
+    )
+
+
+def read_rows(path, start: int = 0, aliases=COLUMN_ALIASES):
+    """
+    Produit `(index, ligne)` pour chaque ligne de données non vide, `index` étant la
+    position (0-based) de la ligne après l'en-tête et `ligne` un dict
+    `{colonne canonique: valeur brute}` (colonnes de `aliases`). Les lignes d'index
+    < `start` sont sautées (reprise). Lève `ImportFileError` si aucun en-tête n'est reconnu.
+    """
+    rows = iter_raw_rows(path)
+    columns = None
+    for position, row in enumerate(rows):
+        if position >= HEADER_SCAN_ROWS:
+            break
+        if row and _is_header(row, aliases):
+            columns = map_columns(row, aliases)
+            break
+    if columns is None:
+        raise ImportFileError(
+            "En-tête introuvable : colonnes téléphone et nom / prénom attendues "
+            f"dans les {HEADER_SCAN_ROWS} premières lignes"
+        )
+
+    wanted = [(i, c) for i, c in enumerate(columns) if c]
+    for index, row in enumerate(rows):
+        if index < start or not row or _is_blank(row):
+            continue
+        yield index, {c: row[i] if i < len(row) else None for i, c in wanted}
+
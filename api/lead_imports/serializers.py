@@ -0,0 +1,41 @@
+import os
+
+from rest_framework import serializers
+
+from api.lead_imports.models import LeadImport
+from api.lead_imports.reader import SUPPORTED_EXTENSIONS
+
+
+class LeadImportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = LeadImport
+        fields = [
+            "id",
+            "file_name",
+            "dry_run",
+            "status",
+            "rows_processed",
+            "created_count",
+            "duplicate_count",
+            "invalid_count",
+            "report",
+            "error",
+            "created_by",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
+
+
+class LeadImportUploadSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    dry_run = serializers.BooleanField(default=True)
+
+    def validate_file(self, value):
+        ext = os.path.splitext(value.name)[1].lower()
+        if ext not in SUPPORTED_EXTENSIONS:
+            raise serializers.ValidationError(
+                f"Format non pris en charge : {', '.join(SUPPORTED_EXTENSIONS)} attendus"
+            )
+        return value
@@ -0,0 +1,418 @@
+"""
+Import en masse de leads.
+
+Déroulé (`run_import`) :
+1. Tables de correspondance construites une seule fois (`Lookups`) : statuts, services,
+   utilisateurs, téléphones normalisés / e-mails des leads existants. Aucune requête
+   par ligne.
+2. Lecture en flux du fichier (`reader.read_rows`), par lots de `LEAD_IMPORT_CHUNK_SIZE`.
+3. Normalisation du lot colonne par colonne (`normalize.normalize_chunk`), puis tri des
+   lignes : à créer, doublon (lead existant ou ligne déjà vue dans le fichier), rejetée.
+4. Écriture du lot par `bulk_create` (leads, assignations conseiller, fiches client avec
+   le service demandé, commentaires) et mise à jour du point de reprise, dans une même
+   transaction. Les lignes sans conseiller sont réparties par l'assignation automatique
+   (`api.lead_assignment`). `bulk_create` n'émet aucun signal : pas de diffusion websocket ligne à
+   ligne, une seule notification récapitulative en fin d'import.
+
+En simulation (`dry_run`), l'étape 4 n'écrit que l'avancement et le rapport.
+"""
+
+import logging
+import uuid
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from api.clients.models import Client
+from api.comments.models import Comment
+from api.lead_assignment.services import adjust_loads, auto_assign_new
+from api.lead_imports.models import ImportStatus, LeadImport
+from api.lead_imports.normalize import lookup_key, normalize_chunk
+from api.lead_imports.reader import read_rows
+from api.lead_status.models import LeadStatus
+from api.leads.constants import RDV_CONFIRME, RDV_PLANIFIE
+from api.leads.duplicates import remember_leads
+from api.leads.models import Lead
+from api.services.models import Service
+from api.users.models import User
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 2000
+REPORT_SAMPLE_SIZE = 50
+# Libellés historiques des exports (colonne « statut client »)
+STATUS_ALIASES = {
+    "RDV_VALIDE": RDV_CONFIRME,
+    "CONFIRME": RDV_CONFIRME,
+    "PLANIFIE": RDV_PLANIFIE,
+}
+DIFF_FIELDS = ("first_name", "last_name", "email", "appointment_date")
+
+
+def get_chunk_size() -> int:
+    return getattr(settings, "LEAD_IMPORT_CHUNK_SIZE", DEFAULT_CHUNK_SIZE)
+
+
+# ==========================
+#  TABLES DE CORRESPONDANCE
+# ==========================
+
+
+@dataclass
+class Lookups:
+    """Correspondances clé normalisée → identifiant, chargées une fois par import."""
+
+    statuses: dict
+    services: dict
+    users: dict
+    default_status_id: int = None
+    phones: dict = field(default_factory=dict)
+    emails: dict = field(default_factory=dict)
+
+    @classmethod
+    def build(cls) -> "Lookups":
+        statuses, codes = {}, {}
+        for pk, code, label in LeadStatus.objects.values_list("id", "code", "label"):
+            codes[code] = pk
+            statuses[lookup_key(pk)] = pk
+            statuses[lookup_key(code)] = pk
+            statuses.setdefault(lookup_key(label), pk)
+        for alias, code in STATUS_ALIASES.items():
+            if code in codes:
+                statuses.setdefault(alias, codes[code])
+
+        services = {}
+        for pk, code, label in Service.objects.values_list("id", "code", "label"):
+            services[lookup_key(pk)] = pk
+            services[lookup_key(code)] = pk
+            services.setdefault(lookup_key(label), pk)
+
+        users = {}
+        for pk, email, first_name, last_name in User.objects.values_list(
+            "id", "email", "first_name", "last_name"
+        ):
+            users[lookup_key(pk)] = pk
+            users[lookup_key(email)] = pk
+            users.setdefault(lookup_key(f"{first_name} {last_name}"), pk)
+
+        lookups = cls(
+            statuses=statuses,
+            services=services,
+            users=users,
+            default_status_id=codes.get(RDV_PLANIFIE),
+        )
+        existing = Lead.objects.values_list("id", "phone_normalized", "email")
+        for pk, phone, email in existing.iterator(chunk_size=10000):
+            lookups.remember(pk, phone, (email or "").strip().lower())
+        return lookups
+
+    def remember(self, lead_id, phone, email, replace=False):
+        """
+        Mémorise un téléphone / e-mail. `lead_id` vaut `("row", n)` pour une ligne du
+        fichier pas encore écrite ; `replace` la remplace par l'id du lead créé.
+        """
+        if phone and (replace or phone not in self.phones):
+            self.phones[phone] = lead_id
+        if email and (replace or email not in self.emails):
+            self.emails[email] = lead_id
+
+    def match(self, phone, email):
+        """Lead existant (ou ligne déjà importée) portant ce téléphone ou cet e-mail."""
+        if phone in self.phones:
+            return "phone", self.phones[phone]
+        if email and email in self.emails:
+            return "email", self.emails[email]
+        return None, None
+
+
+# ==========================
+#  TRI DES LIGNES
+# ==========================
+
+
+@dataclass
+class ChunkPlan:
+    create: list = field(default_factory=list)
+    duplicates: list = field(default_factory=list)
+    invalid: list = field(default_factory=list)
+
+
+def _errors(values, lookups) -> list:
+    errors = []
+    if not values["phone"]:
+        errors.append(
+            f"Téléphone invalide : {values['raw_phone']}" if values["raw_phone"] else "Téléphone manquant"
+        )
+    if not (values["first_name"] or values["last_name"]):
+        errors.append("Nom et prénom manquants")
+    if values["status"]:
+        values["status_id"] = lookups.statuses.get(values["status"])
+        if values["status_id"] is None:
+            errors.append(f"Statut inconnu : {values['status']}")
+    else:
+        values["status_id"] = lookups.default_status_id
+        if values["status_id"] is None:
+            errors.append(f"Statut par défaut {RDV_PLANIFIE} absent")
+    values["service_id"] = lookups.services.get(values["service"]) if values["service"] else None
+    if values["service"] and values["service_id"] is None:
+        errors.append(f"Service inconnu : {values['service']}")
+    values["conseiller_id"] = lookups.users.get(values["conseiller"]) if values["conseiller"] else None
+    if values["conseiller"] and values["conseiller_id"] is None:
+        errors.append(f"Conseiller inconnu : {values['conseiller']}")
+    return errors
+
+
+def plan_chunk(rows, lookups: Lookups) -> ChunkPlan:
+    """
+    Répartit un lot normalisé (`[(index, valeurs)]`). Les lignes retenues sont
+    mémorisées dans `lookups` : un même téléphone plus loin dans le fichier est un doublon.
+    """
+    plan = ChunkPlan()
+    for index, values in rows:
+        errors = _errors(values, lookups)
+        if errors:
+            plan.invalid.append((index, values, errors))
+            continue
+        match, lead_id = lookups.match(values["phone"], values["email"])
+        if match:
+            plan.duplicates.append((index, values, match, lead_id))
+            continue
+        lookups.remember(("row", index + 1), values["phone"], values["email"])
+        plan.create.append((index, values))
+    return plan
+
+
+# ==========================
+#  ÉCRITURE
+# ==========================
+
+
+def write_chunk(rows, lookups: Lookups, author_id=None) -> list:
+    """
+    Crée les leads d'un lot et leurs données liées, sans signaux. Retourne les ids créés.
+    """
+    now = timezone.now()
+    leads = Lead.objects.bulk_create(
+        [
+            Lead(
+                first_name=values["first_name"],
+                last_name=values["last_name"],
+                phone=values["phone"],
+                phone_normalized=values["phone"],
+                email=values["email"],
+                status_id=values["status_id"],
+                appointment_date=values["appointment_date"],
+                created_at=values["created_at"] or now,
+            )
+            for _, values in rows
+        ]
+    )
+
+    assignments, clients, comments = [], [], []
+    for lead, (_, values) in zip(leads, rows):
+        lookups.remember(lead.pk, lead.phone, lead.email, replace=True)
+        if values["conseiller_id"]:
+            assignments.append(
+                Lead.assigned_to.through(lead_id=lead.pk, user_id=values["conseiller_id"])
+            )
+        if values["service_id"]:
+            clients.append(Client(lead_id=lead.pk, type_demande_id=values["service_id"]))
+        comment_author = values["conseiller_id"] or author_id
+        if values["comment"] and comment_author:
+            comments.append(
+                Comment(lead_id=lead.pk, author_id=comment_author, content=values["comment"])
+            )
+
+    Lead.assigned_to.through.objects.bulk_create(assignments)
+    adjust_loads(added=[(a.lead_id, a.user_id) for a in assignments])
+    # Lignes sans conseiller : assignation automatique (rapport synchronisé ci-dessous)
+    auto_assign_new(
+        [lead for lead, (_, values) in zip(leads, rows) if not values["conseiller_id"]],
+        notify=False,
+    )
+    Client.objects.bulk_create(clients)
+    Comment.objects.bulk_create(comments)
+    remember_leads((lead.phone_normalized, lead.email) for lead in leads)
+
+    with_appointment = [lead.pk for lead in leads if lead.appointment_date]
+    if with_appointment:
+        from api.appointment_reports.services import sync_entries
+
+        sync_entries(with_appointment)
+    return [lead.pk for lead in leads]
+
+
+# ==========================
+#  RAPPORT
+# ==========================
+
+
+def empty_report() -> dict:
+    return {"samples": {"create": [], "duplicate": [], "invalid": []}}
+
+
+def _describe(index, values) -> dict:
+    return {
+        "row": index + 1,
+        "first_name": values["first_name"],
+        "last_name": values["last_name"],
+        "phone": values["phone"] or values["raw_phone"],
+        "email": values["email"],
+    }
+
+
+def _changes(values, existing) -> dict:
+    changes = {}
+    for name in DIFF_FIELDS:
+        new, old = values[name], existing.get(name)
+        if new and new != old:
+            changes[name] = [
+                old.isoformat() if hasattr(old, "isoformat") else old,
+                new.isoformat() if hasattr(new, "isoformat") else new,
+            ]
+    return changes
+
+
+def add_to_report(report: dict, plan: ChunkPlan, created_ids=()):
+    """Complète les échantillons du rapport (au plus `REPORT_SAMPLE_SIZE` par catégorie)."""
+    samples = report["samples"]
+
+    room = REPORT_SAMPLE_SIZE - len(samples["create"])
+    lead_ids = list(created_ids) or [None] * len(plan.create)
+    for (index, values), lead_id in zip(plan.create[:room], lead_ids):
+        samples["create"].append({**_describe(index, values), "lead_id": lead_id})
+
+    room = REPORT_SAMPLE_SIZE - len(samples["duplicate"])
+    duplicates = plan.duplicates[:room]
+    existing = {
+        lead["id"]: lead
+        for lead in Lead.objects.filter(
+            id__in=[d[3] for d in duplicates if not isinstance(d[3], tuple)]
+        ).values("id", *DIFF_FIELDS)
+    }
+    for index, values, match, lead_id in duplicates:
+        if isinstance(lead_id, tuple):
+            # Téléphone / e-mail déjà présent plus haut dans le fichier
+            sample = {"match": "file", "first_row": lead_id[1], "lead_id": None, "changes": {}}
+        else:
+            sample = {
+                "match": match,
+                "lead_id": lead_id,
+                "changes": _changes(values, existing.get(lead_id, {})),
+            }
+        samples["duplicate"].append({**_describe(index, values), **sample})
+
+    room = REPORT_SAMPLE_SIZE - len(samples["invalid"])
+    for index, values, errors in plan.invalid[:room]:
+        samples["invalid"].append({**_describe(index, values), "errors": errors})
+    return report
+
+
+# ==========================
+#  IMPORT
+# ==========================
+
+
+def _chunks(rows, size):
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def _save_progress(lead_import, plan, rows_processed, report):
+    lead_import.rows_processed = rows_processed
+    lead_import.created_count += len(plan.create)
+    lead_import.duplicate_count += len(plan.duplicates)
+    lead_import.invalid_count += len(plan.invalid)
+    lead_import.report = report
+    lead_import.save(
+        update_fields=[
+            "rows_processed",
+            "created_count",
+            "duplicate_count",
+            "invalid_count",
+            "report",
+        ]
+    )
+
+
+def run_import(lead_import: LeadImport, path, chunk_size: int = None) -> LeadImport:
+    """
+    Importe (ou simule) le fichier `path` à partir du point de reprise de `lead_import`.
+    En cas d'erreur, l'import passe en échec en conservant les lots déjà validés ;
+    un nouvel appel reprend à la première ligne non traitée.
+    """
+    chunk_size = chunk_size or get_chunk_size()
+    lead_import.status = ImportStatus.RUNNING
+    lead_import.error = ""
+    lead_import.started_at = lead_import.started_at or timezone.now()
+    lead_import.save(update_fields=["status", "error", "started_at"])
+    report = lead_import.report or empty_report()
+    created = 0
+
+    logger.info(
+        f"📥 Import #{lead_import.pk} ({lead_import.file_name}) : démarrage ligne "
+        f"{lead_import.rows_processed + 1}{' (simulation)' if lead_import.dry_run else ''}"
+    )
+    try:
+        lookups = Lookups.build()
+        for chunk in _chunks(read_rows(path, start=lead_import.rows_processed), chunk_size):
+            values = normalize_chunk([row for _, row in chunk])
+            plan = plan_chunk(list(zip((index for index, _ in chunk), values)), lookups)
+            with transaction.atomic():
+                created_ids = []
+                if plan.create and not lead_import.dry_run:
+                    created_ids = write_chunk(
+                        plan.create, lookups, author_id=lead_import.created_by_id
+                    )
+                add_to_report(report, plan, created_ids)
+                _save_progress(lead_import, plan, chunk[-1][0] + 1, report)
+            created += len(created_ids)
+    except Exception as e:
+        logger.exception(f"❌ Import #{lead_import.pk} interrompu : {e}")
+        lead_import.status = ImportStatus.FAILED
+        lead_import.error = str(e)
+        lead_import.save(update_fields=["status", "error"])
+        raise
+
+    lead_import.status = ImportStatus.COMPLETED
+    lead_import.finished_at = timezone.now()
+    lead_import.save(update_fields=["status", "finished_at"])
+    logger.info(
+        f"✅ Import #{lead_import.pk} terminé : {lead_import.created_count} créés, "
+        f"{lead_import.duplicate_count} doublons, {lead_import.invalid_count} rejetés"
+    )
+
+    if created:
+        from api.websocket.signals.leads import broadcast_leads_imported
+
+        transaction.on_commit(
+            lambda: broadcast_leads_imported(lead_import.pk, lead_import.created_count)
+        )
+    return lead_import
+
+
+# ==========================
+#  DÉPÔTS VIA L'API
+# ==========================
+
+UPLOAD_BUCKET = "imports"
+
+
+def store_upload(uploaded_file) -> str:
+    """Dépose le fichier reçu dans le bucket `imports` (lu par le worker) ; retourne la clé."""
+    from api.utils.cloud.scw.bucket_utils import put_object
+
+    key = f"lead-imports/{uuid.uuid4().hex}/{uploaded_file.name}"
+    put_object(UPLOAD_BUCKET, key, uploaded_file.read())
+    return key
+
+
+def schedule_import(lead_import: LeadImport):
+    """Programme le traitement par le worker après validation de la transaction."""
+    from api.lead_imports.tasks import run_lead_import
+
+    transaction.on_commit(lambda: run_lead_import.delay(lead_import.pk))
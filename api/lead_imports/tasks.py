@@ -0,0 +1,35 @@
+import logging
+import os
+import tempfile
+
+from celery import shared_task
+
+from api.lead_imports.models import ImportStatus, LeadImport
+from api.lead_imports.services import UPLOAD_BUCKET, run_import
+from api.utils.cloud.scw.bucket_utils import get_object
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def run_lead_import(import_id: int):
+    """
+    Traite un import déposé via l'API : le fichier est relu depuis le bucket `imports`,
+    le traitement reprend au point de reprise enregistré.
+    """
+    lead_import = LeadImport.objects.filter(pk=import_id).first()
+    if lead_import is None or lead_import.status == ImportStatus.COMPLETED:
+        return None
+
+    content = get_object(UPLOAD_BUCKET, lead_import.s3_key)
+    suffix = os.path.splitext(lead_import.file_name)[1].lower()
+    with tempfile.NamedTemporaryFile(suffix=suffix) as f:
+        f.write(content)
+        f.flush()
+        run_import(lead_import, f.name)
+
+    return {
+        "created": lead_import.created_count,
+        "duplicates": lead_import.duplicate_count,
+        "invalid": lead_import.invalid_count,
+    }
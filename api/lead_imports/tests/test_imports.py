@@ -0,0 +1,259 @@
+import csv
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.clients.models import Client
+from api.comments.models import Comment
+from api.lead_imports.models import ImportStatus, LeadImport
+from api.lead_imports.reader import read_rows
+from api.lead_imports.services import run_import
+from api.lead_imports.tasks import run_lead_import
+from api.lead_status.models import LeadStatus
+from api.leads.constants import RDV_CONFIRME, RDV_PLANIFIE
+from api.leads.models import Lead
+from api.services.models import Service
+from api.users.models import User
+from api.users.roles import UserRoles
+
+pytestmark = pytest.mark.django_db
+
+HEADER = ["Nom", "Prénom", "Téléphone", "E-mail", "Date de RDV", "Statut client", "Service", "Conseiller", "Commentaires"]
+
+
+@pytest.fixture
+def statuses():
+    return {
+        RDV_PLANIFIE: LeadStatus.objects.create(code=RDV_PLANIFIE, label="RDV planifié", color="#000"),
+        RDV_CONFIRME: LeadStatus.objects.create(code=RDV_CONFIRME, label="RDV confirmé", color="#000"),
+    }
+
+
+@pytest.fixture
+def service():
+    return Service.objects.create(code="TITRE_SEJOUR", label="Titre de séjour")
+
+
+@pytest.fixture
+def conseiller():
+    return User.objects.create_user(
+        email="conseiller@example.com",
+        password="pass",
+        role=UserRoles.CONSEILLER,
+        first_name="Claire",
+        last_name="Conseil",
+    )
+
+
+@pytest.fixture
+def admin():
+    return User.objects.create_user(
+        email="admin@example.com",
+        password="pass",
+        role=UserRoles.ADMIN,
+        first_name="Admin",
+        last_name="User",
+    )
+
+
+def _write_csv(path, rows, delimiter=";"):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=delimiter)
+        writer.writerow(["Export RDV"])
+        writer.writerow([])
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+    return path
+
+
+def _rows(count, start=0):
+    return [
+        [f"nom{i}", f"prénom{i}", f"06 12 {i // 100:02d} {i % 100:02d} 00", f"lead{i}@example.com", "", "", "", "", ""]
+        for i in range(start, start + count)
+    ]
+
+
+def test_reader_detects_header_and_maps_columns(tmp_path):
+    path = _write_csv(tmp_path / "leads.csv", [["Dupont", "Jean", "0612345678", "", "", "", "", "", ""]])
+
+    rows = list(read_rows(path))
+
+    assert rows == [
+        (
+            0,
+            {
+                "last_name": "Dupont",
+                "first_name": "Jean",
+                "phone": "0612345678",
+                "email": "",
+                "appointment_date": "",
+                "status": "",
+                "service": "",
+                "conseiller": "",
+                "comment": "",
+            },
+        )
+    ]
+
+
+def test_dry_run_reports_diff_without_writing(tmp_path, statuses):
+    existing = Lead.objects.create(
+        first_name="Jean", last_name="Dupont", phone="0612345678", status=statuses[RDV_PLANIFIE]
+    )
+    path = _write_csv(
+        tmp_path / "leads.csv",
+        [
+            ["Dupont", "Jean", "+33 6 12 34 56 78", "jean@example.com", "", "", "", "", ""],
+            ["Martin", "Léa", "0698765432", "", "", "RDV validé", "", "", ""],
+            ["Martin", "Léa", "33698765432", "", "", "", "", "", ""],
+            ["Durand", "Paul", "12", "", "", "", "", "", ""],
+            ["Petit", "Ana", "0611111111", "", "", "Inconnu", "", "", ""],
+        ],
+    )
+    lead_import = LeadImport.objects.create(file_name="leads.csv", dry_run=True)
+
+    run_import(lead_import, path)
+
+    assert Lead.objects.count() == 1
+    lead_import.refresh_from_db()
+    assert lead_import.status == ImportStatus.COMPLETED
+    assert (lead_import.created_count, lead_import.duplicate_count, lead_import.invalid_count) == (1, 2, 2)
+    samples = lead_import.report["samples"]
+    assert samples["create"][0]["phone"] == "+33698765432"
+    duplicate, in_file = samples["duplicate"]
+    assert duplicate["lead_id"] == existing.id
+    assert duplicate["changes"] == {"email": [None, "jean@example.com"]}
+    assert (in_file["match"], in_file["first_row"]) == ("file", 2)
+    assert [s["errors"] for s in samples["invalid"]] == [
+        ["Téléphone invalide : 12"],
+        ["Statut inconnu : INCONNU"],
+    ]
+
+
+def test_import_bulk_creates_leads_and_related_rows(
+    tmp_path, statuses, service, conseiller, django_assert_max_num_queries, django_capture_on_commit_callbacks
+):
+    rows = _rows(60)
+    rows[0][4:] = ["15/01/2030 10:30", "RDV confirmé", "Titre de séjour", "conseiller@example.com", "Rappeler"]
+    path = _write_csv(tmp_path / "leads.csv", rows)
+    lead_import = LeadImport.objects.create(file_name="leads.csv")
+
+    with patch("api.websocket.signals.leads.broadcast") as broadcast:
+        with django_capture_on_commit_callbacks(execute=True):
+            # Nombre de requêtes fonction du nombre de lots, pas du nombre de lignes
+            # (assignation automatique des lignes sans conseiller comprise)
+            with django_assert_max_num_queries(55):
+                run_import(lead_import, path, chunk_size=20)
+
+    assert Lead.objects.count() == 60
+    lead = Lead.objects.get(phone="+33612000000")
+    assert (lead.first_name, lead.last_name, lead.status.code) == ("Prénom0", "Nom0", RDV_CONFIRME)
+    assert timezone.localtime(lead.appointment_date).hour == 10
+    assert list(lead.assigned_to.all()) == [conseiller]
+    assert Client.objects.get(lead=lead).type_demande == service
+    assert Comment.objects.get(lead=lead).author == conseiller
+    assert Lead.objects.filter(status__code=RDV_PLANIFIE).count() == 59
+    assert Lead.objects.filter(assigned_to=conseiller).count() == 60
+    # Une seule notification websocket pour tout l'import
+    broadcast.assert_called_once()
+    assert broadcast.call_args.args[1]["event"] == "leads_imported"
+    assert broadcast.call_args.args[1]["data"]["created"] == 60
+
+
+def test_failed_import_resumes_from_checkpoint(tmp_path, statuses):
+    path = _write_csv(tmp_path / "leads.csv", _rows(50))
+    lead_import = LeadImport.objects.create(file_name="leads.csv")
+
+    from api.lead_imports import services
+
+    original = services.write_chunk
+    calls = []
+
+    def flaky(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 3:
+            raise RuntimeError("connexion perdue")
+        return original(*args, **kwargs)
+
+    with patch.object(services, "write_chunk", side_effect=flaky):
+        with pytest.raises(RuntimeError):
+            run_import(lead_import, path, chunk_size=20)
+
+    lead_import.refresh_from_db()
+    assert lead_import.status == ImportStatus.FAILED
+    assert lead_import.rows_processed == 40
+    assert Lead.objects.count() == 40
+
+    run_import(lead_import, path, chunk_size=20)
+
+    lead_import.refresh_from_db()
+    assert lead_import.status == ImportStatus.COMPLETED
+    assert (lead_import.rows_processed, lead_import.created_count) == (50, 50)
+    assert Lead.objects.count() == 50
+    assert lead_import.duplicate_count == 0
+
+
+def test_management_command_dry_run(tmp_path, statuses):
+    path = _write_csv(tmp_path / "leads.csv", _rows(3) + [["X", "Y", "", "", "", "", "", "", ""]])
+    out = StringIO()
+
+    call_command("import_leads", str(path), "--dry-run", stdout=out)
+
+    assert Lead.objects.count() == 0
+    assert "3 à créer, 0 doublons, 1 rejetées" in out.getvalue()
+    assert "Téléphone manquant" in out.getvalue()
+
+
+def test_api_upload_then_apply(tmp_path, statuses, admin, django_capture_on_commit_callbacks):
+    client = APIClient()
+    client.force_authenticate(admin)
+    content = _write_csv(tmp_path / "leads.csv", _rows(5)).read_bytes()
+
+    with (
+        patch("api.utils.cloud.scw.bucket_utils.put_object") as put,
+        patch("api.lead_imports.tasks.get_object", return_value=content),
+        patch("api.lead_imports.tasks.run_lead_import.delay", side_effect=run_lead_import),
+        django_capture_on_commit_callbacks(execute=True),
+    ):
+        response = client.post(
+            reverse("lead-imports-list"),
+            {"file": SimpleUploadedFile("leads.csv", content)},
+            format="multipart",
+        )
+    assert response.status_code == 202
+    put.assert_called_once()
+    simulation = LeadImport.objects.get(pk=response.data["id"])
+    assert simulation.dry_run and simulation.status == ImportStatus.COMPLETED
+    assert Lead.objects.count() == 0
+
+    with (
+        patch("api.lead_imports.tasks.get_object", return_value=content),
+        patch("api.lead_imports.tasks.run_lead_import.delay", side_effect=run_lead_import),
+        django_capture_on_commit_callbacks(execute=True),
+    ):
+        response = client.post(reverse("lead-imports-apply", args=[simulation.pk]))
+    assert response.status_code == 202
+    assert Lead.objects.count() == 5
+    assert client.get(reverse("lead-imports-detail", args=[response.data["id"]])).data[
+        "created_count"
+    ] == 5
+
+
+def test_api_rejects_unknown_format_and_non_admin(admin, conseiller):
+    client = APIClient()
+    client.force_authenticate(conseiller)
+    assert client.get(reverse("lead-imports-list")).status_code == 403
+
+    client.force_authenticate(admin)
+    response = client.post(
+        reverse("lead-imports-list"),
+        {"file": SimpleUploadedFile("leads.pdf", b"%PDF")},
+        format="multipart",
+    )
+    assert response.status_code == 400
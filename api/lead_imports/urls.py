@@ -0,0 +1,8 @@
+from rest_framework.routers import DefaultRouter
+
+from api.lead_imports.views import LeadImportViewSet
+
+router = DefaultRouter()
+router.register(r"", LeadImportViewSet, basename="lead-imports")
+
+urlpatterns = router.urls
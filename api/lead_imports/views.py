@@ -0,0 +1,80 @@
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.response import Response
+
+from api.lead_imports.models import ImportStatus, LeadImport
+from api.lead_imports.serializers import LeadImportSerializer, LeadImportUploadSerializer
+from api.lead_imports.services import schedule_import, store_upload
+from api.users.permissions import IsAdminRole
+
+
+class LeadImportViewSet(
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    Imports de leads en masse (ADMIN).
+
+    - POST /lead-imports/ (multipart : file, dry_run) : dépose un CSV / XLSX et lance
+      le traitement en tâche de fond. Simulation par défaut : le rapport liste les leads
+      à créer, les doublons et les lignes rejetées, sans rien écrire.
+    - GET /lead-imports/, /lead-imports/{id}/ : avancement et rapport.
+    - POST /lead-imports/{id}/apply/ : importe réellement le fichier d'une simulation.
+    - POST /lead-imports/{id}/resume/ : relance un import en échec depuis son point de reprise.
+    """
+
+    queryset = LeadImport.objects.all()
+    serializer_class = LeadImportSerializer
+    permission_classes = [IsAdminRole]
+    parser_classes = [MultiPartParser, FormParser, JSONParser]
+
+    def create(self, request, *args, **kwargs):
+        upload = LeadImportUploadSerializer(data=request.data)
+        upload.is_valid(raise_exception=True)
+        file = upload.validated_data["file"]
+        lead_import = LeadImport.objects.create(
+            file_name=file.name,
+            s3_key=store_upload(file),
+            dry_run=upload.validated_data["dry_run"],
+            created_by=request.user,
+        )
+        schedule_import(lead_import)
+        return Response(
+            self.get_serializer(lead_import).data, status=status.HTTP_202_ACCEPTED
+        )
+
+    @action(detail=True, methods=["post"])
+    def apply(self, request, pk=None):
+        simulation = self.get_object()
+        if not simulation.dry_run or simulation.status != ImportStatus.COMPLETED:
+            return Response(
+                {"detail": "Seule une simulation terminée peut être appliquée."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        lead_import = LeadImport.objects.create(
+            file_name=simulation.file_name,
+            s3_key=simulation.s3_key,
+            dry_run=False,
+            created_by=request.user,
+        )
+        schedule_import(lead_import)
+        return Response(
+            self.get_serializer(lead_import).data, status=status.HTTP_202_ACCEPTED
+        )
+
+    @action(detail=True, methods=["post"])
+    def resume(self, request, pk=None):
+        lead_import = self.get_object()
+        if lead_import.status != ImportStatus.FAILED:
+            return Response(
+                {"detail": "Seul un import en échec peut être repris."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        LeadImport.objects.filter(pk=lead_import.pk).update(status=ImportStatus.PENDING)
+        schedule_import(lead_import)
+        lead_import.refresh_from_db()
+        return Response(
+            self.get_serializer(lead_import).data, status=status.HTTP_202_ACCEPTED
+        )
@@ -105,3 +105,28 @@ class TestLeadStatusAPI:
         url = reverse("lead-status-detail", args=[lead_status_sample.id])
         response = api_client.delete(url)
         assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_list_returns_etag_and_304(self, api_client, lead_status_sample):
+        url = reverse("lead-status-list")
+        first = api_client.get(url)
+        assert first.status_code == status.HTTP_200_OK
+        etag = first["ETag"]
+        assert etag and first.has_header("Last-Modified")
+
+        second = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert second.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_list_cache_invalidated_on_write(
+        self, api_client, admin_user, lead_status_sample
+    ):
+        url = reverse("lead-status-list")
+        etag = api_client.get(url)["ETag"]
+
+        api_client.force_authenticate(user=admin_user)
+        detail = reverse("lead-status-detail", args=[lead_status_sample.id])
+        api_client.patch(detail, data={"label": "Modifié"})
+
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"] != etag
+        assert any(s["label"] == "Modifié" for s in response.data)
@@ -5,11 +5,13 @@ from rest_framework.response import Response
 from api.lead_status.models import LeadStatus
 from api.lead_status.permissions import IsAdminRole
 from api.lead_status.serializer import LeadStatusSerializer
+from api.utils.reference_data import ReferenceDataListMixin
 
 PROTECTED_CODES = {"ABSENT", "PRESENT", "RDV_CONFIRME", "RDV_PLANIFIE"}
 
 
-class LeadStatusViewSet(viewsets.ModelViewSet):
+class LeadStatusViewSet(ReferenceDataListMixin, viewsets.ModelViewSet):
+    reference_dataset = "lead_statuses"
     queryset = LeadStatus.objects.all()
     serializer_class = LeadStatusSerializer
     pagination_class = None
@@ -3,3 +3,8 @@ from django.apps import AppConfig
 class LeadsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "api.leads"
+
+    def ready(self):
+        from api.leads.duplicates import connect_probe_signals
+
+        connect_probe_signals()
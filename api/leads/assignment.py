@@ -0,0 +1,158 @@
+"""
+Assignation de conseillers et de juristes à des leads, pour un ou plusieurs leads.
+
+Les liens sont écrits directement dans les tables d'association (`bulk_create` avec
+`ignore_conflicts`, DELETE ensembliste) : ni `lead.save()` ni signal `m2m_changed` par
+lead. Les effets de bord sont regroupés :
+- version des leads (`updated_at`) mise à jour en un UPDATE ;
+- charge des conseillers (`AssignmentLoad`) ajustée ;
+- e-mails « juriste assigné » écrits dans l'outbox en une insertion ;
+- après validation : rapport quotidien des RDV resynchronisé et un seul événement
+  websocket `leads_bulk_assigned`.
+"""
+
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from api.appointment_reports.services import sync_entries
+from api.email_outbox.kinds import LEAD_JURIST_ASSIGNED
+from api.email_outbox.services import enqueue_emails
+from api.lead_assignment.services import adjust_loads
+from api.leads.models import Lead
+from api.users.models import User
+from api.users.roles import UserRoles
+from api.websocket.signals.leads import broadcast_leads_bulk
+
+logger = logging.getLogger(__name__)
+
+ASSIGNMENT_BATCH_SIZE = 1000
+
+# Rôle ciblé → (relation du lead, rôle des utilisateurs assignables)
+ASSIGNMENT_ROLES = {
+    "conseiller": ("assigned_to", UserRoles.CONSEILLER),
+    "juriste": ("jurist_assigned", UserRoles.JURISTE),
+}
+
+
+class AssignmentError(ValueError):
+    """Utilisateurs à assigner introuvables, inactifs ou d'un autre rôle."""
+
+
+def assignable_users(role: str, user_ids) -> list:
+    """Ids des utilisateurs actifs du rôle ; erreur si l'un d'eux ne l'est pas."""
+    user_ids = list(dict.fromkeys(user_ids))
+    found = set(
+        User.objects.filter(
+            id__in=user_ids, role=ASSIGNMENT_ROLES[role][1], is_active=True
+        ).values_list("id", flat=True)
+    )
+    if len(found) != len(user_ids):
+        raise AssignmentError(f"Un ou plusieurs {role}s sont introuvables.")
+    return user_ids
+
+
+def role_users(role: str, user_ids) -> list:
+    """Ids parmi `user_ids` ayant le rôle (actifs ou non), les autres sont ignorés."""
+    return list(
+        User.objects.filter(id__in=user_ids, role=ASSIGNMENT_ROLES[role][1]).values_list(
+            "id", flat=True
+        )
+    )
+
+
+def _notify_jurists(lead_ids, added):
+    """Un e-mail par lead ayant reçu un juriste (le premier assigné), en une insertion."""
+    first_jurist = {}
+    for lead_id, user_id in added:
+        first_jurist.setdefault(lead_id, user_id)
+    with_email = (
+        Lead.objects.filter(pk__in=lead_ids)
+        .exclude(email__isnull=True)
+        .exclude(email="")
+        .values_list("pk", flat=True)
+    )
+    return enqueue_emails(
+        LEAD_JURIST_ASSIGNED,
+        [(pk, None, {"jurist_id": str(first_jurist[pk])}) for pk in with_email],
+    )
+
+
+@transaction.atomic
+def assign_leads(lead_ids, field: str, assign=(), unassign=()) -> dict:
+    """
+    Ajoute les utilisateurs `assign` et retire `unassign` de la relation `field`
+    (`assigned_to` ou `jurist_assigned`) de tous les leads `lead_ids` (ids inconnus
+    ignorés). Les ids utilisateurs sont supposés déjà validés.
+    """
+    through = getattr(Lead, field).through
+    requested = {int(pk) for pk in lead_ids}
+    ids = sorted(
+        Lead.objects.filter(pk__in=requested).values_list("pk", flat=True)
+    )
+    unassign = list(unassign)
+    assign = [user_id for user_id in assign if user_id not in unassign]
+
+    added = []
+    if ids and assign:
+        existing = set(
+            through.objects.filter(lead_id__in=ids, user_id__in=assign).values_list(
+                "lead_id", "user_id"
+            )
+        )
+        added = [
+            (lead_id, user_id)
+            for lead_id in ids
+            for user_id in assign
+            if (lead_id, user_id) not in existing
+        ]
+        through.objects.bulk_create(
+            [through(lead_id=lead_id, user_id=user_id) for lead_id, user_id in added],
+            ignore_conflicts=True,
+            batch_size=ASSIGNMENT_BATCH_SIZE,
+        )
+
+    removed = []
+    if ids and unassign:
+        links = through.objects.filter(lead_id__in=ids, user_id__in=unassign)
+        removed = list(links.values_list("lead_id", "user_id"))
+        links.delete()
+
+    gained = sorted({lead_id for lead_id, _ in added})
+    changed = sorted(set(gained) | {lead_id for lead_id, _ in removed})
+    if changed:
+        now = timezone.now()
+        Lead.objects.filter(pk__in=changed).update(updated_at=now)
+        if field == "assigned_to":
+            adjust_loads(added, removed)
+        if field == "jurist_assigned" and gained:
+            Lead.objects.filter(pk__in=gained).update(juriste_assigned_at=now)
+            _notify_jurists(gained, added)
+
+        # Écritures sans signaux : rapport des RDV et front mis à jour en une fois
+        transaction.on_commit(lambda: sync_entries(changed))
+        transaction.on_commit(
+            lambda: broadcast_leads_bulk(
+                "assigned",
+                changed,
+                extra={
+                    "field": field,
+                    "assign": [str(user_id) for user_id in assign],
+                    "unassign": [str(user_id) for user_id in unassign],
+                },
+            )
+        )
+
+    logger.info(
+        "👥 Assignation %s : %s lien(s) ajouté(s), %s lead(s) modifié(s)",
+        field,
+        len(added),
+        len(changed),
+    )
+    return {
+        "leads": len(ids),
+        "added": len(added),
+        "changed": len(changed),
+        "missing": sorted(requested - set(ids)),
+    }
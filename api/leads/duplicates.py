@@ -0,0 +1,252 @@
+"""
+Recherche en temps réel d'un lead existant (création de lead, formulaires publics).
+
+- `find_existing_lead(phone, email)` : lead au même téléphone normalisé (index
+  `lead_phone_normalized_idx`) ou, à défaut, au même e-mail (index fonctionnel
+  `lead_email_lower_idx` sur `LOWER(email)`). Une requête indexée par critère, aucun
+  balayage de table.
+- Filtre de Bloom dans Redis (chemin des formulaires publics, `use_filter=True`) : bitmap
+  des téléphones normalisés et e-mails connus. Une valeur absente du filtre garantit
+  qu'aucun lead ne correspond : la base n'est pas interrogée. Une valeur présente est
+  confirmée en base (faux positifs possibles : collisions, leads supprimés).
+
+`attach_appointment` rattache une prise de rendez-vous publique au lead trouvé. Les
+formulaires publics ne rattachent que sur le téléphone et répondent le même corps
+minimal (`booking_confirmation`) qu'il y ait eu création ou rattachement : rien du lead
+existant n'est renvoyé à l'appelant anonyme.
+
+Le filtre n'est consulté qu'une fois construit (`rebuild_probe_filter`, tâche nocturne
+ou commande `rebuild_lead_probe_filter`). Il est ensuite alimenté à chaque `Lead.save`
+(signal) et par les écritures en masse (`remember_leads`). Redis indisponible : la base
+répond seule.
+"""
+
+import hashlib
+import logging
+
+from django.conf import settings
+from django.db.models import F
+from django.db.models.functions import Lower
+from django.db.models.signals import post_save
+from django.utils import timezone
+
+from api.leads.constants import ABSENT, RDV_CONFIRME, RDV_PLANIFIE
+from api.utils.phones import normalize_phone
+
+logger = logging.getLogger(__name__)
+
+FILTER_KEY = "leads:probe:bloom"
+FILTER_BUILD_KEY = "leads:probe:bloom:build"
+FILTER_HASHES = 7
+BUILD_BATCH = 5000
+
+# Statuts encore au stade du rendez-vous : une nouvelle réservation les remplace
+REBOOKABLE_STATUSES = {RDV_PLANIFIE, RDV_CONFIRME, ABSENT}
+
+
+def _redis():
+    from django_redis import get_redis_connection
+
+    return get_redis_connection("default")
+
+
+def normalize_email(value) -> str:
+    return (value or "").strip().lower()
+
+
+def _probe_values(phone_normalized, email):
+    values = []
+    if phone_normalized:
+        values.append(f"phone:{phone_normalized}")
+    if email:
+        values.append(f"email:{normalize_email(email)}")
+    return values
+
+
+def _bit_positions(value: str):
+    """Positions des bits d'une valeur (double hachage sur un seul condensat)."""
+    digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], "big")
+    h2 = int.from_bytes(digest[8:], "big") | 1
+    size = settings.LEAD_PROBE_FILTER_BITS
+    return [(h1 + i * h2) % size for i in range(FILTER_HASHES)]
+
+
+def _set_bits(pipe, key, values):
+    for value in values:
+        for position in _bit_positions(value):
+            pipe.setbit(key, position, 1)
+
+
+def _might_exist(values):
+    """
+    True / False selon le filtre, None si le filtre n'est pas construit ou si Redis est
+    indisponible (la base doit alors répondre).
+    """
+    try:
+        pipe = _redis().pipeline(transaction=False)
+        pipe.exists(FILTER_KEY)
+        for value in values:
+            for position in _bit_positions(value):
+                pipe.getbit(FILTER_KEY, position)
+        ready, *bits = pipe.execute()
+    except Exception as e:
+        logger.warning("⚠️ Filtre des leads indisponible : %s", e)
+        return None
+    if not ready:
+        return None
+    return any(
+        all(bits[i : i + FILTER_HASHES]) for i in range(0, len(bits), FILTER_HASHES)
+    )
+
+
+def remember_leads(rows):
+    """
+    Ajoute au filtre des couples `(phone_normalized, email)` (leads créés ou modifiés
+    sans `Lead.save`, ex : `bulk_create`). Sans effet tant que le filtre n'est pas construit.
+    """
+    values = [v for phone, email in rows for v in _probe_values(phone, email)]
+    if not values:
+        return
+    try:
+        redis = _redis()
+        pipe = redis.pipeline(transaction=False)
+        for key in (FILTER_KEY, FILTER_BUILD_KEY):
+            pipe.exists(key)
+        keys = [k for k, exists in zip((FILTER_KEY, FILTER_BUILD_KEY), pipe.execute()) if exists]
+        if not keys:
+            return
+        for key in keys:
+            _set_bits(pipe, key, values)
+        pipe.execute()
+    except Exception as e:
+        logger.warning("⚠️ Filtre des leads non mis à jour : %s", e)
+
+
+def _on_lead_saved(sender, instance, **kwargs):
+    remember_leads([(instance.phone_normalized, instance.email)])
+
+
+def connect_probe_signals():
+    from api.leads.models import Lead
+
+    post_save.connect(
+        _on_lead_saved, sender=Lead, weak=False, dispatch_uid="leads-probe-filter"
+    )
+
+
+def rebuild_probe_filter() -> int:
+    """
+    Reconstruit le filtre depuis la base (clé temporaire puis RENAME atomique). Les
+    leads écrits pendant la reconstruction sont ajoutés aux deux clés. Retourne le
+    nombre de leads indexés.
+    """
+    from api.leads.models import Lead
+
+    started_at = timezone.now()
+    redis = _redis()
+    redis.delete(FILTER_BUILD_KEY)
+    # Bitmap alloué d'emblée : la clé existe, les écritures concurrentes s'y ajoutent
+    redis.setbit(FILTER_BUILD_KEY, settings.LEAD_PROBE_FILTER_BITS - 1, 0)
+
+    count = 0
+    rows = Lead.objects.order_by().values_list("phone_normalized", "email")
+    pipe = redis.pipeline(transaction=False)
+    for phone, email in rows.iterator(chunk_size=BUILD_BATCH):
+        _set_bits(pipe, FILTER_BUILD_KEY, _probe_values(phone, email))
+        count += 1
+        if count % BUILD_BATCH == 0:
+            pipe.execute()
+    pipe.execute()
+    redis.rename(FILTER_BUILD_KEY, FILTER_KEY)
+
+    # Écritures survenues entre la lecture et le RENAME
+    remember_leads(
+        Lead.objects.filter(updated_at__gte=started_at).values_list(
+            "phone_normalized", "email"
+        )
+    )
+    logger.info("🧮 Filtre des leads reconstruit : %s leads", count)
+    return count
+
+
+def find_existing_lead(phone=None, email=None, *, exclude_pk=None, use_filter=False):
+    """
+    Lead existant au même téléphone (prioritaire) ou au même e-mail, None sinon.
+    `use_filter` : consulte d'abord le filtre Redis (formulaires publics, qui ne passent
+    que le téléphone).
+    """
+    from api.leads.models import Lead
+
+    phone_normalized = normalize_phone(phone) if phone else None
+    email = normalize_email(email)
+    values = _probe_values(phone_normalized, email)
+    if not values:
+        return None
+    if use_filter and _might_exist(values) is False:
+        return None
+
+    queryset = Lead.objects.order_by("created_at", "pk")
+    if exclude_pk is not None:
+        queryset = queryset.exclude(pk=exclude_pk)
+    if phone_normalized:
+        lead = queryset.filter(phone_normalized=phone_normalized).first()
+        if lead is not None:
+            return lead
+    if email:
+        return email_lookup(queryset, email).first()
+    return None
+
+
+def email_lookup(queryset, email):
+    """Filtre `LOWER(email) = email` (servi par l'index fonctionnel)."""
+    return queryset.alias(email_lower=Lower("email")).filter(
+        email_lower=normalize_email(email)
+    )
+
+
+def _is_rebookable(lead) -> bool:
+    """Lead sans statut ou au stade du rendez-vous, et sans contrat (client actif)."""
+    from api.leads.models import Lead
+
+    if lead.status_id and lead.status.code not in REBOOKABLE_STATUSES:
+        return False
+    return not Lead.objects.filter(pk=lead.pk, form_data__contracts__isnull=False).exists()
+
+
+def attach_appointment(lead, appointment_date, status, email=None):
+    """
+    Rattache une prise de rendez-vous publique à un lead existant au lieu d'en créer un
+    doublon : date mise à jour, e-mail complété s'il manquait. Le statut n'est remplacé
+    que pour un lead au stade du rendez-vous (pas de retour en arrière d'un lead présent
+    ou client). Le créneau d'un précédent rendez-vous à venir est libéré.
+    """
+    from api.booking.models import SlotQuota
+    from api.lead_assignment.services import tracking_loads
+
+    previous = lead.appointment_date
+    if previous and previous != appointment_date and previous > timezone.now():
+        SlotQuota.objects.filter(start_at=previous, booked__gt=0).update(
+            booked=F("booked") - 1
+        )
+
+    lead.appointment_date = appointment_date
+    update_fields = ["appointment_date"]
+    if _is_rebookable(lead):
+        lead.status = status
+        update_fields.append("status")
+    if email and not lead.email:
+        lead.email = normalize_email(email)
+        update_fields.append("email")
+    with tracking_loads([lead.pk]):
+        lead.save(update_fields=update_fields)
+    logger.info("🔁 Rendez-vous public rattaché au lead existant #%s", lead.pk)
+    return lead
+
+
+def booking_confirmation(appointment_date) -> dict:
+    """Réponse d'une prise de rendez-vous publique, identique en création et en rattachement."""
+    return {
+        "detail": "Rendez-vous enregistré.",
+        "appointment_date": timezone.localtime(appointment_date).strftime("%d/%m/%Y %H:%M"),
+    }
@@ -1,3 +1,4 @@
+import uuid
 from datetime import date, datetime, time
 from typing import Optional
 
@@ -58,6 +59,103 @@ def _to_int_or_none(val: Optional[str]) -> Optional[int]:
         return None
 
 
+def _to_uuid_or_none(val: Optional[str]) -> Optional[uuid.UUID]:
+    if not val:
+        return None
+    try:
+        return uuid.UUID(str(val))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+FILTER_PARAMS = (
+    "date_from",
+    "date_to",
+    "appt_from",
+    "appt_to",
+    "status_code",
+    "status_id",
+    "dossier_code",
+    "dossier_id",
+    "has_jurist",
+    "has_conseiller",
+    "jurist_id",
+    "conseiller_id",
+)
+# Filtres portant un id d'utilisateur (UUID)
+USER_ID_PARAMS = ("jurist_id", "conseiller_id")
+
+
+def filter_leads(qs, params):
+    """
+    Applique les filtres de recherche (`FILTER_PARAMS`) à un queryset de leads.
+    `params` : query params ou dict (ex : filtres enregistrés d'une campagne).
+    Partagé par `LeadSearchView` et les campagnes de notification.
+    """
+    date_from = _to_aware(_parse_iso_any(params.get("date_from")), end_of_day=False)
+    date_to = _to_aware(_parse_iso_any(params.get("date_to")), end_of_day=True)
+    appt_from = _to_aware(_parse_iso_any(params.get("appt_from")), end_of_day=False)
+    appt_to = _to_aware(_parse_iso_any(params.get("appt_to")), end_of_day=True)
+
+    status_code = params.get("status_code")
+    status_id = _to_int_or_none(params.get("status_id"))
+    dossier_code = params.get("dossier_code")
+    dossier_id = _to_int_or_none(params.get("dossier_id"))
+
+    has_jurist = _normalize_avec_sans(params.get("has_jurist"))
+    has_conseille = _normalize_avec_sans(params.get("has_conseiller"))
+
+    jurist_id = _to_uuid_or_none(params.get("jurist_id"))
+    conseiller_id = _to_uuid_or_none(params.get("conseiller_id"))
+
+    if date_from:
+        qs = qs.filter(created_at__gte=date_from)
+    if date_to:
+        qs = qs.filter(created_at__lte=date_to)
+
+    if appt_from:
+        qs = qs.filter(appointment_date__isnull=False, appointment_date__gte=appt_from)
+    if appt_to:
+        qs = qs.filter(appointment_date__isnull=False, appointment_date__lte=appt_to)
+
+    if status_id is not None:
+        qs = qs.filter(status_id=status_id)
+    elif status_code:
+        qs = qs.filter(status__code=status_code)
+
+    if dossier_id is not None:
+        qs = qs.filter(statut_dossier_id=dossier_id)
+    elif dossier_code:
+        qs = qs.filter(statut_dossier__code=dossier_code)
+
+    ThroughConseiller = Lead.assigned_to.through
+    ThroughJurist = Lead.jurist_assigned.through
+
+    if has_jurist == "avec":
+        qs = qs.filter(Exists(ThroughJurist.objects.filter(lead_id=OuterRef("pk"))))
+    elif has_jurist == "sans":
+        qs = qs.filter(~Exists(ThroughJurist.objects.filter(lead_id=OuterRef("pk"))))
+
+    if has_conseille == "avec":
+        qs = qs.filter(Exists(ThroughConseiller.objects.filter(lead_id=OuterRef("pk"))))
+    elif has_conseille == "sans":
+        qs = qs.filter(~Exists(ThroughConseiller.objects.filter(lead_id=OuterRef("pk"))))
+
+    # Leads d'un juriste / conseiller précis (ex : indisponibilité)
+    if jurist_id:
+        qs = qs.filter(
+            Exists(ThroughJurist.objects.filter(lead_id=OuterRef("pk"), user_id=jurist_id))
+        )
+    if conseiller_id:
+        qs = qs.filter(
+            Exists(
+                ThroughConseiller.objects.filter(lead_id=OuterRef("pk"), user_id=conseiller_id)
+            )
+        )
+
+    return qs
+
+
 class LeadSearchView(APIView):
     """
     Vue API permettant la recherche et la filtration des leads,
@@ -69,19 +167,6 @@ class LeadSearchView(APIView):
 
     def get(self, request):
         # --- Query params ---
-        raw_date_from = request.query_params.get("date_from")
-        raw_date_to = request.query_params.get("date_to")
-        raw_appt_from = request.query_params.get("appt_from")
-        raw_appt_to = request.query_params.get("appt_to")
-
-        status_code = request.query_params.get("status_code")
-        status_id = _to_int_or_none(request.query_params.get("status_id"))
-        dossier_code = request.query_params.get("dossier_code")
-        dossier_id = _to_int_or_none(request.query_params.get("dossier_id"))
-
-        has_jurist = _normalize_avec_sans(request.query_params.get("has_jurist"))
-        has_conseille = _normalize_avec_sans(request.query_params.get("has_conseiller"))
-
         # Pagination / tri
         try:
             page = max(int(request.query_params.get("page", 1)), 1)
@@ -101,12 +186,6 @@ class LeadSearchView(APIView):
         if ordering not in allowed_ordering:
             ordering = "-created_at"
 
-        # --- Dates ---
-        date_from = _to_aware(_parse_iso_any(raw_date_from), end_of_day=False)
-        date_to = _to_aware(_parse_iso_any(raw_date_to), end_of_day=True)
-        appt_from = _to_aware(_parse_iso_any(raw_appt_from), end_of_day=False)
-        appt_to = _to_aware(_parse_iso_any(raw_appt_to), end_of_day=True)
-
         # --- Base queryset ---
         ThroughConseiller = Lead.assigned_to.through
         ThroughJurist = Lead.jurist_assigned.through
@@ -132,35 +211,7 @@ class LeadSearchView(APIView):
         )
 
         # --- Filtres ---
-        if date_from:
-            qs = qs.filter(created_at__gte=date_from)
-        if date_to:
-            qs = qs.filter(created_at__lte=date_to)
-
-        if appt_from:
-            qs = qs.filter(appointment_date__isnull=False, appointment_date__gte=appt_from)
-        if appt_to:
-            qs = qs.filter(appointment_date__isnull=False, appointment_date__lte=appt_to)
-
-        if status_id is not None:
-            qs = qs.filter(status_id=status_id)
-        elif status_code:
-            qs = qs.filter(status__code=status_code)
-
-        if dossier_id is not None:
-            qs = qs.filter(statut_dossier_id=dossier_id)
-        elif dossier_code:
-            qs = qs.filter(statut_dossier__code=dossier_code)
-
-        if has_jurist == "avec":
-            qs = qs.filter(has_jurist=True)
-        elif has_jurist == "sans":
-            qs = qs.filter(has_jurist=False)
-
-        if has_conseille == "avec":
-            qs = qs.filter(has_conseiller=True)
-        elif has_conseille == "sans":
-            qs = qs.filter(has_conseiller=False)
+        qs = filter_leads(qs, request.query_params)
 
         # --- Total ---
         total = qs.count()
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.leads.purge import inactive_leads, purge_leads
+
+
+class Command(BaseCommand):
+    help = (
+        "Supprime définitivement des leads et tout leur graphe (fiche client, contrats, "
+        "reçus, documents, fichiers S3) : ids explicites ou leads sans contrat inactifs "
+        "depuis N jours (conservation RGPD)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("ids", nargs="*", type=int, help="Ids des leads à supprimer")
+        parser.add_argument(
+            "--inactive-days",
+            type=int,
+            help="Leads sans contrat non modifiés depuis ce nombre de jours",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Affiche le nombre de leads sans supprimer"
+        )
+
+    def handle(self, *args, **options):
+        if bool(options["ids"]) == (options["inactive_days"] is not None):
+            raise CommandError("Préciser des ids de leads ou --inactive-days (l'un ou l'autre)")
+
+        if options["inactive_days"] is not None:
+            lead_ids = list(
+                inactive_leads(options["inactive_days"]).values_list("pk", flat=True)
+            )
+        else:
+            lead_ids = options["ids"]
+
+        if options["dry_run"]:
+            self.stdout.write(f"🔎 {len(lead_ids)} lead(s) seraient supprimés")
+            return
+
+        result = purge_leads(lead_ids)
+        self.stdout.write(
+            self.style.SUCCESS(f"🗑️ {len(result['lead_ids'])} lead(s) supprimé(s)")
+        )
+        for label, count in sorted(result["deleted"].items()):
+            if count:
+                self.stdout.write(f"  • {label} : {count}")
+        for bucket_key, count in sorted(result["files"].items()):
+            self.stdout.write(f"  • fichiers {bucket_key} : {count} (suppression programmée)")
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api.leads.duplicates import rebuild_probe_filter
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruit le filtre Redis des téléphones / e-mails connus, utilisé par les "
+        "formulaires publics pour détecter un lead existant sans interroger la base."
+    )
+
+    def handle(self, *args, **options):
+        count = rebuild_probe_filter()
+        self.stdout.write(f"🧮 Filtre reconstruit : {count} leads")
@@ -0,0 +1,23 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("leads", "0009_lead_statut_dossier_interne"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="lead",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True,
+                default=django.utils.timezone.now,
+                help_text="Mise à jour à chaque écriture du lead ou de ses données liées (client, contrats, assignations) ; sert de version pour les GET conditionnels (ETag)",
+                verbose_name="date de modification",
+            ),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.7 on 2026-10-19 16:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("leads", "0010_lead_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="lead",
+            name="last_reminder_sent",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Date d'envoi du rappel J-1 (un seul rappel par rendez-vous)",
+                null=True,
+                verbose_name="dernier rappel envoyé",
+            ),
+        ),
+    ]
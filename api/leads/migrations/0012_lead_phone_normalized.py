@@ -0,0 +1,31 @@
+# Generated by Django 5.1.7 on 2026-10-19 17:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("leads", "0011_lead_last_reminder_sent"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="lead",
+            name="phone_normalized",
+            field=models.CharField(
+                blank=True,
+                default="",
+                editable=False,
+                help_text="Téléphone au format E.164, recalculé à chaque sauvegarde (vide si invalide) ; sert aux recherches, imports et rapprochements de doublons",
+                max_length=20,
+                verbose_name="téléphone normalisé",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="lead",
+            index=models.Index(
+                fields=["phone_normalized"], name="lead_phone_normalized_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,47 @@
+from django.db import migrations
+
+from api.utils.phones import normalize_phones
+
+BATCH_SIZE = 2000
+
+
+def backfill_phone_normalized(apps, schema_editor):
+    """
+    Calcule le téléphone normalisé des leads existants, par lots : une normalisation
+    par numéro distinct, une requête `bulk_update` par lot.
+    """
+    Lead = apps.get_model("leads", "Lead")
+
+    rows = Lead.objects.order_by("id").values_list("id", "phone").iterator(
+        chunk_size=BATCH_SIZE
+    )
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            _update(Lead, batch)
+            batch = []
+    if batch:
+        _update(Lead, batch)
+
+
+def _update(Lead, batch):
+    normalized = normalize_phones([phone for _, phone in batch])
+    Lead.objects.bulk_update(
+        [
+            Lead(id=pk, phone_normalized=value or "")
+            for (pk, _), value in zip(batch, normalized)
+        ],
+        ["phone_normalized"],
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("leads", "0012_lead_phone_normalized"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_phone_normalized, migrations.RunPython.noop),
+    ]
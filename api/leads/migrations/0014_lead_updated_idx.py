@@ -0,0 +1,17 @@
+# Generated by Django 5.1.7 on 2026-10-19 17:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("leads", "0013_backfill_lead_phone_normalized"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="lead",
+            index=models.Index(fields=["updated_at"], name="lead_updated_idx"),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.7 on 2026-10-19 17:59
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("leads", "0014_lead_updated_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="lead",
+            index=models.Index(
+                django.db.models.functions.text.Lower("email"),
+                name="lead_email_lower_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,107 @@
+# Generated by Django 5.1.7 on 2026-10-19 18:39
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("leads", "0015_lead_email_lower_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LeadTransition",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "field",
+                    models.CharField(
+                        choices=[
+                            ("status", "Statut"),
+                            ("statut_dossier", "Statut du dossier"),
+                        ],
+                        max_length=20,
+                        verbose_name="champ",
+                    ),
+                ),
+                (
+                    "from_code",
+                    models.CharField(
+                        blank=True, max_length=50, verbose_name="code précédent"
+                    ),
+                ),
+                (
+                    "to_code",
+                    models.CharField(
+                        blank=True, max_length=50, verbose_name="nouveau code"
+                    ),
+                ),
+                (
+                    "source",
+                    models.CharField(
+                        choices=[
+                            ("api", "Fiche lead"),
+                            ("bulk", "Changement en masse"),
+                            ("task", "Tâche planifiée"),
+                        ],
+                        default="api",
+                        max_length=10,
+                        verbose_name="origine",
+                    ),
+                ),
+                (
+                    "changed_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="date"
+                    ),
+                ),
+                (
+                    "changed_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="lead_transitions",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="modifié par",
+                    ),
+                ),
+                (
+                    "lead",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="transitions",
+                        to="leads.lead",
+                        verbose_name="lead",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "transition de lead",
+                "verbose_name_plural": "transitions de leads",
+                "ordering": ["-changed_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["lead", "changed_at"], name="lead_transition_lead_idx"
+                    ),
+                    models.Index(
+                        fields=["field", "to_code", "changed_at"],
+                        name="lead_transition_to_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
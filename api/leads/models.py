@@ -1,9 +1,11 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from api.lead_status.models import LeadStatus
 from api.leads.constants import RDV_CONFIRME, RDV_PLANIFIE
+from api.utils.phones import normalize_phone
 
 
 class Lead(models.Model):
@@ -37,6 +39,17 @@ class Lead(models.Model):
         verbose_name=_("téléphone"),
         help_text=_("Numéro de téléphone au format international (ex: +33612345678)"),
     )
+    phone_normalized = models.CharField(
+        max_length=20,
+        blank=True,
+        default="",
+        editable=False,
+        verbose_name=_("téléphone normalisé"),
+        help_text=_(
+            "Téléphone au format E.164, recalculé à chaque sauvegarde (vide si invalide) ; "
+            "sert aux recherches, imports et rapprochements de doublons"
+        ),
+    )
 
     statut_dossier = models.ForeignKey(
         "statut_dossier.StatutDossier",
@@ -91,6 +104,21 @@ class Lead(models.Model):
         help_text=_("Juristes responsables du lead (assignés par un administrateur)"),
     )
     juriste_assigned_at = models.DateTimeField(null=True, blank=True)
+    last_reminder_sent = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_("dernier rappel envoyé"),
+        help_text=_("Date d'envoi du rappel J-1 (un seul rappel par rendez-vous)"),
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name=_("date de modification"),
+        help_text=_(
+            "Mise à jour à chaque écriture du lead ou de ses données liées (client, contrats, assignations) ; "
+            "sert de version pour les GET conditionnels (ETag)"
+        ),
+    )
 
     class Meta:
         verbose_name = _("lead")
@@ -100,6 +128,9 @@ class Lead(models.Model):
             models.Index(fields=["status"], name="lead_status_idx"),
             models.Index(fields=["appointment_date"], name="lead_appointment_idx"),
             models.Index(fields=["created_at"], name="lead_created_idx"),
+            models.Index(fields=["phone_normalized"], name="lead_phone_normalized_idx"),
+            models.Index(fields=["updated_at"], name="lead_updated_idx"),
+            models.Index(Lower("email"), name="lead_email_lower_idx"),
         ]
 
     def __str__(self):
@@ -118,6 +149,7 @@ class Lead(models.Model):
         2. Si une date de rendez-vous est renseignée (appointment_date non nulle),
            le statut est automatiquement mis à jour en 'RDV_CONFIRME', quel que soit le statut actuel.
            Ceci reflète la confirmation effective du rendez-vous dans le suivi du lead.
+        3. Le téléphone normalisé (`phone_normalized`, E.164) est recalculé depuis `phone`.
 
         Ces règles permettent d'assurer la cohérence des statuts en fonction des informations disponibles
         et facilitent le suivi commercial automatisé.
@@ -130,4 +162,63 @@ class Lead(models.Model):
             except LeadStatus.DoesNotExist:
                 pass  # Tu peux lever une exception si besoin
 
+        # 2. Téléphone normalisé (E.164) tenu à jour avec le téléphone saisi
+        self.phone_normalized = normalize_phone(self.phone) or ""
+
+        # 3. La version (updated_at) suit aussi les sauvegardes partielles
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            extra = {"updated_at", "phone_normalized"} if "phone" in update_fields else {"updated_at"}
+            kwargs["update_fields"] = {*update_fields, *extra}
+
         super().save(*args, **kwargs)
+
+
+class LeadTransition(models.Model):
+    """
+    Historique des changements de statut et de statut de dossier d'un lead
+    (analyses de conversion : délais, taux d'absence, parcours des dossiers).
+    Les codes sont copiés : l'historique reste lisible si un statut est renommé ou supprimé.
+    """
+
+    class Field(models.TextChoices):
+        STATUS = "status", _("Statut")
+        STATUT_DOSSIER = "statut_dossier", _("Statut du dossier")
+
+    class Source(models.TextChoices):
+        API = "api", _("Fiche lead")
+        BULK = "bulk", _("Changement en masse")
+        TASK = "task", _("Tâche planifiée")
+
+    lead = models.ForeignKey(
+        Lead, on_delete=models.CASCADE, related_name="transitions", verbose_name=_("lead")
+    )
+    field = models.CharField(max_length=20, choices=Field.choices, verbose_name=_("champ"))
+    from_code = models.CharField(max_length=50, blank=True, verbose_name=_("code précédent"))
+    to_code = models.CharField(max_length=50, blank=True, verbose_name=_("nouveau code"))
+    source = models.CharField(
+        max_length=10, choices=Source.choices, default=Source.API, verbose_name=_("origine")
+    )
+    changed_by = models.ForeignKey(
+        "users.User",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="lead_transitions",
+        verbose_name=_("modifié par"),
+    )
+    changed_at = models.DateTimeField(default=timezone.now, verbose_name=_("date"))
+
+    class Meta:
+        verbose_name = _("transition de lead")
+        verbose_name_plural = _("transitions de leads")
+        ordering = ["-changed_at"]
+        indexes = [
+            models.Index(fields=["lead", "changed_at"], name="lead_transition_lead_idx"),
+            models.Index(
+                fields=["field", "to_code", "changed_at"], name="lead_transition_to_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.lead_id} {self.field} : {self.from_code or '∅'} → {self.to_code or '∅'}"
@@ -0,0 +1,191 @@
+"""
+Purge définitive de leads et de tout ce qui en dépend (suppression depuis la fiche
+client, effacement RGPD de leads inactifs).
+
+- Le graphe est parcouru depuis `Lead` via les relations déclarées (`_meta`) : DELETE
+  ensemblistes dans l'ordre des dépendances (enfants d'abord), UPDATE pour les relations
+  `SET_NULL`. Aucun objet n'est chargé et aucun signal `pre/post_delete` n'est émis,
+  sans toucher aux receivers globaux : les autres requêtes du processus ne sont pas
+  affectées.
+- Les fichiers S3 (contrats, factures, reçus, documents) sont relevés avant suppression
+  puis effacés après validation par une tâche, par lots (`delete_objects`).
+- Charge des conseillers (`AssignmentLoad`) diminuée des leads supprimés.
+- Une notification websocket `lead_deleted` par lead, après validation.
+
+Les leads sont traités par lots de `PURGE_BATCH_SIZE`, une transaction par lot.
+"""
+
+import logging
+from collections import Counter, defaultdict
+from datetime import timedelta
+from itertools import islice
+
+from django.db import models, transaction
+from django.utils import timezone
+
+from api.contracts.models import Contract
+from api.documents.models import Document
+from api.lead_assignment.services import tracking_loads
+from api.lead_dedup.models import DuplicateCandidate
+from api.leads.models import Lead
+from api.payments.models import PaymentReceipt
+from api.utils.cloud.scw.utils import extract_s3_key_from_url
+from api.websocket.signals.leads import broadcast_leads_deleted
+
+logger = logging.getLogger(__name__)
+
+PURGE_BATCH_SIZE = 500
+
+# Fichiers stockés par lead : (modèle, chemin vers le lead, champ URL, bucket)
+FILE_FIELDS = (
+    (Contract, "client__lead_id", "contract_url", "contracts"),
+    (Contract, "client__lead_id", "invoice_url", "invoices"),
+    (PaymentReceipt, "client__lead_id", "receipt_url", "receipts"),
+    (Document, "client__lead_id", "url", "documents"),
+)
+
+
+class PurgeError(RuntimeError):
+    """Relation qui interdit la suppression (`PROTECT`, `RESTRICT`…)."""
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _raw_delete(queryset) -> int:
+    """DELETE ensembliste, sans collecte des objets ni signaux `pre/post_delete`."""
+    return queryset._raw_delete(queryset.db)
+
+
+def _has_dependents(model) -> bool:
+    return bool(model._meta.related_objects or model._meta.many_to_many)
+
+
+def _delete_graph(model, pks, counts: Counter):
+    """Supprime les lignes `pks` de `model` après leurs dépendances."""
+    if not pks:
+        return
+    for relation in model._meta.related_objects:
+        related = relation.related_model
+        if relation.many_to_many:
+            through = relation.through
+            counts[through._meta.label] += _raw_delete(
+                through._base_manager.filter(
+                    **{f"{relation.field.m2m_reverse_field_name()}__in": pks}
+                )
+            )
+            continue
+
+        field = relation.field.name
+        queryset = related._base_manager.filter(**{f"{field}__in": pks})
+        if relation.on_delete is models.CASCADE:
+            if _has_dependents(related):
+                _delete_graph(related, list(queryset.values_list("pk", flat=True)), counts)
+            else:
+                counts[related._meta.label] += _raw_delete(queryset)
+        elif relation.on_delete is models.SET_NULL:
+            queryset.update(**{field: None})
+        elif relation.on_delete is not models.DO_NOTHING:
+            raise PurgeError(
+                f"{related._meta.label}.{field} ({relation.on_delete.__name__}) "
+                f"empêche la suppression de {model._meta.label}"
+            )
+
+    for field in model._meta.many_to_many:
+        through = field.remote_field.through
+        counts[through._meta.label] += _raw_delete(
+            through._base_manager.filter(**{f"{field.m2m_field_name()}__in": pks})
+        )
+    counts[model._meta.label] += _raw_delete(model._base_manager.filter(pk__in=pks))
+
+
+def collect_files(lead_ids) -> dict:
+    """Clés S3 des fichiers des leads, par bucket (`{"contracts": [...], ...}`)."""
+    files = defaultdict(list)
+    for model, lead_path, field, bucket_key in FILE_FIELDS:
+        urls = (
+            model.objects.filter(**{f"{lead_path}__in": lead_ids})
+            .exclude(**{f"{field}__isnull": True})
+            .exclude(**{field: ""})
+            .values_list(field, flat=True)
+        )
+        for url in urls:
+            try:
+                files[bucket_key].append(extract_s3_key_from_url(url))
+            except ValueError:
+                logger.warning("⚠️ Clé S3 introuvable dans l'URL %s", url)
+    return dict(files)
+
+
+def _schedule_file_deletion(files):
+    from api.leads.tasks import delete_lead_files
+
+    delete_lead_files.delay(files)
+
+
+def _purge_batch(lead_ids, counts: Counter, files: Counter) -> list:
+    with transaction.atomic():
+        ids = list(
+            Lead.objects.select_for_update()
+            .filter(pk__in=lead_ids)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        if not ids:
+            return []
+
+        batch_files = collect_files(ids)
+        # Paires de doublons non fusionnées : sans objet une fois un des leads supprimé
+        # (celles d'une fusion restent au journal, le lead y devient vide)
+        for field in ("lead_a", "lead_b"):
+            _raw_delete(
+                DuplicateCandidate.objects.filter(
+                    **{f"{field}_id__in": ids}, merge__isnull=True
+                )
+            )
+        with tracking_loads(ids):
+            _delete_graph(Lead, ids, counts)
+
+        if batch_files:
+            transaction.on_commit(lambda: _schedule_file_deletion(batch_files))
+        transaction.on_commit(lambda: broadcast_leads_deleted(ids))
+
+    for bucket_key, keys in batch_files.items():
+        files[bucket_key] += len(keys)
+    return ids
+
+
+def purge_leads(lead_ids, batch_size: int = PURGE_BATCH_SIZE) -> dict:
+    """
+    Supprime définitivement les leads `lead_ids` (ids inconnus ignorés) et leur graphe.
+    Retourne les ids supprimés, le nombre de lignes par modèle et de fichiers par bucket.
+    """
+    counts, files = Counter(), Counter()
+    purged = []
+    for batch in _batches(sorted({int(pk) for pk in lead_ids}), batch_size):
+        purged.extend(_purge_batch(batch, counts, files))
+
+    logger.info("🗑️ Purge : %s lead(s) supprimé(s) (%s)", len(purged), dict(counts))
+    return {"lead_ids": purged, "deleted": dict(counts), "files": dict(files)}
+
+
+def inactive_leads(days: int):
+    """
+    Leads sans activité depuis `days` jours (dernière modification) et sans contrat : les
+    leads ayant un contrat relèvent de la conservation comptable et ne sont pas purgés.
+    """
+    cutoff = timezone.now() - timedelta(days=days)
+    return Lead.objects.filter(updated_at__lt=cutoff).exclude(
+        form_data__contracts__isnull=False
+    )
+
+
+def schedule_purge(lead_ids):
+    """Programme la purge par le worker après validation de la transaction."""
+    from api.leads.tasks import purge_leads_task
+
+    lead_ids = list(lead_ids)
+    transaction.on_commit(lambda: purge_leads_task.delay(lead_ids))
@@ -2,14 +2,17 @@ from datetime import datetime
 from zoneinfo import ZoneInfo
 
 import phonenumbers
+from django.db.models import OuterRef, Subquery, UUIDField
 from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
 
 from api.clients.serializers import ClientSerializer
+from api.contracts.models import Contract
 from api.lead_status.models import LeadStatus
 from api.lead_status.serializer import LeadStatusSerializer
 from api.leads.constants import RDV_CONFIRME, RDV_PLANIFIE
-from api.leads.models import Lead
+from api.leads.duplicates import find_existing_lead
+from api.leads.models import Lead, LeadTransition
 from api.statut_dossier.models import StatutDossier
 from api.statut_dossier.serializers import StatutDossierSerializer
 from api.statut_dossier_interne.models import StatutDossierInterne
@@ -17,6 +20,7 @@ from api.statut_dossier_interne.serializers import StatutDossierInterneSerialize
 from api.users.assigned_user_serializer import AssignedUserSerializer
 from api.users.models import User
 from api.users.roles import UserRoles
+from api.utils.reference_data import CachedPrimaryKeyRelatedField
 
 EUROPE_PARIS = ZoneInfo("Europe/Paris")
 
@@ -49,7 +53,8 @@ class LeadSerializer(serializers.ModelSerializer):
     status = LeadStatusSerializer(read_only=True)
     statut_dossier = StatutDossierSerializer(read_only=True)
     jurist_assigned = AssignedUserSerializer(read_only=True, many=True)
-    jurist_assigned_ids = serializers.PrimaryKeyRelatedField(
+    jurist_assigned_ids = CachedPrimaryKeyRelatedField(
+        dataset="juristes",
         queryset=User.objects.filter(role=UserRoles.JURISTE, is_active=True),
         many=True,
         source="jurist_assigned",
@@ -57,19 +62,22 @@ class LeadSerializer(serializers.ModelSerializer):
         required=False,
     )
 
-    status_id = serializers.PrimaryKeyRelatedField(
+    status_id = CachedPrimaryKeyRelatedField(
+        dataset="lead_statuses",
         queryset=LeadStatus.objects.all(),
         source="status",
         write_only=True,
         required=False,
     )
-    statut_dossier_id = serializers.PrimaryKeyRelatedField(
+    statut_dossier_id = CachedPrimaryKeyRelatedField(
+        dataset="statut_dossiers",
         queryset=StatutDossier.objects.all(),
         source="statut_dossier",
         write_only=True,
         required=False,
     )
-    assigned_to_ids = serializers.PrimaryKeyRelatedField(
+    assigned_to_ids = CachedPrimaryKeyRelatedField(
+        dataset="conseillers",
         queryset=User.objects.filter(role=UserRoles.CONSEILLER, is_active=True),
         many=True,
         source="assigned_to",
@@ -77,7 +85,8 @@ class LeadSerializer(serializers.ModelSerializer):
         required=False,
     )
     statut_dossier_interne = StatutDossierInterneSerializer(read_only=True)
-    statut_dossier_interne_id = serializers.PrimaryKeyRelatedField(
+    statut_dossier_interne_id = CachedPrimaryKeyRelatedField(
+        dataset="statut_dossiers_internes",
         queryset=StatutDossierInterne.objects.all(),
         source="statut_dossier_interne",
         write_only=True,
@@ -141,7 +150,37 @@ class LeadSerializer(serializers.ModelSerializer):
             "created_at": {"read_only": True},
         }
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """
+        Charge en une passe tout ce que lit le sérialiseur (évite le N+1 en liste) :
+        - statuts et fiche client (+ type de demande) par jointure,
+        - conseillers et juristes assignés par prefetch,
+        - créateur du dernier contrat par sous-requête (`contract_emitter_id`).
+        """
+        last_contract = Contract.objects.filter(client__lead=OuterRef("pk")).order_by(
+            "-created_at"
+        )
+        return queryset.select_related(
+            "status",
+            "statut_dossier",
+            "statut_dossier_interne",
+            "form_data__type_demande",
+        ).prefetch_related(
+            "assigned_to",
+            "jurist_assigned",
+        ).annotate(
+            _contract_emitter_id=Subquery(
+                last_contract.values("created_by_id")[:1], output_field=UUIDField()
+            )
+        )
+
     def get_contract_emitter_id(self, obj):
+        # Valeur pré-calculée par `setup_eager_loading`
+        if hasattr(obj, "_contract_emitter_id"):
+            emitter_id = obj._contract_emitter_id
+            return str(emitter_id) if emitter_id else None
+
         client = getattr(obj, "form_data", None)
         if not client:
             return None
@@ -160,21 +199,11 @@ class LeadSerializer(serializers.ModelSerializer):
                 "Veuillez entrer une adresse email valide"
             )
         email = value.lower().strip()
-        # Unicité
-        if self.instance:  # Update
-            if (
-                Lead.objects.exclude(pk=self.instance.pk)
-                .filter(email__iexact=email)
-                .exists()
-            ):
-                raise serializers.ValidationError(
-                    "Cet email est déjà utilisé par un autre utilisateur, veuillez nous contacter."
-                )
-        else:  # Create
-            if Lead.objects.filter(email__iexact=email).exists():
-                raise serializers.ValidationError(
-                    "Cet email est déjà utilisé par un autre utilisateur, veuillez nous contacter."
-                )
+        # Unicité (recherche indexée sur LOWER(email))
+        if find_existing_lead(email=email, exclude_pk=getattr(self.instance, "pk", None)):
+            raise serializers.ValidationError(
+                "Cet email est déjà utilisé par un autre utilisateur, veuillez nous contacter."
+            )
         return email
 
     def validate_first_name(self, value):
@@ -216,3 +245,27 @@ class LeadSerializer(serializers.ModelSerializer):
         if instance.status:
             rep["status_display"] = instance.status.label
         return rep
+
+
+class LeadTransitionSerializer(serializers.ModelSerializer):
+    """Ligne de l'historique des statuts d'un lead (lecture seule)."""
+
+    changed_by_name = serializers.SerializerMethodField()
+
+    class Meta:
+        model = LeadTransition
+        fields = [
+            "id",
+            "field",
+            "from_code",
+            "to_code",
+            "source",
+            "changed_by",
+            "changed_by_name",
+            "changed_at",
+        ]
+        read_only_fields = fields
+
+    def get_changed_by_name(self, obj):
+        user = obj.changed_by
+        return f"{user.first_name} {user.last_name}".strip() if user else None
@@ -1,39 +1,105 @@
 import logging
-from datetime import timedelta, datetime
+from datetime import date, timedelta
 
 from celery import shared_task
+from django.db import transaction
+from django.db.models import Q
 from django.utils import timezone
 
+from api.appointment_reports.services import sync_entries
+from api.lead_assignment.services import tracking_loads
 from api.lead_status.models import LeadStatus
 from api.leads.constants import ABSENT, RDV_CONFIRME
-from api.leads.models import Lead
-from api.utils.email import (
-    send_appointment_reminder_email,
-    send_missed_appointment_email,
+from api.leads.models import Lead, LeadTransition
+from api.leads.transitions import record_transitions
+from api.utils.email.leads.notifications import (
+    send_appointment_reminder_emails,
+    send_missed_appointment_emails,
 )
+from api.websocket.signals.leads import broadcast_leads_bulk
 
 logger = logging.getLogger(__name__)
 
 
+EMAIL_CHUNK_SIZE = 100
+
+LEAD_EMAIL_SENDERS = {
+    "reminder": send_appointment_reminder_emails,
+    "missed": send_missed_appointment_emails,
+}
+
+
+def _fan_out_emails(template: str, lead_ids: list):
+    """
+    Répartit l'envoi en sous-tâches de `EMAIL_CHUNK_SIZE` leads :
+    la tâche planifiée rend la main tout de suite, les workers envoient en parallèle.
+    """
+    for start in range(0, len(lead_ids), EMAIL_CHUNK_SIZE):
+        send_lead_emails_chunk.delay(template, lead_ids[start : start + EMAIL_CHUNK_SIZE])
+
+
+@shared_task
+def send_lead_emails_chunk(template: str, lead_ids: list):
+    """
+    Envoie un même e-mail à un lot de leads (chargés en une requête) :
+    rendu en lot et envoi sur la connexion SMTP partagée du worker.
+    """
+    leads = list(Lead.objects.select_related("status").filter(id__in=lead_ids))
+    result = LEAD_EMAIL_SENDERS[template](leads)
+    logger.info(
+        f"📧 E-mails '{template}' envoyés : {result.sent}/{len(lead_ids)} "
+        f"({result.failed} échec(s))"
+    )
+    return result.sent
+
+
+def _claim_leads(queryset, **changes):
+    """
+    Verrouille les leads ciblés, les met à jour en un seul UPDATE et retourne leurs ids.
+    Les verrous (`skip_locked`) évitent qu'une exécution concurrente traite les mêmes leads.
+    Un changement de statut est répercuté sur la charge des conseillers.
+    """
+    ids = list(
+        queryset.select_for_update(skip_locked=True, of=("self",)).values_list(
+            "id", flat=True
+        )
+    )
+    if ids:
+        with tracking_loads(ids, fields=changes):
+            Lead.objects.filter(id__in=ids).update(**changes)
+    return ids
+
+
+def _with_email(queryset):
+    return queryset.exclude(email__isnull=True).exclude(email="")
+
+
 @shared_task
 def send_reminder_emails():
     """
     Envoie un rappel un jour avant le rendez-vous confirmé.
+    Les leads sont marqués en un UPDATE (`last_reminder_sent`) avant l'envoi :
+    une relance de la tâche le même jour n'envoie pas de second rappel.
     """
     now = timezone.now()
-    tomorrow = now.date() + timedelta(days=1)
-
-    leads = Lead.objects.filter(
-        status__code=RDV_CONFIRME,
-        appointment_date__date=tomorrow
+    today = timezone.localdate()
+    tomorrow = today + timedelta(days=1)
+
+    leads = _with_email(
+        Lead.objects.filter(
+            status__code=RDV_CONFIRME, appointment_date__date=tomorrow
+        ).filter(
+            # Un rappel envoyé avant aujourd'hui concernait un rendez-vous antérieur
+            Q(last_reminder_sent__isnull=True) | Q(last_reminder_sent__date__lt=today)
+        )
     )
 
-    for lead in leads:
-        if not lead.last_reminder_sent:
-            send_appointment_reminder_email(lead)
-            lead.last_reminder_sent = now
-            lead.save(update_fields=["last_reminder_sent"])
-            logger.info(f"📧 Rappel J-1 envoyé à {lead.email} (lead #{lead.id})")
+    with transaction.atomic():
+        lead_ids = _claim_leads(leads, last_reminder_sent=now)
+        transaction.on_commit(lambda: _fan_out_emails("reminder", lead_ids))
+
+    logger.info(f"📧 Rappels J-1 programmés pour {len(lead_ids)} leads")
+    return len(lead_ids)
 
 
 @shared_task
@@ -53,40 +119,91 @@ def mark_absent_leads():
 
     leads_to_mark = Lead.objects.filter(status=confirmed_status, appointment_date__lt=now)
 
-    for lead in leads_to_mark:
-        lead.status = absent_status
-        lead.save(update_fields=["status"])
-        logger.info(f"✅ Lead #{lead.id} marqué comme ABSENT")
-
-        if lead.email:
-            send_missed_appointment_email(lead)
-            logger.info(f"📧 Mail d'absence envoyé à {lead.email} (lead #{lead.id})")
-        else:
-            logger.warning(f"⚠️ Email manquant pour lead #{lead.id}, pas d'envoi possible.")
+    with transaction.atomic():
+        lead_ids = _claim_leads(leads_to_mark, status=absent_status, updated_at=now)
+        record_transitions(
+            [(pk, LeadTransition.Field.STATUS, RDV_CONFIRME, ABSENT) for pk in lead_ids],
+            source=LeadTransition.Source.TASK,
+            at=now,
+        )
+        email_ids = list(
+            _with_email(Lead.objects.filter(id__in=lead_ids)).values_list(
+                "id", flat=True
+            )
+        )
+        transaction.on_commit(lambda: _fan_out_emails("missed", email_ids))
+        # Mise à jour en masse (sans signaux) : retire ces RDV du rapport quotidien
+        transaction.on_commit(lambda: sync_entries(lead_ids))
+        transaction.on_commit(
+            lambda: broadcast_leads_bulk(
+                "updated", lead_ids, extra={"status": ABSENT}
+            )
+        )
+
+    logger.info(
+        f"✅ {len(lead_ids)} leads marqués comme ABSENT "
+        f"({len(email_ids)} mails d'absence programmés)"
+    )
+    return len(lead_ids)
 
 
 @shared_task
-def send_daily_appointments_report_task():
+def send_daily_appointments_report_task(day=None):
     """
-    Génère et envoie un rapport PDF des rendez-vous planifiés ou confirmés du jour.
+    Envoie le rapport PDF des rendez-vous planifiés ou confirmés du jour (ou de `day`,
+    AAAA-MM-JJ). Le PDF est normalement déjà prêt (tâche préparatoire) : seul l'envoi reste.
     """
-    from django.utils import timezone
-    from api.lead_status.models import LeadStatus
-    from api.leads.constants import RDV_PLANIFIE, RDV_CONFIRME
     from api.utils.email.leads.daily_report import send_daily_appointment_report
 
-    today = timezone.localdate()
-    start = timezone.make_aware(datetime.combine(today, datetime.min.time()))
-    end = timezone.make_aware(datetime.combine(today, datetime.max.time()))
-
-    leads = Lead.objects.filter(
-        appointment_date__range=(start, end),
-        status__code__in=[RDV_PLANIFIE, RDV_CONFIRME],
-    ).select_related("status")
-
-    if not leads.exists():
+    reports = send_daily_appointment_report(date.fromisoformat(day) if day else None)
+    if not reports:
         logger.info("📭 Aucun rendez-vous planifié ou confirmé aujourd'hui.")
         return
 
-    recipient = send_daily_appointment_report(list(leads))
-    logger.info(f"📄 Rapport PDF envoyé à {recipient} ({leads.count()} RDV)")
\ No newline at end of file
+    logger.info(
+        f"📄 Rapport PDF envoyé ({reports[0].appointment_count} RDV, "
+        f"{len(reports) - 1} rapports individuels)"
+    )
+
+
+@shared_task
+def rebuild_lead_probe_filter():
+    """
+    Reconstruit le filtre Redis des téléphones / e-mails connus (recherche de doublons
+    des formulaires publics) : purge les leads supprimés, réduit les faux positifs.
+    """
+    from api.leads.duplicates import rebuild_probe_filter
+
+    return rebuild_probe_filter()
+
+
+@shared_task
+def purge_leads_task(lead_ids: list):
+    """Purge en masse de leads et de leur graphe (fichiers S3 effacés par une sous-tâche)."""
+    from api.leads.purge import purge_leads
+
+    result = purge_leads(lead_ids)
+    return {"purged": len(result["lead_ids"]), "files": result["files"]}
+
+
+@shared_task
+def delete_lead_files(files: dict):
+    """
+    Efface les fichiers S3 de leads purgés (`{bucket: [clés]}`), par lots `DeleteObjects`.
+    Les clés en erreur sont journalisées : la base est déjà purgée, rien n'est rejoué.
+    """
+    from api.utils.cloud.scw.bucket_utils import delete_objects
+
+    failed = 0
+    for bucket_key, keys in files.items():
+        for error in delete_objects(bucket_key, keys):
+            failed += 1
+            logger.warning(
+                "⚠️ Fichier %s/%s non supprimé : %s",
+                bucket_key,
+                error.get("Key"),
+                error.get("Message") or error.get("Code"),
+            )
+    deleted = sum(len(keys) for keys in files.values()) - failed
+    logger.info("🗑️ Fichiers de leads purgés : %s supprimé(s), %s échec(s)", deleted, failed)
+    return {"deleted": deleted, "failed": failed}
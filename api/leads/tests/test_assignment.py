@@ -0,0 +1,185 @@
+from unittest.mock import patch
+
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api.email_outbox.kinds import LEAD_JURIST_ASSIGNED
+from api.email_outbox.models import EmailOutbox
+from api.lead_status.models import LeadStatus
+from api.leads.constants import RDV_PLANIFIE
+from api.leads.models import Lead
+from api.users.models import User
+from api.users.roles import UserRoles
+
+pytestmark = pytest.mark.django_db
+
+
+def _user(email, role, **extra):
+    return User.objects.create_user(
+        email=email,
+        password="pass",
+        role=role,
+        first_name=email.split("@")[0].capitalize(),
+        last_name="Test",
+        **extra,
+    )
+
+
+@pytest.fixture
+def admin():
+    return _user("admin@example.com", UserRoles.ADMIN)
+
+
+@pytest.fixture
+def conseillers():
+    return [_user(f"conseiller{i}@example.com", UserRoles.CONSEILLER) for i in range(3)]
+
+
+@pytest.fixture
+def leads():
+    status = LeadStatus.objects.create(code=RDV_PLANIFIE, label="RDV planifié", color="#000")
+    return [
+        Lead.objects.create(
+            first_name="Jean",
+            last_name=f"Dupont{i}",
+            phone=f"061234567{i}",
+            email=f"jean{i}@example.com" if i % 2 == 0 else None,
+            status=status,
+        )
+        for i in range(6)
+    ]
+
+
+@pytest.fixture
+def api(admin):
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
+
+
+def test_bulk_assignment_in_constant_queries(
+    api, leads, conseillers, django_assert_max_num_queries, django_capture_on_commit_callbacks
+):
+    first, second, third = conseillers
+    leads[0].assigned_to.add(first, third)
+    before = Lead.objects.get(pk=leads[0].pk).updated_at
+    ids = [lead.pk for lead in leads]
+
+    with (
+        patch("api.leads.assignment.broadcast_leads_bulk") as broadcast,
+        patch("api.leads.assignment.sync_entries") as sync,
+        django_capture_on_commit_callbacks(execute=True),
+    ):
+        # Requêtes en nombre fixe, indépendant du nombre de leads et d'utilisateurs
+        with django_assert_max_num_queries(14):
+            response = api.post(
+                reverse("lead-bulk-assignment"),
+                {
+                    "ids": ids + [999999],
+                    "assign": [first.id, second.id],
+                    "unassign": [third.id],
+                },
+                format="json",
+            )
+
+    assert response.status_code == 200, response.data
+    assert response.data == {"leads": 6, "added": 11, "changed": 6, "missing": [999999]}
+    through = Lead.assigned_to.through
+    assert through.objects.filter(user=first).count() == through.objects.filter(user=second).count() == 6
+    assert not through.objects.filter(user=third).exists()
+    assert Lead.objects.get(pk=leads[0].pk).updated_at > before
+    # Un seul événement websocket et une seule synchronisation du rapport
+    broadcast.assert_called_once()
+    assert broadcast.call_args.args[:2] == ("assigned", ids)
+    sync.assert_called_once_with(ids)
+
+
+def test_bulk_jurist_assignment_enqueues_emails_in_one_batch(
+    api, leads, django_capture_on_commit_callbacks
+):
+    jurist = _user("juriste@example.com", UserRoles.JURISTE)
+    leads[0].jurist_assigned.add(jurist)
+    url = reverse("lead-bulk-assignment")
+
+    with (
+        patch("api.email_outbox.services.schedule_drain") as drain,
+        django_capture_on_commit_callbacks(execute=True),
+    ):
+        response = api.post(
+            url,
+            {"ids": [lead.pk for lead in leads], "role": "juriste", "assign": [jurist.id]},
+            format="json",
+        )
+
+    assert response.data["added"] == 5
+    # Leads avec e-mail ayant reçu le juriste (le premier l'avait déjà)
+    outbox = EmailOutbox.objects.filter(kind=LEAD_JURIST_ASSIGNED)
+    assert sorted(outbox.values_list("lead_id", flat=True)) == [leads[2].pk, leads[4].pk]
+    assert {row.payload["jurist_id"] for row in outbox} == {str(jurist.id)}
+    drain.assert_called_once()
+    assert Lead.objects.filter(juriste_assigned_at__isnull=False).count() == 5
+
+
+def test_bulk_assignment_validation(api, leads, conseillers):
+    url = reverse("lead-bulk-assignment")
+    inactive = _user("inactif@example.com", UserRoles.CONSEILLER, is_active=False)
+    jurist = _user("juriste@example.com", UserRoles.JURISTE)
+    ids = [leads[0].pk]
+
+    assert api.post(url, {"ids": [], "assign": [conseillers[0].id]}, format="json").status_code == 400
+    assert api.post(url, {"ids": ids, "role": "admin", "assign": [1]}, format="json").status_code == 400
+    assert api.post(url, {"ids": ids}, format="json").status_code == 400
+    for user in (inactive, jurist):
+        response = api.post(url, {"ids": ids, "assign": [user.id]}, format="json")
+        assert response.status_code == 404
+    assert not Lead.assigned_to.through.objects.exists()
+
+    api.force_authenticate(conseillers[0])
+    response = api.post(url, {"ids": ids, "assign": [conseillers[0].id]}, format="json")
+    assert response.status_code == 403
+
+
+def test_single_lead_assignment_keeps_lead_updated_event(
+    api, leads, conseillers, django_capture_on_commit_callbacks
+):
+    lead = leads[0]
+    jurist = _user("juriste@example.com", UserRoles.JURISTE)
+
+    with (
+        patch("api.websocket.signals.leads.broadcast") as broadcast,
+        django_capture_on_commit_callbacks(execute=True),
+    ):
+        api.patch(
+            reverse("lead-assignment", kwargs={"pk": lead.pk}),
+            {"assign": [conseillers[0].id]},
+            format="json",
+        )
+        api.patch(
+            reverse("lead-assign-juristes", kwargs={"pk": lead.pk}),
+            {"assign": [jurist.id]},
+            format="json",
+        )
+
+    events = [call.args[1] for call in broadcast.call_args_list]
+    assert [e["event"] for e in events] == ["leads_bulk_assigned", "lead_updated"] * 2
+    assert events[1]["data"]["id"] == lead.pk
+    assert [c["id"] for c in events[1]["data"]["assigned_to"]] == [str(conseillers[0].id)]
+    assert [j["id"] for j in events[3]["data"]["jurist_assigned"]] == [str(jurist.id)]
+
+
+def test_conseiller_self_assignment(leads, conseillers):
+    lead = leads[0]
+    client = APIClient()
+    client.force_authenticate(conseillers[0])
+    url = reverse("lead-assignment", kwargs={"pk": lead.pk})
+
+    response = client.patch(url, {"action": "assign"}, format="json")
+    assert response.status_code == 200
+    assert [c["id"] for c in response.data["assigned_to"]] == [str(conseillers[0].id)]
+
+    response = client.patch(url, {"action": "unassign"}, format="json")
+    assert response.data["assigned_to"] == []
+
+    response = client.patch(url, {"assign": [conseillers[1].id]}, format="json")
+    assert response.status_code == 400
@@ -0,0 +1,177 @@
+from datetime import time, timedelta
+from unittest.mock import patch
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.booking.models import SlotQuota
+from api.booking.services import try_book_slot
+from api.lead_status.models import LeadStatus
+from api.leads import duplicates
+from api.leads.constants import PRESENT, RDV_PLANIFIE
+from api.leads.duplicates import (
+    find_existing_lead,
+    rebuild_probe_filter,
+    remember_leads,
+)
+from api.leads.models import Lead
+from api.opening_hours.models import OpeningHours
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def probe_filter():
+    # Le filtre vit dans Redis, hors de la transaction du test
+    redis = duplicates._redis()
+    redis.delete(duplicates.FILTER_KEY, duplicates.FILTER_BUILD_KEY)
+    yield redis
+    redis.delete(duplicates.FILTER_KEY, duplicates.FILTER_BUILD_KEY)
+
+
+@pytest.fixture
+def lead_status():
+    return LeadStatus.objects.create(code=RDV_PLANIFIE, label="Planifié")
+
+
+@pytest.fixture
+def tuesday():
+    OpeningHours.objects.create(
+        day_of_week=1,
+        is_active=True,
+        open_time=time(10, 0),
+        close_time=time(12, 0),
+        slot_duration_minutes=30,
+        capacity_per_slot=2,
+    )
+    day = timezone.localdate() + timedelta(days=1)
+    while day.weekday() != 1:
+        day += timedelta(days=1)
+    return day
+
+
+def _lead(lead_status, **kwargs):
+    return Lead.objects.create(
+        first_name="Jean", last_name="Dupont", status=lead_status, **kwargs
+    )
+
+
+def test_find_existing_lead_by_phone_then_email(lead_status):
+    by_phone = _lead(lead_status, phone="06 12 34 56 78")
+    by_email = _lead(lead_status, phone="0698765432", email="Lea@Example.com")
+
+    assert find_existing_lead("+33612345678") == by_phone
+    assert find_existing_lead("0600000000", " lea@example.COM") == by_email
+    assert find_existing_lead("0612345678", "lea@example.com") == by_phone
+    assert find_existing_lead("0600000000", "autre@example.com") is None
+    assert find_existing_lead(email="lea@example.com", exclude_pk=by_email.pk) is None
+
+
+def test_probe_filter_answers_unknown_values_without_query(
+    lead_status, django_assert_num_queries
+):
+    _lead(lead_status, phone="0612345678", email="jean@example.com")
+    assert rebuild_probe_filter() == 1
+
+    with django_assert_num_queries(0):
+        assert find_existing_lead("0698765432", "lea@example.com", use_filter=True) is None
+
+    # Créations suivantes : via `Lead.save` (signal) ou écriture en masse
+    created = _lead(lead_status, phone="0698765432")
+    assert find_existing_lead("0698765432", use_filter=True) == created
+    Lead.objects.bulk_create(
+        [Lead(first_name="A", last_name="B", phone="x", phone_normalized="+33611111111", status=lead_status)]
+    )
+    remember_leads([("+33611111111", None)])
+    assert find_existing_lead("0611111111", use_filter=True) is not None
+
+
+def test_probe_falls_back_to_database_without_filter(lead_status):
+    lead = _lead(lead_status, phone="0612345678")
+
+    # Filtre non construit, puis Redis indisponible : la base répond
+    assert find_existing_lead("0612345678", use_filter=True) == lead
+    with patch.object(duplicates, "_redis", side_effect=ConnectionError):
+        assert find_existing_lead("0612345678", use_filter=True) == lead
+
+
+def test_public_create_attaches_booking_to_existing_lead(lead_status, tuesday):
+    previous = timezone.make_aware(timezone.datetime.combine(tuesday, time(10, 0)))
+    try_book_slot(previous)
+    lead = _lead(lead_status, phone="0612345678", appointment_date=previous)
+    rebuild_probe_filter()
+
+    with patch("api.leads.views.enqueue_email"):
+        response = APIClient().post(
+            reverse("lead-public-create"),
+            {
+                "first_name": "jean",
+                "last_name": "dupont",
+                "phone": "+33 6 12 34 56 78",
+                "email": "jean@example.com",
+                "appointment_date": tuesday.strftime("%d/%m/%Y") + " 11:00",
+            },
+            format="json",
+        )
+
+    assert response.status_code == 201
+    assert response.data == {
+        "detail": "Rendez-vous enregistré.",
+        "appointment_date": tuesday.strftime("%d/%m/%Y") + " 11:00",
+    }
+    assert Lead.objects.count() == 1
+    lead.refresh_from_db()
+    assert timezone.localtime(lead.appointment_date).hour == 11
+    assert lead.email == "jean@example.com"
+    # Le créneau précédent est libéré
+    assert SlotQuota.objects.get(start_at=previous).booked == 0
+
+
+def test_public_book_attaches_on_phone_without_leaking_the_lead(lead_status, tuesday):
+    present = LeadStatus.objects.create(code=PRESENT, label="Présent")
+    lead = _lead(present, phone="0612345678", email="jean@example.com")
+    client = APIClient()
+    payload = {
+        "first_name": "Paul",
+        "last_name": "Martin",
+        "phone": "06 12 34 56 78",
+        "email": "paul@example.com",
+        "date": tuesday.isoformat(),
+        "time": "10:30",
+    }
+
+    attached = client.post("/api/booking/book/", data=payload, format="json")
+
+    assert attached.status_code == 201, attached.data
+    assert Lead.objects.count() == 1
+    body = attached.content.decode()
+    for stored in ("Jean", "Dupont", "0612345678", "+33612345678", "jean@example.com"):
+        assert stored not in body
+    # Lead déjà venu au rendez-vous : statut conservé, seule la date change
+    lead.refresh_from_db()
+    assert lead.status == present
+    assert timezone.localtime(lead.appointment_date).strftime("%H:%M") == "10:30"
+
+    # Même e-mail, autre téléphone : pas de rattachement
+    payload.update(phone="0799999999", email="JEAN@example.com")
+    assert client.post("/api/booking/book/", data=payload, format="json").status_code == 400
+    assert Lead.objects.count() == 1
+
+    # Nouveau lead : même réponse qu'un rattachement
+    payload.update(email="paul.martin@example.com")
+    created = client.post("/api/booking/book/", data=payload, format="json")
+    assert (created.status_code, created.data) == (201, attached.data)
+    assert Lead.objects.count() == 2
+
+
+def test_public_book_releases_slot_on_invalid_data(lead_status, tuesday):
+    response = APIClient().post(
+        "/api/booking/book/",
+        data={"first_name": "", "last_name": "Dupont", "phone": "0612345678", "date": tuesday.isoformat(), "time": "10:00"},
+        format="json",
+    )
+
+    assert response.status_code == 400
+    assert not SlotQuota.objects.filter(booked__gt=0).exists()
@@ -0,0 +1,214 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+import pytest
+from django.core.management import call_command
+from django.db.models.signals import post_delete, pre_delete
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.appointment.models import Appointment
+from api.appointment_reports.models import DailyAppointmentEntry
+from api.clients.models import Client
+from api.comments.models import Comment
+from api.contracts.models import Contract
+from api.documents.models import Document
+from api.lead_dedup.models import DuplicateCandidate, LeadMerge
+from api.lead_status.models import LeadStatus
+from api.leads.constants import RDV_PLANIFIE
+from api.leads.models import Lead
+from api.leads.purge import inactive_leads, purge_leads
+from api.leads.tasks import delete_lead_files, purge_leads_task
+from api.payments.models import PaymentReceipt
+from api.reconciliation.models import Statement, StatementLine
+from api.services.models import Service
+from api.users.models import User
+from api.users.roles import UserRoles
+from api.utils.cloud.scw import bucket_utils
+
+pytestmark = pytest.mark.django_db
+
+S3 = "https://s3.fr-par.scw.cloud"
+
+
+@pytest.fixture
+def status():
+    return LeadStatus.objects.create(code=RDV_PLANIFIE, label="RDV planifié", color="#000")
+
+
+@pytest.fixture
+def admin():
+    return User.objects.create_user(
+        email="admin@example.com",
+        password="pass",
+        role=UserRoles.ADMIN,
+        first_name="Admin",
+        last_name="User",
+    )
+
+
+def _lead_with_graph(status, admin, index):
+    lead = Lead.objects.create(
+        first_name="Jean",
+        last_name=f"Dupont{index}",
+        phone=f"061234567{index}",
+        status=status,
+        appointment_date=timezone.now() + timedelta(days=1),
+    )
+    lead.assigned_to.add(admin)
+    client = Client.objects.create(lead=lead)
+    contract = Contract.objects.create(
+        client=client,
+        created_by=admin,
+        service=Service.objects.get_or_create(code="VISA", defaults={"label": "Visa"})[0],
+        amount_due=200,
+    )
+    Contract.objects.filter(pk=contract.pk).update(
+        contract_url=f"{S3}/contracts/dupont_{index}/contrat_{contract.pk}.pdf",
+        invoice_url=f"{S3}/factures/dupont_{index}/facture_{contract.pk}.pdf",
+    )
+    receipt = PaymentReceipt.objects.create(
+        contract=contract, client=client, amount=50, mode="ESPECES"
+    )
+    PaymentReceipt.objects.filter(pk=receipt.pk).update(
+        receipt_url=f"{S3}/recus/dupont_{index}/recu_{receipt.pk}.pdf"
+    )
+    Document.objects.create(client=client, url=f"{S3}/documents-clients/dupont_{index}/cni.pdf")
+    Comment.objects.create(lead=lead, author=admin, content="Rappeler")
+    Appointment.objects.create(lead=lead, date="2030-01-15T10:00:00Z")
+    return lead, contract
+
+
+def test_purge_deletes_whole_graph_without_signals(
+    status, admin, django_assert_max_num_queries, django_capture_on_commit_callbacks
+):
+    leads = [_lead_with_graph(status, admin, i) for i in range(3)]
+    kept, kept_contract = _lead_with_graph(status, admin, 9)
+    purged_ids = [lead.pk for lead, _ in leads]
+    statement = Statement.objects.create(file_name="releve.csv")
+    line = StatementLine.objects.create(
+        statement=statement, row_number=1, contract=leads[0][1]
+    )
+    pending = DuplicateCandidate.objects.create(lead_a=leads[0][0], lead_b=kept, score=0.9)
+    merge = LeadMerge.objects.create(survivor=leads[1][0], survivor_lead_id=leads[1][0].pk)
+    merged = DuplicateCandidate.objects.create(
+        lead_a=kept, lead_b=leads[1][0], score=1, merge=merge
+    )
+    receivers = (list(post_delete.receivers), list(pre_delete.receivers))
+
+    with (
+        patch("api.websocket.signals.leads.broadcast") as broadcast,
+        patch("api.leads.tasks.delete_lead_files.delay") as delete_files,
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            # Requêtes en nombre fixe, indépendant du nombre de leads et de lignes liées
+            with django_assert_max_num_queries(60):
+                result = purge_leads(purged_ids)
+
+    assert result["lead_ids"] == purged_ids
+    assert list(Lead.objects.values_list("pk", flat=True)) == [kept.pk]
+    assert list(Contract.objects.values_list("pk", flat=True)) == [kept_contract.pk]
+    assert Client.objects.count() == PaymentReceipt.objects.count() == Document.objects.count() == 1
+    assert Comment.objects.count() == Appointment.objects.count() == 1
+    assert not DailyAppointmentEntry.objects.filter(lead_id__in=purged_ids).exists()
+    assert not Lead.assigned_to.through.objects.filter(lead_id__in=purged_ids).exists()
+    assert result["deleted"]["leads.Lead"] == 3
+    # Relations SET_NULL : liens vidés, lignes conservées
+    line.refresh_from_db()
+    merge.refresh_from_db()
+    merged.refresh_from_db()
+    assert line.contract_id is None and merge.survivor_id is None and merged.lead_b_id is None
+    assert not DuplicateCandidate.objects.filter(pk=pending.pk).exists()
+    # Receivers globaux inchangés
+    assert (list(post_delete.receivers), list(pre_delete.receivers)) == receivers
+
+    files = delete_files.call_args.args[0]
+    assert sorted(files) == ["contracts", "documents", "invoices", "receipts"]
+    assert sorted(files["documents"]) == [f"dupont_{i}/cni.pdf" for i in range(3)]
+    assert result["files"] == {"contracts": 3, "invoices": 3, "receipts": 3, "documents": 3}
+    # Un événement par lead supprimé
+    events = [call.args[1] for call in broadcast.call_args_list]
+    assert [(e["event"], e["data"]["id"]) for e in events] == [
+        ("lead_deleted", pk) for pk in purged_ids
+    ]
+
+
+def test_delete_lead_files_batches_delete_objects():
+    s3 = MagicMock()
+    s3.delete_objects.side_effect = [
+        {"Errors": [{"Key": "a/0.pdf", "Code": "AccessDenied"}]},
+        {},
+        {},
+    ]
+    keys = [f"a/{i}.pdf" for i in range(2500)]
+
+    with patch.object(bucket_utils, "get_shared_s3_client", return_value=s3):
+        result = delete_lead_files({"documents": keys})
+
+    assert result == {"deleted": 2499, "failed": 1}
+    assert [len(c.kwargs["Delete"]["Objects"]) for c in s3.delete_objects.call_args_list] == [
+        1000,
+        1000,
+        500,
+    ]
+
+
+def test_inactive_leads_keep_leads_with_contract(status, admin):
+    with_contract, _ = _lead_with_graph(status, admin, 1)
+    inactive = Lead.objects.create(first_name="Léa", last_name="Martin", status=status)
+    recent = Lead.objects.create(first_name="Paul", last_name="Durand", status=status)
+    old = timezone.now() - timedelta(days=800)
+    Lead.objects.filter(pk__in=[with_contract.pk, inactive.pk]).update(updated_at=old)
+
+    assert list(inactive_leads(730)) == [inactive]
+
+    out = StringIO()
+    with patch("api.leads.tasks.delete_lead_files.delay"):
+        call_command("purge_leads", "--inactive-days", "730", stdout=out)
+    assert "1 lead(s) supprimé(s)" in out.getvalue()
+    assert set(Lead.objects.values_list("pk", flat=True)) == {with_contract.pk, recent.pk}
+
+
+def test_cascade_delete_by_lead_endpoint_uses_purge(status, admin):
+    lead, _ = _lead_with_graph(status, admin, 1)
+    client = APIClient()
+    client.force_authenticate(admin)
+    url = reverse("client-cascade-delete-by-lead")
+
+    with patch("api.leads.tasks.delete_lead_files.delay"):
+        response = client.delete(f"{url}?lead_id={lead.pk}")
+
+    assert response.status_code == 204
+    assert not Lead.objects.exists() and not Contract.objects.exists()
+    assert client.delete(f"{url}?lead_id={lead.pk}").status_code == 404
+
+
+def test_bulk_purge_endpoint(status, admin, django_capture_on_commit_callbacks):
+    leads = [_lead_with_graph(status, admin, i)[0] for i in range(2)]
+    conseiller = User.objects.create_user(
+        email="conseiller@example.com",
+        password="pass",
+        role=UserRoles.CONSEILLER,
+        first_name="Claire",
+        last_name="Conseil",
+    )
+    client = APIClient()
+    url = reverse("lead-purge")
+
+    client.force_authenticate(conseiller)
+    assert client.post(url, {"ids": [leads[0].pk]}, format="json").status_code == 403
+
+    client.force_authenticate(admin)
+    assert client.post(url, {"ids": []}, format="json").status_code == 400
+    with (
+        patch("api.leads.tasks.purge_leads_task.delay", side_effect=purge_leads_task),
+        patch("api.leads.tasks.delete_lead_files.delay"),
+        django_capture_on_commit_callbacks(execute=True),
+    ):
+        response = client.post(url, {"ids": [leads[0].pk, leads[1].pk, 999999]}, format="json")
+
+    assert response.status_code == 202
+    assert response.data == {"scheduled": 2, "missing": [999999]}
+    assert not Lead.objects.exists()
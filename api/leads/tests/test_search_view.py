@@ -21,6 +21,7 @@ from api.leads.lead_search import (
     _parse_iso_any,
     _to_aware,
     _to_int_or_none,
+    _to_uuid_or_none,
 )
 from api.leads.models import Lead
 from api.statut_dossier.models import StatutDossier
@@ -85,6 +86,23 @@ def test_to_int_or_none_behavior():
     assert _to_int_or_none(None) is None
 
 
+def test_to_uuid_or_none_behavior():
+    value = "4f9c1d2e-8a3b-4c5d-9e6f-7a8b9c0d1e2f"
+    assert str(_to_uuid_or_none(value)) == value
+    assert _to_uuid_or_none("abc") is None
+    assert _to_uuid_or_none(None) is None
+
+
+def test_invalid_user_ids_are_ignored(authenticated_client, lead_status):
+    Lead.objects.create(
+        first_name="A", last_name="B", phone="+1", email="a@test.com", status=lead_status
+    )
+
+    res = authenticated_client.get(reverse("lead-search"), {"jurist_id": "abc", "conseiller_id": "1"})
+    assert res.status_code == 200
+    assert res.data["total"] == 1
+
+
 def test_filter_by_status_code(authenticated_client, lead_status):
     Lead.objects.create(
         first_name="A",
@@ -11,6 +11,8 @@ Objectifs :
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
+from django.contrib.auth.models import update_last_login
+from django.core.cache import cache
 from rest_framework.exceptions import ValidationError
 
 from api.lead_status.models import LeadStatus
@@ -20,6 +22,7 @@ from api.leads.serializers import LeadSerializer
 from api.statut_dossier.models import StatutDossier
 from api.users.models import User
 from api.users.roles import UserRoles
+from api.utils.reference_data import CACHE_KEY, get_reference_entry
 
 pytestmark = pytest.mark.django_db
 
@@ -167,3 +170,73 @@ def test_contract_emitter_id_returns_none(status_planifie):
     )
     serializer = LeadSerializer(lead)
     assert serializer.data["contract_emitter_id"] is None
+
+
+@pytest.fixture
+def active_conseiller():
+    return User.objects.create_user(
+        email="cons.cache@test.com",
+        password="123",
+        role=UserRoles.CONSEILLER,
+        first_name="Cons",
+        last_name="Cache",
+    )
+
+
+@pytest.fixture
+def active_juriste():
+    return User.objects.create_user(
+        email="jur.cache@test.com",
+        password="123",
+        role=UserRoles.JURISTE,
+        first_name="Jur",
+        last_name="Cache",
+    )
+
+
+def test_related_ids_validated_from_reference_cache(
+    status_planifie, active_conseiller, active_juriste, django_assert_num_queries
+):
+    dossier = StatutDossier.objects.create(code="COMPLET", label="Dossier complet")
+    fields = LeadSerializer().fields
+    # Premier passage : construction du cache
+    for name in ("lead_statuses", "statut_dossiers", "conseillers", "juristes"):
+        get_reference_entry(name)
+
+    with django_assert_num_queries(0):
+        status = fields["status_id"].run_validation(status_planifie.id)
+        dossier_value = fields["statut_dossier_id"].run_validation(dossier.id)
+        conseillers = fields["assigned_to_ids"].run_validation([str(active_conseiller.id)])
+        juristes = fields["jurist_assigned_ids"].run_validation([str(active_juriste.id)])
+
+    assert status.pk == status_planifie.id
+    assert dossier_value.pk == dossier.id
+    assert conseillers == [active_conseiller]
+    assert juristes == [active_juriste]
+
+
+def test_login_does_not_invalidate_user_lists(active_conseiller):
+    key = CACHE_KEY.format(name="conseillers")
+    get_reference_entry("conseillers")
+
+    # Écriture de `last_login` à chaque connexion : listes conservées
+    update_last_login(None, active_conseiller)
+    assert cache.get(key) is not None
+
+    active_conseiller.first_name = "Renommé"
+    active_conseiller.save(update_fields=["first_name"])
+    assert cache.get(key) is None
+
+
+def test_related_id_unknown_rejected(status_planifie, active_conseiller):
+    data = {
+        "first_name": "Jean",
+        "last_name": "Dupont",
+        "phone": "+33600000000",
+        "status_id": status_planifie.id + 1000,
+        "assigned_to_ids": [str(active_conseiller.id), "00000000-0000-0000-0000-000000000000"],
+    }
+    serializer = LeadSerializer(data=data)
+    assert not serializer.is_valid()
+    assert "status_id" in serializer.errors
+    assert "assigned_to_ids" in serializer.errors
@@ -0,0 +1,103 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.core import mail
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api.lead_status.models import LeadStatus
+from api.leads.constants import ABSENT, RDV_CONFIRME
+from api.leads.models import Lead
+from api.leads.tasks import mark_absent_leads, send_lead_emails_chunk, send_reminder_emails
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def statuses():
+    return {
+        code: LeadStatus.objects.create(code=code, label=code, color="#000")
+        for code in (RDV_CONFIRME, ABSENT)
+    }
+
+
+def _create_leads(count, status, appointment_date, email=True):
+    return [
+        Lead.objects.create(
+            first_name=f"Lead{i}",
+            last_name="Test",
+            phone=f"+3360000000{i}",
+            email=f"lead{i}@example.com" if email else None,
+            status=status,
+            appointment_date=appointment_date,
+        )
+        for i in range(count)
+    ]
+
+
+def test_mark_absent_leads_single_update_and_broadcast(
+    statuses, django_capture_on_commit_callbacks
+):
+    past = timezone.now() - timedelta(hours=2)
+    absent = _create_leads(2, statuses[RDV_CONFIRME], past)
+    no_email = _create_leads(1, statuses[RDV_CONFIRME], past, email=False)[0]
+    future = _create_leads(1, statuses[RDV_CONFIRME], timezone.now() + timedelta(days=1))[0]
+
+    with patch("api.leads.tasks.send_lead_emails_chunk.delay") as mocked_chunk, patch(
+        "api.leads.tasks.broadcast_leads_bulk"
+    ) as mocked_broadcast:
+        with django_capture_on_commit_callbacks(execute=True):
+            assert mark_absent_leads() == 3
+
+    assert set(
+        Lead.objects.filter(status__code=ABSENT).values_list("id", flat=True)
+    ) == {lead.id for lead in absent} | {no_email.id}
+    assert Lead.objects.get(pk=future.pk).status.code == RDV_CONFIRME
+
+    mocked_chunk.assert_called_once()
+    template, ids = mocked_chunk.call_args.args
+    assert template == "missed"
+    assert sorted(ids) == sorted(lead.id for lead in absent)
+    mocked_broadcast.assert_called_once()
+    assert sorted(mocked_broadcast.call_args.args[1]) == sorted(
+        [lead.id for lead in absent] + [no_email.id]
+    )
+
+
+def test_mark_absent_leads_constant_queries(statuses):
+    past = timezone.now() - timedelta(hours=2)
+
+    def _run(count):
+        _create_leads(count, statuses[RDV_CONFIRME], past)
+        with CaptureQueriesContext(connection) as ctx:
+            mark_absent_leads()
+        return len(ctx.captured_queries)
+
+    assert _run(2) == _run(10)
+
+
+def test_send_reminder_emails_once_per_appointment(
+    statuses, django_capture_on_commit_callbacks
+):
+    tomorrow = timezone.now() + timedelta(days=1)
+    leads = _create_leads(3, statuses[RDV_CONFIRME], tomorrow)
+
+    with patch("api.leads.tasks.send_lead_emails_chunk.delay") as mocked_chunk:
+        with django_capture_on_commit_callbacks(execute=True):
+            assert send_reminder_emails() == 3
+        with django_capture_on_commit_callbacks(execute=True):
+            assert send_reminder_emails() == 0
+
+    assert sorted(mocked_chunk.call_args_list[0].args[1]) == sorted(
+        lead.id for lead in leads
+    )
+    assert not Lead.objects.filter(last_reminder_sent__isnull=True).exists()
+
+
+def test_send_lead_emails_chunk_sends_each_lead(statuses):
+    leads = _create_leads(3, statuses[RDV_CONFIRME], timezone.now() + timedelta(days=1))
+
+    assert send_lead_emails_chunk("reminder", [lead.id for lead in leads]) == 3
+    assert sorted(m.to[0] for m in mail.outbox) == sorted(lead.email for lead in leads)
@@ -0,0 +1,214 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.email_outbox.kinds import LEAD_APPOINTMENT_CONFIRMED, LEAD_DOSSIER_STATUS
+from api.email_outbox.models import EmailOutbox
+from api.lead_status.models import LeadStatus
+from api.leads.constants import ABSENT, PRESENT, RDV_CONFIRME, RDV_PLANIFIE
+from api.leads.models import Lead, LeadTransition
+from api.leads.tasks import mark_absent_leads
+from api.statut_dossier.models import StatutDossier
+from api.users.models import User
+from api.users.roles import UserRoles
+
+pytestmark = pytest.mark.django_db
+
+
+def _user(email, role):
+    return User.objects.create_user(
+        email=email,
+        password="pass",
+        role=role,
+        first_name=email.split("@")[0].capitalize(),
+        last_name="Test",
+    )
+
+
+@pytest.fixture
+def statuses():
+    return {
+        code: LeadStatus.objects.create(code=code, label=code, color="#000")
+        for code in (RDV_PLANIFIE, RDV_CONFIRME, ABSENT, PRESENT)
+    }
+
+
+@pytest.fixture
+def dossiers():
+    return {
+        code: StatutDossier.objects.create(code=code, label=code, color="#000")
+        for code in ("A_TRAITER", "EN_COURS", "CLOS")
+    }
+
+
+@pytest.fixture
+def make_lead(statuses):
+    def make(code=RDV_PLANIFIE, email="jean@example.com", **extra):
+        return Lead.objects.create(
+            first_name="Jean",
+            last_name="Dupont",
+            phone="0612345678",
+            email=email,
+            status=statuses[code],
+            appointment_date=timezone.now() + timedelta(days=1),
+            **extra,
+        )
+
+    return make
+
+
+@pytest.fixture
+def conseiller():
+    return _user("conseiller@example.com", UserRoles.CONSEILLER)
+
+
+@pytest.fixture
+def api(conseiller):
+    client = APIClient()
+    client.force_authenticate(conseiller)
+    return client
+
+
+def test_bulk_transition_applies_in_constant_queries(
+    api,
+    conseiller,
+    make_lead,
+    django_assert_max_num_queries,
+    django_capture_on_commit_callbacks,
+):
+    planned = [make_lead(), make_lead(email=None), make_lead()]
+    confirmed = make_lead(RDV_CONFIRME)
+    updated = [lead.pk for lead in planned]
+
+    with (
+        patch("api.leads.transitions.broadcast_leads_bulk") as broadcast,
+        patch("api.leads.transitions.sync_entries") as sync,
+        patch("api.email_outbox.services.schedule_drain") as drain,
+        django_capture_on_commit_callbacks(execute=True),
+    ):
+        # Requêtes en nombre fixe, indépendant du nombre de leads
+        with django_assert_max_num_queries(10):
+            response = api.post(
+                reverse("lead-bulk-transition"),
+                {"ids": updated + [confirmed.pk, 999999], "status": RDV_CONFIRME},
+                format="json",
+            )
+
+    assert response.status_code == 200, response.data
+    assert response.data == {
+        "updated": updated,
+        "unchanged": [confirmed.pk],
+        "rejected": [],
+        "missing": [999999],
+    }
+    assert Lead.objects.filter(status__code=RDV_CONFIRME).count() == 4
+    history = LeadTransition.objects.all()
+    assert sorted(history.values_list("lead_id", flat=True)) == updated
+    assert {(t.from_code, t.to_code, t.source, t.changed_by_id) for t in history} == {
+        (RDV_PLANIFIE, RDV_CONFIRME, LeadTransition.Source.BULK, conseiller.pk)
+    }
+    # E-mails des leads avec adresse, insérés en un lot
+    outbox = EmailOutbox.objects.filter(kind=LEAD_APPOINTMENT_CONFIRMED)
+    assert sorted(outbox.values_list("lead_id", flat=True)) == [planned[0].pk, planned[2].pk]
+    drain.assert_called_once()
+    broadcast.assert_called_once_with("updated", updated, extra={"status": RDV_CONFIRME})
+    sync.assert_called_once_with(updated)
+
+
+def test_bulk_transition_rejects_forbidden_transitions(api, make_lead, dossiers, settings):
+    settings.STATUT_DOSSIER_TRANSITIONS = {"CLOS": ["EN_COURS"]}
+    planned = make_lead(statut_dossier=dossiers["A_TRAITER"])
+    present = make_lead(PRESENT)  # PRESENT → ABSENT non permis
+    closed = make_lead(statut_dossier=dossiers["CLOS"])  # CLOS → A_TRAITER non permis
+    url = reverse("lead-bulk-transition")
+
+    response = api.post(
+        url,
+        {
+            "ids": [planned.pk, present.pk, closed.pk],
+            "status": ABSENT,
+            "statut_dossier": "A_TRAITER",
+        },
+        format="json",
+    )
+
+    assert response.status_code == 200, response.data
+    assert response.data["updated"] == [planned.pk]
+    assert response.data["rejected"] == [
+        {"id": present.pk, "field": "status", "from": PRESENT, "to": ABSENT},
+        {"id": closed.pk, "field": "statut_dossier", "from": "CLOS", "to": "A_TRAITER"},
+    ]
+    # Lead refusé laissé en entier tel quel
+    closed.refresh_from_db()
+    assert (closed.status.code, closed.statut_dossier.code) == (RDV_PLANIFIE, "CLOS")
+    planned.refresh_from_db()
+    assert planned.status.code == ABSENT
+    assert list(planned.transitions.values_list("field", "to_code")) == [("status", ABSENT)]
+
+    # Dossier vidé : permis, sans e-mail
+    response = api.post(url, {"ids": [planned.pk], "statut_dossier": None}, format="json")
+    assert response.data["updated"] == [planned.pk]
+    assert not EmailOutbox.objects.filter(kind=LEAD_DOSSIER_STATUS).exists()
+
+    assert api.post(url, {"ids": [planned.pk]}, format="json").status_code == 400
+    assert api.post(url, {"ids": [planned.pk], "status": "INCONNU"}, format="json").status_code == 400
+    api.force_authenticate(_user("juriste@example.com", UserRoles.JURISTE))
+    assert api.post(url, {"ids": [planned.pk], "status": ABSENT}, format="json").status_code == 403
+
+
+def test_update_validates_transition_and_records_history(
+    api, conseiller, make_lead, statuses, dossiers
+):
+    lead = make_lead(PRESENT)
+    url = reverse("lead-detail", kwargs={"pk": lead.pk})
+
+    response = api.patch(url, {"status_id": statuses[ABSENT].id}, format="json")
+    assert response.status_code == 400
+    assert "status_id" in response.data
+    assert not LeadTransition.objects.exists()
+
+    response = api.patch(
+        url,
+        {"status_id": statuses[RDV_CONFIRME].id, "statut_dossier_id": dossiers["EN_COURS"].id},
+        format="json",
+    )
+    assert response.status_code == 200, response.data
+    assert sorted(
+        LeadTransition.objects.values_list("field", "from_code", "to_code", "changed_by")
+    ) == [
+        ("status", PRESENT, RDV_CONFIRME, conseiller.pk),
+        ("statut_dossier", "", "EN_COURS", conseiller.pk),
+    ]
+    assert {row.kind for row in EmailOutbox.objects.all()} == {
+        LEAD_APPOINTMENT_CONFIRMED,
+        LEAD_DOSSIER_STATUS,
+    }
+
+    response = api.get(reverse("lead-transitions", kwargs={"pk": lead.pk}))
+    assert {row["to_code"] for row in response.data} == {RDV_CONFIRME, "EN_COURS"}
+    assert {row["changed_by_name"] for row in response.data} == {"Conseiller Test"}
+
+
+def test_absent_task_history_and_stats(make_lead, statuses):
+    lead = make_lead(RDV_CONFIRME, email=None)
+    Lead.objects.filter(pk=lead.pk).update(appointment_date=timezone.now() - timedelta(hours=2))
+    make_lead()
+
+    with patch("api.leads.tasks.broadcast_leads_bulk"):
+        assert mark_absent_leads() == 1
+
+    transition = LeadTransition.objects.get()
+    assert (transition.lead_id, transition.source) == (lead.pk, LeadTransition.Source.TASK)
+
+    client = APIClient()
+    client.force_authenticate(_user("admin@example.com", UserRoles.ADMIN))
+    url = reverse("lead-transition-stats")
+    response = client.get(url, {"field": "status"})
+    assert response.data == [
+        {"field": "status", "from_code": RDV_CONFIRME, "to_code": ABSENT, "count": 1}
+    ]
+    assert client.get(url, {"from": "demain"}).status_code == 400
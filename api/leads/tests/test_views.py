@@ -7,15 +7,15 @@ Ces tests couvrent :
 - la création, récupération, modification et suppression d’un lead,
 - les filtres par statut, recherche et date,
 - l’assignation à des conseillers ou juristes,
-- les envois d’e-mails (formulaire, rendez-vous) simulés via des mocks.
+- les envois d’e-mails (formulaire, rendez-vous) écrits dans l’outbox.
 
 Tous les tests nécessitent un accès à la base de données (pytestmark).
 """
-from unittest.mock import patch
-
 from django.urls import reverse
 from rest_framework.test import APIClient
 
+from api.email_outbox.kinds import LEAD_APPOINTMENT_PLANNED, LEAD_FORMULAIRE
+from api.email_outbox.models import EmailOutbox
 from api.lead_status.models import LeadStatus
 from api.leads.constants import RDV_PLANIFIE
 from api.leads.models import Lead
@@ -73,8 +73,7 @@ def client_for():
     return _client
 
 
-@patch("api.utils.email.leads.tasks.send_appointment_planned_task.delay")
-def test_create_lead_success(mock_notify, client_for, admin_user, lead_status):
+def test_create_lead_success(client_for, admin_user, lead_status):
     client = client_for(admin_user)
     url = reverse("lead-list")
     payload = {
@@ -88,7 +87,9 @@ def test_create_lead_success(mock_notify, client_for, admin_user, lead_status):
     response = client.post(url, data=payload, format="json")
     assert response.status_code == 201, response.data
     assert Lead.objects.count() == 1
-    mock_notify.assert_called_once()
+    outbox = EmailOutbox.objects.get()
+    assert outbox.kind == LEAD_APPOINTMENT_PLANNED
+    assert outbox.lead_id == response.data["id"]
 
 
 def test_retrieve_lead(client_for, admin_user, lead_status):
@@ -149,6 +150,21 @@ def test_filter_leads_by_search(client_for, admin_user, lead_status):
     assert any("jean" in email for email in emails)
 
 
+def test_filter_leads_by_phone_in_any_format(client_for, admin_user, lead_status):
+    lead = Lead.objects.create(
+        first_name="Jean", last_name="Doe", phone="+33612345678", status=lead_status
+    )
+    Lead.objects.create(
+        first_name="Marie", last_name="Curie", phone="+33698765432", status=lead_status
+    )
+
+    client = client_for(admin_user)
+    response = client.get(reverse("lead-list"), {"search": "06 12 34 56 78"})
+
+    assert response.status_code == 200
+    assert [item["id"] for item in response.data.get("results", response.data)] == [lead.id]
+
+
 def test_filter_leads_by_date(client_for, admin_user, lead_status):
     lead = Lead.objects.create(
         first_name="Alice", last_name="X", phone="+33", status=lead_status
@@ -225,18 +241,187 @@ def test_assign_juriste_admin(client_for, admin_user, juriste_user, lead_status)
     assert juriste_user in lead.jurist_assigned.all()
 
 
-@patch("api.utils.email.leads.tasks.send_formulaire_task.delay")
-def test_send_formulaire_email(mock_task, client_for, admin_user, lead_status):
+def test_send_formulaire_email(client_for, admin_user, lead_status):
+    from datetime import datetime, timezone as dt_timezone
+
     lead = Lead.objects.create(
         first_name="Form",
         last_name="Email",
         phone="+336",
         email="test@test.com",
         status=lead_status,
-        appointment_date="2025-09-01T10:00:00Z",
+        appointment_date=datetime(2025, 9, 1, 10, 0, tzinfo=dt_timezone.utc),
     )
     client = client_for(admin_user)
     url = reverse("lead-send-formulaire-email", kwargs={"pk": lead.pk})
     response = client.post(url)
     assert response.status_code == 200
-    mock_task.assert_called_once_with(lead.pk)
+    assert EmailOutbox.objects.filter(kind=LEAD_FORMULAIRE, lead=lead).exists()
+
+
+def test_retrieve_lead_conditional_get(client_for, admin_user, lead_status):
+    lead = Lead.objects.create(
+        first_name="X", last_name="Y", phone="+336", status=lead_status
+    )
+    client = client_for(admin_user)
+    url = reverse("lead-detail", kwargs={"pk": lead.pk})
+
+    first = client.get(url)
+    assert first.status_code == 200
+    etag = first["ETag"]
+
+    second = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert second.status_code == 304
+
+    stats = client.get(reverse("lead-conditional-stats")).data
+    lead_stats = next(s for s in stats if s["resource"] == "lead")
+    assert lead_stats["hits"] >= 1 and lead_stats["misses"] >= 1
+
+
+def test_lead_etag_changes_on_related_writes(
+    client_for, admin_user, conseiller_user, lead_status
+):
+    from api.clients.models import Client
+
+    lead = Lead.objects.create(
+        first_name="X", last_name="Y", phone="+336", status=lead_status
+    )
+    client = client_for(admin_user)
+    url = reverse("lead-detail", kwargs={"pk": lead.pk})
+
+    etag = client.get(url)["ETag"]
+    lead.assigned_to.add(conseiller_user)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+
+    etag = response["ETag"]
+    Client.objects.create(lead=lead)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+# ==== REQUÊTES SQL (régression N+1) ====
+
+
+def _create_full_leads(count, lead_status, conseiller, juriste, creator, start=0):
+    """
+    Crée des leads complets : fiche client + type de demande, contrat, assignations.
+    """
+    from datetime import datetime, timezone as dt_timezone
+    from decimal import Decimal
+
+    from api.clients.models import Client
+    from api.contracts.models import Contract
+    from api.services.models import Service
+
+    service, _ = Service.objects.get_or_create(
+        code="VISA", defaults={"label": "Visa", "price": Decimal("100.00")}
+    )
+    for i in range(start, start + count):
+        lead = Lead.objects.create(
+            first_name=f"Lead{i}",
+            last_name="Nplus",
+            phone=f"+3360000{i:04d}",
+            status=lead_status,
+            appointment_date=datetime(2025, 9, 1, 10, 0, tzinfo=dt_timezone.utc),
+        )
+        lead.assigned_to.add(conseiller)
+        lead.jurist_assigned.add(juriste)
+        client = Client.objects.create(lead=lead, type_demande=service)
+        Contract.objects.create(
+            client=client,
+            created_by=creator,
+            service=service,
+            amount_due=Decimal("100.00"),
+        )
+
+
+def _count_queries(client, url, **params):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url, params)
+    assert response.status_code == 200
+    return len(ctx.captured_queries), response
+
+
+@pytest.mark.parametrize(
+    "url_name, params",
+    [
+        ("lead-list", {}),
+        ("lead-rdv-by-date", {"date": "2025-09-01"}),
+    ],
+)
+def test_lead_list_endpoints_query_count_is_constant(
+    url_name, params, client_for, admin_user, conseiller_user, juriste_user, lead_status
+):
+    client = client_for(admin_user)
+    url = reverse(url_name)
+
+    _create_full_leads(2, lead_status, conseiller_user, juriste_user, admin_user)
+    few, _ = _count_queries(client, url, **params)
+
+    _create_full_leads(
+        6, lead_status, conseiller_user, juriste_user, admin_user, start=2
+    )
+    many, response = _count_queries(client, url, **params)
+
+    assert many == few
+    results = response.data["results"] if isinstance(response.data, dict) else response.data
+    assert len(results) == 8
+    assert all(r["contract_emitter_id"] == str(admin_user.id) for r in results)
+
+
+def test_lead_list_compact_view(
+    client_for, admin_user, conseiller_user, juriste_user, lead_status
+):
+    client = client_for(admin_user)
+    url = reverse("lead-list")
+
+    _create_full_leads(2, lead_status, conseiller_user, juriste_user, admin_user)
+    few, _ = _count_queries(client, url, view="compact")
+    _create_full_leads(
+        4, lead_status, conseiller_user, juriste_user, admin_user, start=2
+    )
+    many, response = _count_queries(client, url, view="compact")
+
+    assert many == few
+    row = response.data["results"][0]
+    assert row["status_code"] == RDV_PLANIFIE
+    assert row["conseillers"][0]["id"] == conseiller_user.id
+    assert row["jurists"][0]["last_name"] == "User"
+    assert "form_data" not in row
+
+
+def test_lead_list_fields_projection(client_for, admin_user, lead_status):
+    Lead.objects.create(first_name="X", last_name="Y", phone="+336", status=lead_status)
+    client = client_for(admin_user)
+    url = reverse("lead-list")
+
+    response = client.get(url, {"fields": "first_name,status_label"})
+    assert response.status_code == 200
+    assert response.data["results"] == [{"first_name": "X", "status_label": "Planifié"}]
+
+    response = client.get(url, {"fields": "first_name,inconnu"})
+    assert response.status_code == 400
+
+
+def test_lead_list_projection_formats_like_serializer(client_for, admin_user, lead_status):
+    from datetime import datetime, timezone as dt_timezone
+
+    lead = Lead.objects.create(
+        first_name="X",
+        last_name="Y",
+        phone="+336",
+        status=lead_status,
+        appointment_date=datetime(2025, 9, 1, 10, 0, tzinfo=dt_timezone.utc),
+    )
+    client = client_for(admin_user)
+
+    full = client.get(reverse("lead-detail", kwargs={"pk": lead.pk})).data
+    row = client.get(reverse("lead-list"), {"view": "compact"}).data["results"][0]
+    # Même format qu'en fiche complète : heure de Paris, « JJ/MM/AAAA hh:mm »
+    assert row["appointment_date"] == full["appointment_date"] == "01/09/2025 12:00"
+    assert row["created_at"] == full["created_at"]
@@ -0,0 +1,213 @@
+"""
+Machine à états des leads : statut (`LeadStatus`) et statut du dossier (`StatutDossier`).
+
+- Statut : transitions permises déclarées par code (`LEAD_STATUS_TRANSITIONS`) ; un
+  statut créé en base hors de ces codes n'est pas contraint.
+- Statut du dossier (codes définis en base) : règles optionnelles du réglage
+  `STATUT_DOSSIER_TRANSITIONS` (`{code: [codes suivants]}`), libre par défaut.
+- Rester sur le même statut, ou partir d'un lead sans statut, est toujours permis.
+
+`transition_leads` applique un même changement à un lot de leads : états lus (et
+verrouillés) en une requête, leads refusés écartés, un seul UPDATE (charge des
+conseillers ajustée), historique (`LeadTransition`) et e-mails insérés en lot, un seul
+événement websocket après validation.
+"""
+
+import logging
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from api.appointment_reports.services import sync_entries
+from api.email_outbox.kinds import (
+    LEAD_APPOINTMENT_CONFIRMED,
+    LEAD_APPOINTMENT_PLANNED,
+    LEAD_DOSSIER_STATUS,
+)
+from api.email_outbox.services import enqueue_emails
+from api.lead_assignment.services import tracking_loads
+from api.leads.constants import ABSENT, PRESENT, RDV_CONFIRME, RDV_PLANIFIE
+from api.leads.models import Lead, LeadTransition
+from api.utils.reference_data import get_reference_entry, get_reference_instance
+from api.websocket.signals.leads import broadcast_leads_bulk
+
+logger = logging.getLogger(__name__)
+
+# Statut actuel → statuts suivants permis
+LEAD_STATUS_TRANSITIONS = {
+    RDV_PLANIFIE: {RDV_CONFIRME, ABSENT, PRESENT},
+    RDV_CONFIRME: {RDV_PLANIFIE, ABSENT, PRESENT},
+    ABSENT: {RDV_PLANIFIE, RDV_CONFIRME, PRESENT},
+    PRESENT: {RDV_PLANIFIE, RDV_CONFIRME},
+}
+
+# Champ du lead → jeu de données de référence de ses statuts
+TRANSITION_DATASETS = {
+    LeadTransition.Field.STATUS: "lead_statuses",
+    LeadTransition.Field.STATUT_DOSSIER: "statut_dossiers",
+}
+
+# Nouveau statut → e-mail envoyé au lead
+STATUS_EMAILS = {
+    RDV_PLANIFIE: LEAD_APPOINTMENT_PLANNED,
+    RDV_CONFIRME: LEAD_APPOINTMENT_CONFIRMED,
+}
+
+
+class TransitionError(ValueError):
+    """Changement de statut non permis par la machine à états."""
+
+
+def _rules(field) -> dict:
+    if field == LeadTransition.Field.STATUS:
+        return LEAD_STATUS_TRANSITIONS
+    return getattr(settings, "STATUT_DOSSIER_TRANSITIONS", {})
+
+
+def is_allowed(field, from_code, to_code) -> bool:
+    if not from_code or from_code == to_code:
+        return True
+    allowed = _rules(field).get(from_code)
+    return allowed is None or to_code in allowed
+
+
+def check_transition(field, from_code, to_code):
+    if not is_allowed(field, from_code, to_code):
+        raise TransitionError(
+            f"Passage de « {from_code} » à « {to_code or 'aucun'} » non permis."
+        )
+
+
+def codes(field) -> dict:
+    """`{id: code}` des statuts du champ, lus dans le cache des données de référence."""
+    entry = get_reference_entry(TRANSITION_DATASETS[field])
+    index = entry["fields"].index("code")
+    return {row[0]: row[index] for row in entry["rows"].values()}
+
+
+def status_by_code(field, code):
+    """Instance du statut de code `code` (cache des données de référence), `None` si inconnu."""
+    for pk, value in codes(field).items():
+        if value == code:
+            return get_reference_instance(TRANSITION_DATASETS[field], pk)
+    return None
+
+
+def record_transitions(rows, source=LeadTransition.Source.API, by=None, at=None) -> list:
+    """Historique en une insertion ; `rows` : suite de `(lead_id, champ, code avant, code après)`."""
+    at = at or timezone.now()
+    return LeadTransition.objects.bulk_create(
+        [
+            LeadTransition(
+                lead_id=lead_id,
+                field=field,
+                from_code=from_code or "",
+                to_code=to_code or "",
+                source=source,
+                changed_by=by,
+                changed_at=at,
+            )
+            for lead_id, field, from_code, to_code in rows
+        ]
+    )
+
+
+def _enqueue_notifications(targets, notified):
+    """E-mails des leads (avec adresse) ayant changé, une insertion par type."""
+    by_kind = {}
+    if notified[LeadTransition.Field.STATUS]:
+        kind = STATUS_EMAILS.get(getattr(targets.get("status"), "code", None))
+        if kind:
+            by_kind[kind] = notified[LeadTransition.Field.STATUS]
+    if notified[LeadTransition.Field.STATUT_DOSSIER] and targets.get("statut_dossier"):
+        by_kind[LEAD_DOSSIER_STATUS] = notified[LeadTransition.Field.STATUT_DOSSIER]
+    for kind, lead_ids in by_kind.items():
+        enqueue_emails(kind, [(lead_id, None, None) for lead_id in lead_ids])
+
+
+@transaction.atomic
+def transition_leads(lead_ids, targets: dict, by=None, source=LeadTransition.Source.BULK) -> dict:
+    """
+    Passe les leads `lead_ids` aux statuts `targets` (`{"status": LeadStatus,
+    "statut_dossier": StatutDossier | None}`, l'un ou l'autre ou les deux).
+
+    Un lead dont l'une des transitions n'est pas permise est écarté en entier ; ceux
+    déjà dans l'état demandé sont laissés tels quels. Ids inconnus ignorés.
+    """
+    fields = [LeadTransition.Field(field) for field in targets]
+    requested = {int(pk) for pk in lead_ids}
+    known = {field: codes(field) for field in fields}
+    wanted = {field: getattr(targets[field], "pk", None) for field in fields}
+    wanted_code = {field: known[field].get(wanted[field], "") for field in fields}
+    summary = {field.value: wanted_code[field] for field in fields}
+
+    rows = (
+        Lead.objects.select_for_update(of=("self",))
+        .filter(pk__in=requested)
+        .order_by("pk")
+        .values_list("pk", "email", *(f"{field}_id" for field in fields))
+    )
+    found, updated, unchanged, rejected, history = set(), [], [], [], []
+    notified = defaultdict(list)
+    for pk, email, *current in rows:
+        found.add(pk)
+        before = dict(zip(fields, current))
+        refused = next(
+            (
+                field
+                for field in fields
+                if not is_allowed(field, known[field].get(before[field], ""), wanted_code[field])
+            ),
+            None,
+        )
+        if refused:
+            rejected.append(
+                {
+                    "id": pk,
+                    "field": refused.value,
+                    "from": known[refused].get(before[refused], ""),
+                    "to": wanted_code[refused],
+                }
+            )
+            continue
+        changed = [field for field in fields if before[field] != wanted[field]]
+        if not changed:
+            unchanged.append(pk)
+            continue
+        updated.append(pk)
+        for field in changed:
+            history.append((pk, field, known[field].get(before[field]), wanted_code[field]))
+            if email:
+                notified[field].append(pk)
+
+    if updated:
+        now = timezone.now()
+        with tracking_loads(updated, fields=targets):
+            Lead.objects.filter(pk__in=updated).update(
+                updated_at=now, **{field.value: targets[field] for field in fields}
+            )
+        record_transitions(history, source=source, by=by, at=now)
+        _enqueue_notifications(targets, notified)
+
+        # Mise à jour en masse (sans signaux) : rapport des RDV et front mis à jour en une fois
+        if LeadTransition.Field.STATUS in fields:
+            transaction.on_commit(lambda: sync_entries(updated))
+        transaction.on_commit(
+            lambda: broadcast_leads_bulk("updated", updated, extra=summary)
+        )
+
+    logger.info(
+        "🔀 Transition %s : %s lead(s) modifié(s), %s inchangé(s), %s refusé(s)",
+        summary,
+        len(updated),
+        len(unchanged),
+        len(rejected),
+    )
+    return {
+        "updated": updated,
+        "unchanged": unchanged,
+        "rejected": rejected,
+        "missing": sorted(requested - found),
+    }
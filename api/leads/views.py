@@ -1,7 +1,10 @@
 # api/leads/views.py
 
+from copy import copy
+from uuid import UUID
+
 from django.db import transaction
-from django.db.models import F, Q
+from django.db.models import Count, F, Q
 from django.utils.dateparse import parse_date
 from rest_framework import status as drf_status
 from rest_framework import viewsets
@@ -11,20 +14,46 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
 from api.booking.models import SlotQuota
+from api.lead_assignment.services import auto_assign_new, tracking_loads
 from api.lead_status.models import LeadStatus
+from api.leads.assignment import (
+    ASSIGNMENT_ROLES,
+    AssignmentError,
+    assign_leads,
+    assignable_users,
+    role_users,
+)
 from api.leads.constants import ABSENT, PRESENT, RDV_CONFIRME, RDV_PLANIFIE
-from api.leads.models import Lead
+from api.leads.duplicates import (
+    attach_appointment,
+    booking_confirmation,
+    find_existing_lead,
+)
+from api.leads.models import Lead, LeadTransition
 from api.leads.permissions import IsConseillerOrAdmin, IsLeadCreator
-from api.leads.serializers import LeadSerializer
-from api.users.models import User
+from api.leads.purge import schedule_purge
+from api.leads.serializers import LeadSerializer, LeadTransitionSerializer
+from api.leads.transitions import (
+    TRANSITION_DATASETS,
+    TransitionError,
+    check_transition,
+    record_transitions,
+    status_by_code,
+    transition_leads,
+)
+from api.users.permissions import IsAdminRole
 from api.users.roles import UserRoles
-from api.utils.email.leads.tasks import (
-    send_appointment_confirmation_task,
-    send_appointment_planned_task,
-    send_dossier_status_notification_task,
-    send_formulaire_task,
-    send_jurist_assigned_notification_task
+from api.utils.conditional import ConditionalRetrieveMixin, get_conditional_stats
+from api.utils.phones import normalize_phone
+from api.utils.projection import ProjectionListMixin, load_m2m_users
+from api.websocket.signals.leads import broadcast_lead_updated
+from api.email_outbox.kinds import (
+    LEAD_APPOINTMENT_CONFIRMED,
+    LEAD_APPOINTMENT_PLANNED,
+    LEAD_DOSSIER_STATUS,
+    LEAD_FORMULAIRE,
 )
+from api.email_outbox.services import enqueue_email
 
 """
 Vues pour la gestion des Leads via API REST.
@@ -38,7 +67,23 @@ Chaque action respecte les permissions associées au rôle utilisateur.
 """
 
 
-class LeadViewSet(viewsets.ModelViewSet):
+def _parse_ids(value, field, required=True, cast=int) -> list:
+    """Liste d'ids (dédoublonnés, dans l'ordre) lue dans le corps de la requête."""
+    if not isinstance(value, list) or (required and not value):
+        raise ValidationError({field: "Liste d'ids attendue."})
+    try:
+        return list(dict.fromkeys(cast(pk) for pk in value))
+    except (TypeError, ValueError, AttributeError):
+        raise ValidationError({field: "Ids invalides."})
+
+
+def _user_id(value) -> UUID:
+    return UUID(str(value))
+
+
+class LeadViewSet(
+    ProjectionListMixin, ConditionalRetrieveMixin, viewsets.ModelViewSet
+):
     """
     ViewSet principal pour la gestion des leads.
 
@@ -47,7 +92,10 @@ class LeadViewSet(viewsets.ModelViewSet):
     - Assignation des conseillers ou juristes
     - Création publique avec gestion de quota horaire
     - Envoi automatique de notifications email selon le statut ou la modification
+    - Transitions de statut contrôlées (machine à états), en masse et historisées
     - Filtres dynamiques sur la date, le statut, le texte
+    - Fiche détail conditionnelle (ETag / 304, voir `ConditionalRetrieveMixin`)
+    - Liste projetée `?view=compact` / `?fields=` (voir `ProjectionListMixin`)
 
     Permissions :
     - Créateur du lead (IsLeadCreator) par défaut
@@ -58,9 +106,61 @@ class LeadViewSet(viewsets.ModelViewSet):
     serializer_class = LeadSerializer
     permission_classes = [IsLeadCreator]
 
+    etag_resource = "lead"
+    etag_version_fields = ("updated_at", "form_data__updated_at")
+    etag_reference_datasets = (
+        "lead_statuses",
+        "statut_dossiers",
+        "statut_dossiers_internes",
+        "services",
+    )
+    # Avatars des assignés servis en URLs signées (1h)
+    etag_max_age = 30 * 60
+
+    projection_fields = {
+        "id": "id",
+        "first_name": "first_name",
+        "last_name": "last_name",
+        "email": "email",
+        "phone": "phone",
+        "appointment_date": "appointment_date",
+        "created_at": "created_at",
+        "status_id": "status_id",
+        "status_code": "status__code",
+        "status_label": "status__label",
+        "status_color": "status__color",
+        "statut_dossier_id": "statut_dossier_id",
+        "statut_dossier_code": "statut_dossier__code",
+        "statut_dossier_label": "statut_dossier__label",
+        "statut_dossier_color": "statut_dossier__color",
+        "statut_dossier_interne_id": "statut_dossier_interne_id",
+        "statut_dossier_interne_label": "statut_dossier_interne__label",
+        "client_id": "form_data__id",
+        "type_demande_label": "form_data__type_demande__label",
+    }
+    projection_relations = {
+        "conseillers": load_m2m_users(Lead.assigned_to.through, "lead_id"),
+        "jurists": load_m2m_users(Lead.jurist_assigned.through, "lead_id"),
+    }
+    projection_compact = (
+        "id",
+        "first_name",
+        "last_name",
+        "email",
+        "phone",
+        "appointment_date",
+        "created_at",
+        "status_code",
+        "status_label",
+        "status_color",
+        "statut_dossier_label",
+        "conseillers",
+        "jurists",
+    )
+
     def get_queryset(self):
-        user = self.request.user
-        queryset = Lead.objects.all()
+        # Jointures / prefetch alignés sur ce que lit LeadSerializer (pas de N+1)
+        queryset = LeadSerializer.setup_eager_loading(Lead.objects.all())
 
         # ⚡️ Pas de filtrage par rôle → tout le monde voit le même jeu de données
         queryset = self._filter_by_search(queryset)
@@ -74,12 +174,18 @@ class LeadViewSet(viewsets.ModelViewSet):
     def _filter_by_search(self, queryset):
         search = self.request.query_params.get("search")
         if search:
-            return queryset.filter(
+            condition = (
                 Q(first_name__icontains=search)
                 | Q(last_name__icontains=search)
                 | Q(phone__icontains=search)
                 | Q(email__icontains=search)
             )
+            # Numéro complet, quel que soit le format saisi (06…, +33 6…, 0033…) :
+            # égalité sur la colonne normalisée indexée
+            phone = normalize_phone(search)
+            if phone:
+                condition |= Q(phone_normalized=phone)
+            return queryset.filter(condition)
         return queryset
 
     def _filter_by_status(self, queryset):
@@ -102,12 +208,20 @@ class LeadViewSet(viewsets.ModelViewSet):
     def get_permissions(self):
         if self.action == "public_create":
             return [AllowAny()]
-        if self.action in ["assignment", "request_assignment"]:
+        if self.action in ["assignment", "request_assignment", "bulk_transition"]:
             return [IsConseillerOrAdmin()]
+        if self.action in (
+            "conditional_stats",
+            "purge",
+            "bulk_assignment",
+            "transition_stats",
+        ):
+            return [IsAdminRole()]
         return super().get_permissions()
 
     # ==== CREATE & UPDATE ====
 
+    @transaction.atomic
     def perform_create(self, serializer):
         lead_status = serializer.validated_data.get("status")
         if not lead_status:
@@ -128,16 +242,48 @@ class LeadViewSet(viewsets.ModelViewSet):
             return
 
         if code == RDV_PLANIFIE:
-            send_appointment_planned_task.delay(lead.id)
+            enqueue_email(LEAD_APPOINTMENT_PLANNED, lead=lead)
         elif code == RDV_CONFIRME:
-            send_appointment_confirmation_task.delay(lead.id)
+            enqueue_email(LEAD_APPOINTMENT_CONFIRMED, lead=lead)
 
+    @transaction.atomic
     def perform_update(self, serializer):
-        lead_before = self.get_object()
-        lead_after = serializer.save()
+        # État avant modification copié depuis l'instance déjà chargée (pas de relecture)
+        lead_before = copy(serializer.instance)
+        self._check_transitions(lead_before, serializer.validated_data)
+        with tracking_loads([lead_before.pk], fields=serializer.validated_data):
+            lead_after = serializer.save()
 
+        self._record_transitions(lead_before, lead_after)
         self._handle_update_notifications(lead_before, lead_after)
 
+    def _check_transitions(self, lead, data):
+        for field in TRANSITION_DATASETS:
+            if field not in data:
+                continue
+            try:
+                check_transition(
+                    field,
+                    getattr(getattr(lead, field), "code", ""),
+                    getattr(data[field], "code", ""),
+                )
+            except TransitionError as e:
+                raise ValidationError({f"{field.value}_id": str(e)})
+
+    def _record_transitions(self, before, after):
+        rows = [
+            (
+                after.pk,
+                field,
+                getattr(getattr(before, field), "code", ""),
+                getattr(getattr(after, field), "code", ""),
+            )
+            for field in TRANSITION_DATASETS
+            if getattr(before, f"{field}_id") != getattr(after, f"{field}_id")
+        ]
+        if rows:
+            record_transitions(rows, by=self.request.user)
+
     def _handle_update_notifications(self, before, after):
         if not after.email:
             return
@@ -156,7 +302,7 @@ class LeadViewSet(viewsets.ModelViewSet):
             self._send_notifications(after)
 
         if statut_dossier_changed and after.statut_dossier:
-            send_dossier_status_notification_task.delay(after.id)
+            enqueue_email(LEAD_DOSSIER_STATUS, lead=after)
 
     # ====== ROUTES PERSONNALISÉES ======
 
@@ -172,9 +318,14 @@ class LeadViewSet(viewsets.ModelViewSet):
 
         Valide que le créneau horaire est disponible.
         Réserve dynamiquement un slot (`SlotQuota`) si disponible.
+        Si un lead existe déjà au même téléphone, le rendez-vous lui est rattaché au lieu
+        de créer un doublon ; la réponse (201) est la même dans les deux cas, sans
+        données du lead.
+        Un nouveau lead est assigné au conseiller disponible le moins chargé.
         Envoie un email selon le statut choisi (RDV_PLANIFIE ou RDV_CONFIRME).
         """
-        serializer = self.get_serializer(data=request.data)
+        existing = find_existing_lead(request.data.get("phone"), use_filter=True)
+        serializer = self.get_serializer(existing, data=request.data)
         serializer.is_valid(raise_exception=True)
 
         appt_dt = serializer.validated_data.get("appointment_date")
@@ -200,11 +351,44 @@ class LeadViewSet(viewsets.ModelViewSet):
             lead_status = (
                 serializer.validated_data.get("status") or self._get_default_status()
             )
-            lead = serializer.save(status=lead_status)
+            if existing is None:
+                lead = serializer.save(status=lead_status)
+                if not serializer.validated_data.get("assigned_to"):
+                    auto_assign_new([lead])
+            else:
+                lead = attach_appointment(
+                    existing, appt_dt, lead_status, email=serializer.validated_data.get("email")
+                )
+            self._send_notifications(lead)
 
-        self._send_notifications(lead)
         return Response(
-            self.get_serializer(lead).data, status=drf_status.HTTP_201_CREATED
+            booking_confirmation(lead.appointment_date), status=drf_status.HTTP_201_CREATED
+        )
+
+    @action(detail=False, methods=["get"], url_path="conditional-stats")
+    def conditional_stats(self, request):
+        """
+        Mesures des GET conditionnels sur les fiches (taux de 304, temps évité).
+        Réservé aux administrateurs.
+        """
+        return Response(
+            [get_conditional_stats(name) for name in ("lead", "client", "contract")]
+        )
+
+    @action(detail=False, methods=["post"], url_path="purge")
+    def purge(self, request):
+        """
+        Suppression définitive de leads en masse (RGPD), avec fiche client, contrats,
+        reçus, documents et fichiers S3. Réservé aux administrateurs.
+
+        Body : {"ids": [1, 2, ...]} — la purge est exécutée en tâche de fond (202).
+        """
+        ids = set(_parse_ids(request.data.get("ids"), "ids"))
+        found = list(Lead.objects.filter(pk__in=ids).values_list("pk", flat=True))
+        schedule_purge(found)
+        return Response(
+            {"scheduled": len(found), "missing": sorted(ids - set(found))},
+            status=drf_status.HTTP_202_ACCEPTED,
         )
 
     @action(detail=False, methods=["get"], url_path="count-by-status")
@@ -238,16 +422,6 @@ class LeadViewSet(viewsets.ModelViewSet):
         - ADMIN : peut assigner/désassigner n'importe quel conseiller + s'auto-assigner
         - CONSEILLER : peut uniquement s'auto-assigner ou se désassigner.
         """
-
-        import sys
-        print("=" * 80, file=sys.stderr)
-        print("🔥 ASSIGNMENT APPELÉ !", file=sys.stderr)
-        print(f"User: {request.user.email}", file=sys.stderr)
-        print(f"Role: {request.user.role}", file=sys.stderr)
-        print(f"PK: {pk}", file=sys.stderr)
-        print(f"Data: {request.data}", file=sys.stderr)
-        print("=" * 80, file=sys.stderr)
-
         lead = self.get_object()
         user = request.user
 
@@ -258,33 +432,21 @@ class LeadViewSet(viewsets.ModelViewSet):
             )
 
         action = request.data.get("action")
-        assign_ids = request.data.get("assign", [])
-        unassign_ids = request.data.get("unassign", [])
 
         # ✅ Cas 1 : Auto-assignation/désassignation (action="assign" ou "unassign")
-        if action in ["assign", "unassign"]:
-            if action == "assign":
-                if not lead.assigned_to.filter(id=user.id).exists():
-                    lead.assigned_to.add(user)
-            elif action == "unassign":
-                if lead.assigned_to.filter(id=user.id).exists():
-                    lead.assigned_to.remove(user)
+        if action == "assign":
+            assign_leads([lead.pk], "assigned_to", assign=[user.id])
+        elif action == "unassign":
+            assign_leads([lead.pk], "assigned_to", unassign=[user.id])
 
         # ✅ Cas 2 : Admin assigne/désassigne d'autres conseillers (via arrays)
         elif user.role == UserRoles.ADMIN:
-            if assign_ids:
-                valid_users = User.objects.filter(
-                    id__in=assign_ids, role=UserRoles.CONSEILLER, is_active=True
-                )
-                if valid_users.count() != len(assign_ids):
-                    raise NotFound("Un ou plusieurs conseillers sont introuvables.")
-                lead.assigned_to.add(*valid_users)
-
-            if unassign_ids:
-                users_to_unassign = User.objects.filter(
-                    id__in=unassign_ids, role=UserRoles.CONSEILLER
-                )
-                lead.assigned_to.remove(*users_to_unassign)
+            self._assign_role(
+                [lead.pk],
+                "conseiller",
+                request.data.get("assign", []),
+                request.data.get("unassign", []),
+            )
 
         # ✅ Cas 3 : Conseiller essaie d'assigner quelqu'un d'autre
         else:
@@ -293,8 +455,7 @@ class LeadViewSet(viewsets.ModelViewSet):
                 status=400
             )
 
-        lead.save()
-        return Response(self.get_serializer(lead).data)
+        return Response(self._reloaded(lead, "assigned_to"))
 
     @action(detail=True, methods=["patch"], url_path="assign-juristes")
     def assign_juristes(self, request, pk=None):
@@ -306,27 +467,115 @@ class LeadViewSet(viewsets.ModelViewSet):
             raise PermissionDenied("Seul un admin peut gérer les juristes assignés.")
 
         lead = self.get_object()
-        assign_ids = request.data.get("assign", [])
-        unassign_ids = request.data.get("unassign", [])
+        self._assign_role(
+            [lead.pk],
+            "juriste",
+            request.data.get("assign", []),
+            request.data.get("unassign", []),
+        )
+        return Response(self._reloaded(lead, "jurist_assigned"))
 
-        if assign_ids:
-            juristes = User.objects.filter(
-                id__in=assign_ids, role=UserRoles.JURISTE, is_active=True
-            )
-            if juristes.count() != len(assign_ids):
-                raise NotFound("Un ou plusieurs juristes à assigner sont introuvables.")
-            lead.jurist_assigned.add(*juristes)
+    @action(detail=False, methods=["post"], url_path="bulk-assignment")
+    def bulk_assignment(self, request):
+        """
+        Assigne / désassigne des conseillers ou des juristes à plusieurs leads en une
+        requête (redistribution depuis la liste). Réservé aux administrateurs.
 
-            if lead.email and juristes.exists():
-                main_jurist = juristes.first()
-                send_jurist_assigned_notification_task.delay(lead.id, main_jurist.id)
+        Body : {"ids": [...], "role": "conseiller" | "juriste",
+                "assign": [user_id, ...], "unassign": [user_id, ...]}
+        """
+        role = request.data.get("role", "conseiller")
+        if role not in ASSIGNMENT_ROLES:
+            raise ValidationError({"role": "Rôle attendu : conseiller ou juriste."})
+        lead_ids = _parse_ids(request.data.get("ids"), "ids")
+        assign = request.data.get("assign") or []
+        unassign = request.data.get("unassign") or []
+        if not assign and not unassign:
+            raise ValidationError({"assign": "Aucun utilisateur à assigner ou désassigner."})
+
+        result = self._assign_role(lead_ids, role, assign, unassign)
+        return Response(result)
+
+    def _assign_role(self, lead_ids, role, assign_ids, unassign_ids):
+        assign_ids = _parse_ids(assign_ids, "assign", required=False, cast=_user_id)
+        unassign_ids = _parse_ids(unassign_ids, "unassign", required=False, cast=_user_id)
+        try:
+            assign_ids = assignable_users(role, assign_ids)
+        except AssignmentError as e:
+            raise NotFound(str(e))
+        return assign_leads(
+            lead_ids,
+            ASSIGNMENT_ROLES[role][0],
+            assign=assign_ids,
+            unassign=role_users(role, unassign_ids),
+        )
 
-        if unassign_ids:
-            juristes = User.objects.filter(id__in=unassign_ids, role=UserRoles.JURISTE)
-            lead.jurist_assigned.remove(*juristes)
+    def _reloaded(self, lead, field):
+        # Liens écrits sans passer par le manager : relation et version rechargées
+        getattr(lead, "_prefetched_objects_cache", {}).pop(field, None)
+        lead.refresh_from_db(fields=["updated_at", "juriste_assigned_at"])
+        # Action sur un seul lead : `lead_updated` en plus de `leads_bulk_assigned`
+        transaction.on_commit(lambda: broadcast_lead_updated(lead))
+        return self.get_serializer(lead).data
 
-        lead.save()
-        return Response(self.get_serializer(lead).data)
+    @action(detail=False, methods=["post"], url_path="bulk-transition")
+    def bulk_transition(self, request):
+        """
+        Change le statut et / ou le statut du dossier de plusieurs leads en une requête,
+        selon la machine à états (voir `api.leads.transitions`). Les leads dont la
+        transition n'est pas permise sont retournés dans `rejected` et laissés tels quels.
+
+        Body : {"ids": [...], "status": "<code>", "statut_dossier": "<code>" | null}
+        """
+        lead_ids = _parse_ids(request.data.get("ids"), "ids")
+        targets = {}
+        for field in TRANSITION_DATASETS:
+            if field.value not in request.data:
+                continue
+            code = request.data[field.value]
+            if code is None and field == LeadTransition.Field.STATUT_DOSSIER:
+                targets[field] = None
+                continue
+            target = status_by_code(field, code) if isinstance(code, str) else None
+            if target is None:
+                raise ValidationError({field.value: f"Statut inconnu : {code}."})
+            targets[field] = target
+        if not targets:
+            raise ValidationError({"status": "Aucun statut demandé."})
+
+        return Response(transition_leads(lead_ids, targets, by=request.user))
+
+    @action(detail=True, methods=["get"], url_path="transitions")
+    def transitions(self, request, pk=None):
+        """Historique des changements de statut du lead, du plus récent au plus ancien."""
+        lead = self.get_object()
+        history = LeadTransition.objects.filter(lead=lead).select_related("changed_by")
+        return Response(LeadTransitionSerializer(history, many=True).data)
+
+    @action(detail=False, methods=["get"], url_path="transition-stats")
+    def transition_stats(self, request):
+        """
+        Nombre de transitions par champ et par couple (avant, après), en une requête
+        d'agrégation. Filtres : `?from=YYYY-MM-DD&to=YYYY-MM-DD&field=status`.
+        """
+        history = LeadTransition.objects.all()
+        for param, lookup in (("from", "changed_at__date__gte"), ("to", "changed_at__date__lte")):
+            value = request.query_params.get(param)
+            if value:
+                day = parse_date(value)
+                if day is None:
+                    raise ValidationError({param: "Date attendue au format YYYY-MM-DD."})
+                history = history.filter(**{lookup: day})
+        field = request.query_params.get("field")
+        if field:
+            history = history.filter(field=field)
+
+        rows = (
+            history.values("field", "from_code", "to_code")
+            .annotate(count=Count("id"))
+            .order_by("field", "-count", "from_code", "to_code")
+        )
+        return Response(list(rows))
 
     @action(detail=True, methods=["post"], url_path="send-formulaire-email")
     def send_formulaire_email(self, request, pk=None):
@@ -334,7 +583,7 @@ class LeadViewSet(viewsets.ModelViewSet):
         Déclenche l’envoi d’un e-mail contenant le formulaire au lead concerné.
         """
         lead = self.get_object()
-        send_formulaire_task.delay(lead.id)
+        enqueue_email(LEAD_FORMULAIRE, lead=lead)
         return Response({"detail": "E-mail de formulaire envoyé."}, status=200)
 
     @action(detail=False, methods=["get"], url_path="rdv-by-date")
@@ -370,7 +619,7 @@ class LeadViewSet(viewsets.ModelViewSet):
 
         # --- Récupération des leads ---
         leads = (
-            Lead.objects
+            LeadSerializer.setup_eager_loading(Lead.objects.all())
             .filter(
                 status__in=statuses,
                 appointment_date__date=parsed_date
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class MonitoringConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "api.monitoring"
+
+    def ready(self):
+        from api.utils.task_queues import connect_task_signals
+
+        connect_task_signals()
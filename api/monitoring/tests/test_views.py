@@ -0,0 +1,131 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+import yaml
+from django.conf import settings as django_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api.users.models import User
+from api.users.roles import UserRoles
+from api.utils.task_queues import (
+    WORKER_GROUPS,
+    QueueAnnotations,
+    _record,
+    get_queue_names,
+    get_task_latency_stats,
+    queue_for_task,
+    reset_task_latency_stats,
+    worker_command,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def latency():
+    reset_task_latency_stats()
+    yield
+    reset_task_latency_stats()
+
+
+def _client(role):
+    user = User.objects.create_user(
+        email=f"{role.lower()}@example.com",
+        password="pass",
+        role=role,
+        first_name="Test",
+        last_name="User",
+    )
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.mark.parametrize(
+    "task_name, queue",
+    [
+        ("api.email_outbox.tasks.drain_email_outbox", "emails-outbox"),
+        ("api.utils.email.leads.tasks.send_appointment_confirmation_task", "emails-urgent"),
+        ("api.leads.tasks.send_reminder_emails", "emails-bulk"),
+        ("api.payments.tasks.send_payment_due_reminders", "emails-bulk"),
+        ("api.utils.email.contracts.tasks.send_contract_email_task", "pdf-render"),
+        ("api.utils.email.recus.tasks.send_receipts_email_task", "pdf-render"),
+        ("api.leads.tasks.send_daily_appointments_report_task", "reports"),
+        ("api.lead_imports.tasks.run_lead_import", "imports"),
+        ("api.lead_dedup.tasks.run_duplicate_detection", "imports"),
+        ("api.leads.tasks.rebuild_lead_probe_filter", "imports"),
+        ("api.leads.tasks.purge_leads_task", "imports"),
+        ("api.reconciliation.tasks.run_reconciliation", "imports"),
+        ("api.lead_assignment.tasks.rebalance_leads_task", "imports"),
+        ("api.inconnu.tasks.autre", "default"),
+    ],
+)
+def test_tasks_routed_by_class(task_name, queue):
+    assert queue_for_task(task_name) == queue
+
+
+def test_every_queue_is_served_by_a_deployed_worker():
+    render = yaml.safe_load((Path(django_settings.BASE_DIR) / "render.yaml").read_text())
+    commands = [s["dockerCommand"] for s in render["services"] if s["type"] == "worker"]
+
+    assert sorted(commands) == sorted(
+        worker_command(*queues, name=name) for name, queues in WORKER_GROUPS.items()
+    )
+    served = [queue for queues in WORKER_GROUPS.values() for queue in queues]
+    assert sorted(served) == sorted(get_queue_names())
+    routed = {route["queue"] for route in django_settings.CELERY_TASK_ROUTES.values()}
+    assert routed <= set(served)
+
+
+def test_time_limits_follow_queue(settings):
+    limits = QueueAnnotations().annotate(
+        SimpleNamespace(name="api.leads.tasks.mark_absent_leads")
+    )
+    assert limits == {
+        "time_limit": settings.CELERY_QUEUE_SETTINGS["emails-bulk"]["time_limit"],
+        "soft_time_limit": settings.CELERY_QUEUE_SETTINGS["emails-bulk"]["soft_time_limit"],
+    }
+
+
+def test_latency_percentiles(latency):
+    for value in range(1, 101):
+        _record("reports", "run_ms", value)
+
+    stats = get_task_latency_stats(["reports"])["reports"]
+
+    assert stats["run_ms"] == {"samples": 100, "p50": 51, "p90": 90, "p99": 99}
+    assert stats["wait_ms"]["samples"] == 0
+
+
+def test_monitoring_endpoint_admin_only(latency):
+    _record("emails-urgent", "wait_ms", 12)
+    url = reverse("monitoring-tasks")
+
+    response = _client(UserRoles.ADMIN).get(url)
+    assert response.status_code == 200
+    urgent = response.data["emails-urgent"]
+    assert urgent["latency"]["wait_ms"]["p50"] == 12
+    assert "-Q emails-urgent" in urgent["worker"]
+    assert set(response.data) == {
+        "emails-urgent",
+        "emails-outbox",
+        "emails-bulk",
+        "pdf-render",
+        "reports",
+        "imports",
+        "default",
+    }
+
+    assert _client(UserRoles.ACCUEIL).get(url).status_code == 403
+
+
+def test_background_endpoint_admin_only():
+    url = reverse("monitoring-background")
+
+    response = _client(UserRoles.ADMIN).get(url)
+    assert response.status_code == 200
+    assert {"active", "queued", "max_workers", "submitted", "inline"} <= set(response.data)
+
+    assert _client(UserRoles.JURISTE).get(url).status_code == 403
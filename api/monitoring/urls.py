@@ -0,0 +1,8 @@
+from django.urls import path
+
+from api.monitoring.views import BackgroundMonitoringView, TaskMonitoringView
+
+urlpatterns = [
+    path("tasks/", TaskMonitoringView.as_view(), name="monitoring-tasks"),
+    path("background/", BackgroundMonitoringView.as_view(), name="monitoring-background"),
+]
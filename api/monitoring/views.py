@@ -0,0 +1,54 @@
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from api.users.permissions import IsAdminRole
+from api.utils.background import get_background_stats
+from api.utils.task_queues import (
+    get_queue_depths,
+    get_queue_names,
+    get_queue_settings,
+    get_task_latency_stats,
+    worker_command,
+)
+
+
+class TaskMonitoringView(APIView):
+    """
+    GET /api/monitoring/tasks/ (ADMIN)
+
+    État des files Celery : messages en attente, percentiles d'attente et d'exécution
+    (ms) des derniers échantillons, réglages et ligne de lancement du worker de chaque file.
+    """
+
+    permission_classes = [IsAdminRole]
+
+    def get(self, request):
+        queues = get_queue_names()
+        depths = get_queue_depths(queues)
+        latency = get_task_latency_stats(queues)
+        settings = get_queue_settings()
+        return Response(
+            {
+                queue: {
+                    "depth": depths.get(queue),
+                    "latency": latency.get(queue),
+                    "settings": settings.get(queue, {}),
+                    "worker": worker_command(queue),
+                }
+                for queue in queues
+            }
+        )
+
+
+class BackgroundMonitoringView(APIView):
+    """
+    GET /api/monitoring/background/ (ADMIN)
+
+    Exécuteur d'arrière-plan du processus web qui répond : tâches actives, en file,
+    limites, et compteurs cumulés (soumises, terminées, en échec, exécutées sur place).
+    """
+
+    permission_classes = [IsAdminRole]
+
+    def get(self, request):
+        return Response(get_background_stats())
@@ -1,5 +1,7 @@
 from rest_framework import permissions, viewsets
 
+from api.utils.reference_data import ReferenceDataListMixin
+
 from .models import OpeningHours
 from .serializers import OpeningHoursSerializer
 
@@ -16,7 +18,8 @@ class IsAdminOrReadOnly(permissions.BasePermission):
         return request.user and getattr(request.user, "role", None) == "ADMIN"
 
 
-class OpeningHoursViewSet(viewsets.ModelViewSet):
+class OpeningHoursViewSet(ReferenceDataListMixin, viewsets.ModelViewSet):
+    reference_dataset = "opening_hours"
     queryset = OpeningHours.objects.all().order_by("day_of_week")
     serializer_class = OpeningHoursSerializer
     permission_classes = [IsAdminOrReadOnly]
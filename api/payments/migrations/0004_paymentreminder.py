@@ -0,0 +1,63 @@
+# Generated by Django 5.1.7 on 2026-10-19 17:20
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contracts", "0007_contract_updated_at"),
+        ("payments", "0003_alter_paymentreceipt_mode"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PaymentReminder",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("due_date", models.DateField()),
+                (
+                    "offset_days",
+                    models.SmallIntegerField(
+                        help_text="Jours par rapport à l'échéance (négatif : avant, positif : retard)"
+                    ),
+                ),
+                (
+                    "amount",
+                    models.DecimalField(
+                        decimal_places=2,
+                        help_text="Solde restant dû au moment du rappel",
+                        max_digits=10,
+                    ),
+                ),
+                ("sent_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "contract",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="payment_reminders",
+                        to="contracts.contract",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-sent_at"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("contract", "due_date", "offset_days"),
+                        name="payment_reminder_uniq",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -54,4 +54,38 @@ class PaymentReceipt(models.Model):
             # Sauvegarder uniquement le champ receipt_url
             self.save(update_fields=["receipt_url"])
             return url
-        return None
\ No newline at end of file
+        return None
+
+class PaymentReminder(models.Model):
+    """
+    Rappel d'échéance envoyé pour un contrat : une ligne par contrat, échéance et décalage
+    (J-7, J-3, J-1, J+3…). La contrainte d'unicité empêche tout double envoi.
+    """
+
+    contract = models.ForeignKey(
+        "contracts.Contract",
+        on_delete=models.CASCADE,
+        related_name="payment_reminders",
+    )
+    due_date = models.DateField()
+    offset_days = models.SmallIntegerField(
+        help_text=_("Jours par rapport à l'échéance (négatif : avant, positif : retard)")
+    )
+    amount = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        help_text=_("Solde restant dû au moment du rappel"),
+    )
+    sent_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["-sent_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["contract", "due_date", "offset_days"],
+                name="payment_reminder_uniq",
+            )
+        ]
+
+    def __str__(self):
+        return f"Rappel contrat {self.contract_id} - {self.due_date} ({self.offset_days:+d} j)"
@@ -0,0 +1,144 @@
+"""
+Rappels d'échéance de paiement.
+
+- L'échéance d'un contrat est la `next_due_date` de son dernier reçu.
+- Le solde est calculé en base (montant après remise - (reçus - remboursement)) : une seule
+  requête annotée sélectionne les contrats à relancer, sans agrégation côté Python.
+- Les décalages se règlent sans changement de code (`PAYMENT_REMINDER_OFFSETS`, en jours
+  par rapport à l'échéance : négatif avant, positif en retard ; J-7, J-3, J-1, J+3 par défaut).
+- Un seul rappel par contrat et par décalage, enregistré en bloc (`PaymentReminder`).
+"""
+
+import logging
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import (
+    Case,
+    DecimalField,
+    Exists,
+    F,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Round
+from django.utils import timezone
+
+from api.contracts.models import Contract
+from api.payments.models import PaymentReceipt, PaymentReminder
+from api.utils.email.recus.notifications import send_payment_due_emails
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OFFSETS = (-7, -3, -1, 3)
+MONEY = DecimalField(max_digits=12, decimal_places=2)
+ZERO = Decimal("0.00")
+
+
+def get_reminder_offsets() -> tuple:
+    return tuple(getattr(settings, "PAYMENT_REMINDER_OFFSETS", DEFAULT_OFFSETS))
+
+
+def with_balance(queryset):
+    """
+    Annote `paid_total`, `real_total` (après remise) et `balance` (solde restant dû),
+    équivalents SQL de `Contract.amount_paid`, `real_amount` et `balance_due`.
+    """
+    paid = (
+        PaymentReceipt.objects.filter(contract=OuterRef("pk"))
+        .values("contract")
+        .annotate(total=Sum("amount"))
+        .values("total")
+    )
+    return queryset.annotate(
+        paid_total=Coalesce(Subquery(paid, output_field=MONEY), Value(ZERO), output_field=MONEY),
+        real_total=Round(
+            F("amount_due") * (Value(Decimal("100")) - F("discount_percent")) / Value(Decimal("100")),
+            2,
+            output_field=MONEY,
+        ),
+    ).annotate(
+        balance=F("real_total") - (F("paid_total") - Coalesce(F("refund_amount"), Value(ZERO))),
+    )
+
+
+def with_due_date(queryset):
+    """Annote `due_date` : prochaine échéance indiquée sur le dernier reçu du contrat."""
+    latest = PaymentReceipt.objects.filter(contract=OuterRef("pk")).order_by(
+        "-payment_date", "-id"
+    )
+    return queryset.annotate(due_date=Subquery(latest.values("next_due_date")[:1]))
+
+
+def due_contracts(today=None):
+    """
+    Contrats non annulés, avec un solde dû, dont l'échéance tombe sur l'un des décalages
+    du jour et qui n'ont pas encore reçu ce rappel. Annote aussi `offset_days`.
+    """
+    today = today or timezone.localdate()
+    targets = {today - timedelta(days=offset): offset for offset in get_reminder_offsets()}
+    if not targets:
+        return Contract.objects.none()
+
+    already_sent = PaymentReminder.objects.filter(
+        contract=OuterRef("pk"),
+        due_date=OuterRef("due_date"),
+        offset_days=OuterRef("offset_days"),
+    )
+    return (
+        with_balance(with_due_date(Contract.objects.filter(is_cancelled=False)))
+        .filter(due_date__in=list(targets), balance__gt=ZERO)
+        .annotate(
+            offset_days=Case(
+                *[When(due_date=due, then=Value(offset)) for due, offset in targets.items()],
+                output_field=IntegerField(),
+            )
+        )
+        .exclude(Exists(already_sent))
+        .select_related("client__lead", "service")
+        .order_by("id")
+    )
+
+
+def send_due_reminders(today=None) -> dict:
+    """
+    Envoie un rappel par contrat à relancer aujourd'hui et enregistre les rappels en bloc.
+    Les lignes sont réservées avant l'envoi (contrainte d'unicité) : un contrat déjà pris
+    par une exécution concurrente n'est pas relancé deux fois.
+    """
+    contracts = list(due_contracts(today))
+    reachable = [c for c in contracts if getattr(c.client.lead, "email", None)]
+
+    now = timezone.now()
+    PaymentReminder.objects.bulk_create(
+        [
+            PaymentReminder(
+                contract=contract,
+                due_date=contract.due_date,
+                offset_days=contract.offset_days,
+                amount=contract.balance,
+                sent_at=now,
+            )
+            for contract in reachable
+        ],
+        ignore_conflicts=True,
+    )
+    claimed = set(
+        PaymentReminder.objects.filter(
+            contract__in=[c.id for c in reachable], sent_at=now
+        ).values_list("contract_id", flat=True)
+    )
+    to_send = [c for c in reachable if c.id in claimed]
+
+    result = send_payment_due_emails(to_send)
+    return {
+        "due": len(contracts),
+        "sent": result.sent,
+        "failed": result.failed,
+        "no_email": len(contracts) - len(reachable),
+    }
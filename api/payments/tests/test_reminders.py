@@ -0,0 +1,112 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.core import mail
+from django.utils import timezone
+
+from api.clients.models import Client
+from api.contracts.models import Contract
+from api.lead_status.models import LeadStatus
+from api.leads.models import Lead
+from api.payments.enums import PaymentMode
+from api.payments.models import PaymentReceipt, PaymentReminder
+from api.payments.reminders import due_contracts, send_due_reminders, with_balance
+from api.services.models import Service
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def service():
+    return Service.objects.create(code="VISA", label="Visa long séjour", price=Decimal("1000"))
+
+
+@pytest.fixture
+def status():
+    return LeadStatus.objects.create(code="NOUVEAU", label="Nouveau", color="#000")
+
+
+def _contract(service, status, i, due_in, paid=("300.00",), discount="10.00", email=True, **kwargs):
+    lead = Lead.objects.create(
+        first_name=f"Client{i}",
+        last_name="Test",
+        phone=f"+3360000000{i}",
+        email=f"client{i}@example.com" if email else None,
+        status=status,
+    )
+    client = Client.objects.create(lead=lead)
+    contract = Contract.objects.create(
+        client=client,
+        service=service,
+        amount_due=Decimal("1000.00"),
+        discount_percent=Decimal(discount),
+        **kwargs,
+    )
+    today = timezone.localdate()
+    for n, amount in enumerate(paid):
+        PaymentReceipt.objects.create(
+            client=client,
+            contract=contract,
+            amount=Decimal(amount),
+            mode=PaymentMode.VIREMENT.value,
+            payment_date=timezone.now() - timedelta(days=10 - n),
+            # Seule l'échéance du dernier reçu compte
+            next_due_date=today + timedelta(days=due_in if n == len(paid) - 1 else 30),
+        )
+    return contract
+
+
+def test_balance_matches_model_properties(service, status):
+    contract = _contract(service, status, 1, 3, paid=("300.00", "150.50"), discount="12.50")
+    Contract.objects.filter(pk=contract.pk).update(refund_amount=Decimal("50.00"))
+    contract.refresh_from_db()
+
+    annotated = with_balance(Contract.objects.filter(pk=contract.pk)).get()
+
+    assert annotated.paid_total == contract.amount_paid
+    assert annotated.real_total == contract.real_amount
+    assert annotated.balance == contract.balance_due
+
+
+def test_due_contracts_by_offset(service, status, settings):
+    settings.PAYMENT_REMINDER_OFFSETS = [-7, -3, -1, 3]
+    in_7 = _contract(service, status, 1, 7)
+    in_1 = _contract(service, status, 2, 1)
+    overdue = _contract(service, status, 3, -3)
+    _contract(service, status, 4, 2)
+    _contract(service, status, 5, 3, paid=("900.00",))  # soldé
+    _contract(service, status, 6, 3, is_cancelled=True)
+
+    offsets = {c.id: c.offset_days for c in due_contracts()}
+
+    assert offsets == {in_7.id: -7, in_1.id: -1, overdue.id: 3}
+
+
+def test_one_reminder_per_contract_recorded_once(service, status):
+    contract = _contract(service, status, 1, 3, paid=("100.00", "200.00"))
+    _contract(service, status, 2, -3, email=False)
+
+    stats = send_due_reminders()
+
+    assert stats == {"due": 2, "sent": 1, "failed": 0, "no_email": 1}
+    assert [m.to for m in mail.outbox] == [["client1@example.com"]]
+    assert "600.00€" in mail.outbox[0].alternatives[0][0]
+    reminder = PaymentReminder.objects.get()
+    assert (reminder.contract_id, reminder.offset_days, reminder.amount) == (
+        contract.id,
+        -3,
+        Decimal("600.00"),
+    )
+
+    assert send_due_reminders()["due"] == 1  # seul le contrat sans email reste à relancer
+    assert len(mail.outbox) == 1
+
+
+def test_overdue_reminder_subject(service, status):
+    _contract(service, status, 1, -3)
+
+    send_due_reminders()
+
+    assert mail.outbox[0].subject == "Échéance de paiement dépassée"
+    assert "depuis <b>3 jours</b>" in mail.outbox[0].alternatives[0][0]
@@ -1,8 +1,6 @@
 import logging
 from decimal import Decimal
 from collections import defaultdict
-import threading
-from concurrent.futures import ThreadPoolExecutor
 
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
@@ -14,6 +12,7 @@ from api.leads.models import Lead
 from api.payments.models import PaymentReceipt
 from api.payments.permissions import IsPaymentEditor
 from api.payments.serializers import PaymentReceiptSerializer
+from api.utils.background import submit_on_commit
 from api.utils.cloud.scw.bucket_utils import delete_object
 from api.utils.email.recus.tasks import send_receipts_email_task
 from api.utils.email.recus.tasks import send_due_date_updated_email_task
@@ -83,12 +82,8 @@ class PaymentReceiptViewSet(viewsets.ModelViewSet):
 
         # ✅ VÉRIFIER SI C'EST LE DERNIER PAIEMENT ET GÉNÉRER LA FACTURE
         if receipt.contract:
-            # Lancer la vérification dans un thread séparé pour ne pas bloquer la réponse
-            threading.Thread(
-                target=self._check_and_generate_invoice,
-                args=(receipt.contract,),
-                daemon=True
-            ).start()
+            # Vérification en arrière-plan (exécuteur partagé) pour ne pas bloquer la réponse
+            submit_on_commit(self._check_and_generate_invoice, receipt.contract)
 
     def create(self, request, *args, **kwargs):
         """
@@ -109,7 +104,7 @@ class PaymentReceiptViewSet(viewsets.ModelViewSet):
 
     def _regenerate_pdf_async(self, receipt_id, old_receipt_url=None):
         """
-        Régénère le PDF de manière asynchrone dans un thread séparé.
+        Régénère le PDF de manière asynchrone (exécuteur partagé, après validation).
         """
 
         def regenerate_task():
@@ -137,11 +132,8 @@ class PaymentReceiptViewSet(viewsets.ModelViewSet):
             except Exception as e:
                 logger.error(f"Erreur régénération PDF asynchrone reçu #{receipt_id}: {e}")
 
-        # Lancer dans un thread séparé
-        import threading
-        thread = threading.Thread(target=regenerate_task)
-        thread.daemon = True
-        thread.start()
+        # Lancer en arrière-plan
+        submit_on_commit(regenerate_task)
 
     def update(self, request, *args, **kwargs):
         """
@@ -0,0 +1,92 @@
+import os
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.lead_imports.reader import ImportFileError
+from api.reconciliation.models import DiscrepancyKind, Statement
+from api.reconciliation.services import StatementError, run_statement
+
+
+class Command(BaseCommand):
+    help = (
+        "Rapproche un relevé externe de contrats (CSV / XLSX, tableaux exportés d'un PDF) "
+        "avec les contrats et encaissements de la base, sur une période quelconque. "
+        "Remplace data_migrations/services/contract_verify.py."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", nargs="?", help="Fichier .csv ou .xlsx")
+        parser.add_argument("--from", dest="period_start", type=date.fromisoformat, help="AAAA-MM-JJ")
+        parser.add_argument("--to", dest="period_end", type=date.fromisoformat, help="AAAA-MM-JJ")
+        parser.add_argument(
+            "--tolerance", type=Decimal, default=None, help="Tolérance des montants (€)"
+        )
+        parser.add_argument(
+            "--exclude-cancelled", action="store_true", help="Ignorer les contrats annulés"
+        )
+        parser.add_argument(
+            "--rerun",
+            type=int,
+            metavar="STATEMENT_ID",
+            help="Rejoue le rapprochement d'un relevé déjà enregistré",
+        )
+        parser.add_argument("--show", type=int, default=20, help="Nombre d'écarts à afficher")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if options["rerun"]:
+            statement = Statement.objects.filter(pk=options["rerun"]).first()
+            if statement is None:
+                raise CommandError(f"Relevé #{options['rerun']} introuvable")
+            path = None
+        elif not path or not os.path.exists(path):
+            raise CommandError(f"Fichier introuvable : {path}")
+        else:
+            statement = Statement.objects.create(
+                file_name=os.path.basename(path),
+                period_start=options["period_start"],
+                period_end=options["period_end"],
+                amount_tolerance=(
+                    options["tolerance"]
+                    if options["tolerance"] is not None
+                    else settings.RECONCILIATION_AMOUNT_TOLERANCE
+                ),
+                include_cancelled=not options["exclude_cancelled"],
+            )
+
+        try:
+            run_statement(statement, path)
+        except (ImportFileError, StatementError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Relevé #{statement.pk} ({statement.period_start} → {statement.period_end}) : "
+                f"{statement.line_count} lignes, {statement.matched_count} rapprochées, "
+                f"{statement.discrepancy_count} écarts"
+            )
+        )
+        for kind, label in DiscrepancyKind.choices:
+            if statement.summary.get(kind):
+                self.stdout.write(f"  • {label} : {statement.summary[kind]}")
+        for d in statement.discrepancies.select_related("line")[: options["show"]]:
+            amounts = " / ".join(
+                f"{name} {value}€"
+                for name, value in (
+                    ("relevé", d.statement_amount),
+                    ("base", d.db_amount),
+                    ("écart", d.difference),
+                )
+                if value is not None
+            )
+            self.stdout.write(
+                self.style.WARNING(
+                    f"  {d.get_kind_display()} : {d.first_name} {d.last_name} ({d.phone})"
+                    f"{' – ' + amounts if amounts else ''}"
+                    f"{' – contrat #' + str(d.contract_id) if d.contract_id else ''}"
+                    f"{' – ' + d.detail if d.detail else ''}"
+                )
+            )
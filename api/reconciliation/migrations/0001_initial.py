@@ -0,0 +1,265 @@
+# Generated by Django 5.1.7 on 2026-10-19 18:07
+
+import django.db.models.deletion
+import django.utils.timezone
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("contracts", "0008_contract_created_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Statement",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("file_name", models.CharField(max_length=255)),
+                (
+                    "s3_key",
+                    models.CharField(
+                        blank=True,
+                        help_text="Fichier déposé via l'API (bucket imports)",
+                        max_length=500,
+                    ),
+                ),
+                (
+                    "period_start",
+                    models.DateField(
+                        blank=True,
+                        help_text="Par défaut : première date du relevé",
+                        null=True,
+                    ),
+                ),
+                (
+                    "period_end",
+                    models.DateField(
+                        blank=True,
+                        help_text="Par défaut : dernière date du relevé",
+                        null=True,
+                    ),
+                ),
+                (
+                    "amount_tolerance",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.01"), max_digits=8
+                    ),
+                ),
+                (
+                    "include_cancelled",
+                    models.BooleanField(
+                        default=True, help_text="Rapprocher aussi les contrats annulés"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PENDING", "En attente"),
+                            ("RUNNING", "En cours"),
+                            ("COMPLETED", "Terminé"),
+                            ("FAILED", "Échec"),
+                        ],
+                        default="PENDING",
+                        max_length=10,
+                    ),
+                ),
+                ("line_count", models.PositiveIntegerField(default=0)),
+                ("matched_count", models.PositiveIntegerField(default=0)),
+                ("discrepancy_count", models.PositiveIntegerField(default=0)),
+                (
+                    "summary",
+                    models.JSONField(
+                        blank=True, default=dict, help_text="Nombre d'écarts par type"
+                    ),
+                ),
+                ("error", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("ingested_at", models.DateTimeField(blank=True, null=True)),
+                ("reconciled_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Relevé de contrats",
+                "verbose_name_plural": "Relevés de contrats",
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="StatementLine",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "row_number",
+                    models.PositiveIntegerField(
+                        help_text="Ligne de données (1 = première)"
+                    ),
+                ),
+                ("last_name", models.CharField(blank=True, max_length=150)),
+                ("first_name", models.CharField(blank=True, max_length=150)),
+                (
+                    "phone",
+                    models.CharField(
+                        blank=True, help_text="Valeur du relevé", max_length=50
+                    ),
+                ),
+                ("phone_normalized", models.CharField(blank=True, max_length=20)),
+                ("date", models.DateField(blank=True, null=True)),
+                (
+                    "amount",
+                    models.DecimalField(
+                        blank=True, decimal_places=2, max_digits=10, null=True
+                    ),
+                ),
+                (
+                    "paid_amount",
+                    models.DecimalField(
+                        blank=True, decimal_places=2, max_digits=10, null=True
+                    ),
+                ),
+                (
+                    "contract",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="Contrat rapproché",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="statement_lines",
+                        to="contracts.contract",
+                    ),
+                ),
+                (
+                    "statement",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="lines",
+                        to="reconciliation.statement",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Ligne de relevé",
+                "verbose_name_plural": "Lignes de relevé",
+                "ordering": ["statement", "row_number"],
+            },
+        ),
+        migrations.CreateModel(
+            name="Discrepancy",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("MISSING_IN_DB", "Absent de la base"),
+                            ("OUT_OF_PERIOD", "Contrat hors période"),
+                            ("MISSING_IN_STATEMENT", "Absent du relevé"),
+                            ("AMOUNT_MISMATCH", "Montant différent"),
+                            ("PAYMENT_MISMATCH", "Encaissement différent"),
+                            ("INVALID_LINE", "Ligne inexploitable"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("phone", models.CharField(blank=True, max_length=50)),
+                ("last_name", models.CharField(blank=True, max_length=150)),
+                ("first_name", models.CharField(blank=True, max_length=150)),
+                (
+                    "statement_amount",
+                    models.DecimalField(
+                        blank=True, decimal_places=2, max_digits=10, null=True
+                    ),
+                ),
+                (
+                    "db_amount",
+                    models.DecimalField(
+                        blank=True, decimal_places=2, max_digits=10, null=True
+                    ),
+                ),
+                (
+                    "difference",
+                    models.DecimalField(
+                        blank=True, decimal_places=2, max_digits=10, null=True
+                    ),
+                ),
+                ("detail", models.CharField(blank=True, max_length=255)),
+                (
+                    "contract",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="discrepancies",
+                        to="contracts.contract",
+                    ),
+                ),
+                (
+                    "statement",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="discrepancies",
+                        to="reconciliation.statement",
+                    ),
+                ),
+                (
+                    "line",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="discrepancies",
+                        to="reconciliation.statementline",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Écart de rapprochement",
+                "verbose_name_plural": "Écarts de rapprochement",
+                "ordering": ["statement", "kind", "id"],
+                "indexes": [
+                    models.Index(
+                        fields=["statement", "kind"], name="reconciliation_kind_idx"
+                    )
+                ],
+            },
+        ),
+    ]
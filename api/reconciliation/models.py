@@ -0,0 +1,150 @@
+from decimal import Decimal
+
+from django.db import models
+from django.utils import timezone
+
+
+class StatementStatus(models.TextChoices):
+    PENDING = "PENDING", "En attente"
+    RUNNING = "RUNNING", "En cours"
+    COMPLETED = "COMPLETED", "Terminé"
+    FAILED = "FAILED", "Échec"
+
+
+class DiscrepancyKind(models.TextChoices):
+    MISSING_IN_DB = "MISSING_IN_DB", "Absent de la base"
+    OUT_OF_PERIOD = "OUT_OF_PERIOD", "Contrat hors période"
+    MISSING_IN_STATEMENT = "MISSING_IN_STATEMENT", "Absent du relevé"
+    AMOUNT_MISMATCH = "AMOUNT_MISMATCH", "Montant différent"
+    PAYMENT_MISMATCH = "PAYMENT_MISMATCH", "Encaissement différent"
+    INVALID_LINE = "INVALID_LINE", "Ligne inexploitable"
+
+
+class Statement(models.Model):
+    """
+    Relevé externe de contrats (export CSV / XLSX, tableaux extraits d'un PDF) rapproché
+    des contrats et encaissements de la base sur une période.
+
+    Les lignes sont stockées à l'ingestion (`StatementLine`) : le rapprochement peut être
+    rejoué sans relire le fichier (tâche nocturne), ses écarts remplacent les précédents.
+    """
+
+    file_name = models.CharField(max_length=255)
+    s3_key = models.CharField(
+        max_length=500, blank=True, help_text="Fichier déposé via l'API (bucket imports)"
+    )
+    period_start = models.DateField(
+        null=True, blank=True, help_text="Par défaut : première date du relevé"
+    )
+    period_end = models.DateField(
+        null=True, blank=True, help_text="Par défaut : dernière date du relevé"
+    )
+    amount_tolerance = models.DecimalField(
+        max_digits=8, decimal_places=2, default=Decimal("0.01")
+    )
+    include_cancelled = models.BooleanField(
+        default=True, help_text="Rapprocher aussi les contrats annulés"
+    )
+    status = models.CharField(
+        max_length=10, choices=StatementStatus.choices, default=StatementStatus.PENDING
+    )
+    line_count = models.PositiveIntegerField(default=0)
+    matched_count = models.PositiveIntegerField(default=0)
+    discrepancy_count = models.PositiveIntegerField(default=0)
+    summary = models.JSONField(
+        default=dict, blank=True, help_text="Nombre d'écarts par type"
+    )
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(
+        "users.User", on_delete=models.SET_NULL, null=True, blank=True
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+    ingested_at = models.DateTimeField(null=True, blank=True)
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Relevé de contrats"
+        verbose_name_plural = "Relevés de contrats"
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.file_name} ({self.period_start} → {self.period_end})"
+
+
+class StatementLine(models.Model):
+    """Ligne d'un relevé : client, montant TTC et, si le relevé le donne, montant encaissé."""
+
+    statement = models.ForeignKey(
+        Statement, on_delete=models.CASCADE, related_name="lines"
+    )
+    row_number = models.PositiveIntegerField(help_text="Ligne de données (1 = première)")
+    last_name = models.CharField(max_length=150, blank=True)
+    first_name = models.CharField(max_length=150, blank=True)
+    phone = models.CharField(max_length=50, blank=True, help_text="Valeur du relevé")
+    phone_normalized = models.CharField(max_length=20, blank=True)
+    date = models.DateField(null=True, blank=True)
+    amount = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    paid_amount = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True
+    )
+    contract = models.ForeignKey(
+        "contracts.Contract",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="statement_lines",
+        help_text="Contrat rapproché",
+    )
+
+    class Meta:
+        verbose_name = "Ligne de relevé"
+        verbose_name_plural = "Lignes de relevé"
+        ordering = ["statement", "row_number"]
+
+    def __str__(self):
+        return f"Ligne {self.row_number} – {self.phone_normalized or self.phone}"
+
+
+class Discrepancy(models.Model):
+    """Écart relevé / base constaté lors du dernier rapprochement d'un relevé."""
+
+    statement = models.ForeignKey(
+        Statement, on_delete=models.CASCADE, related_name="discrepancies"
+    )
+    kind = models.CharField(max_length=20, choices=DiscrepancyKind.choices)
+    line = models.ForeignKey(
+        StatementLine,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="discrepancies",
+    )
+    contract = models.ForeignKey(
+        "contracts.Contract",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="discrepancies",
+    )
+    phone = models.CharField(max_length=50, blank=True)
+    last_name = models.CharField(max_length=150, blank=True)
+    first_name = models.CharField(max_length=150, blank=True)
+    statement_amount = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True
+    )
+    db_amount = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    difference = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True
+    )
+    detail = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        verbose_name = "Écart de rapprochement"
+        verbose_name_plural = "Écarts de rapprochement"
+        ordering = ["statement", "kind", "id"]
+        indexes = [
+            models.Index(fields=["statement", "kind"], name="reconciliation_kind_idx")
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} – {self.phone}"
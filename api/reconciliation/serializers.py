@@ -0,0 +1,78 @@
+import os
+
+from rest_framework import serializers
+
+from api.lead_imports.reader import SUPPORTED_EXTENSIONS
+from api.reconciliation.models import Discrepancy, Statement
+
+
+class StatementSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Statement
+        fields = [
+            "id",
+            "file_name",
+            "period_start",
+            "period_end",
+            "amount_tolerance",
+            "include_cancelled",
+            "status",
+            "line_count",
+            "matched_count",
+            "discrepancy_count",
+            "summary",
+            "error",
+            "created_by",
+            "created_at",
+            "ingested_at",
+            "reconciled_at",
+        ]
+        read_only_fields = fields
+
+
+class StatementUploadSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    period_start = serializers.DateField(required=False)
+    period_end = serializers.DateField(required=False)
+    amount_tolerance = serializers.DecimalField(
+        max_digits=8, decimal_places=2, min_value=0, required=False
+    )
+    include_cancelled = serializers.BooleanField(default=True)
+
+    def validate_file(self, value):
+        ext = os.path.splitext(value.name)[1].lower()
+        if ext not in SUPPORTED_EXTENSIONS:
+            raise serializers.ValidationError(
+                f"Format non pris en charge : {', '.join(SUPPORTED_EXTENSIONS)} attendus "
+                "(tableaux d'un PDF : les exporter en CSV / XLSX)"
+            )
+        return value
+
+    def validate(self, attrs):
+        start, end = attrs.get("period_start"), attrs.get("period_end")
+        if start and end and start > end:
+            raise serializers.ValidationError(
+                {"period_end": "La fin de période précède son début."}
+            )
+        return attrs
+
+
+class DiscrepancySerializer(serializers.ModelSerializer):
+    row_number = serializers.IntegerField(source="line.row_number", read_only=True, default=None)
+
+    class Meta:
+        model = Discrepancy
+        fields = [
+            "id",
+            "kind",
+            "row_number",
+            "contract",
+            "phone",
+            "last_name",
+            "first_name",
+            "statement_amount",
+            "db_amount",
+            "difference",
+            "detail",
+        ]
+        read_only_fields = fields
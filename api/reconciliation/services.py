@@ -0,0 +1,463 @@
+"""
+Rapprochement des relevés externes de contrats avec la base (remplace le script
+`data_migrations/services/contract_verify.py`, mois par mois et en mémoire).
+
+1. Ingestion (`ingest_statement`) : le fichier CSV / XLSX est lu en flux par le lecteur
+   des imports de leads (table d'alias `STATEMENT_COLUMNS`), les téléphones normalisés
+   par lot (`api.utils.phones`) et les lignes écrites par `bulk_create`.
+2. Rapprochement (`reconcile_statement`) : une requête pour les contrats de la période
+   (téléphone du lead et total des encaissements agrégés en base), appariement par
+   téléphone normalisé puis par montant le plus proche, dans la tolérance du relevé.
+   Les lignes sans contrat sur la période sont cherchées hors période par l'index
+   `lead_phone_normalized_idx`. Les écarts remplacent ceux du rapprochement précédent.
+
+Le relevé compare son montant TTC à `Contract.amount_due` (comme le script) et, s'il a
+une colonne d'encaissement, celle-ci au total des reçus du contrat.
+"""
+
+import logging
+import re
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import DecimalField, Max, Min, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from api.contracts.models import Contract
+from api.lead_imports.normalize import parse_datetime_value
+from api.lead_imports.reader import COLUMN_ALIASES, read_rows
+from api.payments.models import PaymentReceipt
+from api.reconciliation.models import (
+    Discrepancy,
+    DiscrepancyKind,
+    Statement,
+    StatementLine,
+    StatementStatus,
+)
+from api.utils.phones import normalize_phones
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 2000
+PHONE_LOOKUP_BATCH = 1000
+CENT = Decimal("0.01")
+ZERO = Decimal("0.00")
+
+STATEMENT_COLUMNS = {
+    "last_name": COLUMN_ALIASES["last_name"],
+    "first_name": COLUMN_ALIASES["first_name"],
+    "phone": COLUMN_ALIASES["phone"],
+    "date": ("date", "date_contrat", "date_du_contrat", "date_de_signature", "date_de_creation"),
+    "amount": ("total_ttc", "montant_ttc", "montant", "montant_contrat", "montant_du", "amount", "total"),
+    "paid_amount": ("montant_paye", "montant_encaisse", "encaisse", "paiements", "paid_amount", "total_paye"),
+}
+_AMOUNT_JUNK = re.compile(r"[^\d,.\-]")
+
+
+class StatementError(ValueError):
+    """Relevé inexploitable (période introuvable, aucune ligne…)."""
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _text(value, max_length=150) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()[:max_length]
+
+
+def parse_amount(value):
+    """Montant d'un relevé (« 1 590,00 € », « 1.590,00 », cellule numérique), None si illisible."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float, Decimal)):
+        if value != value:  # NaN
+            return None
+        return Decimal(str(value)).quantize(CENT)
+    text = _AMOUNT_JUNK.sub("", str(value))
+    if "," in text and "." in text:
+        # Le dernier séparateur est celui des décimales
+        if text.rfind(",") > text.rfind("."):
+            text = text.replace(".", "").replace(",", ".")
+        else:
+            text = text.replace(",", "")
+    else:
+        text = text.replace(",", ".")
+    try:
+        return Decimal(text).quantize(CENT)
+    except InvalidOperation:
+        return None
+
+
+def _parse_date(value):
+    parsed = parse_datetime_value(value)
+    return timezone.localtime(parsed).date() if parsed else None
+
+
+# ==========================
+#  INGESTION
+# ==========================
+
+
+def ingest_statement(statement: Statement, path, batch_size: int = BATCH_SIZE) -> int:
+    """
+    Enregistre les lignes du fichier `path` (remplace celles d'une ingestion précédente).
+    Les lignes sans téléphone (totaux, sous-totaux, séparateurs) sont ignorées. La période
+    non renseignée est déduite des dates du relevé. Retourne le nombre de lignes.
+    """
+    count = 0
+    with transaction.atomic():
+        statement.lines.all().delete()
+        for batch in _batches(read_rows(path, aliases=STATEMENT_COLUMNS), batch_size):
+            rows = [(index, row) for index, row in batch if _text(row.get("phone"))]
+            phones = normalize_phones([row.get("phone") for _, row in rows])
+            StatementLine.objects.bulk_create(
+                [
+                    StatementLine(
+                        statement=statement,
+                        row_number=index + 1,
+                        last_name=_text(row.get("last_name")),
+                        first_name=_text(row.get("first_name")),
+                        phone=_text(row.get("phone"), 50),
+                        phone_normalized=phone or "",
+                        date=_parse_date(row.get("date")),
+                        amount=parse_amount(row.get("amount")),
+                        paid_amount=parse_amount(row.get("paid_amount")),
+                    )
+                    for (index, row), phone in zip(rows, phones)
+                ]
+            )
+            count += len(rows)
+
+        if statement.period_start is None or statement.period_end is None:
+            bounds = statement.lines.aggregate(first=Min("date"), last=Max("date"))
+            statement.period_start = statement.period_start or bounds["first"]
+            statement.period_end = statement.period_end or bounds["last"]
+        if statement.period_start is None or statement.period_end is None:
+            raise StatementError(
+                "Période introuvable : la préciser ou fournir une colonne de date"
+            )
+
+        statement.line_count = count
+        statement.ingested_at = timezone.now()
+        statement.save(
+            update_fields=["period_start", "period_end", "line_count", "ingested_at"]
+        )
+    logger.info("📄 Relevé #%s : %s lignes enregistrées", statement.pk, count)
+    return count
+
+
+# ==========================
+#  RAPPROCHEMENT
+# ==========================
+
+
+def _period_bounds(statement):
+    """Bornes datetime [début, fin[ de la période (index sur `created_at`)."""
+    start = timezone.make_aware(datetime.combine(statement.period_start, time.min))
+    end = timezone.make_aware(
+        datetime.combine(statement.period_end + timedelta(days=1), time.min)
+    )
+    return start, end
+
+
+def _contracts(statement):
+    queryset = Contract.objects.order_by()
+    if not statement.include_cancelled:
+        queryset = queryset.filter(is_cancelled=False)
+    return queryset
+
+
+def period_contracts(statement) -> dict:
+    """Contrats de la période par téléphone normalisé, avec le total encaissé (une requête)."""
+    start, end = _period_bounds(statement)
+    paid = (
+        PaymentReceipt.objects.filter(contract=OuterRef("pk"))
+        .order_by()
+        .values("contract")
+        .annotate(total=Sum("amount"))
+        .values("total")
+    )
+    rows = (
+        _contracts(statement)
+        .filter(created_at__gte=start, created_at__lt=end)
+        .annotate(
+            paid=Coalesce(
+                Subquery(paid),
+                Value(ZERO),
+                output_field=DecimalField(max_digits=12, decimal_places=2),
+            )
+        )
+        .values(
+            "id",
+            "amount_due",
+            "paid",
+            "created_at",
+            "client__lead__phone_normalized",
+            "client__lead__last_name",
+            "client__lead__first_name",
+        )
+    )
+    by_phone = defaultdict(list)
+    for row in rows.iterator(chunk_size=BATCH_SIZE):
+        by_phone[row["client__lead__phone_normalized"] or ""].append(row)
+    return by_phone
+
+
+def outside_contracts(statement, phones) -> dict:
+    """Contrats hors période des téléphones `phones` (index sur le téléphone normalisé)."""
+    start, end = _period_bounds(statement)
+    by_phone = defaultdict(list)
+    for batch in _batches(sorted(phones), PHONE_LOOKUP_BATCH):
+        rows = (
+            _contracts(statement)
+            .filter(client__lead__phone_normalized__in=batch)
+            .exclude(created_at__gte=start, created_at__lt=end)
+            .values("id", "amount_due", "created_at", "client__lead__phone_normalized")
+        )
+        for row in rows:
+            by_phone[row["client__lead__phone_normalized"]].append(row)
+    return by_phone
+
+
+def _date_gap(line, contract) -> int:
+    if line.date is None:
+        return 0
+    return abs((timezone.localtime(contract["created_at"]).date() - line.date).days)
+
+
+def _closest(line, contract):
+    return (abs(contract["amount_due"] - line.amount), _date_gap(line, contract), contract["id"])
+
+
+def pair_lines(lines, contracts):
+    """
+    Appariement glouton des lignes et contrats d'un même téléphone : les couples aux
+    montants les plus proches d'abord (puis aux dates les plus proches). Retourne
+    `(paires, lignes restantes, contrats restants)`.
+    """
+    candidates = sorted(
+        ((_closest(line, contract), line, contract) for line in lines for contract in contracts),
+        key=lambda item: item[0],
+    )
+    pairs, used_lines, used_contracts = [], set(), set()
+    for _, line, contract in candidates:
+        if line.pk in used_lines or contract["id"] in used_contracts:
+            continue
+        pairs.append((line, contract))
+        used_lines.add(line.pk)
+        used_contracts.add(contract["id"])
+    return (
+        pairs,
+        [line for line in lines if line.pk not in used_lines],
+        [contract for contract in contracts if contract["id"] not in used_contracts],
+    )
+
+
+def _line_discrepancy(statement, kind, line, **kwargs):
+    kwargs.setdefault("statement_amount", line.amount)
+    return Discrepancy(
+        statement=statement,
+        kind=kind,
+        line=line,
+        phone=line.phone_normalized or line.phone,
+        last_name=line.last_name,
+        first_name=line.first_name,
+        **kwargs,
+    )
+
+
+def compare_pair(statement, line, contract) -> list:
+    """Écarts de montant (et d'encaissement, si le relevé le donne) d'une paire rapprochée."""
+    tolerance = statement.amount_tolerance
+    found = []
+    difference = line.amount - contract["amount_due"]
+    if abs(difference) > tolerance:
+        found.append(
+            _line_discrepancy(
+                statement,
+                DiscrepancyKind.AMOUNT_MISMATCH,
+                line,
+                contract_id=contract["id"],
+                db_amount=contract["amount_due"],
+                difference=difference,
+            )
+        )
+    if line.paid_amount is not None:
+        difference = line.paid_amount - contract["paid"]
+        if abs(difference) > tolerance:
+            found.append(
+                _line_discrepancy(
+                    statement,
+                    DiscrepancyKind.PAYMENT_MISMATCH,
+                    line,
+                    contract_id=contract["id"],
+                    statement_amount=line.paid_amount,
+                    db_amount=contract["paid"],
+                    difference=difference,
+                )
+            )
+    return found
+
+
+def reconcile_statement(statement: Statement) -> Statement:
+    """
+    Rapproche les lignes enregistrées du relevé avec les contrats de sa période et
+    remplace ses écarts. Met à jour les compteurs et le résumé par type d'écart.
+    """
+    lines = list(statement.lines.order_by("row_number"))
+    previous = {line.pk: line.contract_id for line in lines}
+    contracts_by_phone = period_contracts(statement)
+
+    discrepancies, matched, unmatched = [], [], []
+    lines_by_phone = defaultdict(list)
+    for line in lines:
+        line.contract_id = None
+        if not line.phone_normalized:
+            discrepancies.append(
+                _line_discrepancy(
+                    statement,
+                    DiscrepancyKind.INVALID_LINE,
+                    line,
+                    detail=f"Téléphone invalide : {line.phone}",
+                )
+            )
+        elif line.amount is None:
+            discrepancies.append(
+                _line_discrepancy(
+                    statement, DiscrepancyKind.INVALID_LINE, line, detail="Montant illisible"
+                )
+            )
+        else:
+            lines_by_phone[line.phone_normalized].append(line)
+
+    for phone, phone_lines in lines_by_phone.items():
+        pairs, rest, _ = pair_lines(phone_lines, contracts_by_phone.pop(phone, []))
+        for line, contract in pairs:
+            line.contract_id = contract["id"]
+            matched.append(line)
+            discrepancies.extend(compare_pair(statement, line, contract))
+        unmatched.extend(rest)
+
+    outside = outside_contracts(statement, {line.phone_normalized for line in unmatched})
+    for line in unmatched:
+        candidates = outside.get(line.phone_normalized)
+        if candidates:
+            contract = min(candidates, key=lambda c: _closest(line, c))
+            discrepancies.append(
+                _line_discrepancy(
+                    statement,
+                    DiscrepancyKind.OUT_OF_PERIOD,
+                    line,
+                    contract_id=contract["id"],
+                    db_amount=contract["amount_due"],
+                    detail=f"Contrat du {timezone.localtime(contract['created_at']):%d/%m/%Y}",
+                )
+            )
+        else:
+            discrepancies.append(
+                _line_discrepancy(statement, DiscrepancyKind.MISSING_IN_DB, line)
+            )
+
+    for phone, contracts in contracts_by_phone.items():
+        for contract in contracts:
+            discrepancies.append(
+                Discrepancy(
+                    statement=statement,
+                    kind=DiscrepancyKind.MISSING_IN_STATEMENT,
+                    contract_id=contract["id"],
+                    phone=phone,
+                    last_name=contract["client__lead__last_name"] or "",
+                    first_name=contract["client__lead__first_name"] or "",
+                    db_amount=contract["amount_due"],
+                )
+            )
+
+    summary = Counter(d.kind for d in discrepancies)
+    with transaction.atomic():
+        statement.discrepancies.all().delete()
+        Discrepancy.objects.bulk_create(discrepancies, batch_size=BATCH_SIZE)
+        # Seules les lignes dont l'appariement change sont réécrites (rapprochement
+        # nocturne : quasiment aucune), par upsert sur la clé primaire (plus rapide que
+        # `bulk_update` et ses CASE WHEN)
+        StatementLine.objects.bulk_create(
+            [line for line in lines if line.contract_id != previous[line.pk]],
+            batch_size=BATCH_SIZE,
+            update_conflicts=True,
+            update_fields=["contract"],
+            unique_fields=["id"],
+        )
+        statement.matched_count = len(matched)
+        statement.discrepancy_count = len(discrepancies)
+        statement.summary = {kind: summary[kind] for kind in DiscrepancyKind.values if summary[kind]}
+        statement.reconciled_at = timezone.now()
+        statement.save(
+            update_fields=["matched_count", "discrepancy_count", "summary", "reconciled_at"]
+        )
+    return statement
+
+
+def run_statement(statement: Statement, path=None) -> Statement:
+    """
+    Ingère le fichier `path` (si fourni) puis rapproche le relevé. En cas d'erreur le
+    relevé passe en échec (message conservé) et l'exception est relevée.
+    """
+    statement.status = StatementStatus.RUNNING
+    statement.error = ""
+    statement.save(update_fields=["status", "error"])
+    logger.info("🔎 Rapprochement du relevé #%s (%s)", statement.pk, statement.file_name)
+    try:
+        if path is not None:
+            ingest_statement(statement, path)
+        reconcile_statement(statement)
+    except Exception as e:
+        logger.exception("❌ Relevé #%s : rapprochement interrompu : %s", statement.pk, e)
+        statement.status = StatementStatus.FAILED
+        statement.error = str(e)
+        statement.save(update_fields=["status", "error"])
+        raise
+
+    statement.status = StatementStatus.COMPLETED
+    statement.save(update_fields=["status"])
+    logger.info(
+        "✅ Relevé #%s : %s lignes, %s rapprochées, %s écarts",
+        statement.pk,
+        statement.line_count,
+        statement.matched_count,
+        statement.discrepancy_count,
+    )
+    return statement
+
+
+# ==========================
+#  DÉPÔTS VIA L'API
+# ==========================
+
+UPLOAD_BUCKET = "imports"
+
+
+def store_upload(uploaded_file) -> str:
+    """Dépose le relevé reçu dans le bucket `imports` (lu par le worker) ; retourne la clé."""
+    from api.utils.cloud.scw.bucket_utils import put_object
+
+    key = f"statements/{uuid.uuid4().hex}/{uploaded_file.name}"
+    put_object(UPLOAD_BUCKET, key, uploaded_file.read())
+    return key
+
+
+def schedule_statement(statement: Statement, ingest: bool = True):
+    """Programme le rapprochement par le worker après validation de la transaction."""
+    from api.reconciliation.tasks import run_reconciliation
+
+    transaction.on_commit(lambda: run_reconciliation.delay(statement.pk, ingest))
@@ -0,0 +1,61 @@
+import logging
+import os
+import tempfile
+
+from celery import shared_task
+from django.utils import timezone
+
+from api.reconciliation.models import Statement, StatementStatus
+from api.reconciliation.services import UPLOAD_BUCKET, run_statement
+from api.utils.cloud.scw.bucket_utils import get_object
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def run_reconciliation(statement_id: int, ingest: bool = True):
+    """
+    Rapproche un relevé. `ingest` : le fichier déposé est d'abord relu depuis le bucket
+    `imports` (premier passage) ; sinon les lignes déjà enregistrées sont rapprochées.
+    """
+    statement = Statement.objects.filter(pk=statement_id).first()
+    if statement is None or statement.status == StatementStatus.RUNNING:
+        return None
+
+    if ingest:
+        content = get_object(UPLOAD_BUCKET, statement.s3_key)
+        suffix = os.path.splitext(statement.file_name)[1].lower()
+        with tempfile.NamedTemporaryFile(suffix=suffix) as f:
+            f.write(content)
+            f.flush()
+            run_statement(statement, f.name)
+    else:
+        run_statement(statement)
+
+    return {
+        "lines": statement.line_count,
+        "matched": statement.matched_count,
+        "discrepancies": statement.discrepancy_count,
+    }
+
+
+@shared_task
+def reconcile_current_year():
+    """
+    Rapprochement nocturne : rejoue les relevés déjà ingérés qui couvrent l'année en
+    cours (contrats saisis ou corrigés depuis la veille).
+    """
+    year_start = timezone.localdate().replace(month=1, day=1)
+    statements = Statement.objects.filter(
+        ingested_at__isnull=False, period_end__gte=year_start
+    ).exclude(status=StatementStatus.RUNNING)
+    done = 0
+    for statement in statements.order_by("period_start"):
+        try:
+            run_statement(statement)
+            done += 1
+        except Exception:
+            # Échec consigné sur le relevé : les suivants sont tout de même traités
+            continue
+    logger.info("🌙 Rapprochement nocturne : %s relevé(s)", done)
+    return done
@@ -0,0 +1,286 @@
+import csv
+from datetime import date, datetime
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.clients.models import Client
+from api.contracts.models import Contract
+from api.lead_status.models import LeadStatus
+from api.leads.constants import RDV_PLANIFIE
+from api.leads.models import Lead
+from api.payments.models import PaymentReceipt
+from api.reconciliation.models import DiscrepancyKind, Statement, StatementStatus
+from api.reconciliation.services import parse_amount, run_statement
+from api.reconciliation.tasks import reconcile_current_year, run_reconciliation
+from api.services.models import Service
+from api.users.models import User
+from api.users.roles import UserRoles
+
+pytestmark = pytest.mark.django_db
+
+HEADER = ["Nom", "Prénom", "Telephone", "DATE", "Statut CLIENT", "TOTAL TTC", "Paiements (€)"]
+
+
+@pytest.fixture
+def admin():
+    return User.objects.create_user(
+        email="admin@example.com",
+        password="pass",
+        role=UserRoles.ADMIN,
+        first_name="Admin",
+        last_name="User",
+    )
+
+
+@pytest.fixture
+def contract_factory(admin):
+    status = LeadStatus.objects.create(code=RDV_PLANIFIE, label="RDV planifié", color="#000")
+    service = Service.objects.create(code="VISA", label="Visa")
+
+    def make(phone, amount, created, paid=None, last_name="Dupont", cancelled=False):
+        lead = Lead.objects.filter(phone_normalized=phone).first() or Lead.objects.create(
+            first_name="Jean", last_name=last_name, phone=phone, status=status
+        )
+        client = Client.objects.filter(lead=lead).first() or Client.objects.create(lead=lead)
+        contract = Contract.objects.create(
+            client=client,
+            created_by=admin,
+            service=service,
+            amount_due=Decimal(amount),
+            is_cancelled=cancelled,
+            created_at=timezone.make_aware(datetime.fromisoformat(created)),
+        )
+        if paid:
+            PaymentReceipt.objects.create(
+                contract=contract, client=client, amount=Decimal(paid), mode="ESPECES"
+            )
+        return contract
+
+    return make
+
+
+def _write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(["Contrats mai 2025"])
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+    return path
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("1 590,00 €", Decimal("1590.00")),
+        ("1.590,50", Decimal("1590.50")),
+        ("1,590.50", Decimal("1590.50")),
+        (1590.5, Decimal("1590.50")),
+        ("", None),
+        ("n/a", None),
+    ],
+)
+def test_parse_amount(value, expected):
+    assert parse_amount(value) == expected
+
+
+def test_reconciliation_reports_each_kind_of_discrepancy(
+    tmp_path, contract_factory, django_assert_max_num_queries
+):
+    ok = contract_factory("+33611111111", "1590.00", "2025-05-03T10:00", paid="500")
+    mismatch = contract_factory("+33622222222", "900.00", "2025-05-10T10:00", paid="900")
+    contract_factory("+33633333333", "300.00", "2025-04-28T10:00")
+    missing = contract_factory("+33644444444", "450.00", "2025-05-20T10:00", last_name="Martin")
+    # Deux contrats pour le même téléphone : appariés par montant
+    twin_small = contract_factory("+33655555555", "100.00", "2025-05-05T10:00")
+    twin_big = contract_factory("+33655555555", "800.00", "2025-05-06T10:00")
+    contract_factory("+33666666666", "999.00", "2025-05-07T10:00", cancelled=True)
+    path = _write_csv(
+        tmp_path / "mai.csv",
+        [
+            ["Dupont", "Jean", "06 11 11 11 11", "03/05/2025", "Signé", "1 590,00 €", "500,00"],
+            ["Dupont", "Jean", "0622222222", "10/05/2025", "Signé", "950,00", "800"],
+            ["Durand", "Paul", "+33 6 33 33 33 33", "02/05/2025", "Signé", "300", ""],
+            ["Petit", "Ana", "0677777777", "12/05/2025", "Signé", "200", ""],
+            ["Dupont", "Jean", "0655555555", "06/05/2025", "Signé", "800,00", ""],
+            ["Dupont", "Jean", "0655555555", "05/05/2025", "Signé", "100,00", ""],
+            ["Bernard", "Léa", "12", "15/05/2025", "Signé", "100", ""],
+            ["TOTAL", "", "", "", "", "5 040,00", ""],
+        ],
+    )
+    statement = Statement.objects.create(
+        file_name="mai.csv", period_start=date(2025, 5, 1), period_end=date(2025, 5, 31)
+    )
+
+    # Requêtes en nombre fixe, indépendant du nombre de lignes et de contrats
+    with django_assert_max_num_queries(25):
+        run_statement(statement, path)
+
+    statement.refresh_from_db()
+    assert statement.status == StatementStatus.COMPLETED
+    assert (statement.line_count, statement.matched_count) == (7, 4)
+    assert statement.summary == {
+        DiscrepancyKind.MISSING_IN_DB: 1,
+        DiscrepancyKind.OUT_OF_PERIOD: 1,
+        DiscrepancyKind.MISSING_IN_STATEMENT: 2,
+        DiscrepancyKind.AMOUNT_MISMATCH: 1,
+        DiscrepancyKind.PAYMENT_MISMATCH: 1,
+        DiscrepancyKind.INVALID_LINE: 1,
+    }
+    by_kind = {d.kind: d for d in statement.discrepancies.all()}
+    amount = by_kind[DiscrepancyKind.AMOUNT_MISMATCH]
+    assert (amount.contract_id, amount.difference) == (mismatch.id, Decimal("50.00"))
+    payment = by_kind[DiscrepancyKind.PAYMENT_MISMATCH]
+    assert (payment.statement_amount, payment.db_amount) == (Decimal("800.00"), Decimal("900.00"))
+    assert by_kind[DiscrepancyKind.MISSING_IN_DB].phone == "+33677777777"
+    assert by_kind[DiscrepancyKind.OUT_OF_PERIOD].detail == "Contrat du 28/04/2025"
+    assert set(
+        statement.discrepancies.filter(kind=DiscrepancyKind.MISSING_IN_STATEMENT).values_list(
+            "contract_id", flat=True
+        )
+    ) == {missing.id, Contract.objects.get(is_cancelled=True).id}
+    lines = {line.row_number: line.contract_id for line in statement.lines.all()}
+    assert (lines[1], lines[5], lines[6]) == (ok.id, twin_big.id, twin_small.id)
+
+
+def test_rerun_replaces_discrepancies_and_honours_options(tmp_path, contract_factory):
+    contract_factory("+33611111111", "100.00", "2025-05-03T10:00")
+    path = _write_csv(
+        tmp_path / "mai.csv",
+        [["Dupont", "Jean", "0611111111", "03/05/2025", "", "100,40", ""]],
+    )
+    statement = Statement.objects.create(file_name="mai.csv", amount_tolerance=Decimal("0.50"))
+
+    run_statement(statement, path)
+    statement.refresh_from_db()
+    # Période déduite des dates du relevé, écart sous la tolérance
+    assert (statement.period_start, statement.period_end) == (date(2025, 5, 3), date(2025, 5, 3))
+    assert statement.discrepancy_count == 0
+
+    Contract.objects.update(amount_due=Decimal("120.00"))
+    statement.amount_tolerance = Decimal("0.01")
+    statement.save()
+    run_statement(statement)
+
+    statement.refresh_from_db()
+    assert list(statement.discrepancies.values_list("kind", "difference")) == [
+        (DiscrepancyKind.AMOUNT_MISMATCH, Decimal("-19.60"))
+    ]
+    assert statement.lines.count() == 1
+
+
+def test_statement_without_dates_or_period_fails(tmp_path):
+    path = _write_csv(tmp_path / "x.csv", [["Dupont", "Jean", "0611111111", "", "", "100", ""]])
+    statement = Statement.objects.create(file_name="x.csv")
+
+    with pytest.raises(ValueError):
+        run_statement(statement, path)
+
+    statement.refresh_from_db()
+    assert statement.status == StatementStatus.FAILED
+    assert "Période introuvable" in statement.error
+    assert statement.lines.count() == 0
+
+
+def test_nightly_task_reruns_current_year_statements(contract_factory):
+    this_year = timezone.localdate().replace(month=1, day=1)
+    current = Statement.objects.create(
+        file_name="a.csv",
+        period_start=this_year,
+        period_end=this_year.replace(month=12, day=31),
+        ingested_at=timezone.now(),
+    )
+    old = Statement.objects.create(
+        file_name="b.csv",
+        period_start=date(2020, 1, 1),
+        period_end=date(2020, 12, 31),
+        ingested_at=timezone.now(),
+    )
+    contract_factory("+33611111111", "100.00", f"{this_year.year}-01-02T10:00")
+
+    assert reconcile_current_year() == 1
+
+    current.refresh_from_db()
+    old.refresh_from_db()
+    assert current.summary == {DiscrepancyKind.MISSING_IN_STATEMENT: 1}
+    assert old.reconciled_at is None
+
+
+def test_management_command(tmp_path, contract_factory):
+    contract_factory("+33611111111", "100.00", "2025-05-03T10:00")
+    path = _write_csv(
+        tmp_path / "mai.csv", [["Dupont", "Jean", "0611111111", "03/05/2025", "", "150", ""]]
+    )
+    out = StringIO()
+
+    call_command(
+        "reconcile_contracts", str(path), "--from", "2025-05-01", "--to", "2025-05-31", stdout=out
+    )
+
+    assert "1 lignes, 1 rapprochées, 1 écarts" in out.getvalue()
+    assert "Montant différent : Jean Dupont (+33611111111) – relevé 150.00€" in out.getvalue()
+
+
+def test_api_upload_then_list_discrepancies(
+    tmp_path, admin, contract_factory, django_capture_on_commit_callbacks
+):
+    contract_factory("+33611111111", "100.00", "2025-05-03T10:00")
+    contract_factory("+33622222222", "200.00", "2025-05-04T10:00")
+    content = _write_csv(
+        tmp_path / "mai.csv", [["Dupont", "Jean", "0611111111", "03/05/2025", "", "150", ""]]
+    ).read_bytes()
+    client = APIClient()
+    client.force_authenticate(admin)
+
+    with (
+        patch("api.utils.cloud.scw.bucket_utils.put_object") as put,
+        patch("api.reconciliation.tasks.get_object", return_value=content),
+        patch("api.reconciliation.tasks.run_reconciliation.delay", side_effect=run_reconciliation),
+        django_capture_on_commit_callbacks(execute=True),
+    ):
+        response = client.post(
+            reverse("reconciliation-statements-list"),
+            {"file": SimpleUploadedFile("mai.csv", content), "period_start": "2025-05-01", "period_end": "2025-05-31"},
+            format="multipart",
+        )
+    assert response.status_code == 202
+    put.assert_called_once()
+
+    url = reverse("reconciliation-statements-detail", args=[response.data["id"]])
+    detail = client.get(url).data
+    assert (detail["status"], detail["discrepancy_count"]) == (StatementStatus.COMPLETED, 2)
+
+    discrepancies_url = reverse(
+        "reconciliation-statements-discrepancies", args=[response.data["id"]]
+    )
+    response = client.get(discrepancies_url, {"kind": DiscrepancyKind.MISSING_IN_STATEMENT})
+    assert [d["phone"] for d in response.data["results"]] == ["+33622222222"]
+    assert client.get(discrepancies_url, {"kind": "AUTRE"}).status_code == 400
+
+
+def test_api_rejects_non_admin_and_unknown_format(admin):
+    conseiller = User.objects.create_user(
+        email="conseiller@example.com",
+        password="pass",
+        role=UserRoles.CONSEILLER,
+        first_name="Claire",
+        last_name="Conseil",
+    )
+    client = APIClient()
+    client.force_authenticate(conseiller)
+    assert client.get(reverse("reconciliation-statements-list")).status_code == 403
+
+    client.force_authenticate(admin)
+    response = client.post(
+        reverse("reconciliation-statements-list"),
+        {"file": SimpleUploadedFile("mai.pdf", b"%PDF")},
+        format="multipart",
+    )
+    assert response.status_code == 400
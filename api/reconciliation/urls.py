@@ -0,0 +1,8 @@
+from rest_framework.routers import DefaultRouter
+
+from api.reconciliation.views import StatementViewSet
+
+router = DefaultRouter()
+router.register(r"statements", StatementViewSet, basename="reconciliation-statements")
+
+urlpatterns = router.urls
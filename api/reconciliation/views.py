@@ -0,0 +1,91 @@
+from django.conf import settings
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.response import Response
+
+from api.reconciliation.models import DiscrepancyKind, Statement, StatementStatus
+from api.reconciliation.serializers import (
+    DiscrepancySerializer,
+    StatementSerializer,
+    StatementUploadSerializer,
+)
+from api.reconciliation.services import schedule_statement, store_upload
+from api.users.permissions import IsAdminRole
+
+
+class StatementViewSet(
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    Rapprochement des relevés externes de contrats (ADMIN).
+
+    - POST /reconciliation/statements/ (multipart : file, period_start, period_end,
+      amount_tolerance, include_cancelled) : dépose un relevé CSV / XLSX et lance le
+      rapprochement en tâche de fond. Période par défaut : dates extrêmes du relevé.
+    - GET /reconciliation/statements/, /reconciliation/statements/{id}/ : avancement,
+      compteurs et résumé des écarts par type.
+    - GET /reconciliation/statements/{id}/discrepancies/?kind=AMOUNT_MISMATCH : écarts.
+    - POST /reconciliation/statements/{id}/rerun/ : rejoue le rapprochement (lignes déjà
+      enregistrées, contrats à jour).
+    """
+
+    queryset = Statement.objects.all()
+    serializer_class = StatementSerializer
+    permission_classes = [IsAdminRole]
+    parser_classes = [MultiPartParser, FormParser, JSONParser]
+
+    def create(self, request, *args, **kwargs):
+        upload = StatementUploadSerializer(data=request.data)
+        upload.is_valid(raise_exception=True)
+        data = upload.validated_data
+        file = data["file"]
+        statement = Statement.objects.create(
+            file_name=file.name,
+            s3_key=store_upload(file),
+            period_start=data.get("period_start"),
+            period_end=data.get("period_end"),
+            amount_tolerance=data.get(
+                "amount_tolerance", settings.RECONCILIATION_AMOUNT_TOLERANCE
+            ),
+            include_cancelled=data["include_cancelled"],
+            created_by=request.user,
+        )
+        schedule_statement(statement)
+        return Response(
+            self.get_serializer(statement).data, status=status.HTTP_202_ACCEPTED
+        )
+
+    @action(detail=True, methods=["post"])
+    def rerun(self, request, pk=None):
+        statement = self.get_object()
+        if statement.status == StatementStatus.RUNNING:
+            return Response(
+                {"detail": "Un rapprochement de ce relevé est déjà en cours."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        # Relevé jamais ingéré (échec à la lecture) : le fichier est relu
+        schedule_statement(statement, ingest=statement.ingested_at is None)
+        return Response(
+            self.get_serializer(statement).data, status=status.HTTP_202_ACCEPTED
+        )
+
+    @action(detail=True, methods=["get"])
+    def discrepancies(self, request, pk=None):
+        statement = self.get_object()
+        queryset = statement.discrepancies.select_related("line")
+        kind = request.query_params.get("kind")
+        if kind:
+            if kind not in DiscrepancyKind.values:
+                return Response(
+                    {"detail": f"Type d'écart inconnu : {kind}"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            queryset = queryset.filter(kind=kind)
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(DiscrepancySerializer(page, many=True).data)
+        return Response(DiscrepancySerializer(queryset, many=True).data)
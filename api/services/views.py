@@ -1,16 +1,21 @@
 from rest_framework import viewsets
 
+from api.utils.reference_data import ReferenceDataListMixin
+
 from .models import Service
 from .permissions import IsAdminForUnsafeOnly
 from .serializers import ServiceSerializer
 
 
-class ServiceViewSet(viewsets.ModelViewSet):
+class ServiceViewSet(ReferenceDataListMixin, viewsets.ModelViewSet):
     """
     - Lecture (GET) accessible à tous
     - Écriture réservée aux admins
+    - Liste servie depuis le cache des données de référence (ETag / 304)
     """
 
+    reference_dataset = "services"
+
     queryset = Service.objects.all()
     serializer_class = ServiceSerializer
     permission_classes = [IsAdminForUnsafeOnly]
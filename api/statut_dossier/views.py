@@ -3,14 +3,18 @@ from rest_framework import viewsets
 from api.statut_dossier.models import StatutDossier
 from api.statut_dossier.permissions import IsAdminOrReadOnly
 from api.statut_dossier.serializers import StatutDossierSerializer
+from api.utils.reference_data import ReferenceDataListMixin
 
 
-class StatutDossierViewSet(viewsets.ModelViewSet):
+class StatutDossierViewSet(ReferenceDataListMixin, viewsets.ModelViewSet):
     """
     ViewSet CRUD pour la gestion des statuts dossier.
     Par défaut, toutes les routes nécessitent l’authentification.
+    La liste est servie depuis le cache des données de référence (ETag / 304).
     """
 
+    reference_dataset = "statut_dossiers"
+
     queryset = StatutDossier.objects.all()
     serializer_class = StatutDossierSerializer
     permission_classes = [IsAdminOrReadOnly]
@@ -2,14 +2,18 @@ from rest_framework import viewsets
 from api.statut_dossier_interne.models import StatutDossierInterne
 from api.statut_dossier_interne.serializers import StatutDossierInterneSerializer
 from api.statut_dossier_interne.permissions import IsAdminOrReadOnly
+from api.utils.reference_data import ReferenceDataListMixin
 
 
-class StatutDossierInterneViewSet(viewsets.ModelViewSet):
+class StatutDossierInterneViewSet(ReferenceDataListMixin, viewsets.ModelViewSet):
     """
     ViewSet CRUD pour la gestion des statuts internes de dossiers.
+    La liste est servie depuis le cache des données de référence (ETag / 304).
     """
 
+    reference_dataset = "statut_dossiers_internes"
+
     queryset = StatutDossierInterne.objects.all()
     serializer_class = StatutDossierInterneSerializer
     permission_classes = [IsAdminOrReadOnly]
-    pagination_class = None
\ No newline at end of file
+    pagination_class = None
@@ -36,6 +36,19 @@ api_urlpatterns = [
     path("avatars/", include("api.profile.urls")),
     # Authentification (login, refresh, register si besoin)
     path("auth/", include("api.custom_auth.urls")),
+    # Campagnes de notification en masse
+    path("campaigns/", include("api.campaigns.urls")),
+    # Imports de leads en masse (CSV / XLSX)
+    path("lead-imports/", include("api.lead_imports.urls")),
+    path("lead-dedup/", include("api.lead_dedup.urls")),
+    # Assignation automatique des leads (charges des conseillers, rééquilibrage)
+    path("lead-assignment/", include("api.lead_assignment.urls")),
+    # Rapprochement des relevés externes de contrats
+    path("reconciliation/", include("api.reconciliation.urls")),
+    # Rapport quotidien des rendez-vous (PDF)
+    path("appointment-reports/", include("api.appointment_reports.urls")),
+    # Supervision (files Celery)
+    path("monitoring/", include("api.monitoring.urls")),
     # Ajoute d'autres modules ici au besoin
 ]
 
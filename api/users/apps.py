@@ -8,4 +8,9 @@ class UsersConfig(AppConfig):
 
     def ready(self):
         import api.websocket.signals.leads
-        import api.websocket.signals.clients
\ No newline at end of file
+        import api.websocket.signals.clients
+        from api.utils.conditional import connect_version_signals
+        from api.utils.reference_data import connect_invalidation_signals
+
+        connect_invalidation_signals()
+        connect_version_signals()
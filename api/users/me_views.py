@@ -1,7 +1,9 @@
+from django.shortcuts import get_object_or_404
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from .models import User
 from .serializers import UserSerializer
 
 
@@ -9,5 +11,9 @@ class MeView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        serializer = UserSerializer(request.user, context={"request": request})
+        # request.user peut être un utilisateur issu des claims JWT : on charge le profil complet
+        user = request.user
+        if not isinstance(user, User):
+            user = get_object_or_404(User, pk=user.pk)
+        serializer = UserSerializer(user, context={"request": request})
         return Response(serializer.data)
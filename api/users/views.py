@@ -7,10 +7,11 @@ from rest_framework.exceptions import ValidationError as DRFValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from api.custom_auth.revocation import revoke_user_tokens
 from api.users.models import User
 from api.users.permissions import IsAdminRole
-from api.users.roles import UserRoles
 from api.users.serializers import UserSerializer
+from api.utils.reference_data import reference_list_response
 
 
 class UserViewSet(viewsets.ModelViewSet):
@@ -29,6 +30,21 @@ class UserViewSet(viewsets.ModelViewSet):
     search_fields = ["email", "first_name", "last_name"]
     ordering_fields = ["date_joined", "email"]
 
+    def perform_update(self, serializer):
+        """
+        Un changement de rôle ou d'activation invalide les jetons existants :
+        leurs claims ne reflètent plus l'état du compte.
+        """
+        before = (serializer.instance.role, serializer.instance.is_active)
+        user = serializer.save()
+        if (user.role, user.is_active) != before:
+            revoke_user_tokens(user.pk)
+
+    def perform_destroy(self, instance):
+        user_id = instance.pk
+        instance.delete()
+        revoke_user_tokens(user_id)
+
     @action(detail=True, methods=["patch"], url_path="toggle-active")
     def toggle_active(self, request, pk=None):
         """
@@ -44,13 +60,16 @@ class UserViewSet(viewsets.ModelViewSet):
 
         user.is_active = bool(is_active)
         user.save()
+        if not user.is_active:
+            revoke_user_tokens(user.pk)
         return Response({"is_active": user.is_active}, status=status.HTTP_200_OK)
 
     @action(detail=False, methods=["get"], url_path="juristes")
     def juristes(self, request):
-        juristes = User.objects.filter(role=UserRoles.JURISTE, is_active=True)
-        serializer = self.get_serializer(juristes, many=True)
-        return Response(serializer.data)
+        """
+        Retourne la liste des juristes actifs (servie depuis le cache, ETag / 304).
+        """
+        return reference_list_response(request, "juristes")
 
     @action(
         detail=False,
@@ -62,10 +81,9 @@ class UserViewSet(viewsets.ModelViewSet):
         """
         Retourne la liste des conseillers actifs (role=CONSEILLER, is_active=True).
         Accessible à tous les utilisateurs connectés.
+        Servie depuis le cache des données de référence (ETag / 304).
         """
-        conseillers = User.objects.filter(role=UserRoles.CONSEILLER, is_active=True)
-        serializer = self.get_serializer(conseillers, many=True)
-        return Response(serializer.data)
+        return reference_list_response(request, "conseillers")
 
     @action(detail=True, methods=["patch"], url_path="change-password")
     def change_password(self, request, pk=None):
@@ -94,4 +112,15 @@ class UserViewSet(viewsets.ModelViewSet):
 
         user.set_password(new_password)
         user.save()
+        revoke_user_tokens(user.pk)
         return Response(status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=["post"], url_path="force-logout")
+    def force_logout(self, request, pk=None):
+        """
+        Déconnecte immédiatement un utilisateur de toutes ses sessions
+        (révocation de tous ses jetons JWT émis jusqu'ici).
+        """
+        user = self.get_object()
+        revoke_user_tokens(user.pk)
+        return Response(status=status.HTTP_204_NO_CONTENT)
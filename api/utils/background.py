@@ -0,0 +1,171 @@
+"""
+Exécuteur partagé pour les effets de bord en arrière-plan, dans le processus web
+(régénération de PDF, vérification de facture, suppression de fichiers S3…).
+
+- Pool de threads borné (`BACKGROUND_MAX_WORKERS`) et file bornée (`BACKGROUND_MAX_QUEUE`) :
+  quand la file est pleine, la tâche s'exécute dans le thread appelant (contre-pression)
+  au lieu d'empiler des threads sans limite.
+- Chaque tâche ferme ses connexions base de données en fin d'exécution (les connexions
+  Django sont propres à chaque thread et ne seraient sinon jamais libérées).
+- `submit_on_commit` attend la validation de la transaction : la tâche lit des données
+  écrites, pas un état intermédiaire.
+- Profondeur de file, tâches actives et volumes sont exposés par `get_background_stats`.
+- À l'arrêt du processus, les tâches en cours et en file sont attendues
+  (`BACKGROUND_DRAIN_TIMEOUT` secondes au plus).
+"""
+
+import atexit
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+
+from api.utils.metrics import get_counters, incr, reset_counters
+
+logger = logging.getLogger(__name__)
+
+METRICS_KEY = "background:{metric}"
+METRICS = ("submitted", "completed", "failed", "inline")
+DEFAULTS = {
+    "BACKGROUND_MAX_WORKERS": 4,
+    "BACKGROUND_MAX_QUEUE": 100,
+    "BACKGROUND_DRAIN_TIMEOUT": 30,
+    "BACKGROUND_TASKS_EAGER": False,
+}
+
+_lock = threading.Lock()
+_executor = None
+_slots = None
+_pending = set()
+_active = 0
+
+
+def _setting(name):
+    return getattr(settings, name, DEFAULTS[name])
+
+
+def _get_executor():
+    global _executor, _slots
+    with _lock:
+        if _executor is None:
+            workers = _setting("BACKGROUND_MAX_WORKERS")
+            _executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="background"
+            )
+            _slots = threading.BoundedSemaphore(workers + _setting("BACKGROUND_MAX_QUEUE"))
+        return _executor
+
+
+def _run(fn, args, kwargs, name):
+    global _active
+    with _lock:
+        _active += 1
+    close_old_connections()
+    try:
+        fn(*args, **kwargs)
+        incr(METRICS_KEY.format(metric="completed"))
+    except Exception as e:
+        incr(METRICS_KEY.format(metric="failed"))
+        logger.exception("❌ Tâche d'arrière-plan %s en échec : %s", name, e)
+    finally:
+        connections.close_all()
+        with _lock:
+            _active -= 1
+
+
+def submit(fn, *args, **kwargs):
+    """
+    Exécute `fn(*args, **kwargs)` en arrière-plan. Les exceptions sont loggées, jamais
+    propagées à l'appelant.
+    """
+    name = getattr(fn, "__qualname__", repr(fn))
+    incr(METRICS_KEY.format(metric="submitted"))
+
+    if _setting("BACKGROUND_TASKS_EAGER"):
+        _run_inline(fn, args, kwargs, name)
+        return None
+
+    executor = _get_executor()
+    if not _slots.acquire(blocking=False):
+        logger.warning("⚠️ File d'arrière-plan pleine, exécution immédiate de %s", name)
+        incr(METRICS_KEY.format(metric="inline"))
+        _run_inline(fn, args, kwargs, name)
+        return None
+
+    try:
+        future = executor.submit(_run, fn, args, kwargs, name)
+    except RuntimeError:
+        # Exécuteur arrêté (fin de processus)
+        _slots.release()
+        _run_inline(fn, args, kwargs, name)
+        return None
+
+    with _lock:
+        _pending.add(future)
+    future.add_done_callback(_release)
+    return future
+
+
+def _run_inline(fn, args, kwargs, name):
+    try:
+        fn(*args, **kwargs)
+        incr(METRICS_KEY.format(metric="completed"))
+    except Exception as e:
+        incr(METRICS_KEY.format(metric="failed"))
+        logger.exception("❌ Tâche d'arrière-plan %s en échec : %s", name, e)
+
+
+def _release(future):
+    with _lock:
+        _pending.discard(future)
+    _slots.release()
+
+
+def submit_on_commit(fn, *args, **kwargs):
+    """`submit` après validation de la transaction courante (immédiat hors transaction)."""
+    transaction.on_commit(lambda: submit(fn, *args, **kwargs))
+
+
+def drain(timeout=None) -> bool:
+    """
+    Attend la fin des tâches en cours et en file, puis arrête l'exécuteur.
+    Retourne False si des tâches n'ont pas fini dans le délai.
+    """
+    global _executor
+    timeout = _setting("BACKGROUND_DRAIN_TIMEOUT") if timeout is None else timeout
+    with _lock:
+        executor, pending = _executor, list(_pending)
+        _executor = None
+    if executor is None:
+        return True
+
+    if pending:
+        logger.info("⏳ Attente de %s tâches d'arrière-plan avant arrêt", len(pending))
+    _, not_done = wait(pending, timeout=timeout)
+    executor.shutdown(wait=not not_done, cancel_futures=bool(not_done))
+    if not_done:
+        logger.warning("⚠️ %s tâches d'arrière-plan abandonnées à l'arrêt", len(not_done))
+    return not not_done
+
+
+atexit.register(drain)
+
+
+def get_background_stats() -> dict:
+    """État de l'exécuteur du processus courant et compteurs cumulés (tous processus)."""
+    with _lock:
+        active, pending = _active, len(_pending)
+    counters = get_counters(METRICS_KEY.format(metric=m) for m in METRICS)
+    return {
+        "max_workers": _setting("BACKGROUND_MAX_WORKERS"),
+        "max_queue": _setting("BACKGROUND_MAX_QUEUE"),
+        "active": active,
+        "queued": max(pending - active, 0),
+        **{m: counters[METRICS_KEY.format(metric=m)] for m in METRICS},
+    }
+
+
+def reset_background_stats():
+    reset_counters(METRICS_KEY.format(metric=m) for m in METRICS)
@@ -1,26 +1,50 @@
 from django.conf import settings
 import mimetypes
 from urllib.parse import urlparse, unquote
-from .s3_client import get_s3_client
+from .s3_client import get_shared_s3_client
+
+# Limite S3 du nombre de clés par appel `DeleteObjects`
+DELETE_BATCH_SIZE = 1000
 
 
 def get_object(bucket_key: str, key: str) -> bytes:
-    s3 = get_s3_client()
+    s3 = get_shared_s3_client()
     bucket = settings.SCW_BUCKETS[bucket_key]
     response = s3.get_object(Bucket=bucket, Key=key)
     return response["Body"].read()
 
 
 def delete_object(bucket_key: str, key: str):
-    s3 = get_s3_client()
+    s3 = get_shared_s3_client()
     bucket = settings.SCW_BUCKETS[bucket_key]
     s3.delete_object(Bucket=bucket, Key=key)
 
 
+def delete_objects(bucket_key: str, keys) -> list:
+    """
+    Supprime des clés par lots (`DeleteObjects`, une requête pour 1000 clés).
+    Retourne les erreurs signalées par S3 (`[{"Key", "Code", "Message"}]`).
+    """
+    s3 = get_shared_s3_client()
+    bucket = settings.SCW_BUCKETS[bucket_key]
+    keys = list(keys)
+    errors = []
+    for start in range(0, len(keys), DELETE_BATCH_SIZE):
+        response = s3.delete_objects(
+            Bucket=bucket,
+            Delete={
+                "Objects": [{"Key": key} for key in keys[start : start + DELETE_BATCH_SIZE]],
+                "Quiet": True,
+            },
+        )
+        errors.extend(response.get("Errors", []))
+    return errors
+
+
 def put_object(
     bucket_key: str, key: str, content: bytes, content_type="application/octet-stream"
 ):
-    s3 = get_s3_client()
+    s3 = get_shared_s3_client()
     bucket = settings.SCW_BUCKETS[bucket_key]
     s3.put_object(
         Bucket=bucket,
@@ -36,7 +60,7 @@ def generate_presigned_url(bucket_key: str, key: str, expires_in: int = 3600) ->
     Génère une URL signée temporaire avec détection automatique du type MIME.
     - Supporte aussi bien les clés S3 simples que les URLs complètes.
     """
-    s3 = get_s3_client()
+    s3 = get_shared_s3_client()
     bucket = settings.SCW_BUCKETS[bucket_key]
 
     # 🔍 Étape 1 — Extraire le vrai chemin depuis l’URL si besoin
@@ -0,0 +1,205 @@
+"""
+Téléchargements S3 en parallèle, avec cache local indexé par ETag.
+
+- Un pool de threads borné (`S3_DOWNLOAD_MAX_WORKERS`) partage un seul client boto3.
+- Chaque fichier téléchargé est conservé sur disque (`S3_DOWNLOAD_CACHE_DIR`) sous son ETag ;
+  les appels suivants font un GET conditionnel (`If-None-Match`) et relisent la copie
+  locale si l'objet n'a pas changé (réponse 304, sans transfert du contenu).
+- Le cache est borné : les copies non relues depuis `S3_DOWNLOAD_CACHE_MAX_AGE` secondes
+  sont supprimées, puis les moins récemment utilisées au-delà de
+  `S3_DOWNLOAD_CACHE_MAX_BYTES` (élagage après chaque série de téléchargements).
+- Une erreur sur un fichier n'interrompt pas les autres : elle est renvoyée dans le résultat.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from botocore.exceptions import ClientError
+from django.conf import settings
+
+from api.utils.cloud.scw.s3_client import get_shared_s3_client
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "S3_DOWNLOAD_MAX_WORKERS": 8,
+    "S3_DOWNLOAD_CACHE_DIR": os.path.join(tempfile.gettempdir(), "tds-s3-cache"),
+    "S3_DOWNLOAD_CACHE_MAX_BYTES": 200 * 1024 * 1024,
+    "S3_DOWNLOAD_CACHE_MAX_AGE": 7 * 24 * 3600,
+}
+
+
+def _setting(name):
+    return getattr(settings, name, DEFAULTS[name])
+
+
+@dataclass
+class S3Download:
+    """Résultat du téléchargement d'une clé (contenu ou erreur)."""
+
+    key: str
+    filename: str
+    content: bytes = None
+    etag: str = ""
+    from_cache: bool = False
+    error: Exception = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+# ==========================
+#  CACHE LOCAL
+# ==========================
+
+
+def _index_path(bucket: str, key: str) -> str:
+    digest = hashlib.sha1(f"{bucket}/{key}".encode("utf-8")).hexdigest()
+    return os.path.join(_setting("S3_DOWNLOAD_CACHE_DIR"), f"{digest}.etag")
+
+
+def _content_path(etag: str) -> str:
+    return os.path.join(_setting("S3_DOWNLOAD_CACHE_DIR"), f"{etag}.bin")
+
+
+def _read_cached(bucket: str, key: str):
+    """Retourne (etag, contenu) de la copie locale, ou (None, None)."""
+    try:
+        with open(_index_path(bucket, key)) as f:
+            etag = f.read().strip()
+        with open(_content_path(etag), "rb") as f:
+            content = f.read()
+        # Date de dernier usage : base de l'élagage
+        os.utime(_index_path(bucket, key))
+        os.utime(_content_path(etag))
+        return etag, content
+    except (OSError, ValueError):
+        return None, None
+
+
+def _write_cached(bucket: str, key: str, etag: str, content: bytes):
+    if not etag:
+        return
+    try:
+        os.makedirs(_setting("S3_DOWNLOAD_CACHE_DIR"), exist_ok=True)
+        # Écriture atomique : un autre thread / worker ne lit jamais un fichier partiel
+        for path, data, mode in (
+            (_content_path(etag), content, "wb"),
+            (_index_path(bucket, key), etag, "w"),
+        ):
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, mode) as f:
+                f.write(data)
+            os.replace(tmp, path)
+    except OSError as e:
+        logger.warning(f"⚠️ Cache S3 local indisponible : {e}")
+
+
+def prune_cache() -> int:
+    """
+    Supprime les copies locales expirées, puis les moins récemment utilisées tant que le
+    cache dépasse sa taille maximale. Retourne le nombre de fichiers supprimés.
+    """
+    directory = _setting("S3_DOWNLOAD_CACHE_DIR")
+    try:
+        entries = [entry for entry in os.scandir(directory) if entry.is_file()]
+    except OSError:
+        return 0
+
+    expired_before = time.time() - _setting("S3_DOWNLOAD_CACHE_MAX_AGE")
+    files = []
+    for entry in entries:
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        if entry.name.endswith(".tmp") and stat.st_mtime >= expired_before:
+            continue  # écriture en cours
+        files.append((stat.st_mtime, stat.st_size, entry.path))
+
+    # Plus récemment utilisés en premier : conservés jusqu'à la taille maximale
+    files.sort(reverse=True)
+    budget = _setting("S3_DOWNLOAD_CACHE_MAX_BYTES")
+    removed = 0
+    for mtime, size, path in files:
+        budget -= size
+        if mtime >= expired_before and budget >= 0:
+            continue
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError:
+            pass
+    if removed:
+        logger.info(f"🧹 Cache S3 local : {removed} fichier(s) supprimé(s)")
+    return removed
+
+
+# ==========================
+#  TÉLÉCHARGEMENT
+# ==========================
+
+
+def _download(s3, bucket: str, key: str) -> S3Download:
+    result = S3Download(key=key, filename=os.path.basename(key))
+    cached_etag, cached_content = _read_cached(bucket, key)
+
+    params = {"Bucket": bucket, "Key": key}
+    if cached_etag:
+        params["IfNoneMatch"] = f'"{cached_etag}"'
+
+    try:
+        response = s3.get_object(**params)
+    except ClientError as e:
+        code = e.response.get("Error", {}).get("Code")
+        if cached_etag and code in ("304", "NotModified"):
+            result.content, result.etag, result.from_cache = (
+                cached_content,
+                cached_etag,
+                True,
+            )
+            return result
+        result.error = e
+        return result
+    except Exception as e:
+        result.error = e
+        return result
+
+    result.content = response["Body"].read()
+    result.etag = response.get("ETag", "").strip('"')
+    _write_cached(bucket, key, result.etag, result.content)
+    return result
+
+
+def download_files_from_s3(bucket_key: str, keys) -> list:
+    """
+    Télécharge plusieurs fichiers en parallèle. Retourne une liste de `S3Download`
+    dans l'ordre des clés reçues.
+    """
+    keys = list(keys)
+    if not keys:
+        return []
+
+    s3 = get_shared_s3_client()
+    bucket = settings.SCW_BUCKETS[bucket_key]
+    workers = max(1, min(_setting("S3_DOWNLOAD_MAX_WORKERS"), len(keys)))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda key: _download(s3, bucket, key), keys))
+
+    cached = sum(1 for r in results if r.from_cache)
+    failed = sum(1 for r in results if not r.ok)
+    # Nouvelles copies écrites : cache ramené sous ses limites
+    if len(results) > cached + failed:
+        prune_cache()
+    logger.info(
+        f"📥 {len(keys)} fichier(s) S3 '{bucket_key}' "
+        f"({cached} depuis le cache local, {failed} échec(s))"
+    )
+    return results
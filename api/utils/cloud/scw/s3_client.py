@@ -1,5 +1,7 @@
 # api/utils/cloud/scw/s3_client.py
 
+import threading
+
 import boto3
 from django.conf import settings
 
@@ -16,3 +18,20 @@ def get_s3_client():
         region_name=settings.AWS_S3_REGION_NAME,
         verify=settings.AWS_S3_VERIFY,
     )
+
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_s3_client():
+    """
+    Client S3 partagé par le processus (les clients boto3 sont thread-safe) :
+    évite de recréer session, résolution d'endpoint et pool HTTP à chaque appel.
+    """
+    global _shared_client
+    if _shared_client is None:
+        with _shared_lock:
+            if _shared_client is None:
+                _shared_client = get_s3_client()
+    return _shared_client
@@ -4,7 +4,7 @@ from urllib.parse import urlparse
 
 from django.conf import settings
 
-from api.utils.cloud.scw.s3_client import get_s3_client
+from api.utils.cloud.scw.s3_client import get_shared_s3_client
 
 
 def download_file_from_s3(bucket_key: str, key: str) -> tuple[bytes, str]:
@@ -12,7 +12,7 @@ def download_file_from_s3(bucket_key: str, key: str) -> tuple[bytes, str]:
     Télécharge un fichier depuis Scaleway S3 via boto3 (accès privé).
     Retourne le contenu du fichier (bytes) et son nom.
     """
-    s3 = get_s3_client()
+    s3 = get_shared_s3_client()
     bucket = settings.SCW_BUCKETS[bucket_key]
 
     response = s3.get_object(Bucket=bucket, Key=key)
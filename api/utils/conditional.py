@@ -0,0 +1,217 @@
+"""
+GET conditionnels (ETag / 304) sur les fiches lead, client et contrat.
+
+- Chaque modèle porte une colonne `updated_at` qui sert de version. Elle est mise à jour
+  par les écritures directes et, via les signaux ci-dessous, par les écritures liées
+  (client → lead, contrat → lead, reçu → contrat, assignations M2M → lead).
+- `ConditionalRetrieveMixin` calcule l'ETag en une seule requête `values_list` et répond
+  304 avant toute sérialisation si le client possède déjà la version courante.
+- Les succès / échecs et le temps de sérialisation évité sont comptés dans Redis
+  (`get_conditional_stats`).
+"""
+
+import hashlib
+import time
+
+from django.core.exceptions import ValidationError
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+
+from api.utils.metrics import get_counters, incr, reset_counters
+from api.utils.reference_data import get_reference_entry
+
+STATS_KEY = "conditional:{resource}:{metric}"
+STATS_METRICS = ("hits", "misses", "miss_ms")
+
+
+# ==========================
+#  VERSIONS (updated_at)
+# ==========================
+
+
+def touch(model, **filters):
+    """
+    Met à jour `updated_at` des lignes ciblées en un seul UPDATE (sans signaux).
+    """
+    return model.objects.filter(**filters).update(updated_at=timezone.now())
+
+
+def _touch_lead_from_client(sender, instance, **kwargs):
+    from api.leads.models import Lead
+
+    if instance.lead_id:
+        touch(Lead, pk=instance.lead_id)
+
+
+def _touch_lead_from_contract(sender, instance, **kwargs):
+    from api.leads.models import Lead
+
+    # `contract_emitter_id` du lead dépend de ses contrats
+    touch(Lead, form_data__id=instance.client_id)
+
+
+def _touch_contract_from_receipt(sender, instance, **kwargs):
+    from api.contracts.models import Contract
+
+    # Montants payés / solde du contrat dépendent des reçus
+    if instance.contract_id:
+        touch(Contract, pk=instance.contract_id)
+
+
+def _touch_lead_from_assignment(sender, instance, action, reverse, pk_set, **kwargs):
+    from api.leads.models import Lead
+
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        touch(Lead, pk=instance.pk)
+    elif pk_set:
+        touch(Lead, pk__in=pk_set)
+
+
+def connect_version_signals():
+    """
+    Branche la propagation des versions sur les écritures liées.
+    """
+    from api.clients.models import Client
+    from api.contracts.models import Contract
+    from api.leads.models import Lead
+    from api.payments.models import PaymentReceipt
+
+    for signal, name in ((post_save, "save"), (post_delete, "delete")):
+        signal.connect(
+            _touch_lead_from_client,
+            sender=Client,
+            dispatch_uid=f"version-client-{name}",
+        )
+        signal.connect(
+            _touch_lead_from_contract,
+            sender=Contract,
+            dispatch_uid=f"version-contract-{name}",
+        )
+        signal.connect(
+            _touch_contract_from_receipt,
+            sender=PaymentReceipt,
+            dispatch_uid=f"version-receipt-{name}",
+        )
+
+    for field in ("assigned_to", "jurist_assigned"):
+        m2m_changed.connect(
+            _touch_lead_from_assignment,
+            sender=getattr(Lead, field).through,
+            dispatch_uid=f"version-lead-{field}",
+        )
+
+
+# ==========================
+#  MESURES
+# ==========================
+
+
+def _incr(resource: str, metric: str, amount: int = 1):
+    incr(STATS_KEY.format(resource=resource, metric=metric), amount)
+
+
+def get_conditional_stats(resource: str) -> dict:
+    """
+    Taux de 304 et temps de sérialisation évité pour une ressource.
+    Le temps évité est estimé à partir du temps moyen d'une réponse complète.
+    """
+    keys = {m: STATS_KEY.format(resource=resource, metric=m) for m in STATS_METRICS}
+    values = get_counters(keys.values())
+    hits = values[keys["hits"]]
+    misses = values[keys["misses"]]
+    miss_ms = values[keys["miss_ms"]]
+
+    total = hits + misses
+    avg_miss_ms = miss_ms / misses if misses else 0.0
+    return {
+        "resource": resource,
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / total, 4) if total else 0.0,
+        "avg_full_response_ms": round(avg_miss_ms, 2),
+        "estimated_saved_ms": round(hits * avg_miss_ms, 2),
+    }
+
+
+def reset_conditional_stats(resource: str):
+    reset_counters(STATS_KEY.format(resource=resource, metric=m) for m in STATS_METRICS)
+
+
+# ==========================
+#  MIXIN DE VUE
+# ==========================
+
+
+class ConditionalRetrieveMixin:
+    """
+    Mixin de ViewSet : `retrieve` conditionnel.
+
+    - etag_resource : nom de la ressource (préfixe d'ETag et clé de mesures)
+    - etag_version_fields : champs lus en une requête pour construire l'ETag
+      (ex : `updated_at`, `form_data__updated_at`)
+    - etag_reference_datasets : jeux de données de référence affichés dans la fiche
+      (un renommage de statut change l'ETag)
+    - etag_max_age : rotation forcée de l'ETag (secondes), pour les représentations
+      contenant des URLs signées qui expirent
+
+    Les permissions de la vue (`has_permission`) sont vérifiées avant `retrieve` ;
+    la réponse 304 est donc soumise aux mêmes règles d'accès que la réponse complète.
+    """
+
+    etag_resource = None
+    etag_version_fields = ("updated_at",)
+    etag_reference_datasets = ()
+    etag_max_age = None
+
+    def get_object_etag(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        filter_kwargs = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None)
+        try:
+            row = (
+                queryset.filter(**filter_kwargs)
+                .values_list(*self.etag_version_fields)
+                .first()
+            )
+        except (TypeError, ValueError, ValidationError):
+            return None
+        if row is None:
+            return None
+
+        parts = [self.etag_resource, str(self.kwargs[lookup_url_kwarg])]
+        parts += [value.isoformat() if value else "" for value in row]
+        parts += [
+            get_reference_entry(name)["version"]
+            for name in self.etag_reference_datasets
+        ]
+        if self.etag_max_age:
+            parts.append(str(int(time.time()) // self.etag_max_age))
+
+        digest = hashlib.md5("|".join(parts).encode("utf-8")).hexdigest()
+        return quote_etag(f"{self.etag_resource}-{digest}")
+
+    def retrieve(self, request, *args, **kwargs):
+        etag = self.get_object_etag()
+        if etag is not None:
+            not_modified = get_conditional_response(request, etag=etag)
+            if not_modified is not None:
+                _incr(self.etag_resource, "hits")
+                patch_cache_control(not_modified, private=True, no_cache=True)
+                return not_modified
+
+        start = time.perf_counter()
+        response = super().retrieve(request, *args, **kwargs)
+        if etag is not None and response.status_code == 200:
+            response["ETag"] = etag
+            patch_cache_control(response, private=True, no_cache=True)
+            _incr(self.etag_resource, "misses")
+            _incr(
+                self.etag_resource,
+                "miss_ms",
+                int((time.perf_counter() - start) * 1000),
+            )
+        return response
@@ -2,6 +2,7 @@ import logging
 from datetime import datetime
 
 from celery import shared_task
+from celery.exceptions import Retry
 
 from api.appointment.models import Appointment
 from api.leads.models import Lead
@@ -66,6 +67,8 @@ def send_appointment_deleted_task(lead_id: int, appointment_data: dict):
         lead = Lead.objects.get(pk=lead_id)
         appointment_date = parse_datetime(appointment_data["date"])
         send_appointment_deleted_email(lead, appointment_date, appointment_data)
+    except Retry:
+        raise  # quota SMTP : relance programmée
     except Exception as e:
         logger.error(
             f"❌ Erreur lors de l’envoi du mail d’annulation pour lead #{lead_id} : {e}"
@@ -2,28 +2,29 @@ import logging
 
 from django.conf import settings
 from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
 from django.utils import timezone
 
+from api.utils.email.dispatch import dispatch_messages
+from api.utils.email.rendering import render_batch, render_email
 from api.utils.email.utils import _get_with_info, get_french_datetime_strings
 
 logger = logging.getLogger(__name__)
 
 
-def send_html_email(to_email, subject, template_name, context, attachments=None):
+def build_html_email(to_email, subject, template_name, context, attachments=None):
     """
-    Envoie un email HTML à l'adresse fournie.
+    Construit (sans l'envoyer) un email HTML à l'adresse fournie.
     - to_email: email du destinataire
     - subject: sujet
     - template_name: chemin du template HTML Django
     - context: contexte pour le rendu du template
     - attachments: liste de dicts {filename, content, mimetype} (optionnel)
     """
-    if not to_email:
-        logger.warning("Aucun email fourni.")
-        return
+    html_content = render_email(template_name, context)
+    return _build_message(to_email, subject, html_content, attachments)
+
 
-    html_content = render_to_string(template_name, context)
+def _build_message(to_email, subject, html_content, attachments=None):
     msg = EmailMultiAlternatives(
         subject=subject,
         body="",
@@ -43,7 +44,57 @@ def send_html_email(to_email, subject, template_name, context, attachments=None)
             else:
                 logger.warning(f"Attachment ignoré (format incorrect): {att}")
 
-    msg.send()
+    return msg
+
+
+def send_html_email(to_email, subject, template_name, context, attachments=None):
+    """
+    Envoie un email HTML à l'adresse fournie (mêmes paramètres que `build_html_email`).
+    L'envoi passe par la connexion SMTP partagée du worker (voir `dispatch.py`) ;
+    une erreur définitive est relevée comme avant.
+    """
+    if not to_email:
+        logger.warning("Aucun email fourni.")
+        return
+
+    msg = build_html_email(to_email, subject, template_name, context, attachments)
+    dispatch_messages([msg], raise_on_failure=True)
+
+
+def send_html_emails(emails):
+    """
+    Envoie un lot d'emails HTML sur une seule connexion SMTP.
+    - emails: liste de dicts {to_email, subject, template_name, context, attachments?}
+    Retourne le bilan d'envoi (`DispatchResult`).
+    """
+    messages = [
+        build_html_email(
+            e["to_email"],
+            e["subject"],
+            e["template_name"],
+            e["context"],
+            e.get("attachments"),
+        )
+        for e in emails
+        if e.get("to_email")
+    ]
+    return dispatch_messages(messages)
+
+
+def send_templated_batch(subject, template_name, recipients):
+    """
+    Envoie un même gabarit à plusieurs destinataires : rendu en lot (gabarit compilé
+    une fois) puis envoi sur une seule connexion SMTP.
+    - recipients: liste de dicts {to_email, context, attachments?}
+    Retourne le bilan d'envoi (`DispatchResult`).
+    """
+    recipients = [r for r in recipients if r.get("to_email")]
+    bodies = render_batch(template_name, [r["context"] for r in recipients])
+    messages = [
+        _build_message(r["to_email"], subject, html, r.get("attachments"))
+        for r, html in zip(recipients, bodies)
+    ]
+    return dispatch_messages(messages)
 
 
 TDS_FRANCE_ADDRESS = (
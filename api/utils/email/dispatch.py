@@ -0,0 +1,300 @@
+"""
+Service d'envoi des e-mails transactionnels.
+
+- Une connexion SMTP authentifiée est conservée par worker (et par thread) et réutilisée
+  d'un envoi à l'autre, au lieu d'une session SMTP + STARTTLS par e-mail. Elle est
+  renouvelée après `EMAIL_POOL_MAX_MESSAGES` envois ou `EMAIL_POOL_IDLE_TIMEOUT` secondes
+  d'inactivité (Office365 coupe les sessions inactives).
+- Les envois SMTP respectent le quota du fournisseur (`EMAIL_RATE_LIMIT_PER_MINUTE`),
+  partagé entre workers via Redis. Dans une tâche Celery, l'attente de la réouverture du
+  quota reste sous la limite douce de la file : au-delà, la tâche est relancée
+  (`retry(countdown=…)`) si rien n'a encore été envoyé, sinon les messages restants sont
+  comptés en échec.
+- Chaque message est réessayé individuellement en cas d'erreur transitoire
+  (déconnexion, code 4xx, timeout) ; les erreurs définitives (5xx, destinataire refusé)
+  ne sont pas réessayées.
+- Latence, volumes et connexions ouvertes sont comptés (`get_email_metrics`).
+"""
+
+import logging
+import smtplib
+import threading
+import time
+from dataclasses import dataclass, field
+
+from celery import current_task
+from celery.signals import worker_process_shutdown
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import get_connection
+from django.core.mail.backends.smtp import EmailBackend as SMTPBackend
+
+from api.utils.metrics import get_counters, incr, reset_counters
+from api.utils.task_queues import get_queue_settings, queue_for_task
+
+logger = logging.getLogger(__name__)
+
+METRICS_KEY = "email:metrics:{metric}"
+METRICS = ("sent", "failed", "retries", "send_ms", "connections")
+RATE_KEY = "email:rate:{window}"
+# Marge gardée sous la limite douce de la file pour finir l'envoi après une attente
+QUOTA_WAIT_MARGIN = 5
+
+DEFAULTS = {
+    "EMAIL_POOL_MAX_MESSAGES": 100,
+    "EMAIL_POOL_IDLE_TIMEOUT": 60,
+    "EMAIL_RATE_LIMIT_PER_MINUTE": 30,
+    "EMAIL_SEND_MAX_RETRIES": 3,
+    "EMAIL_RETRY_BACKOFF": 2,
+}
+
+
+def _setting(name):
+    return getattr(settings, name, DEFAULTS[name])
+
+
+class SendQuotaExceeded(Exception):
+    """Quota SMTP épuisé pour plus longtemps que la tâche en cours ne peut attendre."""
+
+    def __init__(self, countdown: float):
+        super().__init__(f"Quota SMTP atteint, réouverture dans {countdown:.0f}s")
+        self.countdown = countdown
+
+
+@dataclass
+class DispatchResult:
+    """Bilan d'un lot d'envois."""
+
+    sent: int = 0
+    failed: int = 0
+    retries: int = 0
+    elapsed_ms: float = 0.0
+    errors: list = field(default_factory=list)
+
+    @property
+    def throughput(self) -> float:
+        """Messages envoyés par seconde."""
+        return self.sent / (self.elapsed_ms / 1000) if self.elapsed_ms else 0.0
+
+
+# ==========================
+#  CONNEXION PARTAGÉE
+# ==========================
+
+_local = threading.local()
+
+
+def _open_connection():
+    connection = get_connection(fail_silently=False)
+    connection.open()
+    _local.connection = connection
+    _local.sent = 0
+    _local.last_used = time.monotonic()
+    incr(METRICS_KEY.format(metric="connections"))
+    return connection
+
+
+def get_pooled_connection():
+    """
+    Retourne la connexion du worker courant, en l'ouvrant ou la renouvelant si besoin.
+    """
+    connection = getattr(_local, "connection", None)
+    if connection is not None:
+        idle = time.monotonic() - _local.last_used
+        if (
+            _local.sent >= _setting("EMAIL_POOL_MAX_MESSAGES")
+            or idle >= _setting("EMAIL_POOL_IDLE_TIMEOUT")
+        ):
+            close_pooled_connection()
+            connection = None
+    return connection or _open_connection()
+
+
+def close_pooled_connection(**kwargs):
+    """Ferme la connexion du worker courant (fin de worker, erreur de session)."""
+    connection = getattr(_local, "connection", None)
+    _local.connection = None
+    if connection is not None:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+worker_process_shutdown.connect(close_pooled_connection, weak=False)
+
+
+# ==========================
+#  QUOTA FOURNISSEUR
+# ==========================
+
+
+def _running_task():
+    task = current_task._get_current_object() if current_task else None
+    return task if task is not None and task.request.id else None
+
+
+def _max_quota_wait():
+    """
+    Attente permise dans la tâche Celery en cours : temps restant sous la limite douce
+    de sa file, moins `QUOTA_WAIT_MARGIN`. Sans limite hors tâche.
+    """
+    task = _running_task()
+    if task is None:
+        return None
+    soft_limit = get_queue_settings().get(queue_for_task(task.name), {}).get("soft_time_limit")
+    if not soft_limit:
+        return None
+    started_at = getattr(task.request, "_started_at", None) or time.time()
+    return soft_limit - (time.time() - started_at) - QUOTA_WAIT_MARGIN
+
+
+def _acquire_send_slot(connection):
+    """
+    Attend qu'un envoi soit autorisé par le quota SMTP (fenêtre d'une minute, partagée
+    entre workers). Sans effet pour les backends non-SMTP (tests, console). Lève
+    `SendQuotaExceeded` si l'attente dépasse ce que la tâche en cours peut attendre.
+    """
+    limit = _setting("EMAIL_RATE_LIMIT_PER_MINUTE")
+    if not limit or not isinstance(connection, SMTPBackend):
+        return
+
+    while True:
+        now = time.time()
+        key = RATE_KEY.format(window=int(now // 60))
+        try:
+            cache.add(key, 0, timeout=120)
+            count = cache.incr(key)
+        except Exception as e:
+            logger.warning("⚠️ Quota d'envoi indisponible : %s", e)
+            return
+        if count <= limit:
+            return
+        wait = 60 - (now % 60) + 0.05
+        max_wait = _max_quota_wait()
+        if max_wait is not None and wait > max_wait:
+            raise SendQuotaExceeded(wait)
+        logger.info("⏳ Quota SMTP atteint (%s/min), pause de %.1fs", limit, wait)
+        time.sleep(wait)
+
+
+# ==========================
+#  ENVOI
+# ==========================
+
+
+def _is_transient(error) -> bool:
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return False
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    return isinstance(error, (smtplib.SMTPServerDisconnected, OSError))
+
+
+def _send_one(message, result: DispatchResult):
+    max_retries = _setting("EMAIL_SEND_MAX_RETRIES")
+    for attempt in range(max_retries + 1):
+        try:
+            connection = get_pooled_connection()
+            _acquire_send_slot(connection)
+            start = time.perf_counter()
+            if not connection.send_messages([message]):
+                raise smtplib.SMTPServerDisconnected("Connexion SMTP indisponible")
+        except SendQuotaExceeded:
+            raise
+        except Exception as e:
+            close_pooled_connection()
+            if _is_transient(e) and attempt < max_retries:
+                result.retries += 1
+                incr(METRICS_KEY.format(metric="retries"))
+                delay = _setting("EMAIL_RETRY_BACKOFF") * (2**attempt)
+                logger.warning(
+                    "🔁 Envoi à %s échoué (%s), nouvel essai dans %ss",
+                    ", ".join(message.to),
+                    e,
+                    delay,
+                )
+                time.sleep(delay)
+                continue
+
+            result.failed += 1
+            result.errors.append(e)
+            incr(METRICS_KEY.format(metric="failed"))
+            logger.error("❌ Échec d'envoi à %s : %s", ", ".join(message.to), e)
+            return False
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        _local.sent += 1
+        _local.last_used = time.monotonic()
+        result.sent += 1
+        incr(METRICS_KEY.format(metric="sent"))
+        incr(METRICS_KEY.format(metric="send_ms"), int(elapsed_ms))
+        return True
+    return False
+
+
+def dispatch_messages(messages, raise_on_failure=False) -> DispatchResult:
+    """
+    Envoie un lot de messages sur la connexion partagée du worker.
+    Les échecs sont comptés dans le résultat ; `raise_on_failure` relève la première erreur.
+    """
+    messages = list(messages)
+    result = DispatchResult()
+    start = time.perf_counter()
+    for index, message in enumerate(messages):
+        try:
+            _send_one(message, result)
+        except SendQuotaExceeded as e:
+            task = _running_task()
+            # Rien d'envoyé : la tâche entière est relancée à la réouverture du quota
+            if task is not None and not result.sent:
+                logger.info("⏳ %s : relance dans %.0fs", e, e.countdown)
+                raise task.retry(countdown=e.countdown, exc=e)
+            pending = len(messages) - index
+            result.failed += pending
+            result.errors.append(e)
+            incr(METRICS_KEY.format(metric="failed"), pending)
+            logger.error("❌ %s : %s message(s) non envoyé(s)", e, pending)
+            break
+    result.elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if result.sent > 1:
+        logger.info(
+            "📬 %s e-mails envoyés en %.0f ms (%.1f/s, %s échecs, %s relances)",
+            result.sent,
+            result.elapsed_ms,
+            result.throughput,
+            result.failed,
+            result.retries,
+        )
+    if raise_on_failure and result.errors:
+        raise result.errors[0]
+    return result
+
+
+# ==========================
+#  MESURES
+# ==========================
+
+
+def get_email_metrics() -> dict:
+    keys = {m: METRICS_KEY.format(metric=m) for m in METRICS}
+    values = get_counters(keys.values())
+    sent = values[keys["sent"]]
+    send_ms = values[keys["send_ms"]]
+    return {
+        "sent": sent,
+        "failed": values[keys["failed"]],
+        "retries": values[keys["retries"]],
+        "connections_opened": values[keys["connections"]],
+        "avg_send_ms": round(send_ms / sent, 2) if sent else 0.0,
+        "messages_per_connection": (
+            round(sent / values[keys["connections"]], 2)
+            if values[keys["connections"]]
+            else 0.0
+        ),
+    }
+
+
+def reset_email_metrics():
+    reset_counters(METRICS_KEY.format(metric=m) for m in METRICS)
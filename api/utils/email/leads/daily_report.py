@@ -1,41 +1,72 @@
 # api/utils/email/leads/daily_report.py
-import os
-from django.core.mail import EmailMessage
 from django.conf import settings
+from django.core.mail import EmailMessage
+
+from api.appointment_reports.services import prepare_daily_reports
+from api.utils.email.dispatch import dispatch_messages
 
-from api.utils.email.leads.pdf_report.appointment_report import generate_daily_appointment_report
+SUBJECT = "📋 Rapport quotidien des rendez-vous – TDS France"
+BODY = (
+    "Bonjour,\n\n"
+    "Veuillez trouver ci-joint le rapport complet des rendez-vous planifiés ou confirmés pour aujourd'hui.\n\n"
+    "Bien cordialement,\n"
+    "Équipe TDS France"
+)
+PERSONAL_BODY = (
+    "Bonjour,\n\n"
+    "Veuillez trouver ci-joint la liste de vos rendez-vous planifiés ou confirmés pour aujourd'hui.\n\n"
+    "Bien cordialement,\n"
+    "Équipe TDS France"
+)
 
 
-def send_daily_appointment_report(leads):
+def get_report_recipients() -> list:
     """
-    Envoie par e-mail le PDF des rendez-vous du jour.
+    Destinataires du rapport complet (équipes), `DAILY_RDV_REPORT_RECIPIENTS`.
     """
-    if not leads:
-        return None
-
-    recipient = os.getenv("DAILY_RDV_REPORT_EMAIL") or settings.DEFAULT_FROM_EMAIL
-    pdf_buffer = generate_daily_appointment_report(leads)
-
-    subject = "📋 Rapport quotidien des rendez-vous – TDS France"
-    body = (
-        "Bonjour,\n\n"
-        "Veuillez trouver ci-joint le rapport complet des rendez-vous planifiés ou confirmés pour aujourd'hui.\n\n"
-        "Bien cordialement,\n"
-        "Équipe TDS France"
-    )
+    return list(getattr(settings, "DAILY_RDV_REPORT_RECIPIENTS", None) or [
+        settings.DEFAULT_FROM_EMAIL
+    ])
+
 
+def _report_message(report, to_email, body):
     email = EmailMessage(
-        subject=subject,
+        subject=SUBJECT,
         body=body,
         from_email=settings.DEFAULT_FROM_EMAIL,
-        to=[recipient],
+        to=[to_email],
     )
-
     email.attach(
-        filename=f"rapport_rdv_{leads[0].appointment_date.date()}.pdf",
-        content=pdf_buffer.getvalue(),
+        filename=report.filename,
+        content=report.content,
         mimetype="application/pdf",
     )
+    return email
+
+
+def send_daily_appointment_report(day=None):
+    """
+    Envoie par e-mail le PDF des rendez-vous du jour :
+    - le rapport complet (sections par juriste et par conseiller) à chaque destinataire configuré,
+    - si `DAILY_RDV_REPORT_PER_USER`, son rapport individuel à chaque juriste / conseiller concerné.
+    Les PDF déjà générés pour le même contenu sont réutilisés. Retourne la liste des rapports
+    envoyés (vide s'il n'y a aucun rendez-vous).
+    """
+    reports = prepare_daily_reports(
+        day, per_user=getattr(settings, "DAILY_RDV_REPORT_PER_USER", False)
+    )
+    if not reports:
+        return []
 
-    email.send(fail_silently=False)
-    return recipient
\ No newline at end of file
+    full_report, personal_reports = reports[0], reports[1:]
+    messages = [
+        _report_message(full_report, to_email, BODY)
+        for to_email in get_report_recipients()
+    ]
+    messages += [
+        _report_message(report, report.owner_email, PERSONAL_BODY)
+        for report in personal_reports
+        if report.owner_email
+    ]
+    dispatch_messages(messages, raise_on_failure=True)
+    return reports
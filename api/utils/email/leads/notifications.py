@@ -4,7 +4,11 @@ from urllib.parse import quote_plus
 from django.conf import settings
 from api.utils.email import send_html_email
 from slugify import slugify
-from api.utils.email.config import TDS_FRANCE_ADDRESS, _build_context
+from api.utils.email.config import (
+    TDS_FRANCE_ADDRESS,
+    _build_context,
+    send_templated_batch,
+)
 
 
 def send_appointment_planned_email(lead):
@@ -40,8 +44,8 @@ def send_appointment_reminder_email(lead):
     context = _build_context(lead, lead.appointment_date, TDS_FRANCE_ADDRESS)
     return send_html_email(
         to_email=lead.email,
-        subject="Rappel important : votre rendez-vous approche – TDS France",
-        template_name="email/leads/appointment_reminder.html",
+        subject=REMINDER_SUBJECT,
+        template_name=REMINDER_TEMPLATE,
         context=context,
     )
 
@@ -53,12 +57,46 @@ def send_missed_appointment_email(lead):
     context = _build_context(lead, lead.appointment_date, TDS_FRANCE_ADDRESS)
     return send_html_email(
         to_email=lead.email,
-        subject="Absence constatée à votre rendez-vous – TDS France",
-        template_name="email/leads/appointment_absent.html",
+        subject=MISSED_SUBJECT,
+        template_name=MISSED_TEMPLATE,
         context=context,
     )
 
 
+REMINDER_SUBJECT = "Rappel important : votre rendez-vous approche – TDS France"
+REMINDER_TEMPLATE = "email/leads/appointment_reminder.html"
+MISSED_SUBJECT = "Absence constatée à votre rendez-vous – TDS France"
+MISSED_TEMPLATE = "email/leads/appointment_absent.html"
+
+
+def _send_appointment_batch(leads, subject, template_name):
+    recipients = [
+        {
+            "to_email": lead.email,
+            "context": _build_context(lead, lead.appointment_date, TDS_FRANCE_ADDRESS),
+        }
+        for lead in leads
+        if lead.email
+    ]
+    return send_templated_batch(subject, template_name, recipients)
+
+
+def send_appointment_reminder_emails(leads):
+    """
+    Envoie le rappel de rendez-vous à une liste de leads (rendu en lot, une connexion SMTP).
+    Retourne le bilan d'envoi (`DispatchResult`).
+    """
+    return _send_appointment_batch(leads, REMINDER_SUBJECT, REMINDER_TEMPLATE)
+
+
+def send_missed_appointment_emails(leads):
+    """
+    Envoie l'e-mail d'absence à une liste de leads (rendu en lot, une connexion SMTP).
+    Retourne le bilan d'envoi (`DispatchResult`).
+    """
+    return _send_appointment_batch(leads, MISSED_SUBJECT, MISSED_TEMPLATE)
+
+
 def send_formulaire_email(lead):
     """
     Envoie un e-mail contenant un lien vers le formulaire à compléter par le lead.
@@ -1,14 +1,77 @@
 # api/utils/pdf/appointment_report.py
 import io
 from datetime import datetime
+from django.utils import timezone
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 
-def generate_daily_appointment_report(leads):
+TABLE_STYLE = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1F2937")),
+    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+    ("BOTTOMPADDING", (0, 0), (-1, 0), 8),
+    ("BACKGROUND", (0, 1), (-1, -1), colors.HexColor("#F9FAFB")),
+    ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+])
+
+
+def _appointments_table(entries):
+    """
+    Tableau des rendez-vous (lignes `DailyAppointmentEntry`, triées par heure).
+    """
+    data = [["Nom complet", "Téléphone", "Email", "Heure RDV", "Statut"]]
+
+    for entry in entries:
+        data.append([
+            f"{entry.first_name} {entry.last_name}",
+            entry.phone or "-",
+            entry.email or "-",
+            timezone.localtime(entry.appointment_date).strftime("%H:%M"),
+            entry.status_label or "-",
+        ])
+
+    table = Table(data, repeatRows=1)
+    table.setStyle(TABLE_STYLE)
+    return table
+
+
+def _sections(entries, field, title, styles):
+    """
+    Une sous-section par personne assignée (`jurists` ou `conseillers`), puis les RDV
+    sans personne assignée.
+    """
+    groups, names, unassigned = {}, {}, []
+    for entry in entries:
+        people = getattr(entry, field)
+        if not people:
+            unassigned.append(entry)
+        for person in people:
+            groups.setdefault(person["id"], []).append(entry)
+            names[person["id"]] = person["name"]
+
+    story = [Paragraph(f"<b>{title}</b>", styles["Heading2"]), Spacer(1, 8)]
+    for person_id in sorted(groups, key=lambda pid: names[pid]):
+        story.append(
+            Paragraph(f"{names[person_id]} — {len(groups[person_id])} RDV", styles["Heading4"])
+        )
+        story.append(_appointments_table(groups[person_id]))
+        story.append(Spacer(1, 12))
+    if unassigned:
+        story.append(Paragraph(f"Non assignés — {len(unassigned)} RDV", styles["Heading4"]))
+        story.append(_appointments_table(unassigned))
+        story.append(Spacer(1, 12))
+    return story
+
+
+def generate_daily_appointment_report(entries, day=None, owner="", sections=True):
     """
     Génère un PDF récapitulatif moderne de tous les rendez-vous du jour.
+    - `entries` : lignes `DailyAppointmentEntry` du jour (ou d'un juriste / conseiller)
+    - `owner` : nom de la personne pour un rapport individuel
+    - `sections` : ajoute les sections par juriste et par conseiller
     Retourne un objet BytesIO prêt à être envoyé par e-mail.
     """
     buffer = io.BytesIO()
@@ -20,41 +83,28 @@ def generate_daily_appointment_report(leads):
     # Titre principal
     story.append(Paragraph("<b>📅 RAPPORT QUOTIDIEN DES RENDEZ-VOUS</b>", styles["Title"]))
     story.append(Spacer(1, 12))
-    story.append(Paragraph(datetime.now().strftime("Date du rapport : %d/%m/%Y"), styles["Normal"]))
+    if owner:
+        story.append(Paragraph(f"<b>Rendez-vous de :</b> {owner}", styles["Normal"]))
+    story.append(Paragraph(f"Date des rendez-vous : {(day or timezone.localdate()).strftime('%d/%m/%Y')}", styles["Normal"]))
+    story.append(Paragraph(datetime.now().strftime("Date du rapport : %d/%m/%Y %H:%M"), styles["Normal"]))
     story.append(Spacer(1, 20))
 
     # Nombre total
-    total = len(leads)
+    total = len(entries)
     story.append(Paragraph(f"<b>Total des rendez-vous :</b> {total}", styles["Heading3"]))
     story.append(Spacer(1, 12))
 
     # Tableau des rendez-vous
-    data = [["Nom complet", "Téléphone", "Email", "Heure RDV", "Statut"]]
+    story.append(_appointments_table(entries))
+    story.append(Spacer(1, 24))
 
-    for lead in leads:
-        data.append([
-            f"{lead.first_name} {lead.last_name}",
-            lead.phone or "-",
-            lead.email or "-",
-            lead.appointment_date.strftime("%H:%M") if lead.appointment_date else "-",
-            lead.status.label if lead.status else "-",
-        ])
+    if sections and entries:
+        story += _sections(entries, "jurists", "Par juriste", styles)
+        story += _sections(entries, "conseillers", "Par conseiller", styles)
+        story.append(Spacer(1, 12))
 
-    table = Table(data, repeatRows=1)
-    table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1F2937")),
-        ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-        ("BOTTOMPADDING", (0, 0), (-1, 0), 8),
-        ("BACKGROUND", (0, 1), (-1, -1), colors.HexColor("#F9FAFB")),
-        ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
-    ]))
-
-    story.append(table)
-    story.append(Spacer(1, 24))
     story.append(Paragraph("— Généré automatiquement par TDS France —", styles["Italic"]))
 
     doc.build(story)
     buffer.seek(0)
-    return buffer
\ No newline at end of file
+    return buffer
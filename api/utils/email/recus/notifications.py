@@ -1,38 +1,72 @@
+import io
 import logging
-from datetime import datetime
+import zipfile
 
-from api.utils.cloud.scw.utils import download_file_from_s3, extract_s3_key_from_url
+from django.conf import settings
+
+from api.utils.cloud.scw.bucket_utils import generate_presigned_url
+from api.utils.cloud.scw.downloads import download_files_from_s3
+from api.utils.cloud.scw.utils import extract_s3_key_from_url
 from api.utils.email import send_html_email
-from api.utils.email.config import _build_context
+from api.utils.email.config import _build_context, send_templated_batch
+from api.utils.email.dispatch import DispatchResult
 
 logger = logging.getLogger(__name__)
 
 
+def _zip_attachments(attachments) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for att in attachments:
+            archive.writestr(att["filename"], att["content"])
+    return buffer.getvalue()
+
+
+def _receipt_links(receipts, keys):
+    expires_in = getattr(settings, "RECEIPT_LINK_EXPIRES", 7 * 24 * 3600)
+    return [
+        {
+            "receipt": receipt,
+            "url": generate_presigned_url("receipts", keys[receipt.id], expires_in),
+        }
+        for receipt in receipts
+        if receipt.id in keys
+    ]
+
+
 def send_receipts_email_to_lead(lead, receipts):
     """
     Envoie un ou plusieurs reçus PDF par mail au lead associé à un client.
 
     - Utilise le template `email/recus/receipts_send.html`
-    - Télécharge chaque reçu depuis Scaleway S3 via boto3
+    - Télécharge les reçus en parallèle depuis Scaleway S3 (cache local par ETag)
+    - Au-delà de `EMAIL_MAX_ATTACHMENTS_SIZE`, les reçus sont regroupés dans une archive zip,
+      ou remplacés par des liens signés si l'archive reste trop lourde
     """
     if not lead or not lead.email:
         logger.warning("Aucun email trouvé pour le lead.")
         return
 
-    attachments = []
+    receipts = list(receipts)
+    keys = {}
     for receipt in receipts:
-        logger.info(f"Téléchargement du reçu : {receipt.receipt_url}")
         try:
-            key = extract_s3_key_from_url(receipt.receipt_url)
-            pdf_content, pdf_filename = download_file_from_s3("receipts", key)
-        except Exception as e:
-            logger.error(f"Échec du téléchargement du reçu {receipt.id} : {e}")
-            continue
+            keys[receipt.id] = extract_s3_key_from_url(receipt.receipt_url)
+        except (TypeError, ValueError) as e:
+            logger.error(f"URL de reçu invalide ({receipt.id}) : {e}")
 
+    attachments = []
+    downloads = download_files_from_s3("receipts", keys.values())
+    for receipt_id, download in zip(keys, downloads):
+        if not download.ok:
+            logger.error(
+                f"Échec du téléchargement du reçu {receipt_id} : {download.error}"
+            )
+            continue
         attachments.append(
             {
-                "filename": pdf_filename,
-                "content": pdf_content,
+                "filename": download.filename,
+                "content": download.content,
                 "mimetype": "application/pdf",
             }
         )
@@ -41,7 +75,30 @@ def send_receipts_email_to_lead(lead, receipts):
         logger.warning(f"Aucune pièce jointe valide pour le lead {lead}.")
         return
 
-    context = _build_context(lead=lead, extra={"receipts": receipts})
+    links = []
+    limit = getattr(settings, "EMAIL_MAX_ATTACHMENTS_SIZE", 15 * 1024 * 1024)
+    total_size = sum(len(att["content"]) for att in attachments)
+    if total_size > limit:
+        archive = _zip_attachments(attachments)
+        if len(archive) <= limit:
+            logger.info(
+                f"🗜️ Reçus regroupés en archive ({total_size} → {len(archive)} octets)"
+            )
+            attachments = [
+                {
+                    "filename": "recus_tds_france.zip",
+                    "content": archive,
+                    "mimetype": "application/zip",
+                }
+            ]
+        else:
+            logger.info(f"🔗 Reçus trop volumineux ({total_size} octets), envoi de liens")
+            links = _receipt_links(receipts, keys)
+            attachments = []
+
+    context = _build_context(
+        lead=lead, extra={"receipts": receipts, "receipt_links": links}
+    )
 
     send_html_email(
         to_email=lead.email,
@@ -54,40 +111,51 @@ def send_receipts_email_to_lead(lead, receipts):
     logger.info(f"📩 Reçus envoyés à {lead.email}")
 
 
-def send_payment_due_email(client, receipt, due_date: datetime, amount: float):
-    """
-    Envoie un rappel par email concernant un paiement à venir.
+PAYMENT_DUE_SUBJECT = "Rappel : Échéance de paiement"
+PAYMENT_OVERDUE_SUBJECT = "Échéance de paiement dépassée"
+PAYMENT_DUE_TEMPLATE = "email/recus/payment_reminder.html"
 
-    - Utilise le template `email/recus/payment_reminder.html`
-    - Ajoute dans le contexte : client, reçu, date d’échéance, montant
-    - Envoie à client.lead.email
-    """
-    lead = getattr(client, "lead", None)
-    recipient = getattr(lead, "email", None)
 
-    if not recipient:
-        logger.warning(f"Aucun email trouvé pour le client {client}")
-        return
+def send_payment_due_emails(contracts):
+    """
+    Envoie un rappel d'échéance par contrat (rendu en lot, une connexion SMTP).
 
-    context = _build_context(
-        lead=lead,
-        extra={
-            "client": client,
-            "receipt": receipt,
-            "due_date": due_date.strftime("%d/%m/%Y"),
-            "amount": f"{amount:.2f}€",
-        },
-    )
+    - `contracts` : contrats annotés `due_date`, `balance` et `offset_days`
+      (voir `api.payments.reminders.due_contracts`)
+    - Utilise le template `email/recus/payment_reminder.html`, envoyé à client.lead.email
+    Retourne le bilan d'envoi (`DispatchResult`).
+    """
+    batches = {PAYMENT_DUE_SUBJECT: [], PAYMENT_OVERDUE_SUBJECT: []}
+    for contract in contracts:
+        lead = contract.client.lead
+        subject = PAYMENT_OVERDUE_SUBJECT if contract.offset_days > 0 else PAYMENT_DUE_SUBJECT
+        batches[subject].append(
+            {
+                "to_email": lead.email,
+                "context": _build_context(
+                    lead=lead,
+                    extra={
+                        "client": contract.client,
+                        "contract": contract,
+                        "due_date": contract.due_date.strftime("%d/%m/%Y"),
+                        "amount": f"{contract.balance:.2f}€",
+                        "days_overdue": max(contract.offset_days, 0),
+                    },
+                ),
+            }
+        )
 
-    subject = "Rappel : Échéance de paiement"
-    send_html_email(
-        to_email=recipient,
-        subject=subject,
-        template_name="email/recus/payment_reminder.html",
-        context=context,
-    )
+    result = DispatchResult()
+    for subject, recipients in batches.items():
+        if not recipients:
+            continue
+        batch = send_templated_batch(subject, PAYMENT_DUE_TEMPLATE, recipients)
+        result.sent += batch.sent
+        result.failed += batch.failed
+        result.retries += batch.retries
+        result.errors += batch.errors
+    return result
 
-    logger.info(f"📩 Rappel de paiement envoyé à {recipient}")
 
 def send_due_date_updated_email(receipt, new_due_date):
     lead = getattr(receipt.client, "lead", None)
@@ -1,6 +1,7 @@
 import logging
 
 from celery import shared_task
+from celery.exceptions import Retry
 
 from api.utils.email.recus.notifications import send_receipts_email_to_lead
 
@@ -54,5 +55,7 @@ def send_due_date_updated_email_task(receipt_id: int, new_due_date: str):
         send_due_date_updated_email(receipt, parsed_date)
     except PaymentReceipt.DoesNotExist:
         logger.warning(f"❌ Reçu #{receipt_id} introuvable – e-mail non envoyé.")
+    except Retry:
+        raise  # quota SMTP : relance programmée
     except Exception as e:
         logger.error(f"❌ Erreur lors de l’envoi de l’e-mail de modification de date : {e}")
@@ -0,0 +1,41 @@
+"""
+Rendu des e-mails HTML.
+
+- Les gabarits compilés sont gardés en mémoire par processus (hors DEBUG, pour que les
+  modifications de gabarits restent visibles en développement).
+- `render_batch` rend un même gabarit pour une liste de contextes (un destinataire par
+  contexte) : compilation et résolution du gabarit une seule fois pour tout le lot.
+- Les dates françaises sont mémoïsées dans `utils.get_french_datetime_strings`.
+"""
+
+from functools import lru_cache
+
+from django.conf import settings
+from django.template.loader import get_template
+
+
+@lru_cache(maxsize=128)
+def _compiled_template(template_name: str):
+    return get_template(template_name)
+
+
+def get_email_template(template_name: str):
+    """Gabarit compilé (mis en cache hors DEBUG)."""
+    if settings.DEBUG:
+        return get_template(template_name)
+    return _compiled_template(template_name)
+
+
+def clear_template_cache():
+    _compiled_template.cache_clear()
+
+
+def render_email(template_name: str, context: dict) -> str:
+    """Équivalent de `render_to_string`, sans relecture du gabarit."""
+    return get_email_template(template_name).render(context)
+
+
+def render_batch(template_name: str, contexts) -> list:
+    """Rend un même gabarit pour chaque contexte, dans l'ordre reçu."""
+    template = get_email_template(template_name)
+    return [template.render(context) for context in contexts]
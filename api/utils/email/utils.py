@@ -1,16 +1,31 @@
-from babel.dates import format_datetime
+from functools import lru_cache
+
+from babel import Locale
+from babel.dates import parse_pattern
 from django.utils import timezone
 
+# Locale et motifs Babel analysés une seule fois par processus
+FR_LOCALE = Locale.parse("fr_FR")
+_DATE_PATTERN = parse_pattern("EEEE d MMMM yyyy")
+_TIME_PATTERN = parse_pattern("HH:mm")
 
-def get_french_datetime_strings(dt):
-    """Retourne une date et heure localisée en français."""
-    dt_local = timezone.localtime(dt)
+
+@lru_cache(maxsize=4096)
+def _format_french_datetime(dt_local):
     return (
-        format_datetime(dt_local, "EEEE d MMMM yyyy", locale="fr_FR"),
-        format_datetime(dt_local, "HH:mm", locale="fr_FR"),
+        _DATE_PATTERN.apply(dt_local, FR_LOCALE),
+        _TIME_PATTERN.apply(dt_local, FR_LOCALE),
     )
 
 
+def get_french_datetime_strings(dt):
+    """
+    Retourne une date et heure localisée en français.
+    Mémoïsé : les rappels d'un même créneau partagent le même rendu.
+    """
+    return _format_french_datetime(timezone.localtime(dt))
+
+
 def _name_from_user(user) -> str | None:
     """Construit un nom affichable."""
     if not user:
@@ -0,0 +1,38 @@
+"""
+Compteurs applicatifs stockés dans Redis (cache Django).
+
+Utilisés pour mesurer les caches HTTP, l'envoi d'e-mails, les files Celery…
+Les erreurs de cache ne doivent jamais faire échouer l'appel métier : elles sont loggées.
+"""
+
+import logging
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+def incr(key: str, amount: int = 1):
+    """Incrémente un compteur (créé à la volée, sans expiration)."""
+    try:
+        try:
+            cache.incr(key, amount)
+        except ValueError:
+            cache.set(key, amount, timeout=None)
+    except Exception as e:
+        logger.warning("⚠️ Compteur %s indisponible : %s", key, e)
+
+
+def get_counters(keys) -> dict:
+    """Lit plusieurs compteurs en un aller-retour ; les absents valent 0."""
+    keys = list(keys)
+    try:
+        values = cache.get_many(keys)
+    except Exception as e:
+        logger.warning("⚠️ Compteurs indisponibles : %s", e)
+        values = {}
+    return {key: int(values.get(key) or 0) for key in keys}
+
+
+def reset_counters(keys):
+    cache.delete_many(list(keys))
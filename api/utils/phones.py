@@ -0,0 +1,112 @@
+"""
+Normalisation des numéros de téléphone, partagée par les imports, la recherche et la
+détection de doublons.
+
+- `normalize_phone(value)` : numéro au format E.164 (France par défaut), None si
+  invalide. Mémoïsé par processus (`phonenumbers.parse` est coûteux et les mêmes numéros
+  reviennent sans cesse).
+- `normalize_phones(values)` : lot de valeurs, chaque valeur distincte n'est analysée
+  qu'une fois. Une `Series` / un `ndarray` pandas-NumPy est nettoyé(e) de façon
+  vectorisée (`str.replace`) avant l'analyse des valeurs uniques ; pandas reste optionnel.
+- `Lead.phone_normalized` stocke le résultat (maintenu par `Lead.save`) : les
+  recherches et rapprochements se font par égalité sur une colonne indexée.
+"""
+
+import re
+from functools import lru_cache
+
+import phonenumbers
+
+DEFAULT_REGION = "FR"
+_NON_PHONE_CHARS = re.compile(r"[^\d+]")
+_FLOAT_SUFFIX = re.compile(r"\.0$")
+
+
+def _text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        if value != value:  # NaN
+            return ""
+        if value.is_integer():
+            # Cellules numériques (ex : 33612345678.0)
+            value = int(value)
+    return str(value).strip()
+
+
+def clean_phone(value) -> str:
+    """Chiffres (et `+`) du numéro saisi, sans séparateurs."""
+    return _NON_PHONE_CHARS.sub("", _FLOAT_SUFFIX.sub("", _text(value)))
+
+
+@lru_cache(maxsize=65536)
+def _to_e164(cleaned: str):
+    if not cleaned:
+        return None
+    if cleaned.startswith("00"):
+        cleaned = "+" + cleaned[2:]
+    elif cleaned.startswith("33") and len(cleaned) == 11:
+        # Indicatif saisi sans « + » (ex : 33612345678)
+        cleaned = "+" + cleaned
+    try:
+        number = phonenumbers.parse(cleaned, DEFAULT_REGION)
+    except phonenumbers.NumberParseException:
+        return None
+    if not phonenumbers.is_valid_number(number):
+        return None
+    return phonenumbers.format_number(number, phonenumbers.PhoneNumberFormat.E164)
+
+
+def normalize_phone(value):
+    """Numéro au format E.164, None si vide ou invalide."""
+    return _to_e164(clean_phone(value))
+
+
+@lru_cache(maxsize=1)
+def _pandas():
+    try:
+        import numpy
+        import pandas
+    except ImportError:
+        return None, None
+    return pandas, numpy
+
+
+def _normalize_series(pd, values):
+    series = pd.Series(values, copy=False)
+    if pd.api.types.is_float_dtype(series):
+        # Colonne numérique (lecture CSV / XLSX) : entiers, sans « .0 »
+        text = series.round().astype("Int64").astype("string")
+    else:
+        text = series.astype("string")
+    cleaned = (
+        text.str.strip()
+        .str.replace(_FLOAT_SUFFIX.pattern, "", regex=True)
+        .str.replace(_NON_PHONE_CHARS.pattern, "", regex=True)
+        .fillna("")
+    )
+    mapping = {value: _to_e164(value) for value in cleaned.unique()}
+    return cleaned.map(mapping).astype(object)
+
+
+def normalize_phones(values):
+    """
+    Normalise un lot de numéros. Retourne une liste, ou une `Series` alignée sur l'index
+    si `values` est une `Series` / un `ndarray` (chemin vectorisé, pandas requis).
+    """
+    pd, np = _pandas()
+    if pd is not None and isinstance(values, (pd.Series, pd.Index, np.ndarray)):
+        return _normalize_series(pd, values)
+
+    distinct = {}
+    result = []
+    for value in values:
+        key = value if isinstance(value, (str, int, float)) or value is None else _text(value)
+        if key not in distinct:
+            distinct[key] = normalize_phone(value)
+        result.append(distinct[key])
+    return result
+
+
+def phone_cache_info():
+    return _to_e164.cache_info()
@@ -0,0 +1,187 @@
+"""
+Projection des listes (`?view=compact` / `?fields=a,b,c`).
+
+Les tableaux du front n'affichent qu'une dizaine de colonnes alors que les sérialiseurs
+complets rendent toute la fiche (dossier client, champs ANEF…). En mode projection :
+- seules les colonnes demandées sont lues, via `.values()` (jointures incluses),
+- les lignes sont renvoyées en dictionnaires plats, sans instancier le sérialiseur par
+  objet ; les valeurs sont toutefois formatées par les champs du sérialiseur complet
+  (dates, montants…) : un même champ a le même format quelle que soit la vue,
+- les relations multiples (conseillers, juristes…) sont chargées par lot, en une requête
+  par relation pour toute la page.
+
+Sans paramètre, la vue garde son sérialiseur complet.
+"""
+
+from django.db.models import F
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+COMPACT_VIEW = "compact"
+
+
+def parse_projection(request, available, compact):
+    """
+    Retourne la liste des champs demandés, ou None si aucune projection n'est demandée.
+    Lève une ValidationError si un champ inconnu est demandé.
+    """
+    raw_fields = request.query_params.get("fields")
+    if raw_fields:
+        fields = [f.strip() for f in raw_fields.split(",") if f.strip()]
+        unknown = [f for f in fields if f not in available]
+        if unknown:
+            raise ValidationError(
+                {
+                    "fields": f"Champs inconnus : {', '.join(unknown)}. "
+                    f"Champs disponibles : {', '.join(available)}."
+                }
+            )
+        return fields
+
+    if request.query_params.get("view") == COMPACT_VIEW:
+        return list(compact)
+    return None
+
+
+class ProjectionListMixin:
+    """
+    Mixin de ViewSet : action `list` projetée.
+
+    - projection_fields : {nom exposé: chemin ORM ou expression} lus par `.values()`
+    - projection_relations : {nom exposé: fonction(ids) -> {id: valeur}} chargées par lot
+    - projection_computed : {nom exposé: colonnes nécessaires} calculés en Python
+      par `postprocess_projection(rows, fields)`
+    - projection_formatters : {nom exposé: fonction(valeur)} pour les champs rendus par
+      une méthode du sérialiseur ; les autres champs homonymes du sérialiseur complet
+      sont formatés par leur `to_representation`
+    - projection_compact : champs renvoyés par `?view=compact`
+    """
+
+    projection_fields = {}
+    projection_relations = {}
+    projection_computed = {}
+    projection_formatters = {}
+    projection_compact = ()
+
+    def get_projection(self):
+        available = [
+            *self.projection_fields,
+            *self.projection_relations,
+            *self.projection_computed,
+        ]
+        return parse_projection(self.request, available, self.projection_compact)
+
+    def get_projection_queryset(self, fields):
+        queryset = self.filter_queryset(self.get_queryset())
+        # Les jointures / prefetch du sérialiseur complet sont inutiles ici
+        queryset = queryset.select_related(None).prefetch_related(None)
+
+        # Un champ calculé peut dépendre d'un autre (ex : solde ← montant dû) : dès qu'un
+        # champ calculé est demandé, toutes leurs colonnes sont lues, puis écartées
+        names = list(fields)
+        if set(fields) & set(self.projection_computed):
+            names += [c for inputs in self.projection_computed.values() for c in inputs]
+        columns = ["id"]
+        for name in names:
+            for column in self.projection_computed.get(name, (name,)):
+                if column in self.projection_fields and column not in columns:
+                    columns.append(column)
+
+        plain, expressions = [], {}
+        for name in columns:
+            source = self.projection_fields[name]
+            if source == name:
+                plain.append(name)
+            elif isinstance(source, str):
+                expressions[name] = F(source)
+            else:
+                expressions[name] = source
+        return queryset.values(*plain, **expressions)
+
+    def postprocess_projection(self, rows, fields):
+        return rows
+
+    def get_projection_formatters(self, fields) -> dict:
+        formatters = {}
+        serializer_fields = self.get_serializer().fields
+        for name in fields:
+            if name in self.projection_formatters:
+                formatters[name] = self.projection_formatters[name]
+                continue
+            field = serializer_fields.get(name)
+            # Relations et sous-sérialiseurs attendent une instance, pas une valeur
+            if field is None or isinstance(
+                field,
+                (
+                    serializers.BaseSerializer,
+                    serializers.RelatedField,
+                    serializers.ManyRelatedField,
+                    serializers.SerializerMethodField,
+                ),
+            ):
+                continue
+            formatters[name] = field.to_representation
+        return formatters
+
+    def format_projection(self, rows, fields):
+        formatters = self.get_projection_formatters(fields)
+        return [
+            {
+                name: (
+                    formatters[name](row[name])
+                    if name in formatters and row[name] is not None
+                    else row[name]
+                )
+                for name in fields
+                if name in row
+            }
+            for row in rows
+        ]
+
+    def list_projection(self, fields):
+        queryset = self.get_projection_queryset(fields)
+        page = self.paginate_queryset(queryset)
+        rows = list(page if page is not None else queryset)
+
+        ids = [row["id"] for row in rows]
+        for name in fields:
+            loader = self.projection_relations.get(name)
+            if loader is None:
+                continue
+            values = loader(ids) if ids else {}
+            for row in rows:
+                row[name] = values.get(row["id"], [])
+
+        rows = self.postprocess_projection(rows, fields)
+        rows = self.format_projection(rows, fields)
+
+        if page is not None:
+            return self.get_paginated_response(rows)
+        return Response(rows)
+
+    def list(self, request, *args, **kwargs):
+        fields = self.get_projection()
+        if fields is None:
+            return super().list(request, *args, **kwargs)
+        return self.list_projection(fields)
+
+
+def load_m2m_users(through, source_field: str):
+    """
+    Fabrique un chargeur par lot pour une relation M2M vers `User` :
+    une seule requête sur la table de liaison pour toute la page.
+    """
+
+    def _load(ids):
+        result = {}
+        rows = through.objects.filter(**{f"{source_field}__in": ids}).values_list(
+            source_field, "user_id", "user__first_name", "user__last_name"
+        )
+        for owner_id, user_id, first_name, last_name in rows:
+            result.setdefault(owner_id, []).append(
+                {"id": user_id, "first_name": first_name, "last_name": last_name}
+            )
+        return result
+
+    return _load
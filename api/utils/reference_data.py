@@ -0,0 +1,302 @@
+"""
+Cache des données de référence (statuts, services, horaires, listes de juristes / conseillers).
+
+Ces données changent rarement mais sont lues à chaque requête (listes déroulantes,
+validation des `*_id` dans les sérialiseurs). Chaque jeu de données est :
+- construit une fois depuis Postgres puis stocké dans Redis (cache Django),
+- invalidé par les signaux `post_save` / `post_delete` des modèles concernés,
+- servi avec `ETag` / `Last-Modified` pour que les clients puissent revalider en 304.
+
+Les sérialiseurs valident les identifiants reçus contre l'ensemble en cache via
+`CachedPrimaryKeyRelatedField`, sans requête par écriture.
+"""
+
+import hashlib
+import json
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.utils.module_loading import import_string
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = "refdata:{name}"
+DEFAULT_TIMEOUT = 60 * 60 * 24
+
+
+@dataclass(frozen=True)
+class ReferenceDataset:
+    """
+    Description d'un jeu de données de référence.
+
+    - model : modèle Django (« app_label.Model »)
+    - serializer : chemin du sérialiseur utilisé pour la liste
+    - filters / ordering : restriction du queryset
+    - instance_fields : champs conservés pour reconstruire des instances (validation des ids)
+    - uncached_fields : champs absents du cache ; une sauvegarde limitée à ces champs
+      (`update_fields`) n'invalide pas le jeu de données
+    - timeout : durée de vie en cache (secondes)
+    """
+
+    model: str
+    serializer: str
+    filters: dict = field(default_factory=dict)
+    ordering: tuple = ()
+    instance_fields: tuple = ()
+    uncached_fields: frozenset = frozenset()
+    timeout: int = DEFAULT_TIMEOUT
+
+    def get_model(self):
+        return apps.get_model(self.model)
+
+    def get_queryset(self):
+        qs = self.get_model().objects.filter(**self.filters)
+        if self.ordering:
+            qs = qs.order_by(*self.ordering)
+        return qs
+
+    def get_instance_fields(self):
+        if self.instance_fields:
+            return list(self.instance_fields)
+        return [f.attname for f in self.get_model()._meta.concrete_fields]
+
+
+_USER_FIELDS = ("id", "email", "first_name", "last_name", "role", "is_active")
+# Écrits à chaque connexion / changement de mot de passe, absents des listes
+_USER_UNCACHED_FIELDS = frozenset({"last_login", "password"})
+
+REFERENCE_DATASETS = {
+    "lead_statuses": ReferenceDataset(
+        "lead_status.LeadStatus", "api.lead_status.serializer.LeadStatusSerializer"
+    ),
+    "statut_dossiers": ReferenceDataset(
+        "statut_dossier.StatutDossier",
+        "api.statut_dossier.serializers.StatutDossierSerializer",
+    ),
+    "statut_dossiers_internes": ReferenceDataset(
+        "statut_dossier_interne.StatutDossierInterne",
+        "api.statut_dossier_interne.serializers.StatutDossierInterneSerializer",
+    ),
+    "services": ReferenceDataset(
+        "services.Service", "api.services.serializers.ServiceSerializer"
+    ),
+    "opening_hours": ReferenceDataset(
+        "opening_hours.OpeningHours",
+        "api.opening_hours.serializers.OpeningHoursSerializer",
+        ordering=("day_of_week",),
+    ),
+    # Les listes d'utilisateurs contiennent des URLs d'avatar signées (valables 1h) :
+    # on garde une durée de vie en cache inférieure à leur expiration.
+    "juristes": ReferenceDataset(
+        "users.User",
+        "api.users.serializers.UserSerializer",
+        filters={"role": "JURISTE", "is_active": True},
+        instance_fields=_USER_FIELDS,
+        uncached_fields=_USER_UNCACHED_FIELDS,
+        timeout=30 * 60,
+    ),
+    "conseillers": ReferenceDataset(
+        "users.User",
+        "api.users.serializers.UserSerializer",
+        filters={"role": "CONSEILLER", "is_active": True},
+        instance_fields=_USER_FIELDS,
+        uncached_fields=_USER_UNCACHED_FIELDS,
+        timeout=30 * 60,
+    ),
+}
+
+
+# ==========================
+#  LECTURE / CONSTRUCTION
+# ==========================
+
+
+def _build_entry(name: str) -> dict:
+    dataset = REFERENCE_DATASETS[name]
+    qs = dataset.get_queryset()
+
+    serializer_class = import_string(dataset.serializer)
+    data = json.loads(json.dumps(serializer_class(qs, many=True).data, cls=JSONEncoder))
+
+    fields = dataset.get_instance_fields()
+    rows = {str(row[0]): list(row) for row in qs.values_list(*fields)}
+
+    payload = json.dumps(data, sort_keys=True, cls=JSONEncoder).encode("utf-8")
+    return {
+        "version": hashlib.md5(payload).hexdigest(),
+        "last_modified": int(time.time()),
+        "data": data,
+        "fields": fields,
+        "rows": rows,
+    }
+
+
+def get_reference_entry(name: str) -> dict:
+    """
+    Retourne l'entrée en cache du jeu de données (la construit si absente).
+    """
+    key = CACHE_KEY.format(name=name)
+    entry = cache.get(key)
+    if entry is None:
+        entry = _build_entry(name)
+        cache.set(key, entry, timeout=REFERENCE_DATASETS[name].timeout)
+    return entry
+
+
+def get_reference_data(name: str) -> list:
+    """Liste sérialisée du jeu de données (telle que renvoyée par l'API)."""
+    return get_reference_entry(name)["data"]
+
+
+def get_reference_instance(name: str, pk):
+    """
+    Reconstruit une instance du modèle à partir du cache, ou None si l'id est inconnu.
+    Les champs non mis en cache sont différés (chargés à la demande).
+    """
+    entry = get_reference_entry(name)
+    row = entry["rows"].get(str(pk))
+    if row is None:
+        # Identifiants UUID reçus sous une autre forme (majuscules, sans tirets…)
+        try:
+            row = entry["rows"].get(str(uuid.UUID(str(pk))))
+        except ValueError:
+            row = None
+    if row is None:
+        return None
+    model = REFERENCE_DATASETS[name].get_model()
+    return model.from_db("default", entry["fields"], row)
+
+
+# ==========================
+#  INVALIDATION
+# ==========================
+
+
+def invalidate_reference_data(*names: str):
+    """
+    Supprime les entrées en cache, immédiatement puis à nouveau après le commit
+    (une lecture concurrente pendant la transaction ne peut pas figer des données périmées).
+    """
+    keys = [CACHE_KEY.format(name=name) for name in names]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def connect_invalidation_signals():
+    """
+    Branche `post_save` / `post_delete` de chaque modèle de référence sur l'invalidation
+    des jeux de données qui en dépendent.
+    """
+    names_by_model = {}
+    for name, dataset in REFERENCE_DATASETS.items():
+        names_by_model.setdefault(dataset.model, []).append(name)
+
+    for model_label, names in names_by_model.items():
+        model = apps.get_model(model_label)
+
+        def _on_save(sender, names=tuple(names), update_fields=None, **kwargs):
+            # Sauvegarde partielle de champs non mis en cache (ex : `last_login`) : ignorée
+            stale = [
+                name
+                for name in names
+                if not update_fields
+                or not set(update_fields) <= REFERENCE_DATASETS[name].uncached_fields
+            ]
+            if stale:
+                invalidate_reference_data(*stale)
+
+        def _on_delete(sender, names=tuple(names), **kwargs):
+            invalidate_reference_data(*names)
+
+        post_save.connect(
+            _on_save, sender=model, weak=False, dispatch_uid=f"refdata-save-{model_label}"
+        )
+        post_delete.connect(
+            _on_delete,
+            sender=model,
+            weak=False,
+            dispatch_uid=f"refdata-delete-{model_label}",
+        )
+
+
+# ==========================
+#  RÉPONSES HTTP
+# ==========================
+
+
+def reference_list_response(request, name: str, view=None):
+    """
+    Réponse de liste servie depuis le cache, avec ETag / Last-Modified.
+    Répond 304 sans sérialisation si le client possède déjà la version courante.
+    La pagination de la vue est respectée si elle est active.
+    """
+    entry = get_reference_entry(name)
+    etag = quote_etag(f"{name}-{entry['version']}")
+    last_modified = entry["last_modified"]
+
+    not_modified = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if not_modified is not None:
+        return not_modified
+
+    data = entry["data"]
+    page = view.paginate_queryset(data) if view is not None else None
+    if page is not None:
+        response = view.get_paginated_response(page)
+    else:
+        response = Response(data)
+
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    return response
+
+
+class ReferenceDataListMixin:
+    """
+    Mixin de ViewSet : sert l'action `list` depuis le cache des données de référence.
+    """
+
+    reference_dataset = None
+
+    def list(self, request, *args, **kwargs):
+        return reference_list_response(request, self.reference_dataset, view=self)
+
+
+# ==========================
+#  SÉRIALISEURS
+# ==========================
+
+
+class CachedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    `PrimaryKeyRelatedField` qui valide l'id contre le jeu de données en cache
+    au lieu d'exécuter un `queryset.get(pk=...)` par valeur.
+    Le `queryset` reste requis par DRF (métadonnées, champs non-cachés) mais n'est pas interrogé.
+    """
+
+    def __init__(self, dataset: str, **kwargs):
+        self.dataset = dataset
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if self.pk_field is not None:
+            data = self.pk_field.to_internal_value(data)
+        if isinstance(data, bool) or not isinstance(data, (str, int, uuid.UUID)):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+        instance = get_reference_instance(self.dataset, data)
+        if instance is None:
+            self.fail("does_not_exist", pk_value=data)
+        return instance
@@ -0,0 +1,237 @@
+"""
+Files Celery : routage, limites de temps et mesures.
+
+Chaque tâche est routée vers une file selon sa classe (`CELERY_TASK_ROUTES`) :
+- emails-urgent : confirmations et notifications unitaires
+- emails-outbox : vidage de l'outbox des e-mails transactionnels (lots au rythme du quota SMTP)
+- emails-bulk : rappels, absences, échéances (rafales planifiées)
+- pdf-render : e-mails avec documents PDF (contrats, reçus)
+- reports : rapports quotidiens
+- imports : traitements de données en masse (imports de leads, détection des doublons)
+- default : tout le reste
+
+`CELERY_QUEUE_SETTINGS` fixe, par file, la concurrence et le prefetch des workers dédiés
+(`worker_command(*queues)` donne la ligne de lancement) ainsi que les limites de temps
+appliquées à chaque tâche de la file (`QueueAnnotations`).
+
+Un worker lancé sans `-Q` n'écoute que la file par défaut : chaque file doit être servie
+par un worker du déploiement (`WORKER_GROUPS`, repris dans `render.yaml`).
+
+Mesures : l'heure de publication est ajoutée aux en-têtes du message ; au démarrage et à la
+fin de chaque tâche, l'attente en file et la durée d'exécution sont stockées dans Redis
+(derniers `LATENCY_SAMPLES` échantillons par file), résumées en percentiles par
+`get_task_latency_stats`.
+"""
+
+import logging
+import time
+
+from celery.signals import before_task_publish, task_postrun, task_prerun
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE = "default"
+
+# Workers du déploiement (render.yaml) : nom → files servies
+WORKER_GROUPS = {
+    "emails": ("emails-urgent", "emails-outbox"),
+    "main": ("emails-bulk", "pdf-render", "reports", "imports", DEFAULT_QUEUE),
+}
+LATENCY_KEY = "tasks:latency:{queue}:{metric}"
+LATENCY_METRICS = ("wait_ms", "run_ms")
+LATENCY_SAMPLES = 1000
+PERCENTILES = (50, 90, 99)
+
+
+# ==========================
+#  ROUTAGE / RÉGLAGES
+# ==========================
+
+
+def get_queue_settings() -> dict:
+    return getattr(settings, "CELERY_QUEUE_SETTINGS", {})
+
+
+def get_queue_names() -> list:
+    return list(get_queue_settings()) or [DEFAULT_QUEUE]
+
+
+def queue_for_task(task_name: str) -> str:
+    """File de destination d'une tâche, selon `CELERY_TASK_ROUTES`."""
+    from celery.app.routes import MapRoute
+
+    route = MapRoute(getattr(settings, "CELERY_TASK_ROUTES", {}))(task_name) or {}
+    return route.get("queue") or getattr(
+        settings, "CELERY_TASK_DEFAULT_QUEUE", DEFAULT_QUEUE
+    )
+
+
+class QueueAnnotations:
+    """
+    Annotations Celery (`CELERY_TASK_ANNOTATIONS`) : limites de temps de la file
+    de chaque tâche.
+    """
+
+    def annotate(self, task):
+        config = get_queue_settings().get(queue_for_task(task.name), {})
+        limits = {
+            key: config[key]
+            for key in ("time_limit", "soft_time_limit")
+            if config.get(key)
+        }
+        return limits or None
+
+
+def worker_command(*queues: str, name: str = None) -> str:
+    """
+    Ligne de lancement d'un worker servant une ou plusieurs files : concurrence
+    cumulée, prefetch le plus prudent des files servies.
+    """
+    configs = [get_queue_settings().get(queue, {}) for queue in queues]
+    concurrency = sum(config.get("concurrency", 1) for config in configs)
+    prefetch = min(config.get("prefetch_multiplier", 1) for config in configs)
+    return (
+        f"celery -A tds worker -Q {','.join(queues)} -n {name or queues[0]}@%h "
+        f"--concurrency {concurrency} "
+        f"--prefetch-multiplier {prefetch}"
+    )
+
+
+# ==========================
+#  MESURES DE LATENCE
+# ==========================
+
+
+def _redis():
+    from django_redis import get_redis_connection
+
+    return get_redis_connection("default")
+
+
+def _record(queue: str, metric: str, value_ms: float):
+    try:
+        key = LATENCY_KEY.format(queue=queue, metric=metric)
+        pipe = _redis().pipeline()
+        pipe.lpush(key, int(value_ms))
+        pipe.ltrim(key, 0, LATENCY_SAMPLES - 1)
+        pipe.execute()
+    except Exception as e:
+        logger.warning("⚠️ Mesure de latence non enregistrée (%s) : %s", queue, e)
+
+
+def _task_queue(task) -> str:
+    delivery_info = getattr(task.request, "delivery_info", None) or {}
+    return delivery_info.get("routing_key") or queue_for_task(task.name)
+
+
+def _on_publish(sender=None, headers=None, **kwargs):
+    if headers is not None:
+        headers.setdefault("published_at", time.time())
+
+
+def _on_prerun(sender=None, task=None, **kwargs):
+    if task is None:
+        return
+    now = time.time()
+    task.request._started_at = now
+    published_at = getattr(task.request, "published_at", None) or (
+        getattr(task.request, "headers", None) or {}
+    ).get("published_at")
+    if published_at:
+        _record(_task_queue(task), "wait_ms", max(0.0, (now - published_at) * 1000))
+
+
+def _on_postrun(sender=None, task=None, **kwargs):
+    started_at = getattr(getattr(task, "request", None), "_started_at", None)
+    if started_at:
+        _record(_task_queue(task), "run_ms", (time.time() - started_at) * 1000)
+
+
+def connect_task_signals():
+    before_task_publish.connect(_on_publish, weak=False, dispatch_uid="tasks-publish")
+    task_prerun.connect(_on_prerun, weak=False, dispatch_uid="tasks-prerun")
+    task_postrun.connect(_on_postrun, weak=False, dispatch_uid="tasks-postrun")
+
+
+def _percentiles(samples) -> dict:
+    if not samples:
+        return {f"p{p}": None for p in PERCENTILES}
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    return {f"p{p}": ordered[round(last * p / 100)] for p in PERCENTILES}
+
+
+def get_task_latency_stats(queues=None) -> dict:
+    """
+    Percentiles (ms) de l'attente en file et de la durée d'exécution, par file.
+    """
+    queues = queues or get_queue_names()
+    keys = [
+        LATENCY_KEY.format(queue=queue, metric=metric)
+        for queue in queues
+        for metric in LATENCY_METRICS
+    ]
+    try:
+        pipe = _redis().pipeline()
+        for key in keys:
+            pipe.lrange(key, 0, -1)
+        values = dict(zip(keys, pipe.execute()))
+    except Exception as e:
+        logger.warning("⚠️ Mesures de latence indisponibles : %s", e)
+        values = {}
+
+    stats = {}
+    for queue in queues:
+        stats[queue] = {}
+        for metric in LATENCY_METRICS:
+            samples = [
+                int(v) for v in values.get(LATENCY_KEY.format(queue=queue, metric=metric), [])
+            ]
+            stats[queue][metric] = {"samples": len(samples), **_percentiles(samples)}
+    return stats
+
+
+def reset_task_latency_stats(queues=None):
+    queues = queues or get_queue_names()
+    _redis().delete(
+        *[
+            LATENCY_KEY.format(queue=queue, metric=metric)
+            for queue in queues
+            for metric in LATENCY_METRICS
+        ]
+    )
+
+
+# ==========================
+#  PROFONDEUR DES FILES
+# ==========================
+
+
+def get_queue_depths(queues=None) -> dict:
+    """
+    Nombre de messages en attente dans chaque file du broker (None si indisponible).
+    """
+    from kombu.exceptions import ChannelError
+
+    from tds.celery import app
+
+    queues = queues or get_queue_names()
+    depths = {}
+    try:
+        with app.connection_for_read() as connection:
+            connection.ensure_connection(max_retries=1)
+            channel = connection.default_channel
+            for queue in queues:
+                try:
+                    depths[queue] = channel.queue_declare(
+                        queue=queue, passive=True
+                    ).message_count
+                except ChannelError:
+                    # File jamais utilisée (ou vide, côté Redis)
+                    depths[queue] = 0
+                    channel = connection.channel()
+    except Exception as e:
+        logger.warning("⚠️ Broker Celery injoignable : %s", e)
+        depths = {queue: None for queue in queues}
+    return depths
@@ -0,0 +1,78 @@
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from api.utils import background
+from api.utils.background import (
+    drain,
+    get_background_stats,
+    reset_background_stats,
+    submit,
+    submit_on_commit,
+)
+
+
+@pytest.fixture
+def executor(settings):
+    drain()
+    reset_background_stats()
+    settings.BACKGROUND_MAX_WORKERS = 1
+    settings.BACKGROUND_MAX_QUEUE = 1
+    settings.BACKGROUND_TASKS_EAGER = False
+    yield
+    drain()
+    reset_background_stats()
+
+
+def test_full_queue_runs_in_caller_thread(executor):
+    release = threading.Event()
+    started = threading.Event()
+    threads = []
+
+    def blocking():
+        started.set()
+        release.wait(5)
+
+    def record():
+        threads.append(threading.current_thread().name)
+
+    submit(blocking)
+    started.wait(5)
+    queued = submit(record)
+    assert queued is not None
+    assert submit(record) is None  # 1 actif + 1 en file : exécution sur place
+    assert threads == [threading.current_thread().name]
+
+    stats = get_background_stats()
+    assert (stats["active"], stats["queued"], stats["inline"]) == (1, 1, 1)
+
+    release.set()
+    assert drain()
+    assert threads[1].startswith("background")
+    assert get_background_stats()["completed"] == 3
+
+
+def test_jobs_close_their_db_connections_and_errors_are_contained(executor):
+    def failing():
+        raise ValueError("boom")
+
+    with patch.object(background.connections, "close_all") as close_all:
+        submit(failing)
+        assert drain()
+
+    close_all.assert_called_once()
+    assert get_background_stats()["failed"] == 1
+
+
+@pytest.mark.django_db
+def test_submit_on_commit_waits_for_commit(executor, settings, django_capture_on_commit_callbacks):
+    settings.BACKGROUND_TASKS_EAGER = True
+    calls = []
+
+    with django_capture_on_commit_callbacks(execute=False) as callbacks:
+        submit_on_commit(calls.append, "ok")
+    assert calls == []
+
+    callbacks[0]()
+    assert calls == ["ok"]
@@ -0,0 +1,140 @@
+import smtplib
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from celery.exceptions import Retry
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail import EmailMessage
+from django.core.mail.backends.smtp import EmailBackend as SMTPBackend
+
+from api.utils.email.dispatch import (
+    RATE_KEY,
+    SendQuotaExceeded,
+    close_pooled_connection,
+    dispatch_messages,
+    get_email_metrics,
+    reset_email_metrics,
+)
+
+"""
+Tests du service d'envoi d'e-mails (connexion partagée, relances, mesures).
+"""
+
+
+@pytest.fixture(autouse=True)
+def fresh_pool(settings):
+    settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+    settings.EMAIL_RETRY_BACKOFF = 0
+    close_pooled_connection()
+    reset_email_metrics()
+    yield
+    close_pooled_connection()
+
+
+def _messages(count):
+    return [
+        EmailMessage(subject=f"Sujet {i}", body="", to=[f"lead{i}@example.com"])
+        for i in range(count)
+    ]
+
+
+def test_messages_share_one_connection():
+    result = dispatch_messages(_messages(3))
+    dispatch_messages(_messages(2))
+
+    assert result.sent == 3
+    assert len(mail.outbox) == 5
+    metrics = get_email_metrics()
+    assert metrics["sent"] == 5
+    assert metrics["connections_opened"] == 1
+
+
+def test_connection_renewed_after_max_messages(settings):
+    settings.EMAIL_POOL_MAX_MESSAGES = 2
+    dispatch_messages(_messages(5))
+    assert get_email_metrics()["connections_opened"] == 3
+
+
+def test_transient_error_is_retried():
+    connection = MagicMock()
+    connection.send_messages.side_effect = [
+        smtplib.SMTPServerDisconnected("coupure"),
+        1,
+    ]
+    with patch("api.utils.email.dispatch.get_connection", return_value=connection):
+        result = dispatch_messages(_messages(1))
+
+    assert result.sent == 1
+    assert result.retries == 1
+    assert connection.send_messages.call_count == 2
+
+
+def test_permanent_error_is_not_retried():
+    connection = MagicMock()
+    connection.send_messages.side_effect = smtplib.SMTPRecipientsRefused(
+        {"lead0@example.com": (550, b"Unknown user")}
+    )
+    with patch("api.utils.email.dispatch.get_connection", return_value=connection):
+        result = dispatch_messages(_messages(1))
+
+    assert result.sent == 0
+    assert result.failed == 1
+    assert result.retries == 0
+    assert get_email_metrics()["failed"] == 1
+
+
+def test_raise_on_failure():
+    connection = MagicMock()
+    connection.send_messages.side_effect = smtplib.SMTPDataError(554, b"Rejected")
+    with patch("api.utils.email.dispatch.get_connection", return_value=connection):
+        with pytest.raises(smtplib.SMTPDataError):
+            dispatch_messages(_messages(1), raise_on_failure=True)
+
+
+@pytest.fixture
+def quota_used_up(settings):
+    """Quota SMTP épuisé, 30 s avant la fin de la fenêtre, dans une tâche urgente lancée il y a 20 s."""
+    settings.EMAIL_RATE_LIMIT_PER_MINUTE = 1
+    now = 1_000_000 * 60 + 30
+    key = RATE_KEY.format(window=1_000_000)
+    cache.set(key, 0, timeout=120)
+    connection = MagicMock(spec=SMTPBackend)
+    connection.send_messages.return_value = 1
+    task = SimpleNamespace(
+        name="api.utils.email.leads.tasks.send_formulaire_task",
+        request=SimpleNamespace(id="t1", _started_at=now - 20),
+        retry=MagicMock(return_value=Retry()),
+    )
+    with (
+        patch("api.utils.email.dispatch.get_connection", return_value=connection),
+        patch("api.utils.email.dispatch._running_task", return_value=task),
+        patch("api.utils.email.dispatch.time.time", return_value=now),
+        patch("api.utils.email.dispatch.time.sleep") as sleep,
+    ):
+        yield SimpleNamespace(key=key, task=task, sleep=sleep, connection=connection)
+    cache.delete(key)
+
+
+def test_quota_wait_beyond_soft_limit_retries_the_task(quota_used_up):
+    cache.set(quota_used_up.key, 1, timeout=120)
+
+    with pytest.raises(Retry):
+        dispatch_messages(_messages(1), raise_on_failure=True)
+
+    # Pas de pause de 30 s dans une file limitée à 45 s : relance à la réouverture
+    quota_used_up.sleep.assert_not_called()
+    quota_used_up.connection.send_messages.assert_not_called()
+    kwargs = quota_used_up.task.retry.call_args.kwargs
+    assert kwargs["countdown"] == pytest.approx(30.05)
+    assert isinstance(kwargs["exc"], SendQuotaExceeded)
+
+
+def test_quota_exceeded_after_partial_batch_is_not_retried(quota_used_up):
+    result = dispatch_messages(_messages(3))
+
+    assert (result.sent, result.failed) == (1, 2)
+    assert isinstance(result.errors[0], SendQuotaExceeded)
+    quota_used_up.task.retry.assert_not_called()
+    quota_used_up.sleep.assert_not_called()
@@ -0,0 +1,62 @@
+from datetime import datetime, timezone as dt_timezone
+from types import SimpleNamespace
+
+from babel.dates import format_datetime
+from django.core import mail
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from api.utils.email.config import TDS_FRANCE_ADDRESS, _build_context
+from api.utils.email.leads.notifications import send_appointment_reminder_emails
+from api.utils.email.rendering import get_email_template, render_batch
+from api.utils.email.utils import _format_french_datetime, get_french_datetime_strings
+
+TEMPLATE = "email/leads/appointment_reminder.html"
+
+
+def _lead(i, dt):
+    return SimpleNamespace(
+        id=i,
+        first_name=f"Prénom{i}",
+        last_name="Nom",
+        email=f"lead{i}@example.com",
+        appointment_date=dt,
+    )
+
+
+def test_french_datetime_matches_babel_and_is_memoized():
+    _format_french_datetime.cache_clear()
+    dt = datetime(2025, 8, 15, 22, 30, tzinfo=dt_timezone.utc)
+    local = timezone.localtime(dt)
+
+    assert get_french_datetime_strings(dt) == (
+        format_datetime(local, "EEEE d MMMM yyyy", locale="fr_FR"),
+        format_datetime(local, "HH:mm", locale="fr_FR"),
+    )
+    get_french_datetime_strings(dt)
+    assert _format_french_datetime.cache_info().hits == 1
+
+
+def test_render_batch_matches_render_to_string(settings):
+    settings.DEBUG = False
+    dt = datetime(2030, 1, 15, 9, 0, tzinfo=dt_timezone.utc)
+    contexts = [
+        _build_context(_lead(i, dt), dt, TDS_FRANCE_ADDRESS) for i in range(3)
+    ]
+
+    assert render_batch(TEMPLATE, contexts) == [
+        render_to_string(TEMPLATE, context) for context in contexts
+    ]
+    assert get_email_template(TEMPLATE) is get_email_template(TEMPLATE)
+
+
+def test_send_reminder_batch_one_message_per_lead():
+    dt = datetime(2030, 1, 15, 9, 0, tzinfo=dt_timezone.utc)
+    leads = [_lead(i, dt) for i in range(4)] + [
+        SimpleNamespace(id=9, first_name="X", last_name="Y", email=None, appointment_date=dt)
+    ]
+
+    result = send_appointment_reminder_emails(leads)
+
+    assert result.sent == 4
+    assert [m.to for m in mail.outbox] == [[f"lead{i}@example.com"] for i in range(4)]
@@ -0,0 +1,50 @@
+import pytest
+
+from api.lead_status.models import LeadStatus
+from api.leads.constants import RDV_PLANIFIE
+from api.leads.models import Lead
+from api.utils.phones import _to_e164, normalize_phone, normalize_phones
+
+
+@pytest.mark.parametrize(
+    "raw",
+    ["0612345678", "06 12 34 56 78", "06.12.34.56.78", "+33 6 12 34 56 78", "0033612345678", "33612345678", 33612345678.0, "612345678"],
+)
+def test_normalize_phone_formats(raw):
+    assert normalize_phone(raw) == "+33612345678"
+
+
+@pytest.mark.parametrize("raw", [None, "", "nan", "12", "abc", float("nan")])
+def test_normalize_phone_invalid(raw):
+    assert normalize_phone(raw) is None
+
+
+def test_foreign_number_keeps_its_country_code():
+    assert normalize_phone("+359 88 123 4567") == "+359881234567"
+
+
+def test_normalize_phones_parses_each_distinct_value_once():
+    _to_e164.cache_clear()
+    values = ["06 12 34 56 78", "0698765432", "06 12 34 56 78", None, "12"] * 100
+
+    result = normalize_phones(values)
+
+    assert result[:5] == ["+33612345678", "+33698765432", "+33612345678", None, None]
+    assert len(result) == 500
+    assert _to_e164.cache_info().misses <= 4
+
+
+@pytest.mark.django_db
+def test_lead_save_maintains_normalized_phone():
+    status = LeadStatus.objects.create(code=RDV_PLANIFIE, label="Planifié")
+    lead = Lead.objects.create(first_name="Jean", last_name="Doe", phone="06 12 34 56 78", status=status)
+    assert lead.phone_normalized == "+33612345678"
+
+    lead.phone = "0698765432"
+    lead.save(update_fields=["phone"])
+    lead.refresh_from_db()
+    assert lead.phone_normalized == "+33698765432"
+
+    lead.phone = "inconnu"
+    lead.save()
+    assert Lead.objects.get(pk=lead.pk).phone_normalized == ""
@@ -0,0 +1,158 @@
+import os
+import threading
+import time
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from botocore.exceptions import ClientError
+from django.core import mail
+
+from api.utils.cloud.scw.downloads import download_files_from_s3
+from api.utils.email.recus.notifications import send_receipts_email_to_lead
+
+
+class FakeS3:
+    """Client S3 minimal : objets en mémoire, GET conditionnel, suivi de la concurrence."""
+
+    def __init__(self, objects, delay=0.0):
+        self.objects = objects
+        self.delay = delay
+        self.transfers = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def get_object(self, Bucket, Key, IfNoneMatch=None):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            if Key not in self.objects:
+                raise ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+            content, etag = self.objects[Key]
+            if IfNoneMatch == f'"{etag}"':
+                raise ClientError({"Error": {"Code": "304"}}, "GetObject")
+            with self._lock:
+                self.transfers += 1
+            return {"Body": SimpleNamespace(read=lambda: content), "ETag": f'"{etag}"'}
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def generate_presigned_url(self, method, Params, ExpiresIn):
+        return f"https://signed.example/{Params['Key']}"
+
+
+@pytest.fixture
+def fake_s3(settings, tmp_path):
+    settings.S3_DOWNLOAD_CACHE_DIR = str(tmp_path)
+    settings.S3_DOWNLOAD_MAX_WORKERS = 4
+    s3 = FakeS3({f"lead/recu_{i}.pdf": (f"pdf-{i}".encode(), f"e{i}") for i in range(8)})
+    with patch("api.utils.cloud.scw.downloads.get_shared_s3_client", return_value=s3), patch(
+        "api.utils.cloud.scw.bucket_utils.get_shared_s3_client", return_value=s3
+    ):
+        yield s3
+
+
+def test_downloads_run_in_parallel_and_keep_order(fake_s3):
+    fake_s3.delay = 0.05
+    keys = [f"lead/recu_{i}.pdf" for i in range(8)]
+
+    results = download_files_from_s3("receipts", keys)
+
+    assert [r.content for r in results] == [f"pdf-{i}".encode() for i in range(8)]
+    assert [r.filename for r in results] == [f"recu_{i}.pdf" for i in range(8)]
+    assert 1 < fake_s3.max_active <= 4
+
+
+def test_unchanged_objects_are_served_from_local_cache(fake_s3):
+    keys = ["lead/recu_0.pdf", "lead/recu_1.pdf"]
+    download_files_from_s3("receipts", keys)
+    assert fake_s3.transfers == 2
+
+    results = download_files_from_s3("receipts", keys)
+    assert all(r.from_cache for r in results)
+    assert fake_s3.transfers == 2
+
+    # Objet remplacé sur S3 : nouvel ETag, nouveau transfert
+    fake_s3.objects["lead/recu_0.pdf"] = (b"nouveau", "e0-bis")
+    first, second = download_files_from_s3("receipts", keys)
+    assert (first.content, first.from_cache) == (b"nouveau", False)
+    assert second.from_cache
+
+
+def test_failed_key_does_not_block_others(fake_s3):
+    ok, missing = download_files_from_s3(
+        "receipts", ["lead/recu_0.pdf", "lead/inconnu.pdf"]
+    )
+    assert ok.ok and ok.content == b"pdf-0"
+    assert not missing.ok
+
+
+def test_local_cache_is_pruned_by_age_and_size(fake_s3, settings, tmp_path):
+    settings.S3_DOWNLOAD_CACHE_MAX_AGE = 3600
+    download_files_from_s3("receipts", ["lead/recu_0.pdf", "lead/recu_1.pdf"])
+    # Copie de recu_0 inutilisée depuis plus longtemps que la durée maximale
+    expired = time.time() - 2 * 3600
+    for path in tmp_path.iterdir():
+        if path.name.startswith("e0") or path.read_text() == "e0":
+            os.utime(path, (expired, expired))
+
+    download_files_from_s3("receipts", ["lead/recu_2.pdf"])
+    assert not (tmp_path / "e0.bin").exists()
+    assert (tmp_path / "e1.bin").exists()
+
+    # Taille maximale : seule la copie la plus récente est gardée
+    settings.S3_DOWNLOAD_CACHE_MAX_BYTES = len("pdf-3") + len("e3")
+    download_files_from_s3("receipts", ["lead/recu_3.pdf"])
+    assert sorted(path.name for path in tmp_path.glob("*.bin")) == ["e3.bin"]
+    assert download_files_from_s3("receipts", ["lead/recu_3.pdf"])[0].from_cache
+
+
+def _receipts(count):
+    return [
+        SimpleNamespace(
+            id=i,
+            receipt_url=f"https://s3.fr-par.scw.cloud/recus/lead/recu_{i}.pdf",
+            amount=100,
+            payment_date=date(2025, 1, 1),
+        )
+        for i in range(count)
+    ]
+
+
+LEAD = SimpleNamespace(id=1, first_name="Sarah", last_name="Martin", email="s@example.com")
+
+
+def test_receipts_sent_as_attachments(fake_s3):
+    send_receipts_email_to_lead(LEAD, _receipts(3))
+
+    message = mail.outbox[0]
+    assert [a[0] for a in message.attachments] == [f"recu_{i}.pdf" for i in range(3)]
+
+
+def test_oversized_receipts_are_zipped(fake_s3, settings):
+    for i in range(3):
+        fake_s3.objects[f"lead/recu_{i}.pdf"] = (b"0" * 4000, f"z{i}")
+    settings.EMAIL_MAX_ATTACHMENTS_SIZE = 10000
+
+    send_receipts_email_to_lead(LEAD, _receipts(3))
+
+    (attachment,) = mail.outbox[0].attachments
+    assert attachment[0] == "recus_tds_france.zip"
+
+
+def test_receipts_too_large_for_zip_are_sent_as_links(fake_s3, settings):
+    for i in range(3):
+        fake_s3.objects[f"lead/recu_{i}.pdf"] = (os.urandom(4000), f"r{i}")
+    settings.EMAIL_MAX_ATTACHMENTS_SIZE = 10000
+
+    send_receipts_email_to_lead(LEAD, _receipts(3))
+
+    message = mail.outbox[0]
+    assert not message.attachments
+    html = message.alternatives[0][0]
+    assert "https://signed.example/lead/recu_2.pdf" in html
@@ -12,6 +12,53 @@ def _send(event: str, instance: Lead):
     payload = safe_payload(event, instance, serializer_class=LeadSerializer)
     broadcast(["leads"], payload)  # groupe général leads
 
+
+def broadcast_lead_updated(instance: Lead):
+    """Événement `lead_updated` d'un lead modifié sans `post_save` (liens écrits en direct)."""
+    _send("updated", instance)
+
+
+def broadcast_leads_bulk(event: str, lead_ids, extra: dict = None):
+    """
+    Notification unique pour une écriture en masse (UPDATE sans signaux `post_save`) :
+    seuls les ids sont envoyés, le front recharge les leads concernés.
+    """
+    lead_ids = list(lead_ids)
+    if not lead_ids:
+        return
+    broadcast(
+        ["leads"],
+        {
+            "event": f"leads_bulk_{event}",
+            "data": {"ids": lead_ids},
+            "extra": extra or {},
+        },
+    )
+
+def broadcast_leads_deleted(lead_ids):
+    """
+    Un événement `lead_deleted` par lead supprimé sans signaux `post_delete` (purge) :
+    le lead n'existe plus, seul son id est envoyé.
+    """
+    for lead_id in lead_ids:
+        broadcast(
+            ["leads"],
+            {"event": "lead_deleted", "data": {"id": lead_id}, "extra": {"purged": True}},
+        )
+
+def broadcast_leads_imported(import_id: int, created: int):
+    """
+    Notification récapitulative d'un import en masse (créations par `bulk_create`, sans
+    signaux) : le front recharge la liste plutôt que de recevoir un événement par lead.
+    """
+    broadcast(
+        ["leads"],
+        {
+            "event": "leads_imported",
+            "data": {"import_id": import_id, "created": created},
+        },
+    )
+
 @receiver(post_save, sender=Lead)
 def on_lead_saved(sender, instance: Lead, created, **kwargs):
     logger.info("🧲 post_save Lead id=%s (created=%s)", instance.id, created)
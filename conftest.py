@@ -0,0 +1,15 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _clear_reference_data_cache():
+    """
+    Le cache des données de référence vit dans Redis et survit au rollback
+    de la base entre deux tests : on le vide avant chaque test.
+    """
+    from django.core.cache import cache
+
+    from api.utils.reference_data import CACHE_KEY, REFERENCE_DATASETS
+
+    cache.delete_many([CACHE_KEY.format(name=name) for name in REFERENCE_DATASETS])
+    yield
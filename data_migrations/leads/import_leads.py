@@ -1,7 +1,6 @@
 import os
 import django
 import pandas as pd
-import phonenumbers
 from django.utils.dateparse import parse_datetime
 from zoneinfo import ZoneInfo
 from django.utils import timezone
@@ -19,6 +18,7 @@ from api.comments.models import Comment
 from api.contracts.models import Contract
 from api.services.models import Service
 from api.payments.models import PaymentReceipt
+from api.utils.phones import normalize_phone
 
 # --- CONFIG ---
 INPUT_CSV = "leads_with_contracts.csv"
@@ -36,40 +36,6 @@ def parse_dt_safe(value):
     return dt
 
 
-def clean_phone(raw_value: str) -> str | None:
-    if not raw_value or str(raw_value).lower() in ("nan", "none"):
-        return None
-
-    raw = str(raw_value).strip()
-    if raw.endswith(".0"):
-        raw = raw[:-2]
-    if isinstance(raw_value, float):
-        raw = str(int(raw_value))
-
-    raw = raw.replace(" ", "").replace(".", "").replace(",", "")
-
-    try:
-        if raw.startswith("0") and len(raw) >= 9:
-            raw = "+33" + raw[1:]
-        elif len(raw) == 9 and raw[0] in ["6", "7"]:
-            raw = "+33" + raw
-        elif raw.startswith("33") and not raw.startswith("+"):
-            raw = "+" + raw
-        elif raw.startswith("359"):  # Bulgarie
-            raw = "+" + raw
-        elif raw.startswith("93"):   # Afghanistan
-            raw = "+" + raw
-        elif not raw.startswith("+"):
-            raw = "+33" + raw
-
-        num = phonenumbers.parse(raw, None)
-        if phonenumbers.is_valid_number(num):
-            return phonenumbers.format_number(num, phonenumbers.PhoneNumberFormat.E164)
-    except Exception:
-        pass
-    return None
-
-
 def create_contract(client, collaborator, service_id, amount, contract_date):
     if pd.isna(service_id) or str(service_id).strip() in ("", "nan", "none") or amount <= 0:
         print(f"ℹ️ Aucun contrat à créer → (service_id={service_id}, montant={amount})")
@@ -153,7 +119,7 @@ def import_leads(csv_path: str):
         raise ValueError("❌ Le CSV doit contenir les colonnes 'status_id' et 'collaborator_id'")
 
     existing_emails = set(Lead.objects.exclude(email=None).values_list("email", flat=True))
-    existing_phones = set(Lead.objects.exclude(phone=None).values_list("phone", flat=True))
+    existing_phones = set(Lead.objects.exclude(phone_normalized="").values_list("phone_normalized", flat=True))
 
     leads_to_create = []
     clients_to_create = []
@@ -170,7 +136,7 @@ def import_leads(csv_path: str):
         first_name = str(row.get("first_name", "")).strip().capitalize()
         last_name = str(row.get("last_name", "")).strip().capitalize()
         email = str(row.get("email", "")).strip().lower() or None
-        phone = clean_phone(row.get("phone"))
+        phone = normalize_phone(row.get("phone"))
         created_at = parse_dt_safe(row.get("created_at"))
         appointment_date = parse_dt_safe(row.get("appointment_date"))
 
@@ -192,7 +158,7 @@ def import_leads(csv_path: str):
         if email:
             existing_lead = Lead.objects.filter(email=email).first()
         if not existing_lead and phone:
-            existing_lead = Lead.objects.filter(phone=phone).first()
+            existing_lead = Lead.objects.filter(phone_normalized=phone).first()
 
         collaborator = None
         collaborator_id = str(row.get("collaborator_id")).strip()
@@ -226,6 +192,7 @@ def import_leads(csv_path: str):
             last_name=last_name,
             email=email,
             phone=phone,
+            phone_normalized=phone,
             status=status,
             created_at=created_at,
             appointment_date=appointment_date,
@@ -1,5 +1,4 @@
 import os
-import re
 import django
 import pandas as pd
 from datetime import datetime
@@ -13,6 +12,7 @@ django.setup()
 
 from api.leads.models import Lead
 from api.lead_status.models import LeadStatus
+from api.utils.phones import normalize_phones
 
 # --- Config ---
 FILE_PATH = "/data_migrations/leads/tds_venir.csv"
@@ -108,37 +108,8 @@ df[col_statut_client] = (
 )
 df[col_conf] = df[col_conf].astype(str).str.strip().apply(lambda x: unidecode(x).upper())
 
-# --- Fonction de normalisation des téléphones ---
-def normalize_phone_raw(value):
-    """
-    Nettoie et normalise un numéro de téléphone.
-    Convertit +33 / 0033 / 33 en 0 et garde uniquement les chiffres.
-    """
-    if pd.isna(value):
-        return ""
-    s = str(value).strip()
-
-    # Si float (ex: 33658637350.0)
-    if re.match(r'^\d+\.0$', s):
-        s = s.split('.')[0]
-
-    # Supprimer tout sauf chiffres
-    digits = re.sub(r'\D', '', s)
-    if digits == "":
-        return ""
-
-    # Gérer formats internationaux français
-    if digits.startswith("00") and digits[2:4] == "33":
-        digits = "0" + digits[4:]
-    elif digits.startswith("33") and len(digits) >= 11:
-        digits = "0" + digits[2:]
-    elif digits.startswith("336") and len(digits) == 11:
-        digits = "0" + digits[3:]
-
-    return digits
-
-# --- Appliquer la normalisation téléphone ---
-df[col_tel] = df[col_tel].apply(normalize_phone_raw)
+# --- Normalisation des téléphones (E.164, module partagé, vectorisée) ---
+df[col_tel] = normalize_phones(df[col_tel])
 print("📞 Aperçu des téléphones normalisés :", df[col_tel].dropna().astype(str).unique()[:10])
 
 # --- Filtre : uniquement par statut et RDV non vide ---
@@ -169,7 +140,7 @@ for _, row in df_filtered.iterrows():
         "first_name": str(row.get(col_prenom, "")).capitalize(),
         "last_name": str(row.get(col_nom, "")).capitalize(),
         "email": str(row.get(col_email, None)).strip() or None,
-        "phone": normalize_phone_raw(row.get(col_tel, "")),
+        "phone": row.get(col_tel),
         "appointment_date": rdv_date,
         "created_at": row[col_date_lead] if pd.notna(row[col_date_lead]) else now,
         "status": status,
@@ -188,14 +159,14 @@ if confirm.lower() == "o":
     skipped = 0
 
     for lead in leads_to_create:
-        phone = normalize_phone_raw(lead.get("phone", ""))
+        phone = lead.get("phone")
 
         if not phone:
             print(f"⚠️ Lead sans numéro : {lead['first_name']} {lead['last_name']} → Ignoré.")
             skipped += 1
             continue
 
-        existing = Lead.objects.filter(phone__iexact=phone).first()
+        existing = Lead.objects.filter(phone_normalized=phone).first()
 
         if existing:
             print(f"⚠️ Lead déjà existant : {existing.first_name} {existing.last_name} "
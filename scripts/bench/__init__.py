@@ -0,0 +1,7 @@
+"""
+Bancs d'essai de performance, hors du paquet applicatif `api`.
+
+À lancer depuis la racine du projet (dossier de `manage.py`) :
+
+    python -m scripts.bench.<module> --help
+"""
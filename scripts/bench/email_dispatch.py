@@ -0,0 +1,110 @@
+"""
+Banc d'essai : envoi « une session SMTP par e-mail » vs connexion partagée (`dispatch.py`).
+
+Utilise un serveur SMTP local (aiosmtpd, si installé) pour mesurer le coût réel des
+ouvertures de session ; à défaut, le backend mémoire de Django (coût réseau nul).
+
+    python -m scripts.bench.email_dispatch --count 200
+"""
+
+import argparse
+import os
+import socket
+import time
+
+
+def _build_messages(count):
+    from django.core.mail import EmailMultiAlternatives
+
+    messages = []
+    for i in range(count):
+        msg = EmailMultiAlternatives(
+            subject=f"Rappel #{i}",
+            body="",
+            from_email="noreply@tds-france.fr",
+            to=[f"lead{i}@example.com"],
+        )
+        msg.attach_alternative(f"<p>Rappel de rendez-vous #{i}</p>", "text/html")
+        messages.append(msg)
+    return messages
+
+
+def _start_smtp_stand_in():
+    try:
+        from aiosmtpd.controller import Controller
+        from aiosmtpd.handlers import Sink
+    except ImportError:
+        return None
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    controller = Controller(Sink(), hostname="127.0.0.1", port=port)
+    controller.start()
+    return controller
+
+
+def run(count: int) -> dict:
+    from django.core.mail import get_connection
+    from django.test.utils import override_settings
+
+    from api.utils.email.dispatch import close_pooled_connection, dispatch_messages
+
+    controller = _start_smtp_stand_in()
+    if controller is not None:
+        overrides = {
+            "EMAIL_BACKEND": "django.core.mail.backends.smtp.EmailBackend",
+            "EMAIL_HOST": controller.hostname,
+            "EMAIL_PORT": controller.port,
+            "EMAIL_USE_TLS": False,
+            "EMAIL_USE_SSL": False,
+            "EMAIL_HOST_USER": "",
+            "EMAIL_HOST_PASSWORD": "",
+        }
+        target = "aiosmtpd"
+    else:
+        overrides = {"EMAIL_BACKEND": "django.core.mail.backends.locmem.EmailBackend"}
+        target = "locmem"
+
+    try:
+        with override_settings(EMAIL_RATE_LIMIT_PER_MINUTE=0, **overrides):
+            # 1. Ancien comportement : msg.send() → une session par e-mail
+            start = time.perf_counter()
+            for msg in _build_messages(count):
+                msg.connection = get_connection()
+                msg.send()
+            per_message_s = time.perf_counter() - start
+
+            # 2. Connexion partagée
+            close_pooled_connection()
+            start = time.perf_counter()
+            result = dispatch_messages(_build_messages(count))
+            pooled_s = time.perf_counter() - start
+            close_pooled_connection()
+    finally:
+        if controller is not None:
+            controller.stop()
+
+    return {
+        "target": target,
+        "count": count,
+        "per_message_s": round(per_message_s, 3),
+        "pooled_s": round(pooled_s, 3),
+        "per_message_rate": round(count / per_message_s, 1),
+        "pooled_rate": round(count / pooled_s, 1),
+        "speedup": round(per_message_s / pooled_s, 2) if pooled_s else None,
+        "failed": result.failed,
+    }
+
+
+if __name__ == "__main__":
+    import django
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=200)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tds.settings.dev")
+    django.setup()
+
+    for key, value in run(args.count).items():
+        print(f"{key:>18} : {value}")
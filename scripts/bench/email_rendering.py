@@ -0,0 +1,118 @@
+"""
+Banc d'essai : rendu de rappels de rendez-vous, chemin historique vs rendu en lot.
+
+- historique : `render_to_string` + deux `format_datetime` Babel (locale résolue à chaque appel)
+  par e-mail
+- lot : gabarit compilé une fois (`rendering.render_batch`), locale / motifs Babel
+  pré-analysés et dates mémoïsées (`utils.get_french_datetime_strings`)
+
+Aucun e-mail n'est envoyé : seuls le contexte, le rendu HTML et la construction des
+messages sont mesurés.
+
+    python -m scripts.bench.email_rendering --count 10000
+"""
+
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+TEMPLATE = "email/leads/appointment_reminder.html"
+SUBJECT = "Rappel important : votre rendez-vous approche – TDS France"
+
+
+def _build_leads(count, slots=60):
+    from django.utils import timezone
+
+    # Les rappels d'une journée se répartissent sur quelques dizaines de créneaux
+    start = timezone.make_aware(datetime(2030, 1, 15, 9, 0))
+    return [
+        SimpleNamespace(
+            id=i,
+            first_name=f"Prénom{i}",
+            last_name=f"Nom{i}",
+            email=f"lead{i}@example.com",
+            appointment_date=start + timedelta(minutes=10 * (i % slots)),
+        )
+        for i in range(count)
+    ]
+
+
+def _legacy_context(lead, address):
+    from babel.dates import format_datetime
+    from django.utils import timezone
+
+    from api.utils.email.config import _base_context
+
+    dt_local = timezone.localtime(lead.appointment_date)
+    context = _base_context(lead)
+    context["appointment"] = {
+        "date": format_datetime(dt_local, "EEEE d MMMM yyyy", locale="fr_FR"),
+        "time": format_datetime(dt_local, "HH:mm", locale="fr_FR"),
+        "location": address,
+        "note": "",
+        "with_label": "Conseiller",
+        "with_name": "",
+    }
+    return context
+
+
+def run(count: int) -> dict:
+    from django.template.loader import render_to_string
+    from django.test.utils import override_settings
+
+    from api.utils.email.config import (
+        TDS_FRANCE_ADDRESS,
+        _build_context,
+        _build_message,
+    )
+    from api.utils.email.rendering import clear_template_cache, render_batch
+    from api.utils.email.utils import _format_french_datetime
+
+    leads = _build_leads(count)
+
+    with override_settings(DEBUG=False):
+        # 1. Chemin historique, e-mail par e-mail
+        start = time.perf_counter()
+        for lead in leads:
+            html = render_to_string(TEMPLATE, _legacy_context(lead, TDS_FRANCE_ADDRESS))
+            _build_message(lead.email, SUBJECT, html)
+        legacy_s = time.perf_counter() - start
+
+        # 2. Rendu en lot (caches froids au départ)
+        clear_template_cache()
+        _format_french_datetime.cache_clear()
+        start = time.perf_counter()
+        contexts = [
+            _build_context(lead, lead.appointment_date, TDS_FRANCE_ADDRESS)
+            for lead in leads
+        ]
+        bodies = render_batch(TEMPLATE, contexts)
+        for lead, html in zip(leads, bodies):
+            _build_message(lead.email, SUBJECT, html)
+        batch_s = time.perf_counter() - start
+
+    return {
+        "count": count,
+        "legacy_s": round(legacy_s, 3),
+        "batch_s": round(batch_s, 3),
+        "legacy_rate": round(count / legacy_s, 1),
+        "batch_rate": round(count / batch_s, 1),
+        "speedup": round(legacy_s / batch_s, 2) if batch_s else None,
+        "date_cache": str(_format_french_datetime.cache_info()),
+    }
+
+
+if __name__ == "__main__":
+    import django
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=10000)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tds.settings.dev")
+    django.setup()
+
+    for key, value in run(args.count).items():
+        print(f"{key:>12} : {value}")
@@ -0,0 +1,104 @@
+"""
+Banc d'essai : détection des doublons (`api.lead_dedup`).
+
+Crée `--count` leads (`bulk_create`, prénoms courants et noms de famille formés de
+syllabes aléatoires, 2 % de doublons avec variante d'orthographe et même téléphone), puis mesure une passe complète et une passe incrémentale après l'ajout de
+1 % de leads. Tout est annulé en fin de mesure (transaction englobante).
+
+    python -m scripts.bench.lead_dedup --count 100000
+"""
+
+import argparse
+import os
+import random
+import time
+
+FIRST_NAMES = ["Jean", "Mohamed", "Fatima", "Léa", "Paul", "Awa", "Karim", "Sophie", "Ibrahim", "Nadia"]
+SYLLABLES = [c + v for c in "BDFGKLMNPRSTVZ" for v in "AEIOU"]
+VARIANTS = {"Mohamed": "Mohammed", "Fatima": "Fatimah", "Léa": "Lea", "Sophie": "Sofie"}
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _leads(count, status, start=0, seed=0):
+    from api.leads.models import Lead
+
+    rng = random.Random(seed)
+    leads = []
+    for i in range(start, start + count):
+        first_name = rng.choice(FIRST_NAMES)
+        last_name = "".join(rng.choice(SYLLABLES) for _ in range(3)).capitalize()
+        phone = f"+3361{i:07d}"
+        if i % 50 == 1:
+            # Doublon du lead précédent : même téléphone, orthographe différente
+            first_name = VARIANTS.get(leads[-1].first_name, leads[-1].first_name)
+            last_name = leads[-1].last_name
+            phone = leads[-1].phone_normalized
+        leads.append(
+            Lead(
+                first_name=first_name,
+                last_name=last_name,
+                phone=phone,
+                phone_normalized=phone,
+                email=f"lead{i}@example.com",
+                status=status,
+            )
+        )
+    return leads
+
+
+def run(count: int) -> dict:
+    from django.db import transaction
+    from django.utils import timezone
+
+    from api.lead_dedup.models import DedupRun
+    from api.lead_dedup.services import run_detection
+    from api.lead_status.models import LeadStatus
+    from api.leads.constants import RDV_PLANIFIE
+    from api.leads.models import Lead
+
+    result = {"count": count}
+    try:
+        with transaction.atomic():
+            status, _ = LeadStatus.objects.get_or_create(
+                code=RDV_PLANIFIE, defaults={"label": "RDV planifié"}
+            )
+            Lead.objects.bulk_create(_leads(count, status), batch_size=5000)
+
+            start = time.perf_counter()
+            full = run_detection(full=True)
+            result["full_s"] = round(time.perf_counter() - start, 2)
+            result["full_candidates"] = full.candidates_found
+            result["full_compared"] = full.pairs_compared
+
+            DedupRun.objects.filter(pk=full.pk).update(
+                started_at=timezone.now() - timezone.timedelta(seconds=1)
+            )
+            Lead.objects.bulk_create(
+                _leads(count // 100, status, start=count, seed=1), batch_size=5000
+            )
+            start = time.perf_counter()
+            incremental = run_detection()
+            result["incremental_s"] = round(time.perf_counter() - start, 2)
+            result["incremental_leads"] = incremental.leads_scanned
+            result["incremental_candidates"] = incremental.candidates_found
+            raise _Rollback
+    except _Rollback:
+        pass
+    return result
+
+
+if __name__ == "__main__":
+    import django
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tds.settings.dev")
+    django.setup()
+
+    for key, value in run(args.count).items():
+        print(f"{key:>22} : {value}")
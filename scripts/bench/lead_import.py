@@ -0,0 +1,93 @@
+"""
+Banc d'essai : import en masse de leads (`api.lead_imports`).
+
+Génère un CSV de `--count` lignes (téléphones au format national, dates de RDV sur
+quelques créneaux, 1 % de doublons et 1 % de lignes invalides), puis mesure l'import
+complet : lecture en flux, normalisation, tri et `bulk_create` par lots. Tout est annulé
+en fin de mesure (transaction englobante), la base n'est pas modifiée.
+
+    python -m scripts.bench.lead_import --count 100000
+"""
+
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _write_csv(path, count, slots=40):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(["Nom", "Prénom", "Téléphone", "E-mail", "Date de RDV", "Statut client"])
+        for i in range(count):
+            if i % 100 == 1:
+                phone = "12"  # invalide
+            elif i % 100 == 2:
+                phone = f"06 {(i - 2) // 10000:02d} {(i - 2) % 10000 // 100:02d} {(i - 2) % 100:02d} 00"
+            else:
+                phone = f"06 {i // 10000:02d} {i % 10000 // 100:02d} {i % 100:02d} 00"
+            writer.writerow(
+                [
+                    f"nom{i}",
+                    f"prénom{i}",
+                    phone,
+                    f"lead{i}@example.com",
+                    f"{15 + i % 10:02d}/01/2030 {9 + i % slots // 4:02d}:{i % 4 * 15:02d}",
+                    "RDV planifié",
+                ]
+            )
+
+
+def run(count: int, chunk_size: int = None) -> dict:
+    from django.db import transaction
+
+    from api.lead_imports.models import LeadImport
+    from api.lead_imports.services import run_import
+    from api.lead_status.models import LeadStatus
+    from api.leads.constants import RDV_PLANIFIE
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "leads.csv")
+        _write_csv(path, count)
+
+        try:
+            with transaction.atomic():
+                LeadStatus.objects.get_or_create(
+                    code=RDV_PLANIFIE, defaults={"label": "RDV planifié"}
+                )
+                lead_import = LeadImport.objects.create(file_name="bench.csv")
+                start = time.perf_counter()
+                run_import(lead_import, path, chunk_size=chunk_size)
+                elapsed = time.perf_counter() - start
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    return {
+        "count": count,
+        "elapsed_s": round(elapsed, 2),
+        "rows_per_s": round(count / elapsed, 1),
+        "created": lead_import.created_count,
+        "duplicates": lead_import.duplicate_count,
+        "invalid": lead_import.invalid_count,
+    }
+
+
+if __name__ == "__main__":
+    import django
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tds.settings.dev")
+    django.setup()
+
+    for key, value in run(args.count, args.chunk_size).items():
+        print(f"{key:>12} : {value}")
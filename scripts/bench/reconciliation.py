@@ -0,0 +1,139 @@
+"""
+Banc d'essai : rapprochement d'un relevé de contrats sur une année (`api.reconciliation`).
+
+Crée `--count` contrats répartis sur l'année (un lead et une fiche client chacun, un reçu
+sur deux), puis un relevé CSV des mêmes contrats avec 1 % de montants différents, 1 %
+de lignes absentes de la base et 1 % de contrats absents du relevé. Mesure l'ingestion,
+le rapprochement et sa réexécution (tâche nocturne). Tout est annulé en fin de mesure
+(transaction englobante).
+
+    python -m scripts.bench.reconciliation --count 20000
+"""
+
+import argparse
+import csv
+import os
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _phone(i):
+    return f"+336{i // 1000000 % 100:02d}{i % 1000000:06d}"
+
+
+def _seed(count, year):
+    from django.utils import timezone
+
+    from api.clients.models import Client
+    from api.contracts.models import Contract
+    from api.lead_status.models import LeadStatus
+    from api.leads.constants import RDV_PLANIFIE
+    from api.leads.models import Lead
+    from api.payments.models import PaymentReceipt
+    from api.services.models import Service
+
+    status, _ = LeadStatus.objects.get_or_create(
+        code=RDV_PLANIFIE, defaults={"label": "RDV planifié"}
+    )
+    service, _ = Service.objects.get_or_create(code="BENCH", defaults={"label": "Bench"})
+    leads = Lead.objects.bulk_create(
+        Lead(
+            first_name=f"prénom{i}",
+            last_name=f"nom{i}",
+            phone=_phone(i),
+            phone_normalized=_phone(i),
+            status=status,
+        )
+        for i in range(count)
+    )
+    clients = Client.objects.bulk_create(Client(lead=lead) for lead in leads)
+    start = timezone.make_aware(datetime(year, 1, 1, 10))
+    contracts = Contract.objects.bulk_create(
+        Contract(
+            client=client,
+            service=service,
+            amount_due=Decimal(100 + i % 900),
+            created_at=start + timedelta(days=i % 365),
+        )
+        for i, client in enumerate(clients)
+    )
+    PaymentReceipt.objects.bulk_create(
+        PaymentReceipt(client_id=c.client_id, contract=c, amount=Decimal(50), mode="ESPECES")
+        for c in contracts[::2]
+    )
+
+
+def _write_csv(path, count, year):
+    start = date(year, 1, 1)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(["Nom", "Prénom", "Telephone", "DATE", "TOTAL TTC"])
+        for i in range(count):
+            if i % 100 == 3:
+                continue  # contrat absent du relevé
+            amount = 100 + i % 900 + (25 if i % 100 == 1 else 0)
+            phone = _phone(i + count) if i % 100 == 2 else f"0{_phone(i)[3:]}"
+            day = start + timedelta(days=i % 365)
+            writer.writerow([f"nom{i}", f"prénom{i}", phone, f"{day:%d/%m/%Y}", f"{amount},00 €"])
+
+
+def run(count: int, year: int = 2025) -> dict:
+    from django.db import transaction
+
+    from api.reconciliation.models import Statement
+    from api.reconciliation.services import ingest_statement, reconcile_statement
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "releve.csv")
+        _write_csv(path, count, year)
+
+        try:
+            with transaction.atomic():
+                _seed(count, year)
+                statement = Statement.objects.create(
+                    file_name="bench.csv",
+                    period_start=date(year, 1, 1),
+                    period_end=date(year, 12, 31),
+                )
+                start = time.perf_counter()
+                ingest_statement(statement, path)
+                ingested = time.perf_counter()
+                reconcile_statement(statement)
+                reconciled = time.perf_counter()
+                # Rapprochement nocturne : mêmes lignes, appariements inchangés
+                reconcile_statement(statement)
+                rerun = time.perf_counter()
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    return {
+        "contracts": count,
+        "ingest_s": round(ingested - start, 2),
+        "reconcile_s": round(reconciled - ingested, 2),
+        "rerun_s": round(rerun - reconciled, 2),
+        "lines": statement.line_count,
+        "matched": statement.matched_count,
+        "discrepancies": statement.discrepancy_count,
+    }
+
+
+if __name__ == "__main__":
+    import django
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=20000)
+    parser.add_argument("--year", type=int, default=2025)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tds.settings.dev")
+    django.setup()
+
+    for key, value in run(args.count, args.year).items():
+        print(f"{key:>14} : {value}")
@@ -1,6 +1,7 @@
 import os
 from pathlib import Path
 from datetime import timedelta
+from decimal import Decimal
 from dotenv import load_dotenv
 from corsheaders.defaults import default_headers
 from celery.schedules import crontab
@@ -50,6 +51,14 @@ INSTALLED_APPS = [
     "api.opening_hours",
     "api.jurist_availability_date",
     "api.user_unavailability",
+    "api.email_outbox",
+    "api.monitoring",
+    "api.appointment_reports",
+    "api.campaigns",
+    "api.lead_imports",
+    "api.lead_dedup",
+    "api.reconciliation",
+    "api.lead_assignment",
 ]
 
 MIDDLEWARE = [
@@ -141,6 +150,10 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
     "AUTH_COOKIE_SECURE": True,
     "AUTH_COOKIE_HTTP_ONLY": True,
+    # Jetons porteurs du rôle / de l'état du compte (auth sans requête DB en lecture)
+    "TOKEN_USER_CLASS": "api.custom_auth.tokens.ClaimsUser",
+    "TOKEN_OBTAIN_SERIALIZER": "api.custom_auth.serializers.RoleTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "api.custom_auth.serializers.RoleTokenRefreshSerializer",
 }
 
 # Langue / Temps
@@ -163,6 +176,29 @@ EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
 DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL")
 SERVER_EMAIL = os.getenv("SERVER_EMAIL")
+# Connexion SMTP partagée par worker et quota fournisseur (voir api/utils/email/dispatch.py)
+EMAIL_TIMEOUT = int(os.getenv("EMAIL_TIMEOUT", 30))
+EMAIL_POOL_MAX_MESSAGES = int(os.getenv("EMAIL_POOL_MAX_MESSAGES", 100))
+EMAIL_POOL_IDLE_TIMEOUT = int(os.getenv("EMAIL_POOL_IDLE_TIMEOUT", 60))
+EMAIL_RATE_LIMIT_PER_MINUTE = int(os.getenv("EMAIL_RATE_LIMIT_PER_MINUTE", 30))
+EMAIL_SEND_MAX_RETRIES = int(os.getenv("EMAIL_SEND_MAX_RETRIES", 3))
+EMAIL_RETRY_BACKOFF = int(os.getenv("EMAIL_RETRY_BACKOFF", 2))
+# Exécuteur d'arrière-plan des vues (voir api/utils/background.py)
+BACKGROUND_MAX_WORKERS = int(os.getenv("BACKGROUND_MAX_WORKERS", 4))
+BACKGROUND_MAX_QUEUE = int(os.getenv("BACKGROUND_MAX_QUEUE", 100))
+BACKGROUND_DRAIN_TIMEOUT = int(os.getenv("BACKGROUND_DRAIN_TIMEOUT", 30))
+# Campagnes : taille des lots et cadence (sous le quota SMTP global, pour laisser passer
+# les e-mails transactionnels)
+CAMPAIGN_CHUNK_SIZE = int(os.getenv("CAMPAIGN_CHUNK_SIZE", 50))
+CAMPAIGN_RATE_LIMIT_PER_MINUTE = int(os.getenv("CAMPAIGN_RATE_LIMIT_PER_MINUTE", 20))
+# Au-delà, les pièces jointes sont zippées puis remplacées par des liens signés
+EMAIL_MAX_ATTACHMENTS_SIZE = int(os.getenv("EMAIL_MAX_ATTACHMENTS_SIZE", 15 * 1024 * 1024))
+RECEIPT_LINK_EXPIRES = 7 * 24 * 3600
+# Outbox des e-mails transactionnels (api.email_outbox)
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", 200))
+EMAIL_OUTBOX_DEBOUNCE = int(os.getenv("EMAIL_OUTBOX_DEBOUNCE", 5))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", 5))
+EMAIL_OUTBOX_RETRY_DELAY = int(os.getenv("EMAIL_OUTBOX_RETRY_DELAY", 60))
 
 # Buckets
 BUCKET_USERS_AVATARS = os.getenv("BUCKET_USERS_AVATARS", "avatars-tds")
@@ -170,6 +206,11 @@ BUCKET_CLIENT_DOCUMENTS = os.getenv("BUCKET_CLIENT_DOCUMENTS", "documents-client
 BUCKET_CONTRACTS = os.getenv("BUCKET_CONTRACTS", "contracts")
 BUCKET_RECEIPTS = os.getenv("BUCKET_RECEIPTS", "recus")
 BUCKET_INVOICES = os.getenv("BUCKET_INVOICES", "factures")
+BUCKET_REPORTS = os.getenv("BUCKET_REPORTS", "rapports")
+BUCKET_IMPORTS = os.getenv("BUCKET_IMPORTS", "imports")
+
+# Téléchargements S3 parallèles (api.utils.cloud.scw.downloads)
+S3_DOWNLOAD_MAX_WORKERS = int(os.getenv("S3_DOWNLOAD_MAX_WORKERS", 8))
 
 SCW_BUCKETS = {
     "avatars": BUCKET_USERS_AVATARS,
@@ -177,10 +218,47 @@ SCW_BUCKETS = {
     "contracts": BUCKET_CONTRACTS,
     "receipts": BUCKET_RECEIPTS,
     "invoices": BUCKET_INVOICES,
+    "reports": BUCKET_REPORTS,
+    "imports": BUCKET_IMPORTS,
 }
 # Celery
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
+
+# Files Celery : une file par classe de tâche, pour qu'un rapport ou une rafale de rappels
+# ne retarde pas les confirmations de rendez-vous (voir api/utils/task_queues.py).
+# Les routes exactes sont prioritaires, puis les motifs dans l'ordre.
+CELERY_TASK_DEFAULT_QUEUE = "default"
+CELERY_TASK_ROUTES = {
+    "api.leads.tasks.send_daily_appointments_report_task": {"queue": "reports"},
+    "api.leads.tasks.rebuild_lead_probe_filter": {"queue": "imports"},
+    "api.leads.tasks.purge_leads_task": {"queue": "imports"},
+    "api.leads.tasks.delete_lead_files": {"queue": "imports"},
+    "api.utils.email.recus.tasks.send_receipts_email_task": {"queue": "pdf-render"},
+    "api.leads.tasks.*": {"queue": "emails-bulk"},
+    "api.payments.tasks.*": {"queue": "emails-bulk"},
+    "api.utils.email.contracts.tasks.*": {"queue": "pdf-render"},
+    "api.utils.email.*": {"queue": "emails-urgent"},
+    "api.email_outbox.tasks.*": {"queue": "emails-outbox"},
+    "api.appointment_reports.tasks.*": {"queue": "reports"},
+    "api.campaigns.tasks.*": {"queue": "emails-bulk"},
+    "api.lead_imports.tasks.*": {"queue": "imports"},
+    "api.lead_dedup.tasks.*": {"queue": "imports"},
+    "api.reconciliation.tasks.*": {"queue": "imports"},
+    "api.lead_assignment.tasks.*": {"queue": "imports"},
+}
+# Réglages par file : concurrence et prefetch des workers dédiés, limites de temps des tâches
+CELERY_QUEUE_SETTINGS = {
+    "emails-urgent": {"concurrency": 4, "prefetch_multiplier": 1, "soft_time_limit": 45, "time_limit": 60},
+    # Vidage de l'outbox : lots bornés par le quota SMTP (1 min), plusieurs lots par passage
+    "emails-outbox": {"concurrency": 1, "prefetch_multiplier": 1, "soft_time_limit": 270, "time_limit": 300},
+    "emails-bulk": {"concurrency": 2, "prefetch_multiplier": 4, "soft_time_limit": 840, "time_limit": 900},
+    "pdf-render": {"concurrency": 2, "prefetch_multiplier": 1, "soft_time_limit": 270, "time_limit": 300},
+    "reports": {"concurrency": 1, "prefetch_multiplier": 1, "soft_time_limit": 1740, "time_limit": 1800},
+    "imports": {"concurrency": 1, "prefetch_multiplier": 1, "soft_time_limit": 1740, "time_limit": 1800},
+    "default": {"concurrency": 2, "prefetch_multiplier": 4, "soft_time_limit": 270, "time_limit": 300},
+}
+CELERY_TASK_ANNOTATIONS = ("api.utils.task_queues.QueueAnnotations",)
 CELERY_BEAT_SCHEDULE = {
     "send-lead-reminders": {
         "task": "api.leads.tasks.send_reminder_emails",
@@ -194,12 +272,85 @@ CELERY_BEAT_SCHEDULE = {
         "task": "api.payments.tasks.send_payment_due_reminders",
         "schedule": crontab(hour=7, minute=0),
     },
+    "prepare-daily-appointments-report": {
+        "task": "api.appointment_reports.tasks.prepare_daily_appointments_report",
+        "schedule": crontab(hour=5, minute=30),
+    },
     "send-daily-appointments-report": {
         "task": "api.leads.tasks.send_daily_appointments_report_task",
         "schedule": crontab(hour=6, minute=0),
     },
+    "drain-email-outbox": {
+        "task": "api.email_outbox.tasks.drain_email_outbox",
+        "schedule": crontab(minute="*"),
+    },
+    "rebuild-lead-probe-filter": {
+        "task": "api.leads.tasks.rebuild_lead_probe_filter",
+        "schedule": crontab(hour=2, minute=30),
+    },
+    "detect-duplicate-leads": {
+        "task": "api.lead_dedup.tasks.run_duplicate_detection",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    "reconcile-contract-statements": {
+        "task": "api.reconciliation.tasks.reconcile_current_year",
+        "schedule": crontab(hour=3, minute=30),
+    },
+    "resume-campaigns": {
+        "task": "api.campaigns.tasks.resume_campaigns",
+        "schedule": crontab(minute="*/10"),
+    },
+    "refresh-assignment-loads": {
+        "task": "api.lead_assignment.tasks.refresh_assignment_loads",
+        "schedule": crontab(minute="5,35"),
+    },
 }
 
+# Rapport quotidien des rendez-vous : destinataires du rapport complet (séparés par des
+# virgules) et envoi d'un rapport individuel à chaque juriste / conseiller concerné
+DAILY_RDV_REPORT_RECIPIENTS = [
+    email.strip()
+    for email in os.getenv(
+        "DAILY_RDV_REPORT_RECIPIENTS", os.getenv("DAILY_RDV_REPORT_EMAIL", "")
+    ).split(",")
+    if email.strip()
+]
+DAILY_RDV_REPORT_PER_USER = os.getenv("DAILY_RDV_REPORT_PER_USER", "False").lower() in (
+    "true",
+    "1",
+    "yes",
+)
+
+# Rappels d'échéance de paiement : jours par rapport à l'échéance (négatif : avant,
+# positif : retard), séparés par des virgules
+PAYMENT_REMINDER_OFFSETS = [
+    int(offset)
+    for offset in os.getenv("PAYMENT_REMINDER_OFFSETS", "-7,-3,-1,3").split(",")
+    if offset.strip()
+]
+
+# Import de leads en masse : lignes écrites par lot (une transaction + point de reprise)
+LEAD_IMPORT_CHUNK_SIZE = int(os.getenv("LEAD_IMPORT_CHUNK_SIZE", 2000))
+
+# Détection des doublons : score minimal d'une paire proposée à la fusion, et taille
+# maximale d'un bloc (leads partageant une clé) comparé deux à deux
+DEDUP_MIN_SCORE = float(os.getenv("DEDUP_MIN_SCORE", 0.6))
+DEDUP_MAX_BLOCK_SIZE = int(os.getenv("DEDUP_MAX_BLOCK_SIZE", 50))
+# Filtre de Bloom Redis des leads connus (formulaires publics) : taille en bits
+# (2**24 bits = 2 Mo, ~2 % de faux positifs pour 2 millions de téléphones / e-mails)
+LEAD_PROBE_FILTER_BITS = int(os.getenv("LEAD_PROBE_FILTER_BITS", 2**24))
+
+# Rapprochement des relevés de contrats : écart de montant toléré par défaut (€)
+RECONCILIATION_AMOUNT_TOLERANCE = Decimal(os.getenv("RECONCILIATION_AMOUNT_TOLERANCE", "0.01"))
+
+# Assignation automatique des nouveaux leads (formulaires publics, imports) au conseiller
+# le moins chargé : charge = leads en attente de RDV + poids × RDV du jour
+LEAD_AUTO_ASSIGNMENT = os.getenv("LEAD_AUTO_ASSIGNMENT", "True").lower() in ("true", "1", "yes")
+LEAD_AUTO_ASSIGN_APPOINTMENT_WEIGHT = int(os.getenv("LEAD_AUTO_ASSIGN_APPOINTMENT_WEIGHT", 2))
+
+# Transitions permises des statuts de dossier : {code: [codes suivants]} ; code absent = libre
+STATUT_DOSSIER_TRANSITIONS = {}
+
 X_FRAME_OPTIONS = 'ALLOW-FROM https://titresdesejour.fr'
 
 # Logging